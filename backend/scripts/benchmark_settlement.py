@@ -0,0 +1,86 @@
+import sys
+import os
+import random
+import time
+from decimal import Decimal
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from app_travel.domain.domain_service.settlement_service import SettlementService
+from app_travel.domain.value_objects.expense_value_objects import SettlementMode
+
+# 对比贪心与精确结算在随机余额集合上的转账次数与耗时
+# 余额按"若干小团体各自 AA"生成，组内零和，贴近真实旅行中的分摊情况
+# 另输出无法两两抵消时精确算法的最坏耗时，用于调整 SettlementService.AUTO_EXACT_MAX_MEMBERS
+# 用法: python scripts/benchmark_settlement.py [成员数列表，逗号分隔] [每组样本数]
+
+
+def random_balances(rng: random.Random, members: int) -> dict:
+    users = [f"user{i}" for i in range(members)]
+    rng.shuffle(users)
+    balances = {}
+    start = 0
+    while start < members:
+        size = min(rng.randint(2, 5), members - start)
+        if members - start - size == 1:
+            size += 1
+        group = users[start:start + size]
+        values = [rng.randint(-50000, 50000) for _ in group[:-1]]
+        values.append(-sum(values))
+        for user_id, cents in zip(group, values):
+            balances[user_id] = Decimal(cents) / 100
+        start += size
+    return balances
+
+
+def measure(balances_list, mode):
+    transfers = 0
+    started = time.perf_counter()
+    worst = 0.0
+    for balances in balances_list:
+        t0 = time.perf_counter()
+        transfers += len(SettlementService.minimize_transfers(balances, mode=mode))
+        worst = max(worst, time.perf_counter() - t0)
+    elapsed = time.perf_counter() - started
+    return transfers / len(balances_list), elapsed / len(balances_list) * 1000, worst * 1000
+
+
+def run(member_counts, samples: int):
+    rng = random.Random(42)
+    print(f"{'members':>7} | {'greedy':>7} | {'auto':>7} | {'exact':>7} | "
+          f"{'auto avg ms':>11} | {'auto max ms':>11} | {'exact avg ms':>12}")
+    for members in member_counts:
+        balances_list = [random_balances(rng, members) for _ in range(samples)]
+        greedy, _, _ = measure(balances_list, SettlementMode.GREEDY)
+        auto, auto_ms, auto_max = measure(balances_list, SettlementMode.AUTO)
+        if members <= 16:
+            exact, exact_ms, _ = measure(balances_list, SettlementMode.EXACT)
+            exact_str, exact_ms_str = f"{exact:7.2f}", f"{exact_ms:12.2f}"
+        else:
+            exact_str, exact_ms_str = f"{'-':>7}", f"{'-':>12}"
+        print(f"{members:>7} | {greedy:7.2f} | {auto:7.2f} | {exact_str} | "
+              f"{auto_ms:11.2f} | {auto_max:11.2f} | {exact_ms_str}")
+
+
+def run_exact_worst_case(member_counts, samples: int):
+    rng = random.Random(7)
+    print(f"\n{'members':>7} | {'exact max ms':>12} | {'auto':>6}")
+    for members in member_counts:
+        worst = 0.0
+        for _ in range(samples):
+            values = [rng.randint(-50000, 50000) for _ in range(members - 1)]
+            values.append(-sum(values))
+            balances = {f"user{i}": Decimal(v) / 100 for i, v in enumerate(values)}
+            t0 = time.perf_counter()
+            SettlementService.exact_transfers(balances)
+            worst = max(worst, time.perf_counter() - t0)
+        auto = 'exact' if members <= SettlementService.AUTO_EXACT_MAX_MEMBERS else 'greedy'
+        print(f"{members:>7} | {worst * 1000:12.2f} | {auto:>6}")
+
+
+if __name__ == "__main__":
+    counts = [int(c) for c in sys.argv[1].split(',')] if len(sys.argv) > 1 else [4, 6, 8, 10, 12, 14, 16, 20, 30]
+    samples = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    run(counts, samples)
+    run_exact_worst_case([c for c in counts if c <= 16], min(samples, 5))
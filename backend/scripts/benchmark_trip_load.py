@@ -0,0 +1,82 @@
+import sys
+import os
+import time
+import uuid
+from datetime import date, time as dtime, timedelta
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from shared.database.core import Base
+from app_travel.infrastructure.database.dao_impl.sqlalchemy_trip_dao import SqlAlchemyTripDao, TRIP_LOAD_PROFILES
+from app_travel.infrastructure.database.persistent_model.trip_po import (
+    TripPO, TripMemberPO, TripDayPO, ActivityPO, TransitPO
+)
+
+# 统计每次完整加载旅行（find_by_id + to_domain）执行的 SQL 条数与耗时
+# 用法: python scripts/benchmark_trip_load.py [天数列表，逗号分隔] [每天活动数]
+
+
+def seed_trip(session, days: int, activities_per_day: int) -> str:
+    trip_id = str(uuid.uuid4())
+    start = date(2024, 1, 1)
+    trip = TripPO(
+        id=trip_id, name=f"Benchmark {days}d", creator_id="bench",
+        start_date=start, end_date=start + timedelta(days=days - 1)
+    )
+    trip.members = [TripMemberPO(user_id=f"user{i}", role="member") for i in range(4)]
+    for d in range(days):
+        day = TripDayPO(day_number=d + 1, date=start + timedelta(days=d))
+        ids = [str(uuid.uuid4()) for _ in range(activities_per_day)]
+        day.activities = [
+            ActivityPO(
+                id=aid, name=f"Activity {i}", activity_type="sightseeing",
+                location_name=f"Place {i}", start_time=dtime(8 + i, 0), end_time=dtime(8 + i, 30)
+            )
+            for i, aid in enumerate(ids)
+        ]
+        day.transits = [
+            TransitPO(
+                id=str(uuid.uuid4()), from_activity_id=a, to_activity_id=b, transport_mode="walking",
+                distance_meters=500, duration_seconds=600,
+                departure_time=dtime(8 + i, 30), arrival_time=dtime(8 + i, 40)
+            )
+            for i, (a, b) in enumerate(zip(ids, ids[1:]))
+        ]
+        trip.days.append(day)
+    session.add(trip)
+    session.commit()
+    return trip_id
+
+
+def run(day_counts, activities_per_day: int = 6):
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    seed = Session()
+    trip_ids = {days: seed_trip(seed, days, activities_per_day) for days in day_counts}
+    seed.close()
+
+    print(f"{'profile':<10}{'days':>6}{'queries':>10}{'ms':>10}")
+    for profile in TRIP_LOAD_PROFILES:
+        for days, trip_id in trip_ids.items():
+            session = Session()
+            statements.clear()
+            started = time.perf_counter()
+            SqlAlchemyTripDao(session, load_profile=profile).find_by_id(trip_id).to_domain()
+            elapsed = (time.perf_counter() - started) * 1000
+            print(f"{profile:<10}{days:>6}{len(statements):>10}{elapsed:>10.1f}")
+            session.close()
+
+
+if __name__ == "__main__":
+    day_counts = [int(x) for x in sys.argv[1].split(',')] if len(sys.argv) > 1 else [1, 7, 30]
+    per_day = int(sys.argv[2]) if len(sys.argv) > 2 else 6
+    run(day_counts, per_day)
@@ -0,0 +1,209 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select, update
+
+from shared.database.core import Base, SessionLocal, engine
+from shared.storage.local_file_storage import (
+    CONTENT_PATH_PATTERN, TMP_DIR_NAME, URL_PREFIX, LocalFileStorageService
+)
+from shared.storage.stored_file_po import StoredFilePO
+from app_auth.infrastructure.database.persistent_model.user_po import UserPO
+from app_social.infrastructure.database.persistent_model.conversation_po import ConversationPO  # MessagePO 的关系映射依赖
+from app_social.infrastructure.database.persistent_model.message_po import MessagePO
+from app_social.infrastructure.database.persistent_model.post_po import PostImagePO
+from app_travel.infrastructure.database.persistent_model.trip_po import TripPO
+
+# 按数据库中实际引用的 URL 重新统计上传文件的引用计数，并删除引用归零且超过宽限期的文件
+# 宽限期用于保护刚上传、尚未被保存到业务数据中的文件（如先上传后提交的封面）。
+# stored_files 的计数以本脚本的统计为准：上传与 release 只是提示，删除帖子/消息/旅行、
+# 更换封面不会 release，这些引用的减少由本脚本重新统计得出。
+# 只处理内容寻址的文件，旧版 UUID 文件名的文件不受影响。可重复执行。
+# 用法: python scripts/gc_uploads.py [宽限小时数] [--dry-run]
+
+args = [a for a in sys.argv[1:] if a != '--dry-run']
+GRACE_HOURS = float(args[0]) if args else 24
+DRY_RUN = '--dry-run' in sys.argv
+BATCH_SIZE = 500
+
+# 保存上传文件 URL 的列
+REFERENCE_COLUMNS = [
+    UserPO.avatar_url,
+    PostImagePO.image_url,
+    MessagePO.media_url,
+    TripPO.cover_image_url,
+]
+
+
+def _count_references():
+    refs = Counter()
+    session = SessionLocal()
+    try:
+        for column in REFERENCE_COLUMNS:
+            stmt = select(column).where(column.like(f"{URL_PREFIX}%")).execution_options(yield_per=1000)
+            for url in session.execute(stmt).scalars():
+                path = LocalFileStorageService.path_from_url(url)
+                if path:
+                    refs[path] += 1
+    finally:
+        session.close()
+    return refs
+
+
+def _files_on_disk(upload_folder):
+    """遍历内容寻址文件（顺带清理超过宽限期的残留临时文件）"""
+    tmp_cutoff = time.time() - GRACE_HOURS * 3600
+    for root, dirs, files in os.walk(upload_folder):
+        if os.path.basename(root) == TMP_DIR_NAME:
+            for name in files:
+                tmp_path = os.path.join(root, name)
+                if os.path.getmtime(tmp_path) < tmp_cutoff and not DRY_RUN:
+                    os.remove(tmp_path)
+            continue
+        for name in files:
+            full_path = os.path.join(root, name)
+            relative_path = os.path.relpath(full_path, upload_folder).replace(os.sep, '/')
+            if CONTENT_PATH_PATTERN.match(relative_path):
+                yield relative_path, full_path
+
+
+def _register_untracked(upload_folder, refs):
+    """登记磁盘上存在但没有引用计数行的文件（登记失败的上传），返回登记数量"""
+    registered = 0
+    pending = []
+
+    def flush(batch):
+        session = SessionLocal()
+        try:
+            known = set(session.execute(
+                select(StoredFilePO.path).where(StoredFilePO.path.in_([p for p, _ in batch]))
+            ).scalars().all())
+            added = 0
+            for relative_path, full_path in batch:
+                if relative_path in known:
+                    continue
+                modified = datetime.utcfromtimestamp(os.path.getmtime(full_path))
+                session.add(StoredFilePO(
+                    path=relative_path,
+                    sha256=os.path.splitext(os.path.basename(relative_path))[0],
+                    size=os.path.getsize(full_path),
+                    ref_count=refs.get(relative_path, 0),
+                    created_at=modified,
+                    updated_at=modified
+                ))
+                added += 1
+            if not DRY_RUN:
+                session.commit()
+            return added
+        finally:
+            session.close()
+
+    for item in _files_on_disk(upload_folder):
+        pending.append(item)
+        if len(pending) >= BATCH_SIZE:
+            registered += flush(pending)
+            pending = []
+    if pending:
+        registered += flush(pending)
+    return registered
+
+
+def _remove_empty_shards(full_path):
+    """删除文件后清理变空的两级分片目录"""
+    shard_dir = os.path.dirname(full_path)
+    for _ in range(2):
+        try:
+            os.rmdir(shard_dir)
+        except OSError:
+            # 目录非空或已被删除
+            return
+        shard_dir = os.path.dirname(shard_dir)
+
+
+def gc_uploads():
+    print(f"Starting upload GC (grace {GRACE_HOURS}h{', dry run' if DRY_RUN else ''})...")
+    Base.metadata.create_all(engine, tables=[StoredFilePO.__table__])
+
+    upload_folder = LocalFileStorageService().upload_folder
+    now = datetime.utcnow()
+    cutoff = now - timedelta(hours=GRACE_HOURS)
+
+    refs = _count_references()
+    print(f"Found {len(refs)} referenced files.")
+    registered = _register_untracked(upload_folder, refs)
+    print(f"Registered {registered} untracked files.")
+
+    corrected = deleted = 0
+    last_path = ''
+    while True:
+        session = SessionLocal()
+        try:
+            rows = session.execute(
+                select(StoredFilePO).where(StoredFilePO.path > last_path)
+                .order_by(StoredFilePO.path).limit(BATCH_SIZE)
+            ).scalars().all()
+            if not rows:
+                break
+            last_path = rows[-1].path
+
+            for stored in rows:
+                actual = refs.get(stored.path, 0)
+                seen_count, seen_updated_at = stored.ref_count, stored.updated_at
+                if DRY_RUN:
+                    corrected += seen_count != actual
+                    deleted += seen_count == actual == 0 and seen_updated_at < cutoff
+                    continue
+
+                if seen_count != actual:
+                    # 计数变化时重新开始宽限期；只在计数仍是读到的值时校正，
+                    # 读取之后并发上传的 acquire 不会被覆盖
+                    result = session.execute(
+                        update(StoredFilePO)
+                        .where(StoredFilePO.path == stored.path, StoredFilePO.ref_count == seen_count)
+                        .values(ref_count=actual, updated_at=now)
+                    )
+                    corrected += result.rowcount
+                    continue
+                if actual != 0 or seen_updated_at >= cutoff:
+                    continue
+
+                # 删除前在同一条语句里重新检查计数与宽限期：读取之后有上传 acquire 过
+                # （计数增加、updated_at 刷新）则不删除。删除语句持有行的写锁直到提交，
+                # 并发的 acquire 要等到提交后才能登记，登记时行已不存在，上传会重新写入文件
+                result = session.execute(
+                    delete(StoredFilePO)
+                    .where(
+                        StoredFilePO.path == stored.path,
+                        StoredFilePO.ref_count == 0,
+                        StoredFilePO.updated_at < cutoff
+                    )
+                )
+                if result.rowcount != 1:
+                    continue
+                full_path = os.path.join(upload_folder, *stored.path.split('/'))
+                if os.path.exists(full_path):
+                    os.remove(full_path)
+                _remove_empty_shards(full_path)
+                deleted += 1
+            if not DRY_RUN:
+                session.commit()
+        except Exception as e:
+            session.rollback()
+            print(f"Batch after {last_path} failed: {e}")
+            break
+        finally:
+            session.close()
+
+    print(f"Corrected {corrected} reference counts, removed {deleted} orphaned files.")
+    print("GC finished.")
+
+
+if __name__ == "__main__":
+    gc_uploads()
@@ -0,0 +1,31 @@
+import sys
+import os
+
+# Add backend directory to path so we can import shared modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from sqlalchemy import text
+from shared.database.core import engine
+
+# 为 trips 表添加乐观锁版本列（TripPO.version，每次更新自增）
+# 已有数据从版本 1 开始
+
+
+def migrate():
+    print("Starting migration: Add version to trips table...")
+
+    with engine.connect() as connection:
+        # We wrap in try-except to handle re-running
+        try:
+            print("Adding version column...")
+            connection.execute(text("ALTER TABLE trips ADD COLUMN version INTEGER NOT NULL DEFAULT 1;"))
+            print("version added.")
+        except Exception as e:
+            print(f"Skipping version (probably exists): {e}")
+
+        connection.commit()
+
+    print("Migration finished.")
+
+if __name__ == "__main__":
+    migrate()
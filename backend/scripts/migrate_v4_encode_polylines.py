@@ -0,0 +1,56 @@
+import sys
+import os
+
+# Add backend directory to path so we can import shared modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from sqlalchemy import select
+
+from shared.database.core import SessionLocal
+from app_travel.infrastructure.database.persistent_model.trip_po import TransitPO
+from app_travel.infrastructure.geo import polyline_codec
+
+# 将 transits.polyline 中的高德原始文本转换为 Encoded Polyline
+# 可重复执行：已编码的行不包含 ','，不会被选中
+# 用法: python scripts/migrate_v4_encode_polylines.py [每批数量]
+
+BATCH_SIZE = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+
+def migrate():
+    print("Starting migration: Encode transit polylines...")
+
+    converted = 0
+    raw_bytes = 0
+    encoded_bytes = 0
+    while True:
+        session = SessionLocal()
+        try:
+            rows = session.execute(
+                select(TransitPO)
+                .where(TransitPO.polyline.like('%,%'))
+                .limit(BATCH_SIZE)
+            ).scalars().all()
+            if not rows:
+                break
+            for transit in rows:
+                encoded = polyline_codec.to_storage(transit.polyline)
+                raw_bytes += len(transit.polyline)
+                encoded_bytes += len(encoded or '')
+                transit.polyline = encoded
+            session.commit()
+            converted += len(rows)
+            print(f"Encoded {converted} polylines")
+        except Exception as e:
+            session.rollback()
+            print(f"Batch failed: {e}")
+            break
+        finally:
+            session.close()
+
+    if raw_bytes:
+        print(f"Polyline size: {raw_bytes} -> {encoded_bytes} bytes ({encoded_bytes / raw_bytes:.0%})")
+    print("Migration finished.")
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,60 @@
+import sys
+import os
+
+# Add backend directory to path so we can import shared modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from sqlalchemy import select
+
+from shared.database.core import Base, SessionLocal, engine
+from app_travel.infrastructure.database.persistent_model.template_po import (
+    TripTemplatePO, TripTemplateTagPO, TripTemplateSearchTermPO
+)
+
+# 创建模板标签表与检索词索引表，并为已有模板回填
+# 可重复执行：每个模板的索引行整体重建
+# 用法: python scripts/migrate_v5_template_index.py [每批数量]
+
+BATCH_SIZE = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+
+def migrate():
+    print("Starting migration: Build template tag table and search index...")
+    Base.metadata.create_all(engine, tables=[TripTemplateTagPO.__table__, TripTemplateSearchTermPO.__table__])
+
+    indexed = 0
+    last_id = ''
+    while True:
+        session = SessionLocal()
+        try:
+            rows = session.execute(
+                select(TripTemplatePO)
+                .where(TripTemplatePO.id > last_id)
+                .order_by(TripTemplatePO.id)
+                .limit(BATCH_SIZE)
+            ).scalars().all()
+            if not rows:
+                break
+            for template_po in rows:
+                tag_rows, search_terms = TripTemplatePO.build_index_rows(template_po.to_domain())
+                # 先删除旧行再插入，避免同一主键冲突
+                template_po.tag_rows = []
+                template_po.search_terms = []
+                session.flush()
+                template_po.tag_rows = tag_rows
+                template_po.search_terms = search_terms
+            session.commit()
+            indexed += len(rows)
+            last_id = rows[-1].id
+            print(f"Indexed {indexed} templates")
+        except Exception as e:
+            session.rollback()
+            print(f"Batch failed: {e}")
+            break
+        finally:
+            session.close()
+
+    print("Migration finished.")
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,113 @@
+import sys
+import os
+
+# Add backend directory to path so we can import shared modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from collections import defaultdict
+from datetime import datetime
+
+from sqlalchemy import select
+
+from shared.database.core import Base, SessionLocal, engine
+from app_social.infrastructure.database.persistent_model.post_po import LikePO, PostPO
+from app_travel.domain.domain_service.popularity_service import PopularityService
+from app_travel.domain.value_objects.popularity_value_objects import PopularitySignal, RankedEntityType
+from app_travel.infrastructure.database.persistent_model.popularity_po import PopularityScorePO
+from app_travel.infrastructure.database.persistent_model.template_po import TripTemplatePO
+from app_travel.infrastructure.database.persistent_model.trip_po import TripPO
+
+# 创建热度排行表，并为尚无热度行的模板/旅行回填分值
+# 回填分值 = 发布时间基线 + 关联游记的历史点赞（按点赞时间衰减）；
+# 历史浏览与克隆没有记录，无法回填。已有热度行不受影响，可重复执行。
+# 用法: python scripts/migrate_v6_popularity_scores.py [每批数量]
+
+BATCH_SIZE = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+
+def _like_times(session, trip_ids):
+    """旅行ID -> 关联游记被他人点赞的时间列表"""
+    rows = session.execute(
+        select(PostPO.trip_id, LikePO.created_at)
+        .join(LikePO, LikePO.post_id == PostPO.id)
+        .where(
+            PostPO.trip_id.in_(trip_ids),
+            PostPO.is_deleted == False,
+            LikePO.user_id != PostPO.author_id
+        )
+    ).all()
+    likes = defaultdict(list)
+    for trip_id, created_at in rows:
+        likes[trip_id].append(created_at)
+    return likes
+
+
+def _score_row(entity_type, entity_id, published_at, like_times, now):
+    base = PopularityService.signal_score(PopularitySignal.CREATED, published_at)
+    score = base
+    for liked_at in like_times:
+        score = PopularityService.add_signal(score, PopularitySignal.LIKE, liked_at)
+    return PopularityScorePO(
+        entity_type=entity_type.value, entity_id=entity_id,
+        score=score, base_score=base,
+        clone_count=0, view_count=0, like_count=len(like_times),
+        published_at=published_at, updated_at=now
+    )
+
+
+def _backfill(entity_type, id_column, created_column, trip_id_column):
+    seeded = 0
+    last_id = ''
+    while True:
+        session = SessionLocal()
+        try:
+            rows = session.execute(
+                select(id_column, created_column, trip_id_column)
+                .where(id_column > last_id)
+                .order_by(id_column)
+                .limit(BATCH_SIZE)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+
+            existing = set(session.execute(
+                select(PopularityScorePO.entity_id).where(
+                    PopularityScorePO.entity_type == entity_type.value,
+                    PopularityScorePO.entity_id.in_([row[0] for row in rows])
+                )
+            ).scalars().all())
+            pending = [row for row in rows if row[0] not in existing]
+            likes = _like_times(session, list({row[2] for row in pending}))
+
+            now = datetime.utcnow()
+            session.add_all([
+                _score_row(entity_type, entity_id, created_at or now, likes.get(trip_id, []), now)
+                for entity_id, created_at, trip_id in pending
+            ])
+            session.commit()
+            seeded += len(pending)
+            print(f"Seeded {seeded} {entity_type.value} rows")
+        except Exception as e:
+            session.rollback()
+            print(f"Batch after {last_id} failed: {e}")
+            break
+        finally:
+            session.close()
+
+
+def migrate():
+    print("Starting migration: Create popularity ranking table...")
+    Base.metadata.create_all(engine, tables=[PopularityScorePO.__table__])
+    # 游记点赞按 source_trip_id 查找模板
+    for index in TripTemplatePO.__table__.indexes:
+        if 'source_trip_id' in index.columns:
+            index.create(engine, checkfirst=True)
+
+    _backfill(RankedEntityType.TEMPLATE, TripTemplatePO.id, TripTemplatePO.created_at, TripTemplatePO.source_trip_id)
+    _backfill(RankedEntityType.TRIP, TripPO.id, TripPO.created_at, TripPO.id.label('trip_id'))
+
+    print("Migration finished.")
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,52 @@
+import sys
+import os
+
+# Add backend directory to path so we can import shared modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from sqlalchemy import select
+
+from shared.database.core import Base, SessionLocal, engine
+from app_auth.infrastructure.database.persistent_model.user_po import UserPO, UserSearchTermPO
+
+# 创建用户名检索词表，并为已有用户回填
+# 可重复执行：每个用户的检索词整体重建（安装 pypinyin 后重跑即可补充拼音检索词）
+# 用法: python scripts/migrate_v7_user_search_index.py [每批数量]
+
+BATCH_SIZE = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+
+def migrate():
+    print("Starting migration: Build username search index...")
+    Base.metadata.create_all(engine, tables=[UserSearchTermPO.__table__])
+
+    indexed = 0
+    last_id = ''
+    while True:
+        session = SessionLocal()
+        try:
+            rows = session.execute(
+                select(UserPO)
+                .where(UserPO.id > last_id)
+                .order_by(UserPO.id)
+                .limit(BATCH_SIZE)
+            ).scalars().all()
+            if not rows:
+                break
+            for user_po in rows:
+                user_po.sync_search_terms(user_po.username)
+            session.commit()
+            indexed += len(rows)
+            last_id = rows[-1].id
+            print(f"Indexed {indexed} users")
+        except Exception as e:
+            session.rollback()
+            print(f"Batch failed: {e}")
+            break
+        finally:
+            session.close()
+
+    print("Migration finished.")
+
+if __name__ == "__main__":
+    migrate()
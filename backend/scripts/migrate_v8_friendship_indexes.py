@@ -0,0 +1,43 @@
+import sys
+import os
+
+# Add backend directory to path so we can import shared modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from sqlalchemy import text
+from shared.database.core import engine
+from app_social.infrastructure.database.po.friendship_po import FriendshipPO
+
+# 将 friendships 表的单列索引替换为按方向的覆盖索引
+# (requester_id, status, addressee_id) / (addressee_id, status, requester_id)
+# 查询某用户的好友只需两次索引范围扫描，不回表
+
+
+def migrate():
+    print("Starting migration: Replace friendship indexes...")
+
+    for index in FriendshipPO.__table__.indexes:
+        if index.name in ('idx_friendship_requester_status', 'idx_friendship_addressee_status'):
+            try:
+                print(f"Creating {index.name}...")
+                index.create(engine)
+            except Exception as e:
+                print(f"Skipping {index.name} (probably exists): {e}")
+
+    with engine.connect() as connection:
+        for name in ('idx_friendship_requester', 'idx_friendship_addressee', 'idx_friendship_status'):
+            try:
+                print(f"Dropping {name}...")
+                if engine.dialect.name == 'mysql':
+                    connection.execute(text(f"DROP INDEX {name} ON friendships;"))
+                else:
+                    connection.execute(text(f"DROP INDEX {name};"))
+            except Exception as e:
+                print(f"Skipping {name} (probably missing): {e}")
+
+        connection.commit()
+
+    print("Migration finished.")
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,51 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from sqlalchemy import select
+
+from shared.database.core import Base, SessionLocal, engine
+from app_travel.infrastructure.database.dao_impl.sqlalchemy_expense_dao import SQLAlchemyExpenseDAO
+from app_travel.infrastructure.database.persistent_model.expense_po import ExpensePO, TripMemberBalancePO
+
+# 根据费用明细重建成员余额表 trip_member_balances（首次上线或数据修复时使用）
+# 用法: python scripts/rebuild_expense_balances.py [每批行程数]
+
+BATCH_SIZE = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+
+
+def rebuild_expense_balances():
+    Base.metadata.create_all(engine, tables=[TripMemberBalancePO.__table__])
+
+    session = SessionLocal()
+    try:
+        trip_ids = list(session.execute(
+            select(ExpensePO.trip_id).distinct().order_by(ExpensePO.trip_id)
+        ).scalars().all())
+        print(f"Found {len(trip_ids)} trips with expenses.")
+    finally:
+        session.close()
+
+    rebuilt = 0
+    for start in range(0, len(trip_ids), BATCH_SIZE):
+        session = SessionLocal()
+        try:
+            expense_dao = SQLAlchemyExpenseDAO(session)
+            for trip_id in trip_ids[start:start + BATCH_SIZE]:
+                expense_dao.rebuild_member_balances(trip_id)
+                rebuilt += 1
+            session.commit()
+            print(f"Rebuilt {rebuilt}/{len(trip_ids)}")
+        except Exception as e:
+            session.rollback()
+            print(f"Batch starting at {start} failed: {e}")
+        finally:
+            session.close()
+
+    print("Rebuild finished.")
+
+
+if __name__ == "__main__":
+    rebuild_expense_balances()
@@ -0,0 +1,100 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from datetime import datetime
+
+from sqlalchemy import select
+
+from shared.database.core import Base, SessionLocal, engine
+from app_auth.infrastructure.database.persistent_model.user_po import UserPO
+from app_social.domain.domain_service.friend_suggestion_service import FriendSuggestionService
+from app_social.infrastructure.database.dao_impl.sqlalchemy_friend_suggestion_dao import SqlAlchemyFriendSuggestionDao
+from app_social.infrastructure.database.dao_impl.sqlalchemy_friendship_dao import SqlAlchemyFriendshipDao
+from app_social.infrastructure.database.persistent_model.friend_suggestion_po import FriendSuggestionPO
+
+# 创建好友推荐表，并按好友关系与旅行成员全量重算每个用户的推荐
+# （功能上线回填、删除旅行等未发布事件的变更、或评分规则变更后使用）
+# 按用户ID分批，每个用户的推荐行整体替换，可重复执行。
+# 用法: python scripts/rebuild_friend_suggestions.py [每批用户数]
+
+BATCH_SIZE = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+ID_CHUNK_SIZE = 500
+
+
+def _friend_sets(friendship_dao, user_ids):
+    """分块加载好友集合，避免超长 IN 列表"""
+    user_ids = list(user_ids)
+    adjacency = {}
+    for start in range(0, len(user_ids), ID_CHUNK_SIZE):
+        adjacency.update(friendship_dao.find_friend_ids_many(user_ids[start:start + ID_CHUNK_SIZE]))
+    return adjacency
+
+
+def _rebuild_batch(session, user_ids, now):
+    friendship_dao = SqlAlchemyFriendshipDao(session)
+    suggestion_dao = SqlAlchemyFriendSuggestionDao(session)
+
+    friends = _friend_sets(friendship_dao, user_ids)
+    friend_ids = set().union(*friends.values()) if friends else set()
+    friends_of_friends = _friend_sets(friendship_dao, friend_ids)
+
+    rows = 0
+    for user_id in user_ids:
+        counts = FriendSuggestionService.compute_for_user(
+            user_id,
+            friends.get(user_id, set()),
+            friends_of_friends,
+            suggestion_dao.count_co_members(user_id)
+        )
+        suggestion_dao.replace_for_user(user_id, [
+            FriendSuggestionPO(
+                user_id=user_id,
+                candidate_id=candidate_id,
+                mutual_friends=mutual,
+                shared_trips=trips,
+                score=FriendSuggestionService.score(mutual, trips),
+                updated_at=now
+            )
+            for candidate_id, (mutual, trips) in counts.items()
+        ])
+        rows += len(counts)
+    return rows
+
+
+def rebuild_friend_suggestions():
+    print("Starting rebuild: friend suggestions...")
+    Base.metadata.create_all(engine, tables=[FriendSuggestionPO.__table__])
+
+    processed = 0
+    written = 0
+    last_id = ''
+    while True:
+        # 每批使用独立会话，避免身份映射无限增长
+        session = SessionLocal()
+        try:
+            user_ids = list(session.execute(
+                select(UserPO.id).where(UserPO.id > last_id).order_by(UserPO.id).limit(BATCH_SIZE)
+            ).scalars().all())
+            if not user_ids:
+                break
+            last_id = user_ids[-1]
+
+            written += _rebuild_batch(session, user_ids, datetime.utcnow())
+            session.commit()
+            processed += len(user_ids)
+            print(f"Rebuilt {processed} users ({written} suggestion rows)")
+        except Exception as e:
+            session.rollback()
+            print(f"Batch after {last_id} failed: {e}")
+            break
+        finally:
+            session.close()
+
+    print("Rebuild finished.")
+
+
+if __name__ == "__main__":
+    rebuild_friend_suggestions()
@@ -0,0 +1,55 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from sqlalchemy import select
+
+from shared.database.core import SessionLocal
+from app_travel.domain.value_objects.travel_value_objects import TripId
+from app_travel.infrastructure.database.dao_impl.sqlalchemy_trip_dao import SqlAlchemyTripDao
+from app_travel.infrastructure.database.dao_impl.sqlalchemy_trip_statistics_dao import SqlAlchemyTripStatisticsDao
+from app_travel.infrastructure.database.repository_impl.trip_repository_impl import TripRepositoryImpl
+from app_travel.infrastructure.database.repository_impl.trip_statistics_repository_impl import TripStatisticsRepositoryImpl
+from app_travel.infrastructure.database.persistent_model.trip_po import TripPO
+
+# 全量重算旅行统计投影（统计投影缺失、过期或计算规则变更后使用）
+# 用法: python scripts/rebuild_trip_statistics.py [每批数量]
+
+BATCH_SIZE = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+
+
+def rebuild_trip_statistics():
+    session = SessionLocal()
+    try:
+        trip_ids = list(session.execute(select(TripPO.id).order_by(TripPO.id)).scalars().all())
+        print(f"Found {len(trip_ids)} trips to process.")
+    finally:
+        session.close()
+
+    rebuilt = 0
+    for start in range(0, len(trip_ids), BATCH_SIZE):
+        # 每批使用独立会话，避免身份映射无限增长
+        session = SessionLocal()
+        try:
+            statistics_repo = TripStatisticsRepositoryImpl(SqlAlchemyTripStatisticsDao(session))
+            trip_repo = TripRepositoryImpl(SqlAlchemyTripDao(session))
+            for trip_id in trip_ids[start:start + BATCH_SIZE]:
+                trip = trip_repo.find_by_id(TripId(trip_id))
+                if trip:
+                    statistics_repo.refresh(trip, trip.updated_at)
+                    rebuilt += 1
+            session.commit()
+            print(f"Rebuilt {rebuilt}/{len(trip_ids)}")
+        except Exception as e:
+            session.rollback()
+            print(f"Batch starting at {start} failed: {e}")
+        finally:
+            session.close()
+
+    print("Rebuild finished.")
+
+
+if __name__ == "__main__":
+    rebuild_trip_statistics()
@@ -11,21 +11,41 @@ from shared.database.core import Base, engine
 from app_admin import admin_bp
 from app_ai import ai_bp
 from app_auth.infrastructure.database.persistent_model.user_po import UserPO
+from app_auth.infrastructure.external_service.password_hasher_impl import get_password_hasher
+from app_auth.infrastructure.external_service.login_rate_limiter_impl import get_login_rate_limiter
 from app_auth.view.auth_view import auth_bp
 from app_notification.infrastructure.database.persistent_model.notification_po import NotificationPO
+from app_notification.domain.event_handler.notification_event_handler import (
+    set_conversation_presence,
+    set_notification_task_queue,
+)
 from app_notification.view.notification_view import notification_bp
 from app_social.infrastructure.database.persistent_model.conversation_po import ConversationPO
+from app_social.infrastructure.database.persistent_model.friend_suggestion_po import FriendSuggestionPO
 from app_social.infrastructure.database.persistent_model.message_po import MessagePO
 from app_social.infrastructure.database.po.friendship_po import FriendshipPO
 from app_social.infrastructure.database.persistent_model.post_po import CommentPO, LikePO, PostPO
+from app_social.infrastructure.database.persistent_model.socket_room_membership_po import SocketRoomMembershipPO
 from app_social.infrastructure.socket.handlers import register_social_socket_handlers
+from app_social.infrastructure.socket.presence_registry import get_presence_registry
+from app_social.infrastructure.socket.room_registry import (
+    DatabaseRoomMembershipRegistry,
+    RoomMembershipRegistry,
+    set_room_registry,
+)
 from app_social.view.social_view import social_bp
 from app_travel.infrastructure.database.persistent_model.expense_po import (
     ExpensePO,
     ExpenseSharePO,
     SettlementTransferPO,
+    TripMemberBalancePO,
+)
+from app_travel.infrastructure.database.persistent_model.popularity_po import PopularityScorePO
+from app_travel.infrastructure.database.persistent_model.template_po import (
+    TripTemplatePO,
+    TripTemplateSearchTermPO,
+    TripTemplateTagPO,
 )
-from app_travel.infrastructure.database.persistent_model.template_po import TripTemplatePO
 from app_travel.infrastructure.database.persistent_model.trip_po import (
     ActivityPO,
     TransitPO,
@@ -33,8 +53,16 @@ from app_travel.infrastructure.database.persistent_model.trip_po import (
     TripMemberPO,
     TripPO,
 )
+from app_travel.infrastructure.database.persistent_model.trip_statistics_po import (
+    TripDayStatisticsPO,
+    TripStatisticsPO,
+)
 from app_travel.view.travel_view import travel_bp
-from shared.infrastructure.socket import socketio
+from shared.event_handler.processed_event_store import ProcessedEventPO
+from shared.infrastructure.background_tasks import get_background_task_queue
+from shared.infrastructure.proxy import apply_proxy_fix
+from shared.infrastructure.socket import get_socketio_options, is_multi_process, socketio
+from shared.storage.stored_file_po import StoredFilePO
 
 
 def create_app(config: Optional[Mapping[str, Any]] = None):
@@ -48,9 +76,16 @@ def create_app(config: Optional[Mapping[str, Any]] = None):
         or "travel-sharing-dev-secret"
     )
     CORS(app, supports_credentials=True)
+    # 反向代理之后还原客户端 IP（按 IP 限流依赖 request.remote_addr）
+    apply_proxy_fix(app)
 
-    socketio.init_app(app)
-    register_social_socket_handlers()
+    socketio.init_app(app, **get_socketio_options(app.config))
+    register_social_socket_handlers(app.config)
+    # 在线状态登记是进程内的，多 worker 时无法判断用户是否在其他进程查看会话
+    set_conversation_presence(None if is_multi_process(app.config) else get_presence_registry())
+    # 断线重连可能落到另一个 worker，多 worker 时房间成员登记放在共享的数据库中
+    set_room_registry(DatabaseRoomMembershipRegistry() if is_multi_process(app.config) else RoomMembershipRegistry())
+    set_notification_task_queue(get_background_task_queue())
 
     upload_dir = os.path.join(app.static_folder, "uploads")
     os.makedirs(upload_dir, exist_ok=True)
@@ -81,6 +116,18 @@ def create_app(config: Optional[Mapping[str, Any]] = None):
     def health_check():
         return {"status": "healthy"}
 
+    @app.route("/health/socket")
+    def socket_health_check():
+        return {"status": "healthy", "emit_metrics": socketio.emit_metrics.snapshot()}
+
+    @app.route("/health/auth")
+    def auth_health_check():
+        return {
+            "status": "healthy",
+            "password_hashing": get_password_hasher().metrics.snapshot(),
+            "login_rate_limit": get_login_rate_limiter().stats(),
+        }
+
     return app
 
 
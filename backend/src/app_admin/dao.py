@@ -1,25 +1,205 @@
-from typing import Any, Dict, List, Optional, Tuple, Type
+import base64
+import datetime
+import json
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Type
+
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func, inspect
+from sqlalchemy import and_, false, or_, select, func, inspect, text
+from sqlalchemy.sql.elements import ColumnElement
+
+from shared.infrastructure.text_search import like_prefix
+
+# 过滤操作符：查询参数 <列名>__<操作符>=值，省略操作符即等值
+FILTER_OPERATORS = ('eq', 'ne', 'lt', 'lte', 'gt', 'gte', 'in', 'prefix', 'isnull')
+
+# 计数方式
+COUNT_MODES = ('auto', 'exact', 'estimate', 'none')
+
+# auto 模式下，统计信息估计行数不超过该值的表仍做精确计数
+EXACT_COUNT_THRESHOLD = 100_000
+
 
 class AdminGenericDao:
-    """通用 CRUD DAO，用于 Admin 模块"""
-    
+    """通用 CRUD DAO，用于 Admin 模块
+
+    列表分页以 (排序列, 主键) 为键集游标：每页只沿索引读取 per_page + 1 行，
+    与页码深度无关；总数默认在大表上改用数据库统计信息的估计值。
+    """
+
     def __init__(self, session: Session):
         self.session = session
 
-    def get_list(self, model_class: Type[Any], page: int = 1, per_page: int = 20) -> Tuple[List[Any], int]:
-        """分页获取列表"""
-        # 获取总数
-        # 注意：这里假设主键是 id，或者直接 count(*)
-        count_stmt = select(func.count()).select_from(model_class)
-        total = self.session.execute(count_stmt).scalar() or 0
+    def get_list(
+        self,
+        model_class: Type[Any],
+        page: int = 1,
+        per_page: int = 20,
+        filters: Optional[Sequence[ColumnElement]] = None,
+        sort: Optional[str] = None,
+        descending: bool = False
+    ) -> List[Any]:
+        """按页码分页获取列表（OFFSET 分页，深页需扫描跳过的行；大表请使用 get_page）"""
+        key_columns = self._sort_key(model_class, sort)
+        stmt = (
+            select(model_class)
+            .where(*(filters or ()))
+            .order_by(*[c.desc() if descending else c.asc() for c in key_columns])
+            .offset((page - 1) * per_page)
+            .limit(per_page)
+        )
+        return list(self.session.execute(stmt).scalars().all())
+
+    def get_page(
+        self,
+        model_class: Type[Any],
+        per_page: int = 20,
+        cursor: Optional[str] = None,
+        sort: Optional[str] = None,
+        descending: bool = False,
+        filters: Optional[Sequence[ColumnElement]] = None
+    ) -> Tuple[List[Any], Optional[str]]:
+        """按键集游标分页获取列表
+
+        Args:
+            model_class: PO 类
+            per_page: 每页数量
+            cursor: 上一页返回的 next_cursor，None 表示第一页
+            sort: 排序列名（必须为非空列），默认按主键
+            descending: 是否降序
+            filters: build_filters 生成的过滤条件
+
+        Returns:
+            (本页记录, 下一页游标)，没有下一页时游标为 None
+        """
+        key_columns = self._sort_key(model_class, sort)
+        stmt = self._keyset_select(model_class, key_columns, descending, filters, cursor)
+        items = list(self.session.execute(stmt.limit(per_page + 1)).scalars().all())
+
+        next_cursor = None
+        if len(items) > per_page:
+            items = items[:per_page]
+            next_cursor = encode_cursor([getattr(items[-1], c.key) for c in key_columns])
+        return items, next_cursor
+
+    def iter_rows(
+        self,
+        model_class: Type[Any],
+        sort: Optional[str] = None,
+        descending: bool = False,
+        filters: Optional[Sequence[ColumnElement]] = None,
+        batch_size: int = 1000
+    ) -> Iterator[Mapping[str, Any]]:
+        """按键集分批遍历所有记录（导出用）
+
+        只选择列值而不加载 PO 对象，每批的行在下一批查询前即可回收，
+        内存占用与表大小无关。参数在调用时即校验，读取在迭代时进行。
+
+        Raises:
+            ValueError: 排序列不合法
+        """
+        key_columns = self._sort_key(model_class, sort)
+        return self._iter_batches(model_class, key_columns, descending, filters, batch_size)
+
+    def count(
+        self,
+        model_class: Type[Any],
+        filters: Optional[Sequence[ColumnElement]] = None,
+        mode: str = 'auto'
+    ) -> Tuple[Optional[int], bool]:
+        """统计记录数
+
+        Args:
+            mode: exact 精确计数；estimate 只用统计信息（有过滤条件时不可用）；
+                  none 不计数；auto 小表精确计数，大表无过滤时用估计值、有过滤时不计数
+
+        Returns:
+            (记录数, 是否为估计值)，无法给出时记录数为 None
+        """
+        if mode not in COUNT_MODES:
+            raise ValueError(f"Invalid count mode: {mode}")
+        if mode == 'none':
+            return None, False
+        if mode == 'exact':
+            return self._exact_count(model_class, filters), False
+
+        estimate = self.estimate_count(model_class)
+        if mode == 'estimate':
+            return (None, False) if filters else (estimate, estimate is not None)
+        if estimate is None or estimate <= EXACT_COUNT_THRESHOLD:
+            return self._exact_count(model_class, filters), False
+        return (None, False) if filters else (estimate, True)
+
+    def estimate_count(self, model_class: Type[Any]) -> Optional[int]:
+        """从数据库统计信息读取表的估计行数（O(1)），没有统计信息时返回 None"""
+        table_name = model_class.__table__.name
+        dialect = self.session.get_bind().dialect.name
+        if dialect == 'mysql':
+            value = self.session.execute(text(
+                "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :name"
+            ), {'name': table_name}).scalar()
+        elif dialect == 'postgresql':
+            value = self.session.execute(text(
+                "SELECT reltuples FROM pg_class WHERE oid = to_regclass(:name)"
+            ), {'name': table_name}).scalar()
+        elif dialect == 'sqlite':
+            # 执行过 ANALYZE 才有 sqlite_stat1
+            has_stats = self.session.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+            )).scalar()
+            value = None
+            if has_stats:
+                stat = self.session.execute(text(
+                    "SELECT stat FROM sqlite_stat1 WHERE tbl = :name ORDER BY idx IS NOT NULL LIMIT 1"
+                ), {'name': table_name}).scalar()
+                value = int(stat.split()[0]) if stat else None
+        else:
+            value = None
+        # PostgreSQL 未 ANALYZE 的表 reltuples 为 -1
+        if value is None or value < 0:
+            return None
+        return int(value)
+
+    def build_filters(self, model_class: Type[Any], params: Mapping[str, str]) -> List[ColumnElement]:
+        """把查询参数转换为 SQL 过滤条件
+
+        参数形如 user_id=abc、created_at__gte=2024-01-01、status__in=a,b、
+        deleted_at__isnull=true；值按列类型转换。
 
-        # 获取分页数据
-        stmt = select(model_class).offset((page - 1) * per_page).limit(per_page)
-        items = self.session.execute(stmt).scalars().all()
-        
-        return list(items), total
+        Raises:
+            ValueError: 列不存在、操作符不支持或值无法转换
+        """
+        columns = model_class.__table__.columns
+        clauses = []
+        for key, raw in params.items():
+            name, _, op = key.partition('__')
+            op = op or 'eq'
+            if name not in columns:
+                raise ValueError(f"Unknown filter column: {name}")
+            if op not in FILTER_OPERATORS:
+                raise ValueError(f"Unsupported filter operator: {op}")
+            column = columns[name]
+
+            if op == 'isnull':
+                is_null = _parse_bool(raw)
+                clauses.append(column.is_(None) if is_null else column.isnot(None))
+            elif op == 'in':
+                values = [_parse_value(column, v) for v in raw.split(',') if v != '']
+                clauses.append(column.in_(values) if values else false())
+            elif op == 'prefix':
+                clauses.append(column.like(like_prefix(raw), escape='\\'))
+            else:
+                value = _parse_value(column, raw)
+                clauses.append({
+                    'eq': column == value,
+                    'ne': column != value,
+                    'lt': column < value,
+                    'lte': column <= value,
+                    'gt': column > value,
+                    'gte': column >= value,
+                }[op])
+        return clauses
 
     def get_by_id(self, model_class: Type[Any], id: Any) -> Optional[Any]:
         """根据 ID 获取详情"""
@@ -30,7 +210,7 @@ class AdminGenericDao:
         # 过滤掉不在 model 定义中的字段，防止报错
         valid_keys = self._get_valid_columns(model_class)
         filtered_data = {k: v for k, v in data.items() if k in valid_keys}
-        
+
         obj = model_class(**filtered_data)
         self.session.add(obj)
         self.session.flush()
@@ -41,12 +221,12 @@ class AdminGenericDao:
         obj = self.session.get(model_class, id)
         if not obj:
             return None
-        
+
         valid_keys = self._get_valid_columns(model_class)
         for key, value in data.items():
             if key in valid_keys:
                 setattr(obj, key, value)
-        
+
         self.session.flush()
         return obj
 
@@ -63,3 +243,119 @@ class AdminGenericDao:
         """获取模型的所有列名"""
         mapper = inspect(model_class)
         return [c.key for c in mapper.attrs]
+
+    def _exact_count(self, model_class: Type[Any], filters: Optional[Sequence[ColumnElement]]) -> int:
+        count_stmt = select(func.count()).select_from(model_class).where(*(filters or ()))
+        return self.session.execute(count_stmt).scalar() or 0
+
+    def _sort_key(self, model_class: Type[Any], sort: Optional[str]) -> List[Any]:
+        """排序键：排序列 + 主键（保证唯一，游标才能无重复无遗漏地翻页）"""
+        pk = _primary_key(model_class)
+        if not sort:
+            return pk
+        columns = model_class.__table__.columns
+        if sort not in columns:
+            raise ValueError(f"Unknown sort column: {sort}")
+        column = columns[sort]
+        if column.nullable:
+            # NULL 无法参与键集比较
+            raise ValueError(f"Cannot sort by nullable column: {sort}")
+        return [column] + [c for c in pk if c is not column]
+
+    def _iter_batches(self, model_class, key_columns, descending, filters, batch_size):
+        key_names = [c.key for c in key_columns]
+        cursor_values = None
+        while True:
+            stmt = self._keyset_select(
+                model_class, key_columns, descending, filters, None, model_class.__table__.columns
+            )
+            if cursor_values is not None:
+                stmt = stmt.where(_after(key_columns, cursor_values, descending))
+            rows = self.session.execute(stmt.limit(batch_size)).mappings().all()
+            yield from rows
+            if len(rows) < batch_size:
+                return
+            cursor_values = [rows[-1][name] for name in key_names]
+
+    def _keyset_select(self, model_class, key_columns, descending, filters, cursor, columns=None):
+        stmt = select(*columns) if columns is not None else select(model_class)
+        stmt = stmt.where(*(filters or ()))
+        if cursor:
+            stmt = stmt.where(_after(key_columns, decode_cursor(cursor, key_columns), descending))
+        return stmt.order_by(*[c.desc() if descending else c.asc() for c in key_columns])
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """把排序键的值编码为不透明的 URL 安全游标"""
+    payload = json.dumps([_jsonable(v) for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, key_columns: Sequence[Any]) -> List[Any]:
+    """解码游标并按排序键的列类型还原值
+
+    Raises:
+        ValueError: 游标格式错误或与排序键不匹配
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw_values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, UnicodeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(raw_values, list) or len(raw_values) != len(key_columns):
+        raise ValueError("Invalid cursor")
+    return [
+        _parse_value(column, value) if isinstance(value, str) else value
+        for column, value in zip(key_columns, raw_values)
+    ]
+
+
+def _primary_key(model_class: Type[Any]) -> List[Any]:
+    return list(model_class.__table__.primary_key.columns)
+
+
+def _after(key_columns: Sequence[Any], values: Sequence[Any], descending: bool) -> ColumnElement:
+    """键集条件：(k1, k2, ...) 在游标之后（逐列展开，兼容不支持行值比较的数据库）"""
+    conditions = []
+    for i, column in enumerate(key_columns):
+        equal_prefix = [key_columns[j] == values[j] for j in range(i)]
+        beyond = column < values[i] if descending else column > values[i]
+        conditions.append(and_(*equal_prefix, beyond))
+    return or_(*conditions)
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _parse_bool(raw: str) -> bool:
+    lowered = raw.lower()
+    if lowered not in ('true', 'false', '1', '0'):
+        raise ValueError(f"Invalid boolean value: {raw}")
+    return lowered in ('true', '1')
+
+
+def _parse_value(column: Any, raw: str) -> Any:
+    """把字符串值转换为列的 Python 类型"""
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return raw
+    try:
+        if python_type is bool:
+            return _parse_bool(raw)
+        if python_type is datetime.datetime:
+            return datetime.datetime.fromisoformat(raw)
+        if python_type is datetime.date:
+            return datetime.date.fromisoformat(raw)
+        if python_type is datetime.time:
+            return datetime.time.fromisoformat(raw)
+        if python_type in (int, float, Decimal):
+            return python_type(raw)
+    except (ValueError, ArithmeticError):
+        raise ValueError(f"Invalid value for {getattr(column, 'name', 'column')}: {raw}")
+    return raw
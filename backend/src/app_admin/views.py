@@ -1,6 +1,9 @@
-from flask import Blueprint, request, jsonify, g, session
+from flask import Blueprint, request, jsonify, g, session, Response, stream_with_context
 from sqlalchemy.exc import IntegrityError
+import csv
 import datetime
+import io
+import json
 from decimal import Decimal
 
 from shared.database.core import SessionLocal
@@ -35,46 +38,134 @@ def teardown_request(exception=None):
     if hasattr(g, 'session'):
         g.session.close()
 
+# 列表/导出的控制参数，其余查询参数均视为列过滤条件
+LIST_PARAMS = {'page', 'per_page', 'cursor', 'sort', 'order', 'count', 'format'}
+
+MAX_PER_PAGE = 10000
+
+# 导出每批读取的行数
+EXPORT_BATCH_SIZE = 1000
+
+def _json_value(val):
+    """列值转换为可 JSON 序列化的值"""
+    # 处理时间格式
+    if isinstance(val, (datetime.datetime, datetime.date, datetime.time)):
+        return val.isoformat()
+    # 处理 Decimal 类型
+    if isinstance(val, Decimal):
+        return float(val)
+    return val
+
 def _serialize(obj):
     """将 SQLAlchemy 对象序列化为字典"""
     if obj is None:
         return None
     
-    data = {}
     # 遍历所有列
-    for c in obj.__table__.columns:
-        val = getattr(obj, c.name)
-        # 处理时间格式
-        if isinstance(val, (datetime.datetime, datetime.date, datetime.time)):
-            val = val.isoformat()
-        # 处理 Decimal 类型
-        elif isinstance(val, Decimal):
-            val = float(val)
-        data[c.name] = val
-    return data
+    return {c.name: _json_value(getattr(obj, c.name)) for c in obj.__table__.columns}
+
+def _list_options(dao, model_class):
+    """解析排序与过滤参数
+
+    Raises:
+        ValueError: 参数不合法
+    """
+    order = request.args.get('order', 'asc')
+    if order not in ('asc', 'desc'):
+        raise ValueError(f"Invalid order: {order}")
+    filters = dao.build_filters(
+        model_class, {k: v for k, v in request.args.items() if k not in LIST_PARAMS}
+    )
+    return request.args.get('sort') or None, order == 'desc', filters
 
 @admin_bp.route('/<string:resource_name>', methods=['GET'])
 def get_list(resource_name):
-    """分页获取列表"""
+    """分页获取列表
+
+    默认按键集游标分页（?cursor= 为上一页返回的 next_cursor）；
+    传 page 时使用页码分页。列过滤与排序在 SQL 中完成，
+    count=auto|exact|estimate|none 控制总数的计算方式。
+    """
     model_class = get_model_class(resource_name)
     if not model_class:
         return jsonify({'error': f'Resource {resource_name} not found'}), 404
         
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
+    per_page = max(1, min(request.args.get('per_page', 20, type=int), MAX_PER_PAGE))
     
     dao = AdminGenericDao(g.session)
-    items, total = dao.get_list(model_class, page, per_page)
+    try:
+        sort, descending, filters = _list_options(dao, model_class)
+        meta = {'per_page': per_page}
+        if 'page' in request.args:
+            page = max(1, request.args.get('page', 1, type=int))
+            items = dao.get_list(model_class, page, per_page, filters, sort, descending)
+            meta['page'] = page
+        else:
+            items, next_cursor = dao.get_page(
+                model_class, per_page, request.args.get('cursor') or None, sort, descending, filters
+            )
+            meta['next_cursor'] = next_cursor
+        total, is_estimate = dao.count(model_class, filters, request.args.get('count', 'auto'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
+    meta['total'] = total
+    meta['total_is_estimate'] = is_estimate
     return jsonify({
         'data': [_serialize(item) for item in items],
-        'meta': {
-            'page': page,
-            'per_page': per_page,
-            'total': total
-        }
+        'meta': meta
     })
 
+def _iter_csv(columns, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for i, row in enumerate(rows, 1):
+        writer.writerow(['' if row[c] is None else _json_value(row[c]) for c in columns])
+        if i % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def _iter_ndjson(columns, rows):
+    lines = []
+    for row in rows:
+        lines.append(json.dumps({c: _json_value(row[c]) for c in columns}, ensure_ascii=False))
+        if len(lines) >= EXPORT_BATCH_SIZE:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+@admin_bp.route('/<string:resource_name>/export', methods=['GET'])
+def export(resource_name):
+    """流式导出（format=csv|ndjson），支持与列表相同的过滤与排序参数"""
+    model_class = get_model_class(resource_name)
+    if not model_class:
+        return jsonify({'error': f'Resource {resource_name} not found'}), 404
+    
+    fmt = request.args.get('format', 'csv')
+    if fmt not in ('csv', 'ndjson'):
+        return jsonify({'error': f'Unsupported export format: {fmt}'}), 400
+    
+    dao = AdminGenericDao(g.session)
+    try:
+        sort, descending, filters = _list_options(dao, model_class)
+        rows = dao.iter_rows(model_class, sort, descending, filters, batch_size=EXPORT_BATCH_SIZE)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # 按键集分批读取并逐块写出，内存占用与表大小无关
+    columns = [c.name for c in model_class.__table__.columns]
+    body = _iter_csv(columns, rows) if fmt == 'csv' else _iter_ndjson(columns, rows)
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={resource_name}.{fmt}'}
+    )
+
 @admin_bp.route('/<string:resource_name>/<string:id>', methods=['GET'])
 def get_detail(resource_name, id):
     """获取详情"""
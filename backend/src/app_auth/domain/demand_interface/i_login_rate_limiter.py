@@ -0,0 +1,42 @@
+"""
+登录限流器接口
+
+由基础设施层实现，应用层在查库和 bcrypt 验证之前调用。
+"""
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class LoginRateLimitedError(Exception):
+    """登录尝试过于频繁，retry_after 秒后可重试"""
+
+    def __init__(self, retry_after: float, message: str = "Too many login attempts, please retry later"):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ILoginRateLimiter(ABC):
+    """登录限流接口"""
+
+    @abstractmethod
+    def check(self, email: str, ip_address: Optional[str] = None) -> None:
+        """登录尝试前检查（按 IP 与按账号）
+
+        Args:
+            email: 登录邮箱
+            ip_address: 客户端IP
+
+        Raises:
+            LoginRateLimitedError: 超出限制
+        """
+        pass
+
+    @abstractmethod
+    def record_failure(self, email: str, ip_address: Optional[str] = None) -> None:
+        """记录一次失败的登录"""
+        pass
+
+    @abstractmethod
+    def record_success(self, email: str, ip_address: Optional[str] = None) -> None:
+        """记录一次成功的登录（清除该账号的失败记录）"""
+        pass
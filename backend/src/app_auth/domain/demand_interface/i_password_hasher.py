@@ -8,6 +8,11 @@ from abc import ABC, abstractmethod
 from app_auth.domain.value_objects.user_value_objects import Password, HashedPassword
 
 
+class PasswordHasherBusyError(RuntimeError):
+    """哈希计算资源已满（或等待超时），调用方应稍后重试"""
+    pass
+
+
 class IPasswordHasher(ABC):
     """密码哈希接口"""
     
@@ -35,3 +40,28 @@ class IPasswordHasher(ABC):
             是否匹配
         """
         pass
+    
+    def needs_rehash(self, hashed: HashedPassword) -> bool:
+        """已存哈希是否应按当前参数重新计算（如 cost 配置已变化）
+        
+        Args:
+            hashed: 已存的哈希密码
+            
+        Returns:
+            是否需要重新哈希，默认不需要
+        """
+        return False
+    
+    def rehash(self, password: Password) -> HashedPassword:
+        """登录成功后按当前参数重新哈希（机会性执行）
+        
+        与 hash 不同，计算资源紧张时实现可以直接拒绝（PasswordHasherBusyError），
+        调用方应跳过本次升级，留到之后的登录再做。
+        
+        Args:
+            password: 已验证通过的明文密码
+            
+        Returns:
+            哈希后的密码
+        """
+        return self.hash(password)
@@ -4,7 +4,7 @@
 仓库模式：聚合根的持久化抽象，由基础设施层实现。
 """
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Collection, List, Optional
 
 from app_auth.domain.entity.user_entity import User
 from app_auth.domain.value_objects.user_value_objects import UserId, Email, Username, UserRole
@@ -71,15 +71,21 @@ class IUserRepository(ABC):
         pass
     
     @abstractmethod
-    def search_by_username(self, query: str, limit: int = 20) -> List[User]:
+    def search_by_username(
+        self,
+        query: str,
+        limit: int = 20,
+        prefer_ids: Optional[Collection[str]] = None
+    ) -> List[User]:
         """根据用户名搜索用户
         
         Args:
             query: 搜索关键词
             limit: 限制数量
+            prefer_ids: 优先排在前面的用户ID（如好友）
             
         Returns:
-            用户列表
+            用户列表（按相关度排序）
         """
         pass
 
@@ -13,7 +13,7 @@ from app_auth.domain.value_objects.user_value_objects import (
     Email, Username, Password, UserRole
 )
 from app_auth.domain.demand_interface.i_user_repository import IUserRepository
-from app_auth.domain.demand_interface.i_password_hasher import IPasswordHasher
+from app_auth.domain.demand_interface.i_password_hasher import IPasswordHasher, PasswordHasherBusyError
 from app_auth.domain.demand_interface.i_email_service import IEmailService
 
 
@@ -100,6 +100,12 @@ class AuthService:
         
         try:
             if user.authenticate(password, self._password_hasher):
+                # 哈希参数变化时透明升级（随下面的保存一起写入）；哈希资源紧张时
+                # 跳过，已验证的登录不因升级失败而失败，留到之后的登录再升级
+                try:
+                    user.rehash_password_if_needed(password, self._password_hasher)
+                except PasswordHasherBusyError:
+                    pass
                 # 记录登录事件
                 user.record_login(login_ip=login_ip, user_agent=user_agent)
                 # 保存以触发事件
@@ -188,6 +188,27 @@ class User:
         
         return password_hasher.verify(password, self._hashed_password)
     
+    def rehash_password_if_needed(self, password: Password, password_hasher: IPasswordHasher) -> bool:
+        """登录验证成功后，按当前哈希参数重新哈希密码
+        
+        密码本身未变化，不发布密码修改事件。
+        
+        Args:
+            password: 已验证通过的明文密码
+            password_hasher: 密码哈希器
+            
+        Returns:
+            是否重新哈希
+            
+        Raises:
+            PasswordHasherBusyError: 哈希资源紧张，本次未升级（密码保持不变）
+        """
+        if not password_hasher.needs_rehash(self._hashed_password):
+            return False
+        self._hashed_password = password_hasher.rehash(password)
+        self._updated_at = datetime.utcnow()
+        return True
+    
     def record_login(self, login_ip: Optional[str] = None, user_agent: Optional[str] = None) -> None:
         """记录登录事件
         
@@ -0,0 +1,89 @@
+"""
+当前用户缓存
+
+前端每次路由切换都会请求 /api/auth/me，短时间内反复为同一用户加载 User 聚合根。
+这里按用户ID缓存聚合根，短 TTL 兜底陈旧数据：
+
+- 未命中时通过调用方传入的 loader 加载（复用请求内的仓库与会话）
+- 命中时返回深拷贝，调用方修改返回的实体不会污染缓存
+- 订阅资料、密码、账户状态变更事件主动失效
+- 不存在的用户不做缓存
+"""
+import copy
+import os
+from typing import Callable, Optional
+
+from shared.event_bus import get_event_bus
+from shared.infrastructure.ttl_cache import TTLCache
+from app_auth.domain.entity.user_entity import User
+
+
+DEFAULT_TTL_SECONDS = float(os.getenv("CURRENT_USER_CACHE_TTL", "30"))
+DEFAULT_MAX_SIZE = int(os.getenv("CURRENT_USER_CACHE_SIZE", "10000"))
+
+# 使缓存失效的用户事件
+INVALIDATING_EVENTS = (
+    'UserProfileUpdatedEvent',
+    'UserPasswordChangedEvent',
+    'PasswordResetCompletedEvent',
+    'UserDeactivatedEvent',
+    'UserReactivatedEvent',
+    'UserEmailVerifiedEvent',
+)
+
+
+class CurrentUserCache:
+    """当前用户聚合根缓存"""
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS, max_size: int = DEFAULT_MAX_SIZE, **cache_kwargs):
+        self._cache = TTLCache(ttl_seconds=ttl_seconds, max_size=max_size, **cache_kwargs)
+
+    def get(self, user_id: str, loader: Callable[[str], Optional[User]]) -> Optional[User]:
+        """获取用户，未命中时调用 loader 加载
+
+        Args:
+            user_id: 用户ID
+            loader: 加载函数，用户不存在时返回 None
+
+        Returns:
+            用户实体（缓存条目的副本），不存在时返回 None
+        """
+        user = self._cache.get(user_id)
+        if user is None:
+            user = loader(user_id)
+            if user is None:
+                return None
+            # 加载时可能带出的未发布事件不应进入缓存
+            user.pop_events()
+            self._cache.set(user_id, user)
+        return copy.deepcopy(user)
+
+    def invalidate(self, user_id: str) -> None:
+        """使某个用户的缓存失效"""
+        self._cache.delete(user_id)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self._cache.clear()
+
+    def handle_user_changed(self, event) -> None:
+        """用户变更事件处理器"""
+        self.invalidate(event.user_id)
+
+
+_current_user_cache: Optional[CurrentUserCache] = None
+
+
+def get_current_user_cache() -> CurrentUserCache:
+    """获取全局当前用户缓存"""
+    global _current_user_cache
+    if _current_user_cache is None:
+        _current_user_cache = CurrentUserCache()
+    return _current_user_cache
+
+
+def register_current_user_cache_handlers() -> None:
+    """订阅用户变更事件，使缓存及时失效"""
+    event_bus = get_event_bus()
+    for event_type in INVALIDATING_EVENTS:
+        event_bus.subscribe(event_type, get_current_user_cache().handle_user_changed)
@@ -0,0 +1,119 @@
+"""
+用户简要资料缓存
+
+为社交消息推送、帖子/会话 DTO 组装等高频场景提供用户名与头像查询，
+避免每条消息都加载完整的 User 聚合根。
+
+- 条目按 TTL 过期，容量受限
+- 未命中的用户通过一次投影查询批量加载（只取 id/username/avatar_url 列）
+- 订阅 UserProfileUpdatedEvent 主动失效
+"""
+import os
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from sqlalchemy.orm import Session
+
+from shared.database.core import SessionLocal
+from shared.event_bus import get_event_bus
+from shared.infrastructure.ttl_cache import TTLCache
+from app_auth.infrastructure.database.dao_impl.sqlalchemy_user_dao import SqlAlchemyUserDao
+
+
+DEFAULT_TTL_SECONDS = float(os.getenv("USER_PROFILE_CACHE_TTL", "60"))
+DEFAULT_MAX_SIZE = int(os.getenv("USER_PROFILE_CACHE_SIZE", "10000"))
+
+
+class UserProfileCache:
+    """用户简要资料缓存
+
+    缓存值格式与各 DTO 中的 author_info 一致：{"name": 用户名, "avatar": 头像URL}。
+    不存在的用户不做缓存。
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_size: int = DEFAULT_MAX_SIZE,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
+        self._cache = TTLCache(ttl_seconds=ttl_seconds, max_size=max_size)
+        self._session_factory = session_factory
+
+    def get(self, user_id: str, session: Optional[Session] = None) -> Optional[Dict[str, Any]]:
+        """获取单个用户的简要资料
+
+        Args:
+            user_id: 用户ID
+            session: 调用方已有的数据库会话（可选，未命中时复用）
+
+        Returns:
+            {"name", "avatar"}，用户不存在时返回 None
+        """
+        if not user_id:
+            return None
+        return self.get_many([user_id], session=session).get(user_id)
+
+    def get_many(self, user_ids: Iterable[str], session: Optional[Session] = None) -> Dict[str, Dict[str, Any]]:
+        """批量获取用户简要资料
+
+        Args:
+            user_ids: 用户ID集合
+            session: 调用方已有的数据库会话（可选，未命中时复用）
+
+        Returns:
+            user_id -> {"name", "avatar"}，不存在的用户不出现在结果中
+        """
+        ids = {uid for uid in user_ids if uid}
+        if not ids:
+            return {}
+
+        result = self._cache.get_many(ids)
+        missing = [uid for uid in ids if uid not in result]
+        if missing:
+            for user_id, info in self._load(missing, session).items():
+                self._cache.set(user_id, info)
+                result[user_id] = info
+        return {uid: dict(info) for uid, info in result.items()}
+
+    def invalidate(self, user_id: str) -> None:
+        """使某个用户的缓存失效"""
+        self._cache.delete(user_id)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self._cache.clear()
+
+    def handle_user_profile_updated(self, event) -> None:
+        """UserProfileUpdatedEvent 处理器"""
+        self.invalidate(event.user_id)
+
+    def _load(self, user_ids, session: Optional[Session]) -> Dict[str, Dict[str, Any]]:
+        owns_session = session is None
+        if owns_session:
+            session = self._session_factory()
+        try:
+            rows = SqlAlchemyUserDao(session).find_briefs_by_ids(list(user_ids))
+            return {
+                user_id: {"name": username, "avatar": avatar_url}
+                for user_id, username, avatar_url in rows
+            }
+        finally:
+            if owns_session:
+                session.close()
+
+
+_user_profile_cache: Optional[UserProfileCache] = None
+
+
+def get_user_profile_cache() -> UserProfileCache:
+    """获取全局用户简要资料缓存"""
+    global _user_profile_cache
+    if _user_profile_cache is None:
+        _user_profile_cache = UserProfileCache()
+    return _user_profile_cache
+
+
+def register_user_profile_cache_handlers() -> None:
+    """订阅资料更新事件，使缓存及时失效"""
+    event_bus = get_event_bus()
+    event_bus.subscribe('UserProfileUpdatedEvent', get_user_profile_cache().handle_user_profile_updated)
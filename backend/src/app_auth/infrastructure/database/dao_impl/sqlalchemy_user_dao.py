@@ -1,9 +1,13 @@
-from typing import List, Optional
+from typing import Collection, List, Optional, Set, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import select, delete, exists
+from sqlalchemy import select, delete, exists, func
 
 from app_auth.infrastructure.database.dao_interface.i_user_dao import IUserDao
-from app_auth.infrastructure.database.persistent_model.user_po import UserPO
+from app_auth.infrastructure.database.persistent_model.user_po import UserPO, UserSearchTermPO
+from shared.infrastructure.text_search import like_prefix
+
+# 检索词匹配等级，按此顺序依次补足结果
+_MATCH_RANKS = (0, 1, 2)
 
 class SqlAlchemyUserDao(IUserDao):
     """基于 SQLAlchemy 的用户 DAO 实现"""
@@ -21,6 +25,12 @@ class SqlAlchemyUserDao(IUserDao):
         stmt = select(UserPO).where(UserPO.id.in_(user_ids))
         return list(self.session.execute(stmt).scalars().all())
 
+    def find_briefs_by_ids(self, user_ids: List[str]) -> List[Tuple[str, str, Optional[str]]]:
+        if not user_ids:
+            return []
+        stmt = select(UserPO.id, UserPO.username, UserPO.avatar_url).where(UserPO.id.in_(user_ids))
+        return [tuple(row) for row in self.session.execute(stmt).all()]
+
     def find_by_email(self, email: str) -> Optional[UserPO]:
         stmt = select(UserPO).where(UserPO.email == email)
         return self.session.execute(stmt).scalars().first()
@@ -29,9 +39,76 @@ class SqlAlchemyUserDao(IUserDao):
         stmt = select(UserPO).where(UserPO.username == username)
         return self.session.execute(stmt).scalars().first()
 
-    def search_by_username(self, query: str, limit: int = 20) -> List[UserPO]:
-        stmt = select(UserPO).where(UserPO.username.ilike(f"%{query}%")).limit(limit)
-        return list(self.session.execute(stmt).scalars().all())
+    def search_by_username(
+        self,
+        query: str,
+        limit: int = 20,
+        prefer_ids: Optional[Collection[str]] = None
+    ) -> List[UserPO]:
+        user_ids = self.search_user_ids(query, limit, prefer_ids)
+        if not user_ids:
+            return []
+        by_id = {po.id: po for po in self.find_by_ids(user_ids)}
+        return [by_id[user_id] for user_id in user_ids if user_id in by_id]
+
+    def search_user_ids(
+        self,
+        query: str,
+        limit: int = 20,
+        prefer_ids: Optional[Collection[str]] = None
+    ) -> List[str]:
+        """按检索词前缀查找用户ID（已排序）
+
+        排序：prefer_ids 中的用户优先，其次按匹配等级（用户名开头 > 拼音 > 用户名中间），
+        同等级按用户名字典序。每一步都是 LIMIT 有界的索引范围扫描，与用户总数无关。
+        """
+        keyword = (query or '').strip().lower()[:UserSearchTermPO.MAX_TERM_LENGTH]
+        if not keyword or limit <= 0:
+            return []
+        matches = UserSearchTermPO.term.like(like_prefix(keyword), escape='\\')
+
+        result: List[str] = []
+        seen: Set[str] = set()
+
+        if prefer_ids:
+            # 偏好用户（好友）数量有限，按主键 (user_id, term) 逐个取最佳等级
+            best_rank = func.min(UserSearchTermPO.match_rank)
+            stmt = (
+                select(UserSearchTermPO.user_id)
+                .where(UserSearchTermPO.user_id.in_(list(prefer_ids)), matches)
+                .group_by(UserSearchTermPO.user_id)
+                .order_by(best_rank, func.min(UserSearchTermPO.term))
+                .limit(limit)
+            )
+            for user_id in self.session.execute(stmt).scalars():
+                seen.add(user_id)
+                result.append(user_id)
+
+        for rank in _MATCH_RANKS:
+            if len(result) >= limit:
+                break
+            # 同一用户可能有多个检索词命中，且需跳过已收录的用户，按批次向后读取
+            batch = limit - len(result) + len(seen)
+            offset = 0
+            while len(result) < limit:
+                stmt = (
+                    select(UserSearchTermPO.user_id)
+                    .where(UserSearchTermPO.match_rank == rank, matches)
+                    .order_by(UserSearchTermPO.term, UserSearchTermPO.user_id)
+                    .offset(offset)
+                    .limit(batch)
+                )
+                user_ids = list(self.session.execute(stmt).scalars())
+                for user_id in user_ids:
+                    if user_id not in seen:
+                        seen.add(user_id)
+                        result.append(user_id)
+                        if len(result) >= limit:
+                            break
+                if len(user_ids) < batch:
+                    break
+                offset += batch
+        return result
 
     def find_by_role(self, role: str) -> List[UserPO]:
         stmt = select(UserPO).where(UserPO.role == role)
@@ -50,6 +127,8 @@ class SqlAlchemyUserDao(IUserDao):
         self.session.flush()
 
     def delete(self, user_id: str) -> None:
+        # 批量删除不触发 ORM 级联，检索词需显式删除
+        self.session.execute(delete(UserSearchTermPO).where(UserSearchTermPO.user_id == user_id))
         stmt = delete(UserPO).where(UserPO.id == user_id)
         self.session.execute(stmt)
         self.session.flush()
@@ -5,7 +5,7 @@
 由具体的数据库实现类实现此接口。
 """
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Collection, List, Optional, Tuple
 
 from app_auth.infrastructure.database.persistent_model.user_po import UserPO
 
@@ -37,6 +37,18 @@ class IUserDao(ABC):
         """
         pass
     
+    @abstractmethod
+    def find_briefs_by_ids(self, user_ids: List[str]) -> List[Tuple[str, str, Optional[str]]]:
+        """根据ID列表查询用户简要信息（仅 id、用户名、头像列）
+        
+        Args:
+            user_ids: 用户ID列表
+            
+        Returns:
+            (user_id, username, avatar_url) 元组列表
+        """
+        pass
+    
     @abstractmethod
     def find_by_email(self, email: str) -> Optional[UserPO]:
         """根据邮箱查找用户
@@ -62,12 +74,18 @@ class IUserDao(ABC):
         pass
     
     @abstractmethod
-    def search_by_username(self, query: str, limit: int = 20) -> List[UserPO]:
-        """根据用户名模糊搜索用户
+    def search_by_username(
+        self,
+        query: str,
+        limit: int = 20,
+        prefer_ids: Optional[Collection[str]] = None
+    ) -> List[UserPO]:
+        """根据用户名搜索用户（子串与拼音匹配，按相关度排序）
         
         Args:
             query: 搜索关键词
             limit: 限制数量
+            prefer_ids: 优先排在前面的用户ID（如好友）
             
         Returns:
             用户持久化对象列表
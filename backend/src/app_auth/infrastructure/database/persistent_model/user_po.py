@@ -5,10 +5,12 @@
 包含与 Domain Entity 的双向转换方法。
 """
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
-from sqlalchemy import Column, String, Boolean, DateTime, Text
+from sqlalchemy import Column, String, Boolean, DateTime, Text, SmallInteger, ForeignKey, Index
+from sqlalchemy.orm import relationship
 from shared.database.core import Base
+from shared.infrastructure.text_search import short_text_terms
 
 from app_auth.domain.entity.user_entity import User
 from app_auth.domain.value_objects.user_value_objects import (
@@ -16,6 +18,25 @@ from app_auth.domain.value_objects.user_value_objects import (
 )
 
 
+class UserSearchTermPO(Base):
+    """用户名检索词（后缀与拼音，按前缀匹配）
+    
+    match_rank 越小越相关：0 用户名开头，1 拼音全拼/首字母，2 用户名中间。
+    (match_rank, term) 索引使按等级、按词序取前 N 个只需一次范围扫描。
+    """
+    
+    __tablename__ = 'user_search_terms'
+    __table_args__ = (
+        Index('ix_user_search_terms_rank_term', 'match_rank', 'term', 'user_id'),
+    )
+    
+    MAX_TERM_LENGTH = 64
+    
+    user_id = Column(String(36), ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    term = Column(String(MAX_TERM_LENGTH), primary_key=True)
+    match_rank = Column(SmallInteger, nullable=False)
+
+
 class UserPO(Base):
     """用户持久化对象 - SQLAlchemy 模型"""
     
@@ -43,6 +64,9 @@ class UserPO(Base):
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # 用户名检索词，随用户名一起维护
+    search_terms = relationship('UserSearchTermPO', cascade='all, delete-orphan')
+    
     def __repr__(self) -> str:
         return f"UserPO(id={self.id}, username={self.username}, email={self.email})"
     
@@ -93,7 +117,8 @@ class UserPO(Base):
             is_active=user.is_active,
             is_email_verified=user.is_email_verified,
             created_at=user.created_at,
-            updated_at=user.updated_at
+            updated_at=user.updated_at,
+            search_terms=cls.build_search_terms(user.id.value, user.username.value)
         )
     
     def update_from_domain(self, user: User) -> None:
@@ -102,6 +127,8 @@ class UserPO(Base):
         Args:
             user: User 领域实体
         """
+        if self.username != user.username.value:
+            self.sync_search_terms(user.username.value)
         self.username = user.username.value
         self.email = user.email.value
         self.hashed_password = user.hashed_password.value
@@ -111,4 +138,27 @@ class UserPO(Base):
         self.location = user.profile.location
         self.is_active = user.is_active
         self.is_email_verified = user.is_email_verified
-        self.updated_at = user.updated_at
\ No newline at end of file
+        self.updated_at = user.updated_at
+    
+    @staticmethod
+    def build_search_terms(user_id: str, username: str) -> List[UserSearchTermPO]:
+        """生成用户名检索词行"""
+        terms = short_text_terms(username, UserSearchTermPO.MAX_TERM_LENGTH)
+        return [
+            UserSearchTermPO(user_id=user_id, term=term, match_rank=rank)
+            for term, rank in sorted(terms.items())
+        ]
+    
+    def sync_search_terms(self, username: str) -> None:
+        """按新用户名增量更新检索词（保留不变的行，避免删除与插入同一主键冲突）"""
+        wanted = {row.term: row.match_rank for row in self.build_search_terms(self.id, username)}
+        kept = []
+        for row in self.search_terms:
+            if row.term in wanted:
+                row.match_rank = wanted.pop(row.term)
+                kept.append(row)
+        kept.extend(
+            UserSearchTermPO(user_id=self.id, term=term, match_rank=rank)
+            for term, rank in sorted(wanted.items())
+        )
+        self.search_terms = kept
@@ -4,7 +4,7 @@
 实现 IUserRepository 接口，通过 IUserDao 进行数据持久化操作。
 负责领域模型与持久化模型之间的转换。
 """
-from typing import List, Optional
+from typing import Collection, List, Optional
 from sqlalchemy.exc import IntegrityError
 
 from app_auth.domain.demand_interface.i_user_repository import IUserRepository
@@ -107,17 +107,23 @@ class UserRepositoryImpl(IUserRepository):
             return user_po.to_domain()
         return None
     
-    def search_by_username(self, query: str, limit: int = 20) -> List[User]:
+    def search_by_username(
+        self,
+        query: str,
+        limit: int = 20,
+        prefer_ids: Optional[Collection[str]] = None
+    ) -> List[User]:
         """根据用户名搜索用户
         
         Args:
             query: 搜索关键词
             limit: 限制数量
+            prefer_ids: 优先排在前面的用户ID（如好友）
             
         Returns:
-            用户列表
+            用户列表（按相关度排序）
         """
-        user_pos = self._user_dao.search_by_username(query, limit)
+        user_pos = self._user_dao.search_by_username(query, limit, prefer_ids)
         return [po.to_domain() for po in user_pos]
 
     def find_by_role(self, role: UserRole) -> List[User]:
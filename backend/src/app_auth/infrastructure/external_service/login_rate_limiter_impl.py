@@ -0,0 +1,101 @@
+"""
+登录限流器实现
+
+两个滑动窗口叠加，在查库与 bcrypt 验证之前拒绝：
+- 按 IP：窗口内的全部登录尝试（LOGIN_IP_MAX_ATTEMPTS / LOGIN_IP_WINDOW），
+  限制单个来源对大量账号的撞库
+- 按账号：窗口内的失败次数（LOGIN_ACCOUNT_MAX_FAILURES / LOGIN_ACCOUNT_WINDOW），
+  限制对单个账号的猜密码；登录成功后清零
+
+默认使用进程内存储，多实例部署时传入共享的 RateLimitBackend。
+"""
+import os
+import threading
+from typing import Dict, Optional
+
+from shared.infrastructure.rate_limiter import RateLimitBackend, SlidingWindowRateLimiter
+from app_auth.domain.demand_interface.i_login_rate_limiter import ILoginRateLimiter, LoginRateLimitedError
+
+
+DEFAULT_IP_MAX_ATTEMPTS = int(os.getenv("LOGIN_IP_MAX_ATTEMPTS", "20"))
+DEFAULT_IP_WINDOW_SECONDS = float(os.getenv("LOGIN_IP_WINDOW", "60"))
+DEFAULT_ACCOUNT_MAX_FAILURES = int(os.getenv("LOGIN_ACCOUNT_MAX_FAILURES", "5"))
+DEFAULT_ACCOUNT_WINDOW_SECONDS = float(os.getenv("LOGIN_ACCOUNT_WINDOW", "300"))
+
+
+class LoginRateLimiterImpl(ILoginRateLimiter):
+    """登录限流器实现 - 按 IP 与按账号的滑动窗口"""
+
+    def __init__(
+        self,
+        ip_max_attempts: int = DEFAULT_IP_MAX_ATTEMPTS,
+        ip_window_seconds: float = DEFAULT_IP_WINDOW_SECONDS,
+        account_max_failures: int = DEFAULT_ACCOUNT_MAX_FAILURES,
+        account_window_seconds: float = DEFAULT_ACCOUNT_WINDOW_SECONDS,
+        backend: Optional[RateLimitBackend] = None,
+        **limiter_kwargs
+    ):
+        """
+        Args:
+            ip_max_attempts: 每个 IP 窗口内允许的登录尝试次数
+            ip_window_seconds: IP 窗口长度（秒）
+            account_max_failures: 每个账号窗口内允许的失败次数
+            account_window_seconds: 账号窗口长度（秒）
+            backend: 限流存储后端（两个窗口共用，键带前缀区分）
+            limiter_kwargs: 透传给 SlidingWindowRateLimiter（如测试注入 clock）
+        """
+        self._by_ip = SlidingWindowRateLimiter(ip_max_attempts, ip_window_seconds, backend, **limiter_kwargs)
+        self._by_account = SlidingWindowRateLimiter(
+            account_max_failures, account_window_seconds, backend, **limiter_kwargs
+        )
+        self._lock = threading.Lock()
+        self._rejected = {'ip': 0, 'account': 0}
+
+    def check(self, email: str, ip_address: Optional[str] = None) -> None:
+        # 先查账号：被锁定账号的请求不再消耗该 IP 的额度
+        wait = self._by_account.peek(self._account_key(email))
+        if wait:
+            self._count_rejection('account')
+            raise LoginRateLimitedError(wait)
+        if ip_address:
+            wait = self._by_ip.hit(self._ip_key(ip_address))
+            if wait:
+                self._count_rejection('ip')
+                raise LoginRateLimitedError(wait)
+
+    def record_failure(self, email: str, ip_address: Optional[str] = None) -> None:
+        self._by_account.record(self._account_key(email))
+
+    def record_success(self, email: str, ip_address: Optional[str] = None) -> None:
+        self._by_account.reset(self._account_key(email))
+
+    def stats(self) -> Dict[str, int]:
+        """被拒绝的尝试次数（按维度）"""
+        with self._lock:
+            return {f'rejected_{scope}': count for scope, count in self._rejected.items()}
+
+    def _count_rejection(self, scope: str) -> None:
+        with self._lock:
+            self._rejected[scope] += 1
+
+    @staticmethod
+    def _account_key(email: str) -> str:
+        return f"login:account:{email.strip().lower()}"
+
+    @staticmethod
+    def _ip_key(ip_address: str) -> str:
+        return f"login:ip:{ip_address}"
+
+
+_login_rate_limiter: Optional[LoginRateLimiterImpl] = None
+_login_rate_limiter_lock = threading.Lock()
+
+
+def get_login_rate_limiter() -> LoginRateLimiterImpl:
+    """获取进程内共享的登录限流器"""
+    global _login_rate_limiter
+    if _login_rate_limiter is None:
+        with _login_rate_limiter_lock:
+            if _login_rate_limiter is None:
+                _login_rate_limiter = LoginRateLimiterImpl()
+    return _login_rate_limiter
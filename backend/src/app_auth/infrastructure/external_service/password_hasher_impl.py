@@ -2,44 +2,307 @@
 密码哈希器实现
 
 使用 bcrypt 库实现 IPasswordHasher 接口。
+
+bcrypt 每次计算约 100~300ms，且刻意占满一个 CPU 核。为避免登录高峰占满
+所有请求线程、拖慢其他接口：
+- 计算在专用的有界线程池中执行（bcrypt 计算期间释放 GIL，线程池即可并行），
+  同时进行的计算数不超过 PASSWORD_HASH_WORKERS
+- 排队数超过 PASSWORD_HASH_MAX_PENDING 时立即拒绝（PasswordHasherBusyError），
+  由视图层返回 503，而不是让请求线程无限等待
+- 计算强度由 BCRYPT_ROUNDS 配置；登录成功时若已存哈希的强度与配置不同，
+  由领域层用明文重新哈希（needs_rehash / rehash）。重新哈希只在有空闲计算线程时
+  执行，否则拒绝并留到之后的登录，登录高峰时不额外增加 bcrypt 负载
+- 计算次数、耗时、排队时间与每分钟验证次数记录在 metrics 中
 """
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Optional
+
 import bcrypt
 
-from app_auth.domain.demand_interface.i_password_hasher import IPasswordHasher
+from app_auth.domain.demand_interface.i_password_hasher import IPasswordHasher, PasswordHasherBusyError
 from app_auth.domain.value_objects.user_value_objects import Password, HashedPassword
 
 
+DEFAULT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+DEFAULT_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+DEFAULT_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+DEFAULT_TIMEOUT_SECONDS = float(os.getenv("PASSWORD_HASH_TIMEOUT", "10"))
+
+MIN_ROUNDS = 4
+MAX_ROUNDS = 31
+
+
+class PasswordHashMetrics:
+    """记录哈希/验证次数、耗时与排队时间（毫秒）"""
+
+    def __init__(self, window_size: int = 1000):
+        self._window_size = window_size
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._verify_times: deque = deque()
+        self._rejected = 0
+        self._rehashes = 0
+        self._rehashes_skipped = 0
+
+    def record(self, operation: str, elapsed_ms: float, wait_ms: float, ok: bool = True) -> None:
+        with self._lock:
+            stats = self._stats.get(operation)
+            if stats is None:
+                stats = {
+                    'count': 0,
+                    'failures': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                    'total_wait_ms': 0.0,
+                    'max_wait_ms': 0.0,
+                    'recent': deque(maxlen=self._window_size)
+                }
+                self._stats[operation] = stats
+            stats['count'] += 1
+            if not ok:
+                stats['failures'] += 1
+            stats['total_ms'] += elapsed_ms
+            stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+            stats['total_wait_ms'] += wait_ms
+            stats['max_wait_ms'] = max(stats['max_wait_ms'], wait_ms)
+            stats['recent'].append(elapsed_ms)
+            if operation == 'verify':
+                self._verify_times.append(time.monotonic())
+
+    def record_rejected(self) -> None:
+        with self._lock:
+            self._rejected += 1
+
+    def record_rehash(self) -> None:
+        with self._lock:
+            self._rehashes += 1
+
+    def record_rehash_skipped(self) -> None:
+        with self._lock:
+            self._rehashes_skipped += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """返回统计快照（p50/p95 基于最近窗口，verify_per_minute 为最近 60 秒的验证次数）"""
+        with self._lock:
+            cutoff = time.monotonic() - 60
+            while self._verify_times and self._verify_times[0] < cutoff:
+                self._verify_times.popleft()
+            result: Dict[str, Any] = {
+                'rejected': self._rejected,
+                'rehashes': self._rehashes,
+                'rehashes_skipped': self._rehashes_skipped,
+                'verify_per_minute': len(self._verify_times),
+            }
+            for operation, stats in self._stats.items():
+                recent = sorted(stats['recent'])
+                result[operation] = {
+                    'count': stats['count'],
+                    'failures': stats['failures'],
+                    'avg_ms': round(stats['total_ms'] / stats['count'], 3),
+                    'max_ms': round(stats['max_ms'], 3),
+                    'p50_ms': round(_percentile(recent, 0.50), 3),
+                    'p95_ms': round(_percentile(recent, 0.95), 3),
+                    'avg_wait_ms': round(stats['total_wait_ms'] / stats['count'], 3),
+                    'max_wait_ms': round(stats['max_wait_ms'], 3),
+                }
+            return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self._verify_times.clear()
+            self._rejected = 0
+            self._rehashes = 0
+            self._rehashes_skipped = 0
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _hash_cost(hashed: str) -> Optional[int]:
+    """解析 bcrypt 哈希（$2b$12$...）中的 cost，无法解析返回 None"""
+    parts = hashed.split('$')
+    if len(parts) < 4 or parts[1] not in ('2a', '2b', '2y'):
+        return None
+    try:
+        return int(parts[2])
+    except ValueError:
+        return None
+
+
 class PasswordHasherImpl(IPasswordHasher):
-    """密码哈希器实现 - 使用 bcrypt 算法"""
-    
+    """密码哈希器实现 - 使用 bcrypt 算法，在有界线程池中计算"""
+
+    def __init__(
+        self,
+        rounds: int = DEFAULT_ROUNDS,
+        max_workers: int = DEFAULT_WORKERS,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        timeout_seconds: float = DEFAULT_TIMEOUT_SECONDS
+    ):
+        """
+        Args:
+            rounds: bcrypt cost（4~31，每加 1 计算量翻倍）
+            max_workers: 同时进行的 bcrypt 计算数
+            max_pending: 等待中的计算数上限，超出时立即拒绝
+            timeout_seconds: 请求线程等待结果的最长时间
+        """
+        if not MIN_ROUNDS <= rounds <= MAX_ROUNDS:
+            raise ValueError(f"bcrypt rounds must be between {MIN_ROUNDS} and {MAX_ROUNDS}")
+        self._rounds = rounds
+        self._timeout = timeout_seconds
+        self._workers = max(1, max_workers)
+        # 已占用名额（计算中 + 排队中）的数量，用于判断是否有空闲计算线程
+        self._in_flight = 0
+        self._in_flight_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='bcrypt')
+        self._slots = threading.BoundedSemaphore(max(1, max_workers) + max(0, max_pending))
+        self.metrics = PasswordHashMetrics()
+
+    @property
+    def rounds(self) -> int:
+        return self._rounds
+
     def hash(self, password: Password) -> HashedPassword:
         """将明文密码哈希化
-        
+
         Args:
             password: 明文密码
-            
+
         Returns:
             哈希后的密码
+
+        Raises:
+            PasswordHasherBusyError: 哈希线程池已满或等待超时
         """
         # bcrypt.hashpw 需要 bytes
         pwd_bytes = password.value.encode('utf-8')
-        salt = bcrypt.gensalt()
-        hashed_bytes = bcrypt.hashpw(pwd_bytes, salt)
-        
+        salt = bcrypt.gensalt(rounds=self._rounds)
+        hashed_bytes = self._run('hash', bcrypt.hashpw, pwd_bytes, salt)
+
         # 转换回 string 存储
         return HashedPassword(value=hashed_bytes.decode('utf-8'))
-    
+
     def verify(self, password: Password, hashed: HashedPassword) -> bool:
         """验证密码是否匹配
-        
+
         Args:
             password: 明文密码
             hashed: 哈希后的密码
-            
+
         Returns:
             是否匹配
+
+        Raises:
+            PasswordHasherBusyError: 哈希线程池已满或等待超时
         """
         pwd_bytes = password.value.encode('utf-8')
         hashed_bytes = hashed.value.encode('utf-8')
-        
-        return bcrypt.checkpw(pwd_bytes, hashed_bytes)
+
+        return self._run('verify', bcrypt.checkpw, pwd_bytes, hashed_bytes)
+
+    def needs_rehash(self, hashed: HashedPassword) -> bool:
+        """已存哈希的 cost 与当前配置不同时需要重新哈希"""
+        cost = _hash_cost(hashed.value)
+        return cost is not None and cost != self._rounds
+
+    def rehash(self, password: Password) -> HashedPassword:
+        """按当前 cost 重新哈希，仅在有空闲计算线程时执行
+
+        Raises:
+            PasswordHasherBusyError: 没有空闲计算线程（不排队，也不计入 rejected）
+        """
+        pwd_bytes = password.value.encode('utf-8')
+        salt = bcrypt.gensalt(rounds=self._rounds)
+        try:
+            hashed_bytes = self._run('hash', bcrypt.hashpw, pwd_bytes, salt, idle_only=True)
+        except PasswordHasherBusyError:
+            self.metrics.record_rehash_skipped()
+            raise
+        self.metrics.record_rehash()
+        return HashedPassword(value=hashed_bytes.decode('utf-8'))
+
+    def shutdown(self, wait: bool = True) -> None:
+        """关闭线程池"""
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, operation: str, func: Callable[..., Any], *args, idle_only: bool = False) -> Any:
+        """在线程池中执行 bcrypt 计算，请求线程等待结果
+
+        idle_only 为 True 时只在有空闲计算线程时提交（不排队）
+        """
+        if not self._acquire_slot(idle_only):
+            if not idle_only:
+                self.metrics.record_rejected()
+            raise PasswordHasherBusyError("Password hashing is busy, please retry later")
+
+        submitted = time.perf_counter()
+
+        def task():
+            started = time.perf_counter()
+            ok = False
+            try:
+                result = func(*args)
+                # 验证失败（密码错误）也计入 failures，便于观察暴力尝试
+                ok = bool(result)
+                return result
+            finally:
+                # 先释放名额再交付结果，调用方拿到结果后即可发起下一次计算
+                self._release_slot()
+                self.metrics.record(
+                    operation,
+                    (time.perf_counter() - started) * 1000,
+                    (started - submitted) * 1000,
+                    ok
+                )
+
+        try:
+            future = self._executor.submit(task)
+        except RuntimeError:
+            self._release_slot()
+            raise
+
+        try:
+            return future.result(timeout=self._timeout)
+        except FutureTimeoutError:
+            # 尚未开始的计算可以取消，名额由这里释放；已开始的计算结束时自行释放
+            if future.cancel():
+                self._release_slot()
+            self.metrics.record_rejected()
+            raise PasswordHasherBusyError("Password hashing timed out, please retry later")
+
+    def _acquire_slot(self, idle_only: bool) -> bool:
+        with self._in_flight_lock:
+            if idle_only and self._in_flight >= self._workers:
+                return False
+            if not self._slots.acquire(blocking=False):
+                return False
+            self._in_flight += 1
+            return True
+
+    def _release_slot(self) -> None:
+        with self._in_flight_lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+
+_password_hasher: Optional[PasswordHasherImpl] = None
+_password_hasher_lock = threading.Lock()
+
+
+def get_password_hasher() -> PasswordHasherImpl:
+    """获取进程内共享的密码哈希器（共享同一个有界线程池）"""
+    global _password_hasher
+    if _password_hasher is None:
+        with _password_hasher_lock:
+            if _password_hasher is None:
+                _password_hasher = PasswordHasherImpl()
+    return _password_hasher
@@ -3,15 +3,18 @@
 
 负责协调领域服务和基础设施，处理认证相关的用例。
 """
-from typing import Optional, Any, List
+from functools import partial
+from typing import Optional, Any, Callable, List
 from flask import session
 
 from app_auth.domain.domain_service.auth_service import AuthService as DomainAuthService
 from app_auth.domain.demand_interface.i_user_repository import IUserRepository
+from app_auth.domain.demand_interface.i_login_rate_limiter import ILoginRateLimiter
 from app_auth.domain.entity.user_entity import User
 from app_auth.domain.value_objects.user_value_objects import (
     Username, Email, Password, UserRole, UserId, UserProfile
 )
+from app_auth.infrastructure.cache.current_user_cache import CurrentUserCache
 from shared.event_bus import EventBus
 from shared.storage.local_file_storage import LocalFileStorageService
 
@@ -30,7 +33,11 @@ class AuthApplicationService:
         self,
         domain_auth_service: DomainAuthService,
         user_repository: IUserRepository,
-        event_bus: Optional[EventBus] = None
+        event_bus: Optional[EventBus] = None,
+        rate_limiter: Optional[ILoginRateLimiter] = None,
+        current_user_cache: Optional[CurrentUserCache] = None,
+        friend_ids_provider: Optional[Callable[[str], List[str]]] = None,
+        defer_until_commit: Optional[Callable[[Callable[[], None]], None]] = None
     ):
         """初始化应用服务
         
@@ -38,10 +45,18 @@ class AuthApplicationService:
             domain_auth_service: 领域认证服务
             user_repository: 用户仓库 (用于查找聚合根)
             event_bus: 事件总线
+            rate_limiter: 登录限流器（可选，不传则不限流）
+            current_user_cache: 当前用户缓存（可选，不传则每次查库）
+            friend_ids_provider: 用户ID -> 好友ID列表（可选，用于搜索结果好友优先）
+            defer_until_commit: 登记在调用方事务提交后执行的任务（可选，不传则立即执行）
         """
         self._domain_service = domain_auth_service
         self._user_repo = user_repository
         self._event_bus = event_bus or EventBus.get_instance()
+        self._rate_limiter = rate_limiter
+        self._current_user_cache = current_user_cache
+        self._friend_ids_provider = friend_ids_provider
+        self._defer_until_commit = defer_until_commit
         self._storage_service = LocalFileStorageService()
     
     def _publish_events(self, user: User) -> None:
@@ -106,7 +121,13 @@ class AuthApplicationService:
             
         Returns:
             登录成功的用户实体，失败返回 None
+            
+        Raises:
+            LoginRateLimitedError: 该 IP 或账号的尝试过于频繁（此时不查库、不验证密码）
         """
+        if self._rate_limiter:
+            self._rate_limiter.check(email, ip_address)
+        
         v_email = Email(email)
         v_password = Password(password)
         
@@ -118,6 +139,12 @@ class AuthApplicationService:
             user_agent=user_agent
         )
         
+        if self._rate_limiter:
+            if user:
+                self._rate_limiter.record_success(email, ip_address)
+            else:
+                self._rate_limiter.record_failure(email, ip_address)
+        
         if user:
             # 登录成功，写入 Flask Session
             session['user_id'] = user.id.value
@@ -149,17 +176,34 @@ class AuthApplicationService:
         """
         return self._user_repo.find_by_id(UserId(user_id))
     
-    def search_users(self, query: str, limit: int = 20) -> List[User]:
+    def get_current_user(self, user_id: str) -> Optional[User]:
+        """获取当前登录用户（优先读缓存）
+        
+        Args:
+            user_id: Session 中的用户ID
+            
+        Returns:
+            用户实体，如果不存在则返回 None
+        """
+        if self._current_user_cache is None:
+            return self.get_user_by_id(user_id)
+        return self._current_user_cache.get(user_id, self.get_user_by_id)
+    
+    def search_users(self, query: str, limit: int = 20, viewer_id: Optional[str] = None) -> List[User]:
         """搜索用户
         
         Args:
             query: 搜索关键词
             limit: 限制数量
+            viewer_id: 当前用户ID（提供时其好友排在前面）
             
         Returns:
             用户列表
         """
-        return self._user_repo.search_by_username(query, limit)
+        friend_ids = None
+        if viewer_id and self._friend_ids_provider:
+            friend_ids = self._friend_ids_provider(viewer_id)
+        return self._user_repo.search_by_username(query, limit, prefer_ids=friend_ids)
 
     def change_password(
         self,
@@ -219,6 +263,17 @@ class AuthApplicationService:
         self._user_repo.save(user)
         self._publish_events(user)
         
+        # 旧头像不再被该用户引用（重新上传相同内容时引用数先增后减，保持不变）。
+        # release 用自己的会话写 stored_files，要等 users 的更新提交后再执行：
+        # 否则会等待本事务持有的写锁，且请求回滚时引用数已被减掉
+        old_avatar_url = current_profile.avatar_url
+        if old_avatar_url and new_avatar_url is not None and (avatar_file or new_avatar_url != old_avatar_url):
+            release_old_avatar = partial(self._storage_service.release, old_avatar_url)
+            if self._defer_until_commit is not None:
+                self._defer_until_commit(release_old_avatar)
+            else:
+                release_old_avatar()
+        
         return user
 
         
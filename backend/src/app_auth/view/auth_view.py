@@ -3,18 +3,28 @@
 
 处理认证相关的 HTTP 请求，调用应用层服务，返回 JSON 响应。
 """
+import math
+from functools import partial
+
 from flask import Blueprint, request, jsonify, g, session
-from shared.database.core import SessionLocal
+from shared.database.core import SessionLocal, after_commit
 
 # Infrastructure
 from app_auth.infrastructure.database.dao_impl.sqlalchemy_user_dao import SqlAlchemyUserDao
 from app_auth.infrastructure.database.repository_impl.user_repository_impl import UserRepositoryImpl
-from app_auth.infrastructure.external_service.password_hasher_impl import PasswordHasherImpl
+from app_auth.infrastructure.external_service.password_hasher_impl import get_password_hasher
 from app_auth.infrastructure.external_service.console_email_service import ConsoleEmailService
+from app_auth.infrastructure.external_service.login_rate_limiter_impl import get_login_rate_limiter
+from app_auth.infrastructure.cache.current_user_cache import (
+    get_current_user_cache,
+    register_current_user_cache_handlers,
+)
 
 # Domain
 from app_auth.domain.domain_service.auth_service import AuthService as DomainAuthService
 from app_auth.domain.entity.user_entity import User
+from app_auth.domain.demand_interface.i_password_hasher import PasswordHasherBusyError
+from app_auth.domain.demand_interface.i_login_rate_limiter import LoginRateLimitedError
 
 # Application
 from app_auth.services.auth_application_service import AuthApplicationService
@@ -22,6 +32,9 @@ from app_auth.services.auth_application_service import AuthApplicationService
 # 创建蓝图
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
+# 用户资料/密码/账户状态变更时使当前用户缓存失效
+register_current_user_cache_handlers()
+
 # ==================== 依赖注入与会话管理 ====================
 
 @auth_bp.before_request
@@ -35,6 +48,11 @@ def shutdown_session(exception=None):
     if hasattr(g, 'session'):
         g.session.close()
 
+def find_friend_ids(user_id: str) -> list:
+    """查询好友ID（好友关系属于社交上下文，延迟导入避免循环依赖）"""
+    from app_social.infrastructure.cache.friend_graph_cache import get_friend_graph_cache
+    return list(get_friend_graph_cache().friend_ids(user_id, session=g.session))
+
 def get_auth_service() -> AuthApplicationService:
     """获取 AuthApplicationService 实例
     
@@ -45,7 +63,8 @@ def get_auth_service() -> AuthApplicationService:
     # 基础设施
     user_dao = SqlAlchemyUserDao(g.session)
     user_repo = UserRepositoryImpl(user_dao)
-    password_hasher = PasswordHasherImpl()
+    # 进程内共享，所有请求的 bcrypt 计算共用一个有界线程池
+    password_hasher = get_password_hasher()
     email_service = ConsoleEmailService()
     
     # 领域服务
@@ -55,10 +74,14 @@ def get_auth_service() -> AuthApplicationService:
         email_service=email_service
     )
     
-    # 应用服务
+    # 应用服务（限流器与当前用户缓存进程内共享）
     return AuthApplicationService(
         domain_auth_service=domain_service,
-        user_repository=user_repo
+        user_repository=user_repo,
+        rate_limiter=get_login_rate_limiter(),
+        current_user_cache=get_current_user_cache(),
+        friend_ids_provider=find_friend_ids,
+        defer_until_commit=partial(after_commit, g.session)
     )
 
 # ==================== 序列化辅助函数 ====================
@@ -81,6 +104,21 @@ def serialize_user(user: User) -> dict:
         'updated_at': user.updated_at.isoformat()
     }
 
+def busy_response():
+    """密码哈希线程池已满：返回 503，提示客户端稍后重试"""
+    response = jsonify({'error': 'Server is busy, please retry later'})
+    response.status_code = 503
+    response.headers['Retry-After'] = '1'
+    return response
+
+def rate_limited_response(error: LoginRateLimitedError):
+    """登录尝试过于频繁：返回 429 与 Retry-After（秒，向上取整）"""
+    retry_after = max(1, math.ceil(error.retry_after))
+    response = jsonify({'error': 'Too many login attempts, please retry later', 'retry_after': retry_after})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
 # ==================== 路由定义 ====================
 
 @auth_bp.route('/register', methods=['POST'])
@@ -103,6 +141,9 @@ def register():
         g.session.rollback()
         print(f"Registration ValueError: {e}")
         return jsonify({'error': str(e)}), 400
+    except PasswordHasherBusyError:
+        g.session.rollback()
+        return busy_response()
     except Exception as e:
         g.session.rollback()
         # 记录日志
@@ -134,6 +175,12 @@ def login():
         else:
             return jsonify({'error': 'Invalid email or password'}), 401
             
+    except LoginRateLimitedError as e:
+        g.session.rollback()
+        return rate_limited_response(e)
+    except PasswordHasherBusyError:
+        g.session.rollback()
+        return busy_response()
     except Exception as e:
         g.session.rollback()
         print(f"Login error: {e}")
@@ -154,7 +201,7 @@ def get_current_user():
         return jsonify({'error': 'Not authenticated'}), 401
         
     service = get_auth_service()
-    user = service.get_user_by_id(user_id)
+    user = service.get_current_user(user_id)
     
     if user:
         return jsonify(serialize_user(user)), 200
@@ -191,7 +238,7 @@ def search_users():
         return jsonify([]), 200
         
     service = get_auth_service()
-    users = service.search_users(query)
+    users = service.search_users(query, viewer_id=session.get('user_id'))
     
     results = []
     for user in users:
@@ -225,6 +272,9 @@ def change_password():
     except ValueError as e:
         g.session.rollback()
         return jsonify({'error': str(e)}), 400
+    except PasswordHasherBusyError:
+        g.session.rollback()
+        return busy_response()
     except Exception as e:
         g.session.rollback()
         print(f"Change password error: {e}")
@@ -313,6 +363,9 @@ def reset_password():
     except ValueError as e:
         g.session.rollback()
         return jsonify({'error': str(e)}), 400
+    except PasswordHasherBusyError:
+        g.session.rollback()
+        return busy_response()
     except Exception as e:
         g.session.rollback()
         print(f"Reset password error: {e}")
@@ -0,0 +1,21 @@
+"""
+会话在线状态接口
+
+通知处理器据此跳过正在查看会话的用户（他们已通过实时推送收到消息）。
+"""
+from abc import ABC, abstractmethod
+from typing import Iterable, Set
+
+
+class IConversationPresence(ABC):
+    """会话在线状态接口"""
+
+    @abstractmethod
+    def is_online(self, user_id: str) -> bool:
+        """用户是否有活跃连接"""
+        pass
+
+    @abstractmethod
+    def get_viewing_users(self, conversation_id: str, user_ids: Iterable[str]) -> Set[str]:
+        """批量返回 user_ids 中正在查看该会话的用户"""
+        pass
@@ -2,10 +2,10 @@
 通知仓库接口
 """
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Iterable, List, Optional, Set
 
 from app_notification.domain.entity.notification import Notification
-from app_notification.domain.value_objects.notification_value_objects import NotificationId
+from app_notification.domain.value_objects.notification_value_objects import NotificationId, NotificationType
 
 
 class INotificationRepository(ABC):
@@ -40,3 +40,15 @@ class INotificationRepository(ABC):
     def mark_all_read(self, user_id: str) -> int:
         """标记用户所有通知为已读，返回更新数量"""
         pass
+    
+    @abstractmethod
+    def refresh_unread(
+        self,
+        user_ids: Iterable[str],
+        notification_type: NotificationType,
+        resource_type: str,
+        resource_id: str,
+        actor_id: Optional[str] = None
+    ) -> Set[str]:
+        """把用户已有的同资源未读通知刷新到最新，返回已有未读通知的用户ID"""
+        pass
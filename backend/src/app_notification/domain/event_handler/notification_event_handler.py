@@ -3,13 +3,38 @@
 
 订阅领域事件并创建相应的通知。
 """
+from typing import Optional
+
 from shared.event_bus import EventBus
 from shared.database.core import SessionLocal
+from shared.infrastructure.background_tasks import BackgroundTaskQueue
 from app_notification.domain.entity.notification import Notification
 from app_notification.domain.value_objects.notification_value_objects import NotificationType
 from app_notification.infrastructure.database.dao_impl.sqlalchemy_notification_dao import SQLAlchemyNotificationDAO
 from app_notification.infrastructure.database.repository_impl.notification_repository_impl import NotificationRepositoryImpl
 from app_notification.infrastructure.database.persistent_model.notification_po import NotificationPO
+from app_notification.domain.demand_interface.i_conversation_presence import IConversationPresence
+
+# 会话在线状态（由应用组装时注入；未注入时所有接收者都会收到通知）
+# 在线状态只在单进程内准确，多 worker 部署时不注入
+_conversation_presence: Optional[IConversationPresence] = None
+
+
+def set_conversation_presence(presence: Optional[IConversationPresence]) -> None:
+    """注入会话在线状态，用于跳过正在查看会话的用户"""
+    global _conversation_presence
+    _conversation_presence = presence
+
+
+# 写新消息通知的后台任务队列（由应用组装时注入；未注入时在调用线程上立即写入）
+# 消息是高频事件，通知在独立会话中写入，放在发送请求的线程上会与其他请求争用写锁
+_task_queue: Optional[BackgroundTaskQueue] = None
+
+
+def set_notification_task_queue(task_queue: Optional[BackgroundTaskQueue]) -> None:
+    """注入写新消息通知的后台任务队列"""
+    global _task_queue
+    _task_queue = task_queue
 
 
 def register_notification_handlers():
@@ -33,6 +58,9 @@ def register_notification_handlers():
     
     # 费用添加
     event_bus.subscribe('ExpenseAddedEvent', handle_expense_added)
+    
+    # 新消息
+    event_bus.subscribe('MessageSentEvent', handle_message_sent)
 
 
 def handle_friend_request_sent(event):
@@ -175,11 +203,11 @@ def handle_expense_added(event):
         from app_travel.domain.value_objects.travel_value_objects import TripId
         
         trip_dao = SqlAlchemyTripDao(session)
-        trip_po = trip_dao.get_by_id(event.trip_id)
+        # 只需要成员列表，不加载日程
+        trip_po = trip_dao.find_by_id(event.trip_id, load_profile='members')
         
         if trip_po:
-            trip = trip_po.to_domain()
-            for member in trip.members:
+            for member in trip_po.members:
                 # 不给付款人自己发通知
                 if member.user_id != event.payer_id:
                     notification = Notification.create(
@@ -202,3 +230,57 @@ def handle_expense_added(event):
         print(f"Error handling expense added event: {e}")
     finally:
         session.close()
+
+
+def handle_message_sent(event):
+    """处理消息发送事件
+    
+    每个接收者在一个会话上最多保留一条未读的新消息通知：已有未读通知时只刷新
+    其时间和发送者，避免群聊中每条消息都产生一行通知。
+    正在查看该会话的用户已通过实时推送看到消息，不再写入通知。
+    注入了后台任务队列时只在请求线程上判断接收者，写库在后台执行。
+    """
+    recipient_ids = [uid for uid in event.recipient_ids if uid != event.sender_id]
+    if _conversation_presence and recipient_ids:
+        viewing = _conversation_presence.get_viewing_users(event.conversation_id, recipient_ids)
+        recipient_ids = [uid for uid in recipient_ids if uid not in viewing]
+    if not recipient_ids:
+        return
+    
+    if _task_queue is None:
+        _save_message_notifications(event, recipient_ids)
+    else:
+        _task_queue.submit(_save_message_notifications, event, recipient_ids)
+
+
+def _save_message_notifications(event, recipient_ids) -> None:
+    session = SessionLocal()
+    try:
+        dao = SQLAlchemyNotificationDAO(session)
+        repo = NotificationRepositoryImpl(dao)
+        refreshed = repo.refresh_unread(
+            recipient_ids,
+            NotificationType.NEW_MESSAGE,
+            resource_type="conversation",
+            resource_id=event.conversation_id,
+            actor_id=event.sender_id
+        )
+        for recipient_id in recipient_ids:
+            if recipient_id in refreshed:
+                continue
+            notification = Notification.create(
+                user_id=recipient_id,
+                notification_type=NotificationType.NEW_MESSAGE,
+                title="新消息",
+                content=f"你收到了新消息",
+                resource_type="conversation",
+                resource_id=event.conversation_id,
+                actor_id=event.sender_id
+            )
+            repo.save(notification)
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        print(f"Error handling message sent event: {e}")
+    finally:
+        session.close()
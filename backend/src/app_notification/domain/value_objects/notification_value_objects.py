@@ -14,6 +14,7 @@ class NotificationType(Enum):
     POST_LIKED = "post_liked"
     POST_COMMENTED = "post_commented"
     EXPENSE_ADDED = "expense_added"
+    NEW_MESSAGE = "new_message"
     
     @classmethod
     def from_string(cls, type_str: str) -> 'NotificationType':
@@ -1,7 +1,8 @@
 """
 通知 DAO SQLAlchemy 实现
 """
-from typing import List, Optional
+from datetime import datetime
+from typing import Iterable, List, Optional, Set
 from sqlalchemy.orm import Session
 
 from app_notification.infrastructure.database.dao_interface.i_notification_dao import INotificationDAO
@@ -58,3 +59,33 @@ class SQLAlchemyNotificationDAO(INotificationDAO):
         ).update({'is_read': True})
         self.session.flush()
         return count
+    
+    def refresh_unread(
+        self,
+        user_ids: Iterable[str],
+        notification_type: str,
+        resource_type: str,
+        resource_id: str,
+        actor_id: Optional[str] = None
+    ) -> Set[str]:
+        """把用户已有的同资源未读通知刷新到最新（更新时间与触发者），返回已有未读通知的用户ID"""
+        user_ids = list(user_ids)
+        if not user_ids:
+            return set()
+        filters = (
+            NotificationPO.user_id.in_(user_ids),
+            NotificationPO.type == notification_type,
+            NotificationPO.resource_type == resource_type,
+            NotificationPO.resource_id == resource_id,
+            NotificationPO.is_read == False
+        )
+        existing = {
+            user_id for (user_id,) in self.session.query(NotificationPO.user_id).filter(*filters)
+        }
+        if existing:
+            self.session.query(NotificationPO).filter(*filters).update(
+                {'created_at': datetime.utcnow(), 'actor_id': actor_id},
+                synchronize_session=False
+            )
+            self.session.flush()
+        return existing
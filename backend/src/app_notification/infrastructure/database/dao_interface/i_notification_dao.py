@@ -2,7 +2,7 @@
 通知 DAO 接口
 """
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Iterable, List, Optional, Set
 
 from app_notification.infrastructure.database.persistent_model.notification_po import NotificationPO
 
@@ -44,3 +44,15 @@ class INotificationDAO(ABC):
     def mark_all_read(self, user_id: str) -> int:
         """标记用户所有通知为已读，返回更新数量"""
         pass
+    
+    @abstractmethod
+    def refresh_unread(
+        self,
+        user_ids: Iterable[str],
+        notification_type: str,
+        resource_type: str,
+        resource_id: str,
+        actor_id: Optional[str] = None
+    ) -> Set[str]:
+        """把用户已有的同资源未读通知刷新到最新（更新时间与触发者），返回已有未读通知的用户ID"""
+        pass
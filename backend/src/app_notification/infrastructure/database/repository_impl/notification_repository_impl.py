@@ -1,10 +1,10 @@
 """
 通知仓库实现
 """
-from typing import List, Optional
+from typing import Iterable, List, Optional, Set
 
 from app_notification.domain.entity.notification import Notification
-from app_notification.domain.value_objects.notification_value_objects import NotificationId
+from app_notification.domain.value_objects.notification_value_objects import NotificationId, NotificationType
 from app_notification.domain.demand_interface.i_notification_repository import INotificationRepository
 from app_notification.infrastructure.database.dao_interface.i_notification_dao import INotificationDAO
 from app_notification.infrastructure.database.persistent_model.notification_po import NotificationPO
@@ -54,3 +54,16 @@ class NotificationRepositoryImpl(INotificationRepository):
     def mark_all_read(self, user_id: str) -> int:
         """标记用户所有通知为已读，返回更新数量"""
         return self._dao.mark_all_read(user_id)
+    
+    def refresh_unread(
+        self,
+        user_ids: Iterable[str],
+        notification_type: NotificationType,
+        resource_type: str,
+        resource_id: str,
+        actor_id: Optional[str] = None
+    ) -> Set[str]:
+        """把用户已有的同资源未读通知刷新到最新，返回已有未读通知的用户ID"""
+        return self._dao.refresh_unread(
+            user_ids, notification_type.value, resource_type, resource_id, actor_id
+        )
@@ -6,7 +6,7 @@ from app_social.domain.value_objects.friendship_value_objects import (
     FriendshipId, FriendshipStatus, Relation
 )
 from app_social.domain.domain_event.friendship_events import (
-    FriendRequestSentEvent, FriendshipAcceptedEvent, FriendshipRejectedEvent
+    FriendRequestSentEvent, FriendshipAcceptedEvent, FriendshipRejectedEvent, FriendshipBlockedEvent
 )
 from shared.domain_event import DomainEvent
 
@@ -140,10 +140,19 @@ class Friendship:
         if operator_id != self.requester_id and operator_id != self.addressee_id:
             raise ValueError("Permission denied.")
             
+        was_friends = self._status == FriendshipStatus.ACCEPTED
         self._status = FriendshipStatus.BLOCKED
         self._updated_at = datetime.now()
-        # No specific event requested for Blocked, but good practice to add one? 
-        # Requirement only asked for RequestSent, Accepted, Rejected. I will skip BlockedEvent for now to stick to spec.
+        
+        # Blocking an accepted friendship removes the edge from the friend graph
+        self._add_event(FriendshipBlockedEvent(
+            friendship_id=self.id.value,
+            requester_id=self.requester_id,
+            addressee_id=self.addressee_id,
+            operator_id=operator_id,
+            blocked_at=self._updated_at,
+            was_friends=was_friends
+        ))
 
     def _add_event(self, event: DomainEvent):
         self._domain_events.append(event)
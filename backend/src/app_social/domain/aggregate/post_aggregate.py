@@ -334,7 +334,8 @@ class Post:
             self._add_event(PostLikedEvent(
                 post_id=self._id.value,
                 user_id=user_id,
-                post_author_id=self._author_id
+                post_author_id=self._author_id,
+                trip_id=self._trip_id
             ))
         
         return True
@@ -353,7 +354,9 @@ class Post:
         
         self._add_event(PostUnlikedEvent(
             post_id=self._id.value,
-            user_id=user_id
+            user_id=user_id,
+            post_author_id=self._author_id,
+            trip_id=self._trip_id
         ))
         
         return True
@@ -22,3 +22,13 @@ class FriendshipRejectedEvent(DomainEvent):
     requester_id: str
     addressee_id: str
     rejected_at: datetime
+
+@dataclass(frozen=True)
+class FriendshipBlockedEvent(DomainEvent):
+    friendship_id: str
+    requester_id: str
+    addressee_id: str
+    operator_id: str
+    blocked_at: datetime
+    # Whether the pair were friends before the block (i.e. a friend-graph edge was removed)
+    was_friends: bool = False
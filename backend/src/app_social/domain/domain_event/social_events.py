@@ -71,6 +71,7 @@ class PostLikedEvent(DomainEvent):
     post_id: str = ""
     user_id: str = ""
     post_author_id: str = ""
+    trip_id: Optional[str] = None  # 游记关联的旅行（用于旅行热度）
 
 
 @dataclass(frozen=True)
@@ -78,6 +79,8 @@ class PostUnlikedEvent(DomainEvent):
     """取消点赞事件"""
     post_id: str = ""
     user_id: str = ""
+    post_author_id: str = ""
+    trip_id: Optional[str] = None
 
 
 # ==================== 分享相关事件 ====================
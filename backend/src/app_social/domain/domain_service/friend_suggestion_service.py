@@ -0,0 +1,99 @@
+"""
+好友推荐领域服务
+
+“可能认识的人”由两类信号组成：
+- 共同好友数：两人都与同一个人是好友
+- 同行次数：两人同为某个旅行的成员
+
+推荐按用户物化为 (user_id, candidate_id) 行，这里只负责计算：
+- 增量：一条好友关系 / 一个旅行成员变化只影响少量用户对，
+  返回这些用户对的计数变化量（稀疏）
+- 全量：由好友集合与同行成员计数重建某个用户的全部推荐（用于回填与校正）
+
+纯业务逻辑，不依赖数据库。
+"""
+from collections import Counter
+from typing import Dict, Iterable, Mapping, Set, Tuple
+
+# (user_id, candidate_id) -> (共同好友变化量, 同行次数变化量)
+PairDeltas = Dict[Tuple[str, str], Tuple[int, int]]
+
+
+class FriendSuggestionService:
+    """好友推荐计算"""
+
+    MUTUAL_FRIEND_WEIGHT = 1.0
+    # 一起出行过比共同好友更能说明认识
+    SHARED_TRIP_WEIGHT = 2.0
+
+    @classmethod
+    def score(cls, mutual_friends: int, shared_trips: int) -> float:
+        """推荐分值"""
+        return mutual_friends * cls.MUTUAL_FRIEND_WEIGHT + shared_trips * cls.SHARED_TRIP_WEIGHT
+
+    @staticmethod
+    def friendship_deltas(
+        user_a: str,
+        user_b: str,
+        friends_of_a: Iterable[str],
+        friends_of_b: Iterable[str],
+        delta: int
+    ) -> PairDeltas:
+        """A、B 成为（delta=1）或不再是（delta=-1）好友时的共同好友变化
+
+        A 的每个好友 F 与 B 之间多（少）了一个共同好友 A，反之亦然。
+        """
+        changes: Counter = Counter()
+        for middle, other, friends in ((user_a, user_b, friends_of_a), (user_b, user_a, friends_of_b)):
+            for friend_id in friends:
+                if friend_id in (middle, other):
+                    continue
+                changes[(other, friend_id)] += delta
+                changes[(friend_id, other)] += delta
+        return {pair: (count, 0) for pair, count in changes.items() if count}
+
+    @staticmethod
+    def co_member_deltas(user_id: str, other_member_ids: Iterable[str], delta: int) -> PairDeltas:
+        """用户加入（delta=1）或离开（delta=-1）某个旅行时的同行次数变化"""
+        changes: PairDeltas = {}
+        for member_id in set(other_member_ids) - {user_id}:
+            changes[(user_id, member_id)] = (0, delta)
+            changes[(member_id, user_id)] = (0, delta)
+        return changes
+
+    @staticmethod
+    def compute_for_user(
+        user_id: str,
+        friend_ids: Set[str],
+        friends_of_friends: Mapping[str, Iterable[str]],
+        co_member_counts: Mapping[str, int]
+    ) -> Dict[str, Tuple[int, int]]:
+        """全量计算某个用户的推荐计数
+
+        共同好友数即 user 的好友集合与候选人好友集合的交集大小；按好友逐个展开
+        其好友集合累加（稀疏），不需要枚举全体用户。
+
+        Args:
+            user_id: 用户ID
+            friend_ids: 用户的好友ID集合
+            friends_of_friends: 好友ID -> 该好友的好友ID集合
+            co_member_counts: 其他用户ID -> 与该用户同为成员的旅行数
+
+        Returns:
+            候选人ID -> (共同好友数, 同行次数)，与增量维护的结果一致
+            （包括已是好友的用户，读取时再排除）
+        """
+        mutual: Counter = Counter()
+        for friend_id in friend_ids:
+            for candidate_id in friends_of_friends.get(friend_id, ()):
+                if candidate_id != user_id:
+                    mutual[candidate_id] += 1
+
+        result: Dict[str, Tuple[int, int]] = {}
+        for candidate_id in set(mutual) | set(co_member_counts):
+            if candidate_id == user_id:
+                continue
+            counts = (mutual.get(candidate_id, 0), co_member_counts.get(candidate_id, 0))
+            if counts[0] > 0 or counts[1] > 0:
+                result[candidate_id] = counts
+        return result
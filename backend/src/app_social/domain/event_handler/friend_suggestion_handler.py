@@ -0,0 +1,166 @@
+"""
+好友推荐事件处理器
+
+订阅好友关系与旅行成员事件，增量维护 friend_suggestions 中受影响用户对的计数，
+推荐查询直接沿 (user_id, score) 索引分页，请求时不遍历好友关系图。
+
+- 好友接受：A 的每个好友与 B（以及 B 的每个好友与 A）共同好友数 +1
+- 拉黑已是好友的关系：同上 -1
+- 旅行成员加入 / 移除：该成员与旅行其他成员的同行次数 ±1
+
+每个事件只读写 O(好友数) 或 O(旅行成员数) 行。写库在后台任务队列中按事件顺序
+执行，不占用请求线程。发布方在请求事务提交后才发布事件，回滚的请求不会留下计数；
+旅行成员事件带有变更时聚合内的其他成员（旅行版本号保证并发加入依次生效），
+并发加入的两人之间只计一次，不依赖任务执行时数据库中的成员。
+
+功能上线前的数据以及
+未发布事件的变更（如删除旅行）由 scripts/rebuild_friend_suggestions.py 全量校正。
+"""
+from datetime import datetime
+from typing import Callable, Iterable, Optional
+
+from sqlalchemy.orm import Session
+
+from shared.database.core import SessionLocal
+from shared.event_bus import get_event_bus
+from shared.infrastructure.background_tasks import BackgroundTaskQueue, get_background_task_queue
+from app_social.domain.domain_service.friend_suggestion_service import FriendSuggestionService, PairDeltas
+from app_social.infrastructure.database.dao_impl.sqlalchemy_friend_suggestion_dao import SqlAlchemyFriendSuggestionDao
+from app_social.infrastructure.database.dao_impl.sqlalchemy_friendship_dao import SqlAlchemyFriendshipDao
+from app_social.infrastructure.database.dao_interface.i_friend_suggestion_dao import IFriendSuggestionDao
+from app_social.infrastructure.database.persistent_model.friend_suggestion_po import FriendSuggestionPO
+
+
+class FriendSuggestionHandler:
+    """好友推荐事件处理器"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        task_queue: Optional[BackgroundTaskQueue] = None
+    ):
+        """
+        Args:
+            session_factory: 会话工厂
+            task_queue: 后台任务队列；为 None 时在调用线程上立即写入（脚本与测试）
+        """
+        self._session_factory = session_factory
+        self._task_queue = task_queue
+
+    # ==================== 事件入口 ====================
+
+    def handle_friendship_accepted(self, event) -> None:
+        self._submit(self._apply_friendship, event.requester_id, event.addressee_id, 1)
+
+    def handle_friendship_blocked(self, event) -> None:
+        # 拉黑待处理的请求不涉及好友关系图
+        if event.was_friends:
+            self._submit(self._apply_friendship, event.requester_id, event.addressee_id, -1)
+
+    def handle_trip_member_added(self, event) -> None:
+        self._submit(self._apply_trip_member, event.trip_id, event.user_id,
+                     event.co_member_ids, 1)
+
+    def handle_trip_member_removed(self, event) -> None:
+        self._submit(self._apply_trip_member, event.trip_id, event.user_id,
+                     event.co_member_ids, -1)
+
+    def subscribe(self, event_bus) -> None:
+        """在事件总线上订阅本处理器关心的事件"""
+        event_bus.subscribe('FriendshipAcceptedEvent', self.handle_friendship_accepted)
+        event_bus.subscribe('FriendshipBlockedEvent', self.handle_friendship_blocked)
+        event_bus.subscribe('TripMemberAddedEvent', self.handle_trip_member_added)
+        event_bus.subscribe('TripMemberRemovedEvent', self.handle_trip_member_removed)
+
+    def _submit(self, task: Callable[..., None], *args) -> None:
+        if self._task_queue is None:
+            task(*args)
+        else:
+            self._task_queue.submit(task, *args)
+
+    # ==================== 计数更新 ====================
+
+    def _apply_friendship(self, user_a: str, user_b: str, delta: int) -> None:
+        session = self._session_factory()
+        try:
+            # 直接查询而不走好友关系图缓存：与缓存失效处理器的执行顺序无关
+            friends = SqlAlchemyFriendshipDao(session).find_friend_ids_many([user_a, user_b])
+            deltas = FriendSuggestionService.friendship_deltas(
+                user_a, user_b, friends.get(user_a, ()), friends.get(user_b, ()), delta
+            )
+            self.apply_deltas(SqlAlchemyFriendSuggestionDao(session), deltas)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            print(f"Error updating friend suggestions for {user_a}/{user_b}: {e}")
+        finally:
+            session.close()
+
+    def _apply_trip_member(
+        self,
+        trip_id: str,
+        user_id: str,
+        co_member_ids: Optional[Iterable[str]],
+        delta: int
+    ) -> None:
+        session = self._session_factory()
+        try:
+            dao = SqlAlchemyFriendSuggestionDao(session)
+            if co_member_ids is None:
+                co_member_ids = dao.find_trip_member_ids(trip_id)
+            deltas = FriendSuggestionService.co_member_deltas(user_id, co_member_ids, delta)
+            self.apply_deltas(dao, deltas)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            print(f"Error updating friend suggestions for trip {trip_id}: {e}")
+        finally:
+            session.close()
+
+    @staticmethod
+    def apply_deltas(dao: IFriendSuggestionDao, deltas: PairDeltas) -> None:
+        """把用户对的计数变化写入推荐行（读-改-写，行锁防止并发覆盖）
+
+        计数都归零的行被删除；不存在的行只在变化量为正时创建。
+        """
+        if not deltas:
+            return
+        now = datetime.utcnow()
+        existing = dao.get_many(deltas.keys(), for_update=True)
+        for (user_id, candidate_id), (mutual_delta, trips_delta) in deltas.items():
+            suggestion_po = existing.get((user_id, candidate_id))
+            if suggestion_po is None:
+                mutual, trips = max(mutual_delta, 0), max(trips_delta, 0)
+                if mutual == 0 and trips == 0:
+                    continue
+                dao.add(FriendSuggestionPO(
+                    user_id=user_id,
+                    candidate_id=candidate_id,
+                    mutual_friends=mutual,
+                    shared_trips=trips,
+                    score=FriendSuggestionService.score(mutual, trips),
+                    updated_at=now
+                ))
+                continue
+
+            mutual = max(suggestion_po.mutual_friends + mutual_delta, 0)
+            trips = max(suggestion_po.shared_trips + trips_delta, 0)
+            if mutual == 0 and trips == 0:
+                dao.delete(suggestion_po)
+                continue
+            suggestion_po.mutual_friends = mutual
+            suggestion_po.shared_trips = trips
+            suggestion_po.score = FriendSuggestionService.score(mutual, trips)
+            suggestion_po.updated_at = now
+        dao.flush()
+
+
+_friend_suggestion_handler: Optional[FriendSuggestionHandler] = None
+
+
+def register_friend_suggestion_handlers() -> None:
+    """订阅好友推荐相关的领域事件"""
+    global _friend_suggestion_handler
+    if _friend_suggestion_handler is None:
+        _friend_suggestion_handler = FriendSuggestionHandler(task_queue=get_background_task_queue())
+    _friend_suggestion_handler.subscribe(get_event_bus())
@@ -0,0 +1,149 @@
+"""
+好友关系图缓存
+
+好友判断（成员选择器、建群、拉人进群、旅行加成员）与好友列表都只需要
+“某用户的好友ID集合”，不需要加载 Friendship 聚合根。这里按用户缓存邻接集合：
+
+- 值为 frozenset（只读），容量受限，按 LRU 淘汰，另有 TTL 兜底
+- 未命中的用户通过 (requester_id, status) / (addressee_id, status) 覆盖索引批量加载
+- 订阅好友关系变更事件，使双方的集合失效
+
+事件只在本进程内失效缓存，多 worker 部署时其他进程的集合可能陈旧：
+- are_friends / filter_friends 的否定结果回库确认（只查询缓存中不是好友的
+  候选人），确认为好友时刷新该用户的集合，新好友不会被其他 worker 拒绝
+- 肯定结果与 friend_ids 列表最多陈旧一个 TTL（默认 60 秒）
+"""
+import os
+from typing import Callable, Dict, FrozenSet, Iterable, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from shared.database.core import SessionLocal
+from shared.event_bus import get_event_bus
+from shared.infrastructure.ttl_cache import TTLCache
+from app_social.infrastructure.database.dao_impl.sqlalchemy_friendship_dao import SqlAlchemyFriendshipDao
+
+
+DEFAULT_TTL_SECONDS = float(os.getenv("FRIEND_GRAPH_CACHE_TTL", "60"))
+DEFAULT_MAX_SIZE = int(os.getenv("FRIEND_GRAPH_CACHE_SIZE", "20000"))
+
+# 会改变好友集合的领域事件
+FRIENDSHIP_EVENT_TYPES = (
+    'FriendshipAcceptedEvent',
+    'FriendshipBlockedEvent',
+)
+
+
+class FriendGraphCache:
+    """用户好友邻接集合缓存"""
+
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_size: int = DEFAULT_MAX_SIZE,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
+        self._cache = TTLCache(ttl_seconds=ttl_seconds, max_size=max_size)
+        self._session_factory = session_factory
+
+    def friend_ids(self, user_id: str, session: Optional[Session] = None) -> FrozenSet[str]:
+        """获取用户的好友ID集合
+
+        Args:
+            user_id: 用户ID
+            session: 调用方已有的数据库会话（可选，未命中时复用）
+        """
+        if not user_id:
+            return frozenset()
+        return self.friend_ids_many([user_id], session=session)[user_id]
+
+    def friend_ids_many(self, user_ids: Iterable[str], session: Optional[Session] = None) -> Dict[str, FrozenSet[str]]:
+        """批量获取多个用户的好友ID集合（未命中的用户一次查询加载）"""
+        ids = {uid for uid in user_ids if uid}
+        if not ids:
+            return {}
+
+        result = self._cache.get_many(ids)
+        missing = [uid for uid in ids if uid not in result]
+        if missing:
+            loaded = self._load(missing, session)
+            for user_id in missing:
+                friends = frozenset(loaded.get(user_id, ()))
+                self._cache.set(user_id, friends)
+                result[user_id] = friends
+        return result
+
+    def are_friends(self, user_id_1: str, user_id_2: str, session: Optional[Session] = None) -> bool:
+        """两人是否为好友（缓存中不是好友时回库确认）"""
+        if not user_id_1 or not user_id_2 or user_id_1 == user_id_2:
+            return False
+        return user_id_2 in self.filter_friends(user_id_1, [user_id_2], session=session)
+
+    def filter_friends(self, user_id: str, candidate_ids: Iterable[str], session: Optional[Session] = None) -> Set[str]:
+        """批量判断：返回 candidate_ids 中是 user_id 好友的那些
+
+        缓存命中的直接返回；其余候选人回库确认，以免漏掉其他 worker 上新建立的好友关系。
+        """
+        if not user_id:
+            return set()
+        candidates = set(candidate_ids) - {user_id}
+        cached = self.friend_ids(user_id, session=session)
+        friends = cached & candidates
+        unconfirmed = candidates - cached
+        if unconfirmed:
+            confirmed = self._confirm(user_id, unconfirmed, session)
+            if confirmed:
+                self.invalidate(user_id)
+                friends |= confirmed
+        return friends
+
+    def invalidate(self, user_id: str) -> None:
+        """使某个用户的好友集合失效"""
+        self._cache.delete(user_id)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self._cache.clear()
+
+    def handle_friendship_changed(self, event) -> None:
+        """好友关系变更事件处理器：双方的集合都失效"""
+        self.invalidate(event.requester_id)
+        self.invalidate(event.addressee_id)
+
+    def _confirm(self, user_id: str, candidate_ids: Set[str], session: Optional[Session]) -> Set[str]:
+        owns_session = session is None
+        if owns_session:
+            session = self._session_factory()
+        try:
+            return SqlAlchemyFriendshipDao(session).find_friends_among(user_id, sorted(candidate_ids))
+        finally:
+            if owns_session:
+                session.close()
+
+    def _load(self, user_ids, session: Optional[Session]) -> Dict[str, Set[str]]:
+        owns_session = session is None
+        if owns_session:
+            session = self._session_factory()
+        try:
+            return SqlAlchemyFriendshipDao(session).find_friend_ids_many(list(user_ids))
+        finally:
+            if owns_session:
+                session.close()
+
+
+_friend_graph_cache: Optional[FriendGraphCache] = None
+
+
+def get_friend_graph_cache() -> FriendGraphCache:
+    """获取全局好友关系图缓存"""
+    global _friend_graph_cache
+    if _friend_graph_cache is None:
+        _friend_graph_cache = FriendGraphCache()
+    return _friend_graph_cache
+
+
+def register_friend_graph_cache_handlers() -> None:
+    """订阅好友关系变更事件，使缓存及时失效"""
+    event_bus = get_event_bus()
+    for event_type in FRIENDSHIP_EVENT_TYPES:
+        event_bus.subscribe(event_type, get_friend_graph_cache().handle_friendship_changed)
@@ -0,0 +1,88 @@
+"""
+好友推荐 DAO SQLAlchemy 实现
+"""
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import and_, delete, exists, func, or_, select, tuple_
+from sqlalchemy.orm import Session, aliased
+
+from app_social.infrastructure.database.dao_interface.i_friend_suggestion_dao import IFriendSuggestionDao
+from app_social.infrastructure.database.persistent_model.friend_suggestion_po import FriendSuggestionPO
+from app_social.infrastructure.database.po.friendship_po import FriendshipPO
+from app_travel.infrastructure.database.persistent_model.trip_po import TripMemberPO
+
+# 单条 IN 查询的用户对数量上限
+_PAIR_BATCH_SIZE = 500
+
+
+class SqlAlchemyFriendSuggestionDao(IFriendSuggestionDao):
+    """好友推荐 DAO SQLAlchemy 实现"""
+
+    def __init__(self, session: Session):
+        self._session = session
+
+    def get_many(
+        self,
+        pairs: Iterable[Tuple[str, str]],
+        for_update: bool = False
+    ) -> Dict[Tuple[str, str], FriendSuggestionPO]:
+        pairs = list(pairs)
+        result: Dict[Tuple[str, str], FriendSuggestionPO] = {}
+        for start in range(0, len(pairs), _PAIR_BATCH_SIZE):
+            stmt = select(FriendSuggestionPO).where(
+                tuple_(FriendSuggestionPO.user_id, FriendSuggestionPO.candidate_id).in_(
+                    pairs[start:start + _PAIR_BATCH_SIZE]
+                )
+            )
+            if for_update:
+                stmt = stmt.with_for_update()
+            for suggestion_po in self._session.execute(stmt).scalars():
+                result[(suggestion_po.user_id, suggestion_po.candidate_id)] = suggestion_po
+        return result
+
+    def add(self, suggestion_po: FriendSuggestionPO) -> None:
+        self._session.add(suggestion_po)
+
+    def delete(self, suggestion_po: FriendSuggestionPO) -> None:
+        self._session.delete(suggestion_po)
+
+    def replace_for_user(self, user_id: str, rows: List[FriendSuggestionPO]) -> None:
+        self._session.execute(delete(FriendSuggestionPO).where(FriendSuggestionPO.user_id == user_id))
+        self._session.add_all(rows)
+        self._session.flush()
+
+    def find_page(self, user_id: str, limit: int = 20, offset: int = 0) -> List[FriendSuggestionPO]:
+        # 两个方向各走一次唯一索引 (requester_id, addressee_id) 的点查
+        related = exists().where(or_(
+            and_(FriendshipPO.requester_id == user_id,
+                 FriendshipPO.addressee_id == FriendSuggestionPO.candidate_id),
+            and_(FriendshipPO.requester_id == FriendSuggestionPO.candidate_id,
+                 FriendshipPO.addressee_id == user_id),
+        ))
+        stmt = (
+            select(FriendSuggestionPO)
+            .where(FriendSuggestionPO.user_id == user_id, ~related)
+            .order_by(FriendSuggestionPO.score.desc(), FriendSuggestionPO.candidate_id)
+            .limit(limit)
+            .offset(offset)
+        )
+        return list(self._session.execute(stmt).scalars().all())
+
+    def find_trip_member_ids(self, trip_id: str) -> List[str]:
+        return list(self._session.execute(
+            select(TripMemberPO.user_id).where(TripMemberPO.trip_id == trip_id).distinct()
+        ).scalars().all())
+
+    def count_co_members(self, user_id: str) -> Dict[str, int]:
+        mine = aliased(TripMemberPO)
+        other = aliased(TripMemberPO)
+        rows = self._session.execute(
+            select(other.user_id, func.count(func.distinct(other.trip_id)))
+            .join(mine, mine.trip_id == other.trip_id)
+            .where(mine.user_id == user_id, other.user_id != user_id)
+            .group_by(other.user_id)
+        ).all()
+        return {member_id: count for member_id, count in rows}
+
+    def flush(self) -> None:
+        self._session.flush()
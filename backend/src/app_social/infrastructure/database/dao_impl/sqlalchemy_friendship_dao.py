@@ -1,6 +1,7 @@
-from typing import List, Optional
+from collections import defaultdict
+from typing import Dict, List, Optional, Set
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
+from sqlalchemy import or_, and_, select
 from app_social.infrastructure.database.po.friendship_po import FriendshipPO
 from app_social.domain.value_objects.friendship_value_objects import FriendshipStatus
 
@@ -48,3 +49,50 @@ class SqlAlchemyFriendshipDao:
             ),
             FriendshipPO.status == FriendshipStatus.ACCEPTED
         ).all()
+
+    def find_friend_ids(self, user_id: str) -> List[str]:
+        """
+        IDs of accepted friends, read from the two covering indexes only.
+        """
+        return sorted(self.find_friend_ids_many([user_id]).get(user_id, set()))
+
+    def find_friends_among(self, user_id: str, candidate_ids: List[str]) -> Set[str]:
+        """
+        The subset of candidate_ids that are accepted friends of user_id.
+        Both directions are point lookups on the covering indexes.
+        """
+        if not candidate_ids:
+            return set()
+        as_requester = select(FriendshipPO.addressee_id).where(
+            FriendshipPO.requester_id == user_id,
+            FriendshipPO.addressee_id.in_(candidate_ids),
+            FriendshipPO.status == FriendshipStatus.ACCEPTED
+        )
+        as_addressee = select(FriendshipPO.requester_id).where(
+            FriendshipPO.addressee_id == user_id,
+            FriendshipPO.requester_id.in_(candidate_ids),
+            FriendshipPO.status == FriendshipStatus.ACCEPTED
+        )
+        return set(self._session.execute(as_requester).scalars()) | set(self._session.execute(as_addressee).scalars())
+
+    def find_friend_ids_many(self, user_ids: List[str]) -> Dict[str, Set[str]]:
+        """
+        Adjacency sets for several users in two index range scans.
+        Users without friends are absent from the result.
+        """
+        if not user_ids:
+            return {}
+        adjacency: Dict[str, Set[str]] = defaultdict(set)
+        by_requester = select(FriendshipPO.requester_id, FriendshipPO.addressee_id).where(
+            FriendshipPO.requester_id.in_(user_ids),
+            FriendshipPO.status == FriendshipStatus.ACCEPTED
+        )
+        for user_id, friend_id in self._session.execute(by_requester):
+            adjacency[user_id].add(friend_id)
+        by_addressee = select(FriendshipPO.addressee_id, FriendshipPO.requester_id).where(
+            FriendshipPO.addressee_id.in_(user_ids),
+            FriendshipPO.status == FriendshipStatus.ACCEPTED
+        )
+        for user_id, friend_id in self._session.execute(by_addressee):
+            adjacency[user_id].add(friend_id)
+        return dict(adjacency)
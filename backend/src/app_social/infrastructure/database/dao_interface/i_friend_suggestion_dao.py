@@ -0,0 +1,76 @@
+"""
+好友推荐 DAO 接口
+
+定义好友推荐持久化对象的数据访问操作。
+"""
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Tuple
+
+from app_social.infrastructure.database.persistent_model.friend_suggestion_po import FriendSuggestionPO
+
+
+class IFriendSuggestionDao(ABC):
+    """好友推荐数据访问对象接口"""
+
+    @abstractmethod
+    def get_many(
+        self,
+        pairs: Iterable[Tuple[str, str]],
+        for_update: bool = False
+    ) -> Dict[Tuple[str, str], FriendSuggestionPO]:
+        """批量获取推荐行
+
+        Args:
+            pairs: (user_id, candidate_id) 列表
+            for_update: 是否加行锁（读-改-写时使用）
+
+        Returns:
+            (user_id, candidate_id) -> 推荐行，不存在的用户对不在结果中
+        """
+        pass
+
+    @abstractmethod
+    def add(self, suggestion_po: FriendSuggestionPO) -> None:
+        """新增推荐行"""
+        pass
+
+    @abstractmethod
+    def delete(self, suggestion_po: FriendSuggestionPO) -> None:
+        """删除推荐行"""
+        pass
+
+    @abstractmethod
+    def replace_for_user(self, user_id: str, rows: List[FriendSuggestionPO]) -> None:
+        """以全量计算结果替换某个用户的全部推荐行（重建用）"""
+        pass
+
+    @abstractmethod
+    def find_page(self, user_id: str, limit: int = 20, offset: int = 0) -> List[FriendSuggestionPO]:
+        """按分值分页获取推荐
+
+        已与该用户存在任何好友关系记录（已是好友、待处理、已拒绝、已拉黑）的候选人不返回。
+
+        Args:
+            user_id: 用户ID
+            limit: 每页数量
+            offset: 偏移量
+
+        Returns:
+            推荐行列表，按分值降序
+        """
+        pass
+
+    @abstractmethod
+    def find_trip_member_ids(self, trip_id: str) -> List[str]:
+        """获取旅行的成员ID列表"""
+        pass
+
+    @abstractmethod
+    def count_co_members(self, user_id: str) -> Dict[str, int]:
+        """统计与用户同为成员的其他用户及共同旅行数（重建用）"""
+        pass
+
+    @abstractmethod
+    def flush(self) -> None:
+        """刷新会话"""
+        pass
@@ -0,0 +1,37 @@
+"""
+好友推荐持久化对象 (PO - Persistent Object)
+
+按用户物化的“可能认识的人”：每个 (user_id, candidate_id) 一行，
+记录共同好友数与同行次数，由好友关系 / 旅行成员事件增量维护
+（见 FriendSuggestionHandler）。两个计数都归零时删除该行。
+
+(user_id, score, candidate_id) 索引即为每个用户预排序的推荐列表，
+分页只需沿索引读取一页，不需要在请求时遍历好友关系图。
+"""
+from datetime import datetime
+
+from sqlalchemy import Column, String, DateTime, Float, Integer, Index
+from shared.database.core import Base
+
+
+class FriendSuggestionPO(Base):
+    """好友推荐持久化对象"""
+
+    __tablename__ = 'friend_suggestions'
+
+    user_id = Column(String(36), primary_key=True)
+    candidate_id = Column(String(36), primary_key=True)
+
+    mutual_friends = Column(Integer, nullable=False, default=0)
+    shared_trips = Column(Integer, nullable=False, default=0)
+    score = Column(Float, nullable=False, default=0.0)
+
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_friend_suggestions_rank', 'user_id', 'score', 'candidate_id'),
+    )
+
+    def __repr__(self):
+        return (f"<FriendSuggestionPO {self.user_id}->{self.candidate_id} "
+                f"mutual={self.mutual_friends} trips={self.shared_trips}>")
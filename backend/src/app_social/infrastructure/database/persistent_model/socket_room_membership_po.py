@@ -0,0 +1,27 @@
+"""
+Socket 房间成员持久化对象 (PO - Persistent Object)
+
+多 worker 部署时的房间成员登记（见 DatabaseRoomMembershipRegistry）：
+每个 (客户端会话, 房间) 一行，客户端重连到任一 worker 时按客户端会话恢复房间。
+过期时间之后未续期的行视为已失效，由登记表顺带清理。
+"""
+from sqlalchemy import Column, String, DateTime, Index
+from shared.database.core import Base
+
+
+class SocketRoomMembershipPO(Base):
+    """Socket 房间成员持久化对象"""
+
+    __tablename__ = 'socket_room_memberships'
+
+    client_key = Column(String(128), primary_key=True)
+    room = Column(String(128), primary_key=True)
+
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index('ix_socket_room_memberships_expires_at', 'expires_at'),
+    )
+
+    def __repr__(self):
+        return f"<SocketRoomMembershipPO {self.client_key} room={self.room}>"
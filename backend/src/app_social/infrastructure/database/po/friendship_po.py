@@ -15,7 +15,7 @@ class FriendshipPO(Base):
 
     __table_args__ = (
         UniqueConstraint('requester_id', 'addressee_id', name='uq_friendship_requester_addressee'),
-        Index('idx_friendship_requester', 'requester_id'),
-        Index('idx_friendship_addressee', 'addressee_id'),
-        Index('idx_friendship_status', 'status'),
+        # Covering indexes for "friends of X" in either direction (status filter + other side)
+        Index('idx_friendship_requester_status', 'requester_id', 'status', 'addressee_id'),
+        Index('idx_friendship_addressee_status', 'addressee_id', 'status', 'requester_id'),
     )
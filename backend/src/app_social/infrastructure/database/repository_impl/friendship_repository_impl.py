@@ -58,14 +58,7 @@ class FriendshipRepositoryImpl(IFriendshipRepository):
         return [self._to_domain(po) for po in pos]
 
     def find_friends(self, user_id: str) -> List[str]:
-        pos = self._dao.find_friends(user_id)
-        friend_ids = []
-        for po in pos:
-            if po.requester_id == user_id:
-                friend_ids.append(po.addressee_id)
-            else:
-                friend_ids.append(po.requester_id)
-        return friend_ids
+        return self._dao.find_friend_ids(user_id)
 
     def _to_po(self, friendship: Friendship) -> FriendshipPO:
         return FriendshipPO(
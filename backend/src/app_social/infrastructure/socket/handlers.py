@@ -1,34 +1,60 @@
-from flask import session
+from flask import request, session
 from flask_socketio import join_room, leave_room, emit
 from shared.infrastructure.socket import socketio
-from app_social.domain.domain_event.social_events import MessageSentEvent
+from app_social.infrastructure.socket.room_registry import get_room_registry, room_client_key
+from app_social.infrastructure.socket.presence_registry import get_presence_registry
+from app_social.infrastructure.socket.room_batcher import (
+    ROOM_BATCH_EVENT,
+    RoomEventBatcher,
+    get_batching_options,
+)
+from app_social.domain.domain_event.social_events import MessageSentEvent, MessagesReadEvent
 from shared.event_bus import get_event_bus
 from datetime import datetime
 import logging
-from shared.database.core import SessionLocal
-from app_auth.infrastructure.database.dao_impl.sqlalchemy_user_dao import SqlAlchemyUserDao
-from app_auth.infrastructure.database.repository_impl.user_repository_impl import UserRepositoryImpl
-from app_auth.domain.value_objects.user_value_objects import UserId
+from app_auth.infrastructure.cache.user_profile_cache import (
+    get_user_profile_cache,
+    register_user_profile_cache_handlers,
+)
 
 logger = logging.getLogger(__name__)
 
+# Optional per-room batching layer, configured in register_social_socket_handlers
+_room_batcher = None
+
 # ==================== Socket Events ====================
 
 @socketio.on('connect')
-def handle_connect():
+def handle_connect(auth=None):
     """Handle client connection"""
     user_id = session.get('user_id')
     if user_id:
         logger.info(f"User {user_id} connected to socket")
+        get_presence_registry().connect(user_id, request.sid)
         join_room(f"user_{user_id}")
+        # Rooms are remembered per client session (one per browser tab), sent in the
+        # connect auth payload; the socket session is private to this connection
+        client_session = auth.get('client_session') if isinstance(auth, dict) else None
+        client_key = room_client_key(user_id, client_session)
+        session['room_client_key'] = client_key
+        # Restore conversation rooms this tab joined before a reconnect
+        if client_key:
+            for room in get_room_registry().rooms_for(client_key):
+                join_room(room)
     else:
         logger.info("Anonymous user connected")
 
 @socketio.on('disconnect')
 def handle_disconnect():
     """Handle client disconnection"""
+    get_presence_registry().disconnect(request.sid)
     logger.info("Client disconnected")
 
+@socketio.on('heartbeat')
+def on_heartbeat(data=None):
+    """Refresh presence of the current connection"""
+    get_presence_registry().heartbeat(request.sid)
+
 @socketio.on('join')
 def on_join(data):
     """Join a conversation room"""
@@ -38,6 +64,12 @@ def on_join(data):
     
     # TODO: Check permission if user is allowed to join this conversation
     join_room(room)
+    user_id = session.get('user_id')
+    if user_id:
+        client_key = session.get('room_client_key')
+        if client_key:
+            get_room_registry().remember(client_key, room)
+        get_presence_registry().set_viewing(request.sid, room)
     logger.info(f"Socket: Joined room {room}")
 
 @socketio.on('leave')
@@ -48,8 +80,29 @@ def on_leave(data):
         return
     
     leave_room(room)
+    user_id = session.get('user_id')
+    if user_id:
+        client_key = session.get('room_client_key')
+        if client_key:
+            get_room_registry().forget(client_key, room)
+        get_presence_registry().stop_viewing(request.sid, room)
     logger.info(f"Socket: Left room {room}")
 
+@socketio.on('typing')
+def on_typing(data):
+    """Broadcast typing indicator to a conversation room"""
+    room = data.get('room')
+    user_id = session.get('user_id')
+    if not room or not user_id:
+        return
+    
+    is_typing = bool(data.get('is_typing', True))
+    if _room_batcher:
+        _room_batcher.set_typing(room, user_id, is_typing)
+    else:
+        emit('typing', {"conversation_id": room, "user_id": user_id, "is_typing": is_typing},
+             room=room, include_self=False)
+
 # ==================== Domain Event Handlers ====================
 
 def handle_message_sent(event: MessageSentEvent):
@@ -58,22 +111,17 @@ def handle_message_sent(event: MessageSentEvent):
     """
     logger.info(f"Pushing message {event.message_id} to room {event.conversation_id}")
     
-    # Fetch sender info
+    # Fetch sender info (served from the shared profile cache)
     sender_name = None
     sender_avatar = None
     
-    session_db = SessionLocal()
     try:
-        user_dao = SqlAlchemyUserDao(session_db)
-        user_repo = UserRepositoryImpl(user_dao)
-        user = user_repo.find_by_id(UserId(event.sender_id))
-        if user:
-            sender_name = user.username.value
-            sender_avatar = user.profile.avatar_url
+        sender_info = get_user_profile_cache().get(event.sender_id)
+        if sender_info:
+            sender_name = sender_info["name"]
+            sender_avatar = sender_info["avatar"]
     except Exception as e:
         logger.error(f"Error fetching sender info for socket push: {e}")
-    finally:
-        session_db.close()
 
     payload = {
         "id": event.message_id,
@@ -88,11 +136,47 @@ def handle_message_sent(event: MessageSentEvent):
         "created_at": datetime.utcnow().isoformat()
     }
     
-    socketio.emit('new_message', payload, room=event.conversation_id)
+    if _room_batcher:
+        _room_batcher.add_message(event.conversation_id, payload)
+    else:
+        socketio.emit('new_message', payload, room=event.conversation_id)
+
+def handle_messages_read(event: MessagesReadEvent):
+    """
+    Push read receipt to conversation room participants
+    """
+    if _room_batcher:
+        _room_batcher.add_read_receipt(event.conversation_id, event.user_id, event.up_to_message_id)
+    else:
+        socketio.emit('messages_read', {
+            "conversation_id": event.conversation_id,
+            "user_id": event.user_id,
+            "up_to_message_id": event.up_to_message_id
+        }, room=event.conversation_id)
+
+def _emit_room_batch(room, frame):
+    socketio.emit(ROOM_BATCH_EVENT, frame, room=room)
+
+def configure_room_batching(config=None):
+    """Enable or disable per-room batching according to app config"""
+    global _room_batcher
+    options = get_batching_options(config)
+    if _room_batcher:
+        _room_batcher.flush_all()
+    _room_batcher = RoomEventBatcher(
+        _emit_room_batch,
+        start_task=socketio.start_background_task,
+        sleep=socketio.sleep,
+        **options
+    ) if options else None
 
-def register_social_socket_handlers():
+def register_social_socket_handlers(config=None):
     """Register domain event listeners and ensure socket events are loaded"""
+    configure_room_batching(config)
     event_bus = get_event_bus()
     # Subscribe using the class name string, which is what event.event_type returns
     event_bus.subscribe(MessageSentEvent.__name__, handle_message_sent)
+    event_bus.subscribe(MessagesReadEvent.__name__, handle_messages_read)
+    # Keep cached sender names/avatars fresh when profiles change
+    register_user_profile_cache_handlers()
     logger.info("Social socket handlers registered")
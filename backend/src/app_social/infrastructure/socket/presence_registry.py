@@ -0,0 +1,169 @@
+"""
+在线状态登记
+
+记录用户的 Socket 连接集合、最近心跳时间以及当前正在查看的会话。
+
+- 连接在 expiry_seconds 内无心跳视为失效（惰性清理）
+- 单用户在线/查看判断为 O(1)，批量查询为 O(n)
+- 实现 IConversationPresence，供通知处理器跳过正在查看会话的用户
+"""
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Optional, Set
+
+from app_notification.domain.demand_interface.i_conversation_presence import IConversationPresence
+
+
+@dataclass
+class _Connection:
+    user_id: str
+    last_seen: float
+    viewing: Optional[str] = None
+
+
+class PresenceRegistry(IConversationPresence):
+    """用户在线状态登记表"""
+
+    def __init__(self, expiry_seconds: float = 90.0, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            expiry_seconds: 心跳超时时间（秒）
+            clock: 时间源
+        """
+        self._expiry = expiry_seconds
+        self._clock = clock
+        self._connections: Dict[str, _Connection] = {}
+        self._user_sids: Dict[str, Set[str]] = {}
+        self._viewers: Dict[str, Dict[str, int]] = {}  # conversation_id -> user_id -> 连接数
+        self._lock = threading.Lock()
+
+    # ==================== 连接生命周期 ====================
+
+    def connect(self, user_id: str, sid: str) -> None:
+        with self._lock:
+            self._drop(sid)
+            self._connections[sid] = _Connection(user_id=user_id, last_seen=self._clock())
+            self._user_sids.setdefault(user_id, set()).add(sid)
+
+    def disconnect(self, sid: str) -> None:
+        with self._lock:
+            self._drop(sid)
+
+    def heartbeat(self, sid: str) -> bool:
+        """刷新连接心跳，连接未登记时返回 False"""
+        with self._lock:
+            conn = self._connections.get(sid)
+            if conn is None:
+                return False
+            conn.last_seen = self._clock()
+            return True
+
+    def set_viewing(self, sid: str, conversation_id: Optional[str]) -> None:
+        """设置连接当前正在查看的会话（None 表示未查看任何会话）"""
+        with self._lock:
+            conn = self._connections.get(sid)
+            if conn is None:
+                return
+            conn.last_seen = self._clock()
+            if conn.viewing == conversation_id:
+                return
+            self._unview(conn)
+            conn.viewing = conversation_id
+            if conversation_id:
+                viewers = self._viewers.setdefault(conversation_id, {})
+                viewers[conn.user_id] = viewers.get(conn.user_id, 0) + 1
+
+    def stop_viewing(self, sid: str, conversation_id: str) -> None:
+        """连接离开会话（仅当其正在查看该会话时生效）"""
+        with self._lock:
+            conn = self._connections.get(sid)
+            if conn is not None and conn.viewing == conversation_id:
+                self._unview(conn)
+
+    # ==================== 查询 ====================
+
+    def is_online(self, user_id: str) -> bool:
+        with self._lock:
+            return self._has_live_connection(user_id)
+
+    def get_online_users(self, user_ids: Iterable[str]) -> Set[str]:
+        """批量查询在线用户（用于会话成员列表）"""
+        with self._lock:
+            return {uid for uid in set(user_ids) if self._has_live_connection(uid)}
+
+    def is_viewing(self, user_id: str, conversation_id: str) -> bool:
+        with self._lock:
+            return self._is_viewing(user_id, conversation_id)
+
+    def get_viewing_users(self, conversation_id: str, user_ids: Iterable[str]) -> Set[str]:
+        with self._lock:
+            viewers = self._viewers.get(conversation_id)
+            if not viewers:
+                return set()
+            return {uid for uid in set(user_ids) if uid in viewers and self._is_viewing(uid, conversation_id)}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connections.clear()
+            self._user_sids.clear()
+            self._viewers.clear()
+
+    # ==================== 内部实现（调用方持有锁） ====================
+
+    def _is_live(self, sid: str) -> bool:
+        conn = self._connections.get(sid)
+        if conn is None:
+            return False
+        if conn.last_seen + self._expiry <= self._clock():
+            self._drop(sid)
+            return False
+        return True
+
+    def _has_live_connection(self, user_id: str) -> bool:
+        sids = self._user_sids.get(user_id)
+        if not sids:
+            return False
+        return any([self._is_live(sid) for sid in list(sids)])
+
+    def _is_viewing(self, user_id: str, conversation_id: str) -> bool:
+        if user_id not in self._viewers.get(conversation_id, {}):
+            return False
+        sids = list(self._user_sids.get(user_id, ()))
+        return any([
+            self._is_live(sid) and self._connections[sid].viewing == conversation_id
+            for sid in sids
+        ])
+
+    def _unview(self, conn: _Connection) -> None:
+        if not conn.viewing:
+            return
+        viewers = self._viewers.get(conn.viewing)
+        if viewers is not None:
+            remaining = viewers.get(conn.user_id, 0) - 1
+            if remaining > 0:
+                viewers[conn.user_id] = remaining
+            else:
+                viewers.pop(conn.user_id, None)
+            if not viewers:
+                del self._viewers[conn.viewing]
+        conn.viewing = None
+
+    def _drop(self, sid: str) -> None:
+        conn = self._connections.pop(sid, None)
+        if conn is None:
+            return
+        self._unview(conn)
+        sids = self._user_sids.get(conn.user_id)
+        if sids is not None:
+            sids.discard(sid)
+            if not sids:
+                del self._user_sids[conn.user_id]
+
+
+_presence_registry = PresenceRegistry()
+
+
+def get_presence_registry() -> PresenceRegistry:
+    """获取在线状态登记表"""
+    return _presence_registry
@@ -0,0 +1,182 @@
+"""
+房间级实时事件合批
+
+高频群聊中，同一房间在几毫秒内产生的新消息、输入状态、已读回执合并为
+一个 'room_batch' 帧发送，减少帧数量与消息队列发布次数。
+
+- window_ms: 房间静默多久后发送（每次新事件会顺延）
+- max_latency_ms: 首个事件进入缓冲后的最长等待时间，保证延迟上界
+- max_batch_size: 单个缓冲的消息条数上限，达到即立即发送
+
+输入状态按用户合并（只保留最新状态），已读回执按用户合并（只保留最新位置）。
+缓冲以目标房间为单位，个人房间 user_<id> 即对应单个客户端的发送缓冲。
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+
+ROOM_BATCH_EVENT = 'room_batch'
+
+
+@dataclass
+class _RoomBuffer:
+    first_at: float
+    last_at: float
+    messages: List[Dict[str, Any]] = field(default_factory=list)
+    typing: Dict[str, bool] = field(default_factory=dict)
+    reads: Dict[str, str] = field(default_factory=dict)
+
+    def to_frame(self, room: str) -> Dict[str, Any]:
+        return {
+            "room": room,
+            "messages": self.messages,
+            "typing": [
+                {"user_id": user_id, "is_typing": is_typing}
+                for user_id, is_typing in self.typing.items()
+            ],
+            "reads": [
+                {"user_id": user_id, "up_to_message_id": message_id}
+                for user_id, message_id in self.reads.items()
+            ],
+        }
+
+
+class RoomEventBatcher:
+    """按房间合并实时事件"""
+
+    def __init__(
+        self,
+        emit: Callable[[str, Dict[str, Any]], None],
+        window_ms: float = 5.0,
+        max_latency_ms: float = 50.0,
+        max_batch_size: int = 100,
+        start_task: Optional[Callable[..., Any]] = None,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            emit: 发送函数 emit(room, frame)
+            window_ms: 合批窗口（毫秒）
+            max_latency_ms: 最大等待时间（毫秒）
+            max_batch_size: 单帧最大消息数
+            start_task: 启动后台任务的函数，默认使用线程
+            sleep: 休眠函数（需与 start_task 的并发模型一致）
+            clock: 时间源
+        """
+        self._emit = emit
+        self._window = window_ms / 1000.0
+        self._max_latency = max(max_latency_ms, window_ms) / 1000.0
+        self._max_batch_size = max_batch_size
+        self._start_task = start_task or _start_thread
+        self._sleep = sleep
+        self._clock = clock
+        self._buffers: Dict[str, _RoomBuffer] = {}
+        self._lock = threading.Lock()
+
+    # ==================== 入队 ====================
+
+    def add_message(self, room: str, payload: Dict[str, Any]) -> None:
+        """新消息（全部保留，按顺序发送）"""
+        self._enqueue(room, lambda buf: buf.messages.append(payload))
+
+    def set_typing(self, room: str, user_id: str, is_typing: bool) -> None:
+        """输入状态（同一用户只保留最新状态）"""
+        self._enqueue(room, lambda buf: buf.typing.__setitem__(user_id, is_typing))
+
+    def add_read_receipt(self, room: str, user_id: str, up_to_message_id: str) -> None:
+        """已读回执（同一用户只保留最新位置）"""
+        self._enqueue(room, lambda buf: buf.reads.__setitem__(user_id, up_to_message_id))
+
+    # ==================== 发送 ====================
+
+    def flush(self, room: str) -> bool:
+        """立即发送某房间的缓冲，返回是否有数据发送"""
+        with self._lock:
+            buffer = self._buffers.pop(room, None)
+        if buffer is None:
+            return False
+        self._emit(room, buffer.to_frame(room))
+        return True
+
+    def flush_all(self) -> int:
+        """发送所有缓冲，返回发送的帧数"""
+        with self._lock:
+            rooms = list(self._buffers.keys())
+        return sum(1 for room in rooms if self.flush(room))
+
+    def pending_rooms(self) -> List[str]:
+        with self._lock:
+            return list(self._buffers.keys())
+
+    # ==================== 内部实现 ====================
+
+    def _enqueue(self, room: str, apply: Callable[[_RoomBuffer], None]) -> None:
+        now = self._clock()
+        with self._lock:
+            buffer = self._buffers.get(room)
+            is_new = buffer is None
+            if is_new:
+                buffer = _RoomBuffer(first_at=now, last_at=now)
+                self._buffers[room] = buffer
+            apply(buffer)
+            buffer.last_at = now
+            is_full = len(buffer.messages) >= self._max_batch_size
+
+        if is_full:
+            self.flush(room)
+        elif is_new:
+            self._start_task(self._flush_when_due, room, buffer)
+
+    def _flush_when_due(self, room: str, buffer: _RoomBuffer) -> None:
+        while True:
+            with self._lock:
+                if self._buffers.get(room) is not buffer:
+                    return  # 已被其他路径发送
+                due_at = min(buffer.last_at + self._window, buffer.first_at + self._max_latency)
+            remaining = due_at - self._clock()
+            if remaining <= 0:
+                with self._lock:
+                    if self._buffers.get(room) is not buffer:
+                        return
+                    del self._buffers[room]
+                self._emit(room, buffer.to_frame(room))
+                return
+            self._sleep(remaining)
+
+
+def _start_thread(target, *args):
+    thread = threading.Thread(target=target, args=args, daemon=True)
+    thread.start()
+    return thread
+
+
+def get_batching_options(config: Optional[Mapping[str, Any]] = None) -> Optional[Dict[str, float]]:
+    """读取合批配置（app.config 优先，其次环境变量）
+
+    SOCKETIO_BATCH_WINDOW_MS: 合批窗口，未配置或为 0 时关闭合批
+    SOCKETIO_BATCH_MAX_LATENCY_MS: 最大等待时间，默认 50
+    SOCKETIO_BATCH_MAX_SIZE: 单帧最大消息数，默认 100
+
+    Returns:
+        RoomEventBatcher 参数，关闭时返回 None
+    """
+    config = config or {}
+
+    def read(key, default):
+        value = config.get(key)
+        if value is None:
+            value = os.getenv(key, default)
+        return float(value)
+
+    window_ms = read('SOCKETIO_BATCH_WINDOW_MS', 0)
+    if window_ms <= 0:
+        return None
+    return {
+        'window_ms': window_ms,
+        'max_latency_ms': read('SOCKETIO_BATCH_MAX_LATENCY_MS', 50),
+        'max_batch_size': int(read('SOCKETIO_BATCH_MAX_SIZE', 100)),
+    }
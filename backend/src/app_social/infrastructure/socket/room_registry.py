@@ -0,0 +1,196 @@
+"""
+Socket 房间成员登记
+
+记录每个客户端会话通过 'join' 加入的会话房间，在客户端断线重连（可能连到另一个
+worker）时自动重新加入，避免重连后收不到实时消息。
+
+登记按客户端会话（用户ID + 客户端在连接时携带的会话标识，每个浏览器标签页一个）
+区分，而不是按用户：同一用户新开的标签页不会自动加入其他标签页打开过的房间。
+未携带会话标识的连接不登记、也不恢复。
+
+- RoomMembershipRegistry：进程内存储（单进程部署）
+- DatabaseRoomMembershipRegistry：数据库共享存储，多 worker 部署时由
+  create_app 通过 set_room_registry 接入，重连到任一 worker 都能恢复
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Set, Tuple, Union
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from shared.database.core import SessionLocal
+from app_social.infrastructure.database.persistent_model.socket_room_membership_po import SocketRoomMembershipPO
+
+# 客户端会话标识的最大长度（超出视为无效）
+MAX_CLIENT_SESSION_LENGTH = 64
+
+
+def room_client_key(user_id: Optional[str], client_session: Optional[str]) -> Optional[str]:
+    """登记用的客户端键；未登录或未携带有效会话标识时返回 None
+
+    键中包含用户ID，其他用户即使拿到会话标识也恢复不了这些房间。
+    """
+    if not user_id or not isinstance(client_session, str):
+        return None
+    if not client_session or len(client_session) > MAX_CLIENT_SESSION_LENGTH:
+        return None
+    return f"{user_id}:{client_session}"
+
+
+class RoomMembershipRegistry:
+    """客户端会话 -> 已加入房间集合
+
+    断线后成员关系保留 retention_seconds，超时未重连则丢弃。
+    """
+
+    def __init__(self, retention_seconds: float = 600.0, clock: Callable[[], float] = time.monotonic):
+        self._retention = retention_seconds
+        self._clock = clock
+        self._rooms: Dict[str, Tuple[Set[str], float]] = {}
+        self._lock = threading.Lock()
+
+    def remember(self, client_key: str, room: str) -> None:
+        """记录客户端会话加入房间"""
+        with self._lock:
+            rooms, _ = self._rooms.get(client_key, (set(), 0.0))
+            rooms.add(room)
+            self._rooms[client_key] = (rooms, self._clock() + self._retention)
+
+    def forget(self, client_key: str, room: str) -> None:
+        """记录客户端会话离开房间"""
+        with self._lock:
+            entry = self._rooms.get(client_key)
+            if entry:
+                entry[0].discard(room)
+                if not entry[0]:
+                    del self._rooms[client_key]
+
+    def rooms_for(self, client_key: str) -> Set[str]:
+        """获取客户端会话应在的房间（同时续期）"""
+        with self._lock:
+            entry = self._rooms.get(client_key)
+            if entry is None:
+                return set()
+            rooms, expires_at = entry
+            now = self._clock()
+            if expires_at <= now:
+                del self._rooms[client_key]
+                return set()
+            self._rooms[client_key] = (rooms, now + self._retention)
+            return set(rooms)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._rooms.clear()
+
+
+class DatabaseRoomMembershipRegistry:
+    """房间成员登记的数据库实现（所有 worker 共享）
+
+    接口与 RoomMembershipRegistry 相同。每次操作使用独立的短会话；
+    过期时间用 UTC 墙钟（多进程之间需要一致）。登记失败只记录不抛出，
+    不影响连接本身（最坏情况是重连后需要客户端重新 join）。
+    """
+
+    def __init__(
+        self,
+        retention_seconds: float = 600.0,
+        session_factory: Callable[[], Session] = SessionLocal,
+        clock: Callable[[], datetime] = datetime.utcnow
+    ):
+        self._retention = timedelta(seconds=retention_seconds)
+        self._session_factory = session_factory
+        self._clock = clock
+
+    def remember(self, client_key: str, room: str) -> None:
+        """记录客户端会话加入房间（同时续期该会话的其他房间）"""
+        # 并发首次登记同一房间时插入冲突，重试一次即走更新分支
+        for attempt in range(2):
+            session = self._session_factory()
+            try:
+                expires_at = self._clock() + self._retention
+                self._renew(session, client_key, expires_at)
+                if session.get(SocketRoomMembershipPO, (client_key, room)) is None:
+                    session.add(SocketRoomMembershipPO(client_key=client_key, room=room, expires_at=expires_at))
+                session.commit()
+                return
+            except IntegrityError:
+                session.rollback()
+                if attempt:
+                    print(f"Error remembering socket room {room}: duplicate membership")
+            except Exception as e:
+                session.rollback()
+                print(f"Error remembering socket room {room}: {e}")
+                return
+            finally:
+                session.close()
+
+    def forget(self, client_key: str, room: str) -> None:
+        """记录客户端会话离开房间"""
+        session = self._session_factory()
+        try:
+            session.execute(delete(SocketRoomMembershipPO).where(
+                SocketRoomMembershipPO.client_key == client_key,
+                SocketRoomMembershipPO.room == room
+            ))
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            print(f"Error forgetting socket room {room}: {e}")
+        finally:
+            session.close()
+
+    def rooms_for(self, client_key: str) -> Set[str]:
+        """获取客户端会话应在的房间（同时续期，并清理所有已过期的登记）"""
+        session = self._session_factory()
+        try:
+            now = self._clock()
+            session.execute(delete(SocketRoomMembershipPO).where(SocketRoomMembershipPO.expires_at <= now))
+            rooms = set(session.execute(
+                select(SocketRoomMembershipPO.room).where(SocketRoomMembershipPO.client_key == client_key)
+            ).scalars())
+            if rooms:
+                self._renew(session, client_key, now + self._retention)
+            session.commit()
+            return rooms
+        except Exception as e:
+            session.rollback()
+            print(f"Error loading socket rooms: {e}")
+            return set()
+        finally:
+            session.close()
+
+    def clear(self) -> None:
+        session = self._session_factory()
+        try:
+            session.execute(delete(SocketRoomMembershipPO))
+            session.commit()
+        finally:
+            session.close()
+
+    @staticmethod
+    def _renew(session: Session, client_key: str, expires_at: datetime) -> None:
+        session.execute(
+            update(SocketRoomMembershipPO)
+            .where(SocketRoomMembershipPO.client_key == client_key)
+            .values(expires_at=expires_at)
+        )
+
+
+RoomRegistry = Union[RoomMembershipRegistry, DatabaseRoomMembershipRegistry]
+
+_room_registry: RoomRegistry = RoomMembershipRegistry()
+
+
+def get_room_registry() -> RoomRegistry:
+    """获取房间成员登记表"""
+    return _room_registry
+
+
+def set_room_registry(registry: RoomRegistry) -> None:
+    """替换房间成员登记表（多 worker 部署时接入共享存储）"""
+    global _room_registry
+    _room_registry = registry
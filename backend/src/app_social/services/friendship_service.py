@@ -1,12 +1,17 @@
 from typing import List, Dict, Any, Optional
 from shared.database.core import SessionLocal
 from shared.event_bus import get_event_bus
+from app_auth.infrastructure.cache.user_profile_cache import get_user_profile_cache
+from app_social.infrastructure.cache.friend_graph_cache import get_friend_graph_cache
+from app_social.infrastructure.database.dao_impl.sqlalchemy_friend_suggestion_dao import SqlAlchemyFriendSuggestionDao
 from app_social.infrastructure.database.dao_impl.sqlalchemy_friendship_dao import SqlAlchemyFriendshipDao
 from app_social.infrastructure.database.repository_impl.friendship_repository_impl import FriendshipRepositoryImpl
 from app_social.domain.aggregate.friendship_aggregate import Friendship
 from app_social.domain.value_objects.friendship_value_objects import FriendshipId, FriendshipStatus
 
 class FriendshipService:
+    MAX_SUGGESTION_PAGE_SIZE = 50
+
     def __init__(self):
         self._event_bus = get_event_bus()
 
@@ -120,8 +125,9 @@ class FriendshipService:
             friendship.accept(operator_id)
             
             repo.save(friendship)
-            self._event_bus.publish_all(friendship.pop_events())
             session.commit()
+            # 提交后再发布：好友关系图缓存失效后重新加载时能读到新关系
+            self._event_bus.publish_all(friendship.pop_events())
         except Exception as e:
             session.rollback()
             raise e
@@ -157,14 +163,6 @@ class FriendshipService:
             
             requests = repo.find_pending_requests(user_id, type)
             
-            # Enrich with user info
-            from app_auth.infrastructure.database.dao_impl.sqlalchemy_user_dao import SqlAlchemyUserDao
-            from app_auth.infrastructure.database.repository_impl.user_repository_impl import UserRepositoryImpl
-            from app_auth.domain.value_objects.user_value_objects import UserId
-            
-            user_dao = SqlAlchemyUserDao(session)
-            user_repo = UserRepositoryImpl(user_dao)
-            
             results = []
             if not requests:
                 return []
@@ -177,15 +175,8 @@ class FriendshipService:
                 else:
                     target_ids.add(r.addressee_id)
             
-            # Batch fetch
-            users_map = {}
-            if target_ids:
-                users = user_repo.find_by_ids([UserId(uid) for uid in target_ids])
-                for u in users:
-                    users_map[u.id.value] = {
-                        "name": u.username.value,
-                        "avatar": u.profile.avatar_url
-                    }
+            # Batch fetch (enrich with user info from the shared profile cache)
+            users_map = get_user_profile_cache().get_many(target_ids, session=session)
             
             for r in requests:
                 target_id = r.requester_id if type == 'incoming' else r.addressee_id
@@ -209,9 +200,7 @@ class FriendshipService:
     def get_friends(self, user_id: str) -> List[Dict[str, Any]]:
         session = SessionLocal()
         try:
-            dao = SqlAlchemyFriendshipDao(session)
-            repo = FriendshipRepositoryImpl(dao)
-            friend_ids = repo.find_friends(user_id)
+            friend_ids = get_friend_graph_cache().friend_ids(user_id, session=session)
             
             if not friend_ids:
                 return []
@@ -238,6 +227,38 @@ class FriendshipService:
         finally:
             session.close()
 
+    def get_friend_suggestions(self, user_id: str, limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+        """Paged "people you may know", read from the materialized suggestion rows."""
+        limit = max(1, min(limit, self.MAX_SUGGESTION_PAGE_SIZE))
+        offset = max(0, offset)
+        session = SessionLocal()
+        try:
+            # One extra row tells whether another page exists without a COUNT
+            rows = SqlAlchemyFriendSuggestionDao(session).find_page(user_id, limit=limit + 1, offset=offset)
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+
+            users_map = get_user_profile_cache().get_many([r.candidate_id for r in rows], session=session)
+            suggestions = []
+            for r in rows:
+                user_info = users_map.get(r.candidate_id)
+                if not user_info:
+                    # Deleted account; its rows are cleaned up by the rebuild script
+                    continue
+                suggestions.append({
+                    "user": {
+                        "id": r.candidate_id,
+                        "name": user_info.get("name", "Unknown"),
+                        "avatar": user_info.get("avatar")
+                    },
+                    "mutual_friends": r.mutual_friends,
+                    "shared_trips": r.shared_trips,
+                    "score": r.score
+                })
+            return {"suggestions": suggestions, "has_more": has_more, "offset": offset, "limit": limit}
+        finally:
+            session.close()
+
     def get_friendship_status(self, user_id: str, target_id: str) -> Dict[str, Any]:
         """Get status between two users."""
         session = SessionLocal()
@@ -20,9 +20,9 @@ from app_travel.domain.value_objects.travel_value_objects import TripId
 from app_social.infrastructure.database.dao_impl.sqlalchemy_post_dao import SqlAlchemyPostDao
 from app_social.infrastructure.database.dao_impl.sqlalchemy_conversation_dao import SqlAlchemyConversationDao
 from app_social.infrastructure.database.dao_impl.sqlalchemy_message_dao import SqlAlchemyMessageDao
-from app_auth.infrastructure.database.repository_impl.user_repository_impl import UserRepositoryImpl
-from app_auth.infrastructure.database.dao_impl.sqlalchemy_user_dao import SqlAlchemyUserDao
-from app_auth.domain.value_objects.user_value_objects import UserId
+from app_auth.infrastructure.cache.user_profile_cache import get_user_profile_cache
+from app_social.infrastructure.cache.friend_graph_cache import get_friend_graph_cache
+from app_social.infrastructure.socket.presence_registry import get_presence_registry
 from shared.database.core import SessionLocal
 from shared.event_bus import get_event_bus
 from shared.storage.local_file_storage import LocalFileStorageService
@@ -33,22 +33,12 @@ class SocialService:
     def __init__(self):
         self._event_bus = get_event_bus()
         self._storage_service = LocalFileStorageService()
+        self._user_profile_cache = get_user_profile_cache()
+        self._friend_graph = get_friend_graph_cache()
     
     def are_friends(self, user_id_1: str, user_id_2: str) -> bool:
-        """检查两人是否为好友"""
-        session = SessionLocal()
-        try:
-            from app_social.infrastructure.database.dao_impl.sqlalchemy_friendship_dao import SqlAlchemyFriendshipDao
-            from app_social.infrastructure.database.repository_impl.friendship_repository_impl import FriendshipRepositoryImpl
-            from app_social.domain.value_objects.friendship_value_objects import FriendshipStatus
-            
-            friend_dao = SqlAlchemyFriendshipDao(session)
-            friend_repo = FriendshipRepositoryImpl(friend_dao)
-            
-            friendship = friend_repo.find_by_users(user_id_1, user_id_2)
-            return friendship is not None and friendship.status == FriendshipStatus.ACCEPTED
-        finally:
-            session.close()
+        """检查两人是否为好友（读好友关系图缓存）"""
+        return self._friend_graph.are_friends(user_id_1, user_id_2)
 
     # ==================== 帖子管理 ====================
     
@@ -217,8 +207,9 @@ class SocialService:
             
             if result:
                 post_repo.save(post)
-                self._event_bus.publish_all(post.pop_events())
                 session.commit()
+                # 提交后再发布：热度处理器按事件计数，提交失败的点赞不应计入
+                self._event_bus.publish_all(post.pop_events())
             
             return action == "liked"
             
@@ -276,20 +267,12 @@ class SocialService:
             posts = post_repo.find_public_feed(limit, offset, tags, search_query)
             
             # Batch fetch authors
-            author_ids = list(set(p.author_id for p in posts))
+            author_ids = set(p.author_id for p in posts)
             author_info_map = {}
-            if author_ids:
-                try:
-                    user_dao = SqlAlchemyUserDao(session)
-                    user_repo = UserRepositoryImpl(user_dao)
-                    users = user_repo.find_by_ids([UserId(uid) for uid in author_ids])
-                    for u in users:
-                        author_info_map[u.id.value] = {
-                            "name": u.username.value,
-                            "avatar": u.profile.avatar_url
-                        }
-                except Exception as e:
-                    print(f"Error fetching authors: {e}")
+            try:
+                author_info_map = self._user_profile_cache.get_many(author_ids, session=session)
+            except Exception as e:
+                print(f"Error fetching authors: {e}")
             
             return [self._post_to_dto(p, viewer_id=viewer_id, author_info=author_info_map.get(p.author_id)) for p in posts]
         finally:
@@ -330,20 +313,12 @@ class SocialService:
                     visible_posts.append(p)
             
             # Batch fetch authors (usually just one, but good for consistency)
-            author_ids = list(set(p.author_id for p in visible_posts))
+            author_ids = set(p.author_id for p in visible_posts)
             author_info_map = {}
-            if author_ids:
-                try:
-                    user_dao = SqlAlchemyUserDao(session)
-                    user_repo = UserRepositoryImpl(user_dao)
-                    users = user_repo.find_by_ids([UserId(uid) for uid in author_ids])
-                    for u in users:
-                        author_info_map[u.id.value] = {
-                            "name": u.username.value,
-                            "avatar": u.profile.avatar_url
-                        }
-                except Exception as e:
-                    print(f"Error fetching authors: {e}")
+            try:
+                author_info_map = self._user_profile_cache.get_many(author_ids, session=session)
+            except Exception as e:
+                print(f"Error fetching authors: {e}")
 
             return [self._post_to_dto(p, viewer_id, author_info=author_info_map.get(p.author_id)) for p in visible_posts]
         finally:
@@ -357,33 +332,22 @@ class SocialService:
         
         session = SessionLocal()
         try:
-            user_dao = SqlAlchemyUserDao(session)
-            user_repo = UserRepositoryImpl(user_dao)
-            
             # Post author
-            if author_info:
-                author_name = author_info.get("name", "Unknown")
-                author_avatar = author_info.get("avatar")
-            else:
+            if author_info is None:
                 try:
-                    author = user_repo.find_by_id(UserId(post.author_id))
-                    if author:
-                        author_name = author.username.value
-                        author_avatar = author.profile.avatar_url
+                    author_info = self._user_profile_cache.get(post.author_id, session=session)
                 except Exception as e:
                     print(f"Error fetching author info: {e}")
+            if author_info:
+                author_name = author_info.get("name", "Unknown")
+                author_avatar = author_info.get("avatar")
 
             # Comment authors
             comment_authors = {}
-            comment_author_ids = list(set(c.author_id for c in post.comments))
+            comment_author_ids = set(c.author_id for c in post.comments)
             if comment_author_ids:
                 try:
-                    users = user_repo.find_by_ids([UserId(uid) for uid in comment_author_ids])
-                    for u in users:
-                        comment_authors[u.id.value] = {
-                            "name": u.username.value,
-                            "avatar": u.profile.avatar_url
-                        }
+                    comment_authors = self._user_profile_cache.get_many(comment_author_ids, session=session)
                 except Exception as e:
                     print(f"Error fetching comment authors: {e}")
 
@@ -451,19 +415,12 @@ class SocialService:
             msg_dao = SqlAlchemyMessageDao(session)
             conv_repo = ConversationRepositoryImpl(conv_dao, msg_dao)
             
-            # 1. 检查好友关系：所有被拉的人必须是创建者的好友
-            from app_social.infrastructure.database.dao_impl.sqlalchemy_friendship_dao import SqlAlchemyFriendshipDao
-            from app_social.infrastructure.database.repository_impl.friendship_repository_impl import FriendshipRepositoryImpl
-            from app_social.domain.value_objects.friendship_value_objects import FriendshipStatus
-            
-            friend_dao = SqlAlchemyFriendshipDao(session)
-            friend_repo = FriendshipRepositoryImpl(friend_dao)
-            
+            # 1. 检查好友关系：所有被拉的人必须是创建者的好友（一次取出好友集合批量判断）
             # 排除自己
             targets = [uid for uid in participant_ids if uid != creator_id]
+            friends = self._friend_graph.filter_friends(creator_id, targets, session=session)
             for target_id in targets:
-                 friendship = friend_repo.find_by_users(creator_id, target_id)
-                 if not friendship or friendship.status != FriendshipStatus.ACCEPTED:
+                 if target_id not in friends:
                      raise ValueError(f"User {target_id} is not your friend")
             
             # 2. 创建群聊
@@ -498,15 +455,7 @@ class SocialService:
                 raise ValueError("Conversation not found")
             
             # 1. 检查好友关系
-            from app_social.infrastructure.database.dao_impl.sqlalchemy_friendship_dao import SqlAlchemyFriendshipDao
-            from app_social.infrastructure.database.repository_impl.friendship_repository_impl import FriendshipRepositoryImpl
-            from app_social.domain.value_objects.friendship_value_objects import FriendshipStatus
-            
-            friend_dao = SqlAlchemyFriendshipDao(session)
-            friend_repo = FriendshipRepositoryImpl(friend_dao)
-            
-            friendship = friend_repo.find_by_users(operator_id, new_member_id)
-            if not friendship or friendship.status != FriendshipStatus.ACCEPTED:
+            if not self._friend_graph.are_friends(operator_id, new_member_id, session=session):
                  raise ValueError(f"User {new_member_id} is not your friend")
             
             # 2. 调用聚合根方法
@@ -673,8 +622,10 @@ class SocialService:
             message = conv.send_message(sender_id, msg_content)
             
             conv_repo.save(conv)
-            self._event_bus.publish_all(conv.pop_events())
             session.commit()
+            # 提交后再发布：通知等处理器在自己的会话中写库，提交前执行会与本事务争用写锁，
+            # 实时推送也不会先于消息落库到达客户端
+            self._event_bus.publish_all(conv.pop_events())
             
             return {
                 "message_id": message.message_id,
@@ -706,17 +657,13 @@ class SocialService:
             user_info_map = {}
             if all_participant_ids:
                 try:
-                    user_dao = SqlAlchemyUserDao(session)
-                    user_repo = UserRepositoryImpl(user_dao)
-                    users = user_repo.find_by_ids([UserId(uid) for uid in all_participant_ids])
-                    for u in users:
-                        user_info_map[u.id.value] = {
-                            "name": u.username.value,
-                            "avatar": u.profile.avatar_url
-                        }
+                    user_info_map = self._user_profile_cache.get_many(all_participant_ids, session=session)
                 except Exception as e:
                     print(f"Error fetching participants info: {e}")
 
+            # Batch presence lookup for all participants
+            online_ids = get_presence_registry().get_online_users(all_participant_ids)
+
             results = []
             for conv in convs:
                 last_msg = conv.messages[-1] if conv.messages else None
@@ -752,7 +699,8 @@ class SocialService:
                         "sent_at": last_msg.sent_at.isoformat() if last_msg else None,
                         "sender_id": last_msg.sender_id if last_msg else None
                     } if last_msg else None,
-                    "participants": list(conv.participant_ids)
+                    "participants": list(conv.participant_ids),
+                    "online_participants": [pid for pid in conv.participant_ids if pid in online_ids]
                 })
             return results
         finally:
@@ -793,14 +741,7 @@ class SocialService:
             user_info_map = {}
             if sender_ids:
                 try:
-                    user_dao = SqlAlchemyUserDao(session)
-                    user_repo = UserRepositoryImpl(user_dao)
-                    users = user_repo.find_by_ids([UserId(uid) for uid in sender_ids])
-                    for u in users:
-                        user_info_map[u.id.value] = {
-                            "name": u.username.value,
-                            "avatar": u.profile.avatar_url
-                        }
+                    user_info_map = self._user_profile_cache.get_many(sender_ids, session=session)
                 except Exception as e:
                     print(f"Error fetching message senders info: {e}")
 
@@ -8,6 +8,7 @@ from typing import Dict, Any
 import logging
 
 from app_social.services.social_service import SocialService
+from shared.infrastructure.json_stream import parse_fields, select_fields, stream_json_response
 
 # 创建 Blueprint
 social_bp = Blueprint('social', __name__, url_prefix='/api/social')
@@ -194,8 +195,11 @@ def get_feed():
         tags = request.args.getlist('tags')
         search_query = request.args.get('search') or request.args.get('q')
         
+        # ?fields= 只返回客户端渲染所需的字段
+        selection = parse_fields(request.args.get('fields'))
+        
         result = social_service.get_public_feed(limit, offset, tags, viewer_id=user_id, search_query=search_query)
-        return jsonify(result), 200
+        return stream_json_response(select_fields(result, selection))
     except Exception as e:
         return _handle_error(e)
 
@@ -356,6 +360,8 @@ def change_group_role(conv_id, target_user_id):
 
 from app_social.services.friendship_service import FriendshipService
 from app_social.domain.event_handler.friendship_handler import register_friendship_handlers
+from app_social.infrastructure.cache.friend_graph_cache import register_friend_graph_cache_handlers
+from app_social.domain.event_handler.friend_suggestion_handler import register_friend_suggestion_handlers
 
 # 初始化好友服务
 friendship_service = FriendshipService()
@@ -363,6 +369,8 @@ friendship_service = FriendshipService()
 # 注册事件处理器
 try:
     register_friendship_handlers()
+    register_friend_graph_cache_handlers()
+    register_friend_suggestion_handlers()
 except Exception as e:
     logger.error(f"Failed to register friendship handlers: {e}")
 
@@ -425,6 +433,18 @@ def get_friends():
     except Exception as e:
         return _handle_error(e)
 
+@social_bp.route('/friends/suggestions', methods=['GET'])
+def get_friend_suggestions():
+    """获取好友推荐（可能认识的人）"""
+    try:
+        user_id = _get_current_user_id()
+        limit = int(request.args.get('limit', 20))
+        offset = int(request.args.get('offset', 0))
+        result = friendship_service.get_friend_suggestions(user_id, limit=limit, offset=offset)
+        return jsonify(result), 200
+    except Exception as e:
+        return _handle_error(e)
+
 @social_bp.route('/friends/<target_id>/status', methods=['GET'])
 def get_friendship_status(target_id):
     """获取与某人的好友状态"""
@@ -51,7 +51,8 @@ class Trip:
         status: TripStatus = TripStatus.PLANNING,
         cover_image_url: Optional[str] = None,
         created_at: Optional[datetime] = None,
-        updated_at: Optional[datetime] = None
+        updated_at: Optional[datetime] = None,
+        version: Optional[int] = None
     ):
         self._id = trip_id
         self._name = name
@@ -64,8 +65,12 @@ class Trip:
         self._cover_image_url = cover_image_url
         self._created_at = created_at or datetime.utcnow()
         self._updated_at = updated_at or self._created_at
+        # 乐观锁版本号：新建未持久化时为 None，由仓库在保存后回写
+        self._version = version
         self._members: List[TripMember] = []
         self._days: List[TripDay] = []
+        # 按日加载时为已加载日程的索引，此时 _days 只包含这一天
+        self._day_scope: Optional[int] = None
         self._domain_events: List[DomainEvent] = []
     
     # ==================== 工厂方法 ====================
@@ -128,9 +133,15 @@ class Trip:
         status: TripStatus = TripStatus.PLANNING,
         cover_image_url: Optional[str] = None,
         created_at: Optional[datetime] = None,
-        updated_at: Optional[datetime] = None
+        updated_at: Optional[datetime] = None,
+        version: Optional[int] = None,
+        day_scope: Optional[int] = None
     ) -> 'Trip':
-        """从持久化数据重建旅行"""
+        """从持久化数据重建旅行
+        
+        day_scope 不为 None 时为按日加载：days 只包含该索引对应的日程
+        （日程不存在时为空），聚合只允许操作这一天，由仓库按日保存。
+        """
         trip = cls(
             trip_id=trip_id,
             name=name,
@@ -142,10 +153,12 @@ class Trip:
             status=status,
             cover_image_url=cover_image_url,
             created_at=created_at,
-            updated_at=updated_at
+            updated_at=updated_at,
+            version=version
         )
         trip._members = members
         trip._days = days
+        trip._day_scope = day_scope
         return trip
     
     def _initialize_days(self) -> None:
@@ -205,10 +218,28 @@ class Trip:
     def updated_at(self) -> datetime:
         return self._updated_at
     
+    @property
+    def version(self) -> Optional[int]:
+        return self._version
+    
+    def assign_version(self, version: int) -> None:
+        """回写持久化后的版本号（仅由仓库调用）"""
+        self._version = version
+    
     @property
     def members(self) -> tuple[TripMember, ...]:
         return tuple(self._members)
     
+    @property
+    def is_day_scoped(self) -> bool:
+        """是否为按日加载的聚合（只包含一个日程）"""
+        return self._day_scope is not None
+    
+    @property
+    def day_scope(self) -> Optional[int]:
+        """按日加载时已加载日程的索引"""
+        return self._day_scope
+    
     @property
     def days(self) -> tuple[TripDay, ...]:
         return tuple(self._days)
@@ -268,6 +299,8 @@ class Trip:
     
     @property
     def total_days(self) -> int:
+        if self._day_scope is not None:
+            return self._date_range.days
         return len(self._days)
     
     # ==================== 成员管理 ====================
@@ -320,7 +353,8 @@ class Trip:
             trip_id=self._id.value,
             user_id=user_id,
             role=role.value,
-            added_by=added_by or self._creator_id
+            added_by=added_by or self._creator_id,
+            co_member_ids=tuple(m.user_id for m in self._members if m.user_id != user_id)
         ))
     
     def remove_member(self, user_id: str, removed_by: str, reason: Optional[str] = None) -> None:
@@ -352,7 +386,8 @@ class Trip:
             trip_id=self._id.value,
             user_id=user_id,
             removed_by=removed_by,
-            reason=reason
+            reason=reason,
+            co_member_ids=tuple(m.user_id for m in self._members)
         ))
     
     def change_member_role(self, user_id: str, new_role: MemberRole, changed_by: str) -> None:
@@ -409,10 +444,21 @@ class Trip:
     
     def get_day(self, day_index: int) -> Optional[TripDay]:
         """获取指定日期的日程（基于0索引）"""
+        if self._day_scope is not None:
+            if day_index == self._day_scope and self._days:
+                return self._days[0]
+            return None
         if 0 <= day_index < len(self._days):
             return self._days[day_index]
         return None
     
+    def _require_day(self, day_index: int) -> TripDay:
+        """获取指定日程，索引无效（或按日加载时不是已加载的那一天）抛出 ValueError"""
+        day = self.get_day(day_index)
+        if day is None:
+            raise ValueError(f"Invalid day index: {day_index}")
+        return day
+    
     def get_day_by_date(self, d: date) -> Optional[TripDay]:
         """根据日期获取日程"""
         for day in self._days:
@@ -446,14 +492,11 @@ class Trip:
         if not self.is_member(operator_id):
             raise ValueError("Only trip members can add activities")
 
-        if day_index < 0 or day_index >= len(self._days):
-            raise ValueError(f"Invalid day index: {day_index}")
+        day = self._require_day(day_index)
         
         if self._status == TripStatus.COMPLETED:
             raise ValueError("Cannot modify completed trip")
         
-        day = self._days[day_index]
-        
         # 获取前一个活动（在添加新活动之前）
         prev_activity = self._get_previous_activity_for_new(day, activity)
         
@@ -521,13 +564,10 @@ class Trip:
         if not self.is_member(operator_id):
             raise ValueError("Only trip members can modify activities")
 
-        if day_index < 0 or day_index >= len(self._days):
-            raise ValueError(f"Invalid day index: {day_index}")
+        day = self._require_day(day_index)
         
         if self._status == TripStatus.COMPLETED:
             raise ValueError("Cannot modify completed trip")
-        
-        day = self._days[day_index]
         activity = day.find_activity(activity_id)
         
         if not activity:
@@ -621,10 +661,7 @@ class Trip:
         if not self.is_member(operator_id):
             raise ValueError("Only trip members can remove activities")
 
-        if day_index < 0 or day_index >= len(self._days):
-            raise ValueError(f"Invalid day index: {day_index}")
-        
-        day = self._days[day_index]
+        day = self._require_day(day_index)
         activity = day.find_activity(activity_id)
         
         if not activity:
@@ -688,10 +725,7 @@ class Trip:
         if not self.is_member(operator_id):
             raise ValueError("Only trip members can modify transit")
 
-        if day_index < 0 or day_index >= len(self._days):
-            raise ValueError(f"Invalid day index: {day_index}")
-            
-        day = self._days[day_index]
+        day = self._require_day(day_index)
         
         # 查找 Transit
         target_transit = None
@@ -784,10 +818,7 @@ class Trip:
         if not self.is_member(operator_id):
             raise ValueError("Only trip members can update itinerary")
 
-        if day_index < 0 or day_index >= len(self._days):
-            raise ValueError(f"Invalid day index: {day_index}")
-        
-        day = self._days[day_index]
+        day = self._require_day(day_index)
         day.replace_activities(activities)
         self._updated_at = datetime.utcnow()
         
@@ -809,10 +840,7 @@ class Trip:
     
     def update_day_notes(self, day_index: int, notes: str) -> None:
         """更新某日备注"""
-        if day_index < 0 or day_index >= len(self._days):
-            raise ValueError(f"Invalid day index: {day_index}")
-        
-        self._days[day_index].update_notes(notes)
+        self._require_day(day_index).update_notes(notes)
         self._updated_at = datetime.utcnow()
     
     def _get_previous_activity_for_new(
@@ -937,38 +965,29 @@ class Trip:
         """
         from app_travel.domain.value_objects.trip_statistics import TripStatistics
         
-        total_distance = 0.0
-        total_play_time = 0
-        total_transit_time = 0
-        activity_count = 0
-        activity_cost = Money.zero()
-        transit_cost = Money.zero()
-        visited_locations: List[Location] = []
+        return TripStatistics.from_days(self.generate_day_statistics())
+    
+    def generate_day_statistics(self) -> List['DayStatistics']:
+        """按日生成统计（用于统计投影的按日增量维护）
         
-        for day in self._days:
-            # 统计活动
-            total_play_time += day.calculate_total_play_time()
-            activity_count += len(day.activities)
-            activity_cost = activity_cost + day.calculate_activity_cost()
-            
-            for activity in day.activities:
-                visited_locations.append(activity.location)
-            
-            # 统计交通
-            total_distance += day.calculate_total_transit_distance()
-            total_transit_time += day.calculate_total_transit_time()
-            transit_cost = transit_cost + day.calculate_transit_cost()
-        
-        return TripStatistics(
-            total_distance_meters=total_distance,
-            total_play_time_minutes=total_play_time,
-            total_transit_time_minutes=total_transit_time,
-            total_estimated_cost=activity_cost + transit_cost,
-            activity_cost=activity_cost,
-            transit_cost=transit_cost,
-            activity_count=activity_count,
-            visited_locations=visited_locations
-        )
+        Returns:
+            每个日程一条 DayStatistics，按日程顺序排列
+        """
+        from app_travel.domain.value_objects.trip_statistics import DayStatistics
+        
+        return [
+            DayStatistics(
+                day_number=day.day_number,
+                distance_meters=day.calculate_total_transit_distance(),
+                play_time_minutes=day.calculate_total_play_time(),
+                transit_time_minutes=day.calculate_total_transit_time(),
+                activity_cost=day.calculate_activity_cost(),
+                transit_cost=day.calculate_transit_cost(),
+                activity_count=len(day.activities),
+                visited_locations=tuple(activity.location for activity in day.activities)
+            )
+            for day in self._days
+        ]
     
     # ==================== 查询方法 ====================
     
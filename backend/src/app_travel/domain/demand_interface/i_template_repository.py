@@ -2,8 +2,10 @@
 Template repository interface
 """
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from app_travel.domain.aggregate.trip_template import TripTemplate
+from app_travel.domain.value_objects.popularity_value_objects import RankingSort
+from app_travel.domain.value_objects.template_summary import TemplateSummary
 from app_travel.domain.value_objects.template_value_objects import TemplateId
 
 
@@ -52,6 +54,29 @@ class ITemplateRepository(ABC):
         """
         pass
     
+    @abstractmethod
+    def find_summaries(
+        self,
+        limit: int = 20,
+        offset: int = 0,
+        keyword: Optional[str] = None,
+        tag: Optional[str] = None,
+        sort: RankingSort = RankingSort.LATEST
+    ) -> Tuple[List[TemplateSummary], int]:
+        """Find one page of template summaries and the total count
+        
+        Args:
+            limit: Page size
+            offset: Offset
+            keyword: Optional keyword search
+            tag: Optional tag filter
+            sort: Newest first, or by popularity score
+            
+        Returns:
+            (summaries, total matching templates)
+        """
+        pass
+    
     @abstractmethod
     def count_all(
         self,
@@ -2,10 +2,27 @@
 旅行仓库接口
 """
 from abc import ABC, abstractmethod
+from datetime import datetime
 from typing import List, Optional
 
 from app_travel.domain.aggregate.trip_aggregate import Trip
 from app_travel.domain.value_objects.travel_value_objects import TripId, TripStatus
+from app_travel.domain.value_objects.trip_summary import TripSummary
+from app_travel.domain.value_objects.popularity_value_objects import RankingSort
+
+
+class TripConcurrencyError(Exception):
+    """旅行并发修改冲突
+    
+    保存时旅行已被其他请求修改（版本号不一致）。
+    调用方应重新加载旅行后再重试，或将冲突返回给客户端。
+    """
+    
+    def __init__(self, trip_id: str, expected_version: Optional[int] = None, actual_version: Optional[int] = None):
+        self.trip_id = trip_id
+        self.expected_version = expected_version
+        self.actual_version = actual_version
+        super().__init__(f"Trip {trip_id} was modified concurrently")
 
 
 class ITripRepository(ABC):
@@ -15,8 +32,24 @@ class ITripRepository(ABC):
     def save(self, trip: Trip) -> None:
         """保存旅行（新增或更新）
         
+        更新时校验版本号，保存成功后回写新版本号到聚合根。
+        
         Args:
             trip: 旅行聚合根
+            
+        Raises:
+            TripConcurrencyError: 旅行已被其他请求修改
+        """
+        pass
+    
+    @abstractmethod
+    def add_new(self, trip: Trip) -> None:
+        """批量插入新建的旅行（克隆等一次性生成完整行程的场景）
+        
+        不检查是否已存在，整棵对象图按表批量插入。
+        
+        Args:
+            trip: 新建的旅行聚合根
         """
         pass
     
@@ -32,6 +65,31 @@ class ITripRepository(ABC):
         """
         pass
     
+    @abstractmethod
+    def find_day_scoped(self, trip_id: TripId, day_index: int) -> Optional[Trip]:
+        """按日加载旅行：旅行信息、成员和指定日程（含活动与交通）
+        
+        Args:
+            trip_id: 旅行ID
+            day_index: 日程索引（从0开始）
+            
+        Returns:
+            按日加载的旅行实例（日程不存在时不含日程），旅行不存在则返回 None
+        """
+        pass
+    
+    @abstractmethod
+    def save_day(self, trip: Trip) -> None:
+        """保存按日加载的旅行：只写入旅行行与已加载日程的活动、交通
+        
+        Args:
+            trip: 按日加载的旅行聚合根
+            
+        Raises:
+            TripConcurrencyError: 旅行已被其他请求修改
+        """
+        pass
+    
     @abstractmethod
     def find_by_member(self, user_id: str, status: Optional[TripStatus] = None) -> List[Trip]:
         """查找用户参与的旅行
@@ -71,6 +129,52 @@ class ITripRepository(ABC):
         """
         pass
     
+    @abstractmethod
+    def find_summaries_by_member(self, user_id: str, status: Optional[TripStatus] = None) -> List[TripSummary]:
+        """查找用户参与的旅行摘要（列表页使用，不还原完整聚合）
+        
+        Args:
+            user_id: 用户ID
+            status: 可选的状态筛选
+            
+        Returns:
+            旅行摘要列表
+        """
+        pass
+    
+    @abstractmethod
+    def find_summaries_by_creator(self, creator_id: str) -> List[TripSummary]:
+        """查找用户创建的旅行摘要
+        
+        Args:
+            creator_id: 创建者ID
+            
+        Returns:
+            旅行摘要列表
+        """
+        pass
+    
+    @abstractmethod
+    def find_public_summaries(
+        self,
+        limit: int = 20,
+        offset: int = 0,
+        search_query: Optional[str] = None,
+        sort: RankingSort = RankingSort.LATEST
+    ) -> List[TripSummary]:
+        """查找公开的旅行摘要
+        
+        Args:
+            limit: 每页数量
+            offset: 偏移量
+            search_query: 搜索关键词
+            sort: 排序方式（最新或热度）
+            
+        Returns:
+            旅行摘要列表
+        """
+        pass
+    
     @abstractmethod
     def delete(self, trip_id: TripId) -> None:
         """删除旅行
@@ -90,4 +194,16 @@ class ITripRepository(ABC):
         Returns:
             是否存在
         """
-        pass
\ No newline at end of file
+        pass
+    
+    @abstractmethod
+    def find_version(self, trip_id: TripId) -> Optional[datetime]:
+        """查询旅行版本（最后更新时间），不加载聚合
+        
+        Args:
+            trip_id: 旅行ID
+            
+        Returns:
+            版本时间戳，不存在则返回 None
+        """
+        pass
@@ -0,0 +1,71 @@
+"""
+旅行统计投影仓库接口
+"""
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app_travel.domain.aggregate.trip_aggregate import Trip
+from app_travel.domain.value_objects.trip_statistics import TripStatistics, TripStatisticsSummary
+
+
+class ITripStatisticsRepository(ABC):
+    """旅行统计投影仓库接口
+    
+    统计投影随旅行写入同步刷新；读取时按旅行版本校验，过期视为不存在。
+    """
+    
+    @abstractmethod
+    def find_by_trip_id(self, trip_id: str, version: datetime) -> Optional[TripStatistics]:
+        """查找指定版本的旅行统计报表
+        
+        Args:
+            trip_id: 旅行ID
+            version: 旅行当前版本（updated_at）
+            
+        Returns:
+            统计报表，不存在或已过期则返回 None
+        """
+        pass
+    
+    @abstractmethod
+    def find_summaries(self, trip_ids: List[str]) -> Dict[str, TripStatisticsSummary]:
+        """批量查找旅行统计摘要（列表卡片使用）
+        
+        Args:
+            trip_ids: 旅行ID列表
+            
+        Returns:
+            trip_id -> 统计摘要，不存在或已过期的旅行不在结果中
+        """
+        pass
+    
+    @abstractmethod
+    def refresh(self, trip: Trip, version: datetime) -> None:
+        """根据旅行聚合刷新统计投影（只改写发生变化的日期）
+        
+        Args:
+            trip: 旅行聚合根
+            version: 旅行持久化后的版本（updated_at）
+        """
+        pass
+    
+    @abstractmethod
+    def refresh_days(self, trip: Trip, previous_version: datetime, version: datetime) -> None:
+        """根据按日加载的旅行只刷新已加载日期的统计，并重算汇总
+        
+        Args:
+            trip: 按日加载的旅行聚合根
+            previous_version: 本次保存前的旅行版本，投影版本与之不一致时不刷新
+            version: 旅行持久化后的版本
+        """
+        pass
+    
+    @abstractmethod
+    def delete(self, trip_id: str) -> None:
+        """删除旅行的统计投影
+        
+        Args:
+            trip_id: 旅行ID
+        """
+        pass
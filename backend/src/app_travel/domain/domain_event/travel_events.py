@@ -61,6 +61,8 @@ class TripMemberAddedEvent(DomainEvent):
     user_id: str = ""
     role: str = ""
     added_by: str = ""
+    # 加入时旅行的其他成员（None 表示未提供，处理器按数据库当前成员计算）
+    co_member_ids: Optional[Tuple[str, ...]] = None
 
 
 @dataclass(frozen=True)
@@ -70,6 +72,8 @@ class TripMemberRemovedEvent(DomainEvent):
     user_id: str = ""
     removed_by: str = ""
     reason: Optional[str] = None
+    # 移除后旅行剩余的成员（None 表示未提供，处理器按数据库当前成员计算）
+    co_member_ids: Optional[Tuple[str, ...]] = None
 
 
 @dataclass(frozen=True)
@@ -129,3 +133,43 @@ class TransitCalculatedEvent(DomainEvent):
     day_index: int = 0
     transit_count: int = 0
     warnings_count: int = 0
+
+
+@dataclass(frozen=True)
+class TripViewedEvent(DomainEvent):
+    """旅行详情被查看事件（热度信号）"""
+    trip_id: str = ""
+    viewer_id: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class TripClonedEvent(DomainEvent):
+    """公开旅行被直接克隆事件"""
+    source_trip_id: str = ""
+    trip_id: str = ""
+    user_id: str = ""
+
+
+# ==================== 模板事件 ====================
+
+@dataclass(frozen=True)
+class TemplatePublishedEvent(DomainEvent):
+    """模板发布事件"""
+    template_id: str = ""
+    source_trip_id: str = ""
+    author_id: str = ""
+
+
+@dataclass(frozen=True)
+class TemplateClonedEvent(DomainEvent):
+    """模板被克隆为新行程事件"""
+    template_id: str = ""
+    trip_id: str = ""
+    user_id: str = ""
+
+
+@dataclass(frozen=True)
+class TemplateViewedEvent(DomainEvent):
+    """模板详情被查看事件（热度信号）"""
+    template_id: str = ""
+    viewer_id: Optional[str] = None
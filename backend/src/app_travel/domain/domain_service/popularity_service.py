@@ -0,0 +1,81 @@
+"""
+热度计算服务 - 领域服务
+
+热度 = Σ 权重 × 2^(-(当前时间 - 信号时间) / 半衰期)，发布时间本身也作为一个
+信号（新鲜度基线），因此新发布的内容在没有互动时也会随时间下沉。
+
+为了让排序索引无需定期重算，存储的是前向衰减（forward decay）形式的对数分值：
+    score = log2(Σ 权重 × 2^((信号时间 - EPOCH) / 半衰期))
+任意时刻 now 的实际热度为 2^(score - (now - EPOCH) / 半衰期)，所有对象共用
+同一个衰减因子，所以按 score 排序即按当前热度排序；新信号只需对单行做一次
+log-sum-exp 累加。对数形式避免了指数随时间增长导致的浮点溢出。
+"""
+import math
+from datetime import datetime
+from typing import Dict, Optional
+
+from app_travel.domain.value_objects.popularity_value_objects import PopularitySignal
+
+
+class PopularityService:
+    """热度计算服务"""
+
+    # 热度半衰期（小时）
+    HALF_LIFE_HOURS = 72.0
+    # 前向衰减的时间原点（固定值，修改后需要重建全部分值）
+    EPOCH = datetime(2024, 1, 1)
+    # 各信号权重
+    WEIGHTS: Dict[PopularitySignal, float] = {
+        PopularitySignal.CREATED: 10.0,
+        PopularitySignal.CLONE: 5.0,
+        PopularitySignal.LIKE: 2.0,
+        PopularitySignal.VIEW: 0.25,
+    }
+
+    @classmethod
+    def decay_units(cls, at: datetime) -> float:
+        """从 EPOCH 到 at 经过的半衰期个数"""
+        return (at - cls.EPOCH).total_seconds() / (cls.HALF_LIFE_HOURS * 3600)
+
+    @classmethod
+    def signal_score(cls, signal: PopularitySignal, at: datetime, count: int = 1) -> float:
+        """单个信号（或同一时刻的 count 个信号）的对数分值"""
+        return math.log2(cls.WEIGHTS[signal] * count) + cls.decay_units(at)
+
+    @classmethod
+    def add_signal(
+        cls,
+        score: Optional[float],
+        signal: PopularitySignal,
+        at: datetime,
+        count: int = 1
+    ) -> float:
+        """在已有分值上累加信号，score 为 None 表示尚无分值"""
+        point = cls.signal_score(signal, at, count)
+        if score is None:
+            return point
+        high, low = max(score, point), min(score, point)
+        return high + math.log2(1.0 + 2.0 ** (low - high))
+
+    @classmethod
+    def remove_signal(
+        cls,
+        score: float,
+        signal: PopularitySignal,
+        at: datetime,
+        floor: float
+    ) -> float:
+        """撤销一个信号（如取消点赞），结果不低于 floor（新鲜度基线）
+
+        原信号的发生时间未知，按撤销时间扣除：扣除量不小于当初的增量，
+        反复点赞/取消无法刷高热度。
+        """
+        ratio = 2.0 ** (cls.signal_score(signal, at) - score)
+        if ratio >= 1.0:
+            return floor
+        return max(score + math.log2(1.0 - ratio), floor)
+
+    @classmethod
+    def current_value(cls, score: float, now: Optional[datetime] = None) -> float:
+        """分值在 now 时刻对应的实际热度（用于展示）"""
+        return 2.0 ** (score - cls.decay_units(now or datetime.utcnow()))
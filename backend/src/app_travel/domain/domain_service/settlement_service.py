@@ -1,14 +1,18 @@
 """
 结算服务 - 领域服务
 
-负责计算费用结算方案，使用贪心算法最小化转账次数。
+负责计算费用结算方案：成员数较少时用精确算法求最少转账次数，
+成员过多或超出时间预算时回退为贪心算法。
 """
 import json
+import time
 from decimal import Decimal
-from typing import List, Dict
+from typing import Any, List, Dict, Optional, Tuple
 
 from app_travel.domain.entity.expense import Expense
-from app_travel.domain.value_objects.expense_value_objects import SettlementTransfer
+from app_travel.domain.value_objects.expense_value_objects import SettlementMode, SettlementTransfer
+
+CENT = Decimal('0.01')
 
 
 class SettlementService:
@@ -17,6 +21,15 @@ class SettlementService:
     提供费用结算计算功能，包括余额计算和转账最小化。
     """
     
+    # 精确算法处理的最大成员数（不含余额为 0 及已两两抵消的成员）
+    EXACT_MAX_MEMBERS = 20
+    # AUTO 模式下直接选用精确算法的最大成员数（口径同上）。DP 耗时随成员数翻倍，
+    # 纯 Python 下 14 人最坏约 20ms、15 人约 40ms、16 人约 85ms，
+    # 超过该值直接用贪心，不再先耗尽时间预算（见 scripts/benchmark_settlement.py）
+    AUTO_EXACT_MAX_MEMBERS = 14
+    # AUTO 模式下精确算法的时间预算（秒）
+    EXACT_TIME_BUDGET = 0.05
+    
     @staticmethod
     def calculate_balances(expenses: List[Expense]) -> Dict[str, Decimal]:
         """计算每个成员的净余额
@@ -47,12 +60,57 @@ class SettlementService:
         return balances
     
     @staticmethod
-    def minimize_transfers(balances: Dict[str, Decimal]) -> List[SettlementTransfer]:
-        """使用贪心算法最小化转账次数
+    def minimize_transfers(
+        balances: Dict[str, Decimal],
+        currency: str = "CNY",
+        mode: SettlementMode = SettlementMode.AUTO,
+        time_budget: Optional[float] = None
+    ) -> List[SettlementTransfer]:
+        """计算结清所有余额的转账方案
+        
+        精确算法：n 个非零余额的成员若能划分为 k 个互不相交的零和子组，
+        每组内部 s 人只需 s-1 笔转账，总转账数为 n-k。因此最少转账数
+        等价于最大化零和子组个数，用子集状态压缩 DP 求解（O(2^n * n)）。
+        
+        - AUTO：成员数不超过 AUTO_EXACT_MAX_MEMBERS 时使用精确算法，否则直接贪心；
+          time_budget（默认 EXACT_TIME_BUDGET 秒）只作为慢机器上的兜底，超时回退贪心
+        - EXACT：精确算法，不设时间预算（成员数仍受 EXACT_MAX_MEMBERS 限制）
+        - GREEDY：贪心
+        
+        Args:
+            balances: 用户ID到净余额的映射
+            currency: 转账货币
+            mode: 算法选择
+            time_budget: 精确算法的时间预算（秒）
+            
+        Returns:
+            List[SettlementTransfer]: 转账列表
+        """
+        if mode == SettlementMode.GREEDY:
+            return SettlementService.greedy_transfers(balances, currency)
+        
+        if mode == SettlementMode.EXACT:
+            deadline = None if time_budget is None else time.perf_counter() + time_budget
+        else:
+            budget = SettlementService.EXACT_TIME_BUDGET if time_budget is None else time_budget
+            deadline = time.perf_counter() + budget
+        
+        max_members = (
+            SettlementService.EXACT_MAX_MEMBERS if mode == SettlementMode.EXACT
+            else SettlementService.AUTO_EXACT_MAX_MEMBERS
+        )
+        transfers = SettlementService.exact_transfers(balances, currency, deadline, max_members)
+        if transfers is None:
+            return SettlementService.greedy_transfers(balances, currency)
+        return transfers
+    
+    @staticmethod
+    def greedy_transfers(balances: Dict[str, Decimal], currency: str = "CNY") -> List[SettlementTransfer]:
+        """使用贪心算法生成转账（速度快，转账次数不一定最少）
         
         算法：
         1. 分离债务人（余额<0）和债权人（余额>0）
-        2. 排序：债务人按余额升序，债权人按余额降序
+        2. 排序：债务人按债务降序，债权人按债权降序
         3. 循环匹配：最大债务人向最大债权人转账
         4. 转账金额为 min(|债务|, 债权)
         5. 更新余额，移除已清零的成员
@@ -60,10 +118,67 @@ class SettlementService:
         
         Args:
             balances: 用户ID到净余额的映射
+            currency: 转账货币
+            
+        Returns:
+            List[SettlementTransfer]: 转账列表
+        """
+        return [
+            SettlementTransfer(
+                from_user_id=debtor_id,
+                to_user_id=creditor_id,
+                amount=amount,
+                currency=currency,
+                is_settled=False
+            )
+            for debtor_id, creditor_id, amount in SettlementService._greedy_match(balances)
+        ]
+    
+    @staticmethod
+    def exact_transfers(
+        balances: Dict[str, Decimal],
+        currency: str = "CNY",
+        deadline: Optional[float] = None,
+        max_members: Optional[int] = None
+    ) -> Optional[List[SettlementTransfer]]:
+        """使用精确算法生成转账数最少的方案
+        
+        Args:
+            balances: 用户ID到净余额的映射（精确到分）
+            currency: 转账货币
+            deadline: time.perf_counter() 截止时间，None 表示不限时
+            max_members: 精确求解的最大成员数（不含两两抵消的成员），默认 EXACT_MAX_MEMBERS
             
         Returns:
-            List[SettlementTransfer]: 最小化的转账列表
+            转账列表；余额不是整分或合计不为 0、成员过多或超时时返回 None
         """
+        cents = SettlementService._to_cents(balances)
+        if cents is None:
+            return None
+        
+        if max_members is None:
+            max_members = SettlementService.EXACT_MAX_MEMBERS
+        groups = SettlementService._zero_sum_groups(cents, deadline, max_members)
+        if groups is None:
+            return None
+        
+        transfers = []
+        for group in groups:
+            for debtor_id, creditor_id, amount in SettlementService._greedy_match(
+                {user_id: cents[user_id] for user_id in group}
+            ):
+                transfers.append(SettlementTransfer(
+                    from_user_id=debtor_id,
+                    to_user_id=creditor_id,
+                    amount=(Decimal(amount) / 100).quantize(CENT),
+                    currency=currency,
+                    is_settled=False
+                ))
+        return transfers
+    
+    @staticmethod
+    def _greedy_match(balances: Dict[str, Any]) -> List[Tuple[str, str, Any]]:
+        """贪心匹配债务人与债权人，返回 (付款方, 收款方, 金额)"""
         # 过滤出非零余额
         debtors = []  # (user_id, debt_amount) debt_amount > 0
         creditors = []  # (user_id, credit_amount) credit_amount > 0
@@ -78,7 +193,7 @@ class SettlementService:
         debtors.sort(key=lambda x: x[1], reverse=True)
         creditors.sort(key=lambda x: x[1], reverse=True)
         
-        transfers = []
+        matches = []
         
         # 贪心匹配
         i, j = 0, 0
@@ -88,18 +203,7 @@ class SettlementService:
             
             # 转账金额为两者中较小的
             transfer_amount = min(debt, credit)
-            
-            # 获取货币（假设所有费用使用相同货币，这里使用CNY）
-            # 在实际应用中，应该从费用中获取货币信息
-            currency = "CNY"
-            
-            transfers.append(SettlementTransfer(
-                from_user_id=debtor_id,
-                to_user_id=creditor_id,
-                amount=transfer_amount,
-                currency=currency,
-                is_settled=False
-            ))
+            matches.append((debtor_id, creditor_id, transfer_amount))
             
             # 更新余额
             debtors[i][1] -= transfer_amount
@@ -111,7 +215,91 @@ class SettlementService:
             if creditors[j][1] == 0:
                 j += 1
         
-        return transfers
+        return matches
+    
+    @staticmethod
+    def _to_cents(balances: Dict[str, Decimal]) -> Optional[Dict[str, int]]:
+        """转换为以分为单位的非零整数余额；不是整分或合计不为 0 时返回 None"""
+        cents = {}
+        for user_id, balance in balances.items():
+            value = Decimal(balance) * 100
+            if value != value.to_integral_value():
+                return None
+            if value:
+                cents[user_id] = int(value)
+        if sum(cents.values()) != 0:
+            return None
+        return cents
+    
+    @staticmethod
+    def _zero_sum_groups(
+        cents: Dict[str, int],
+        deadline: Optional[float],
+        max_members: int
+    ) -> Optional[List[List[str]]]:
+        """将成员划分为尽可能多的零和子组
+        
+        1. 余额恰好相反的两人单独成组（总是最优的划分之一）
+        2. 剩余成员用状态压缩 DP：
+           dp[mask] = max(dp[mask - {i}]) + (sum[mask] == 0)
+           dp[全集] 即最大零和子组数，沿最优链回溯得到各组
+        """
+        groups: List[List[str]] = []
+        unmatched: Dict[int, List[str]] = {}
+        for user_id in sorted(cents):
+            amount = cents[user_id]
+            partners = unmatched.get(-amount)
+            if partners:
+                groups.append([partners.pop(), user_id])
+            else:
+                unmatched.setdefault(amount, []).append(user_id)
+        
+        users = [user_id for members in unmatched.values() for user_id in members]
+        n = len(users)
+        if n == 0:
+            return groups
+        if n > max_members:
+            return None
+        
+        values = [cents[user_id] for user_id in users]
+        size = 1 << n
+        sums = [0] * size
+        dp = [0] * size
+        for mask in range(1, size):
+            if deadline is not None and not mask & 0x3ff and time.perf_counter() > deadline:
+                return None
+            low = mask & -mask
+            sums[mask] = sums[mask ^ low] + values[low.bit_length() - 1]
+            best = 0
+            rest = mask
+            while rest:
+                bit = rest & -rest
+                if dp[mask ^ bit] > best:
+                    best = dp[mask ^ bit]
+                rest ^= bit
+            dp[mask] = best + (sums[mask] == 0)
+        
+        # 回溯：最优链上的零和状态两两之差即为各零和子组
+        boundaries = []
+        mask = size - 1
+        while mask:
+            is_zero = sums[mask] == 0
+            if is_zero:
+                boundaries.append(mask)
+            target = dp[mask] - is_zero
+            rest = mask
+            while rest:
+                bit = rest & -rest
+                if dp[mask ^ bit] == target:
+                    break
+                rest ^= bit
+            mask ^= bit
+        boundaries.append(0)
+        
+        for outer, inner in zip(boundaries, boundaries[1:]):
+            group_mask = outer ^ inner
+            groups.append([users[i] for i in range(n) if group_mask >> i & 1])
+        return groups
     
     @staticmethod
     def to_json(transfers: List[SettlementTransfer]) -> str:
@@ -4,17 +4,26 @@ Template domain service
 Handles template creation from trips and cloning templates to new trips.
 """
 from datetime import date, timedelta, time
-from typing import List, Optional
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
 from app_travel.domain.aggregate.trip_aggregate import Trip
 from app_travel.domain.aggregate.trip_template import TripTemplate
 from app_travel.domain.value_objects.template_value_objects import (
-    TemplateDayData, TemplateActivityData
+    TemplateDayData, TemplateActivityData, TemplateTransitData
+)
+from app_travel.domain.value_objects.transit_value_objects import (
+    RouteInfo, TransitCost, TransportMode
 )
 from app_travel.domain.value_objects.travel_value_objects import (
     TripName, TripDescription, DateRange, TripStatus, TripVisibility,
     Location, Money, ActivityType
 )
 from app_travel.domain.entity.activity import Activity
+from app_travel.domain.entity.transit import Transit
+from app_travel.domain.entity.trip_day_entity import TripDay
+
+DEFAULT_DAY_START = 9 * 60  # 09:00, in minutes
+LAST_MINUTE = 23 * 60 + 59
 
 
 class TemplateService:
@@ -73,15 +82,30 @@ class TemplateService:
                     duration_minutes=duration_minutes,
                     cost_amount=float(activity.cost.amount) if activity.cost else None,
                     cost_currency=activity.cost.currency if activity.cost else "CNY",
-                    notes=""  # Strip private notes
+                    notes="",  # Strip private notes
+                    start_time=activity.start_time.strftime("%H:%M")
                 )
                 activities_data.append(activity_data)
                 total_activity_count += 1
             
+            # Keep computed routes so clones do not need to re-route
+            activities_by_id = {a.id: a for a in day.activities}
+            transits_data = [
+                TemplateService._transit_data(
+                    transit,
+                    activities_by_id[transit.from_activity_id].location,
+                    activities_by_id[transit.to_activity_id].location
+                )
+                for transit in day.transits
+                if transit.from_activity_id in activities_by_id
+                and transit.to_activity_id in activities_by_id
+            ]
+            
             day_data = TemplateDayData(
                 day_number=day.day_number,
                 theme=day.theme,
-                activities=tuple(activities_data)
+                activities=tuple(activities_data),
+                transits=tuple(transits_data)
             )
             days_data.append(day_data)
         
@@ -144,6 +168,9 @@ class TemplateService:
             visibility=TripVisibility.PRIVATE
         )
         
+        # Routes computed for the source trip, reusable across all days
+        routes = TemplateService._route_index(template)
+        
         # Clone activities from template
         days_to_clone = min(new_days, template.duration_days)
         
@@ -157,53 +184,7 @@ class TemplateService:
                     if template_day.theme:
                         trip_day.update_theme(template_day.theme)
                     
-                    # Clone activities
-                    for template_activity in template_day.activities:
-                        # Calculate start and end times
-                        # For simplicity, we'll use a default time distribution
-                        # In a real system, this would preserve relative times
-                        start_time = time(9, 0)  # Default start time
-                        
-                        # Calculate end time based on duration
-                        total_minutes = template_activity.duration_minutes
-                        hours = total_minutes // 60
-                        minutes = total_minutes % 60
-                        end_hour = start_time.hour + hours
-                        end_minute = start_time.minute + minutes
-                        
-                        # Handle minute overflow
-                        if end_minute >= 60:
-                            end_hour += end_minute // 60
-                            end_minute = end_minute % 60
-                        
-                        # Cap at 23:59
-                        if end_hour >= 24:
-                            end_hour = 23
-                            end_minute = 59
-                        
-                        end_time = time(end_hour, end_minute)
-                        
-                        # Create activity
-                        activity = Activity.create(
-                            name=template_activity.name,
-                            activity_type=ActivityType.from_string(template_activity.activity_type),
-                            location=Location(
-                                name=template_activity.location_name,
-                                latitude=template_activity.latitude,
-                                longitude=template_activity.longitude,
-                                address=template_activity.address
-                            ),
-                            start_time=start_time,
-                            end_time=end_time,
-                            cost=Money(
-                                amount=template_activity.cost_amount,
-                                currency=template_activity.cost_currency
-                            ) if template_activity.cost_amount else None,
-                            notes=template_activity.notes
-                        )
-                        
-                        # Add activity to trip day
-                        trip_day.add_activity(activity)
+                    TemplateService._clone_day(template_day, trip_day, routes)
         
         # Remaining days (if new_days > template_days) are left empty
         
@@ -240,3 +221,149 @@ class TemplateService:
         
         # Clone from template
         return TemplateService.clone_to_trip(template, user_id, start_date, end_date)
+    
+    # ==================== Helpers ====================
+    
+    @staticmethod
+    def location_key(name: str, latitude: Optional[float], longitude: Optional[float]) -> str:
+        """Key identifying a location for route reuse (~1 m precision, or the name)"""
+        if latitude is not None and longitude is not None:
+            return f"{float(latitude):.5f},{float(longitude):.5f}"
+        return f"name:{(name or '').strip().lower()}"
+    
+    @staticmethod
+    def _activity_key(activity: TemplateActivityData) -> str:
+        return TemplateService.location_key(activity.location_name, activity.latitude, activity.longitude)
+    
+    @staticmethod
+    def _transit_data(transit: Transit, origin: Location, destination: Location) -> TemplateTransitData:
+        cost = transit.estimated_cost
+        return TemplateTransitData(
+            from_location=TemplateService.location_key(origin.name, origin.latitude, origin.longitude),
+            to_location=TemplateService.location_key(destination.name, destination.latitude, destination.longitude),
+            transport_mode=transit.transport_mode.value,
+            distance_meters=float(transit.route_info.distance_meters),
+            duration_seconds=int(transit.route_info.duration_seconds),
+            polyline=transit.route_info.polyline,
+            cost_amount=float(cost.estimated_cost.amount) if cost else None,
+            cost_currency=cost.estimated_cost.currency if cost else "CNY",
+            fuel_cost=float(cost.fuel_cost.amount) if cost and cost.fuel_cost else None,
+            toll_cost=float(cost.toll_cost.amount) if cost and cost.toll_cost else None,
+            ticket_cost=float(cost.ticket_cost.amount) if cost and cost.ticket_cost else None
+        )
+    
+    @staticmethod
+    def _route_index(template: TripTemplate) -> Dict[Tuple[str, str, str], TemplateTransitData]:
+        """(from_location, to_location, transport_mode) -> first recorded leg"""
+        routes: Dict[Tuple[str, str, str], TemplateTransitData] = {}
+        for day_data in template.days_data:
+            for leg in day_data.transits:
+                routes.setdefault((leg.from_location, leg.to_location, leg.transport_mode), leg)
+        return routes
+    
+    @staticmethod
+    def _day_modes(
+        template_day: TemplateDayData,
+        routes: Dict[Tuple[str, str, str], TemplateTransitData]
+    ) -> Dict[Tuple[str, str], str]:
+        """(from_location, to_location) -> transport mode to reuse on this day
+        
+        The mode the author used on this day wins; pairs without a leg on this
+        day fall back to the first mode recorded anywhere in the template.
+        """
+        modes: Dict[Tuple[str, str], str] = {}
+        for leg in template_day.transits:
+            modes.setdefault((leg.from_location, leg.to_location), leg.transport_mode)
+        for from_location, to_location, mode in routes:
+            modes.setdefault((from_location, to_location), mode)
+        return modes
+    
+    @staticmethod
+    def _clone_day(
+        template_day: TemplateDayData,
+        trip_day: TripDay,
+        routes: Dict[Tuple[str, str, str], TemplateTransitData]
+    ) -> None:
+        """Clone one day's activities and attach reusable transit legs
+        
+        Activities keep their source start times when the template has them;
+        otherwise they are laid out back to back from 09:00, leaving room for
+        the carried-over transit between them.
+        """
+        previous: Optional[Tuple[TemplateActivityData, Activity]] = None
+        cursor = DEFAULT_DAY_START
+        modes = TemplateService._day_modes(template_day, routes)
+        
+        for template_activity in template_day.activities:
+            leg = None
+            if previous is not None:
+                pair = (TemplateService._activity_key(previous[0]),
+                        TemplateService._activity_key(template_activity))
+                mode = modes.get(pair)
+                leg = routes.get((*pair, mode)) if mode else None
+            if leg is not None:
+                cursor += -(-leg.duration_seconds // 60)
+            
+            start = TemplateService._parse_minutes(template_activity.start_time)
+            start = cursor if start is None else max(start, cursor)
+            start = min(start, LAST_MINUTE)
+            end = min(start + template_activity.duration_minutes, LAST_MINUTE)
+            
+            activity = Activity.create(
+                name=template_activity.name,
+                activity_type=ActivityType.from_string(template_activity.activity_type),
+                location=Location(
+                    name=template_activity.location_name,
+                    latitude=template_activity.latitude,
+                    longitude=template_activity.longitude,
+                    address=template_activity.address
+                ),
+                start_time=time(start // 60, start % 60),
+                end_time=time(end // 60, end % 60),
+                cost=Money(
+                    amount=template_activity.cost_amount,
+                    currency=template_activity.cost_currency
+                ) if template_activity.cost_amount else None,
+                notes=template_activity.notes
+            )
+            trip_day.add_activity(activity)
+            
+            if leg is not None:
+                trip_day.add_transit(TemplateService._transit_from_leg(leg, previous[1], activity))
+            
+            previous = (template_activity, activity)
+            cursor = end
+    
+    @staticmethod
+    def _transit_from_leg(leg: TemplateTransitData, from_activity: Activity, to_activity: Activity) -> Transit:
+        def money(amount: Optional[float]) -> Optional[Money]:
+            return Money(Decimal(str(amount)), leg.cost_currency) if amount is not None else None
+        
+        estimated = money(leg.cost_amount)
+        return Transit.create(
+            from_activity_id=from_activity.id,
+            to_activity_id=to_activity.id,
+            transport_mode=TransportMode.from_string(leg.transport_mode),
+            route_info=RouteInfo(
+                distance_meters=leg.distance_meters,
+                duration_seconds=leg.duration_seconds,
+                polyline=leg.polyline
+            ),
+            departure_time=from_activity.end_time,
+            estimated_cost=TransitCost(
+                estimated_cost=estimated,
+                fuel_cost=money(leg.fuel_cost),
+                toll_cost=money(leg.toll_cost),
+                ticket_cost=money(leg.ticket_cost)
+            ) if estimated is not None else None
+        )
+    
+    @staticmethod
+    def _parse_minutes(value: Optional[str]) -> Optional[int]:
+        if not value:
+            return None
+        try:
+            hours, minutes = value.split(':')[:2]
+            return int(hours) * 60 + int(minutes)
+        except ValueError:
+            return None
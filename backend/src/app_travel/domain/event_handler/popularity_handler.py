@@ -0,0 +1,268 @@
+"""
+热度排行事件处理器
+
+订阅模板/旅行相关的领域事件，增量更新 popularity_scores 中对应行的
+分值与计数（每个事件只读写一行），排行榜查询直接沿分值索引分页。
+
+- 模板发布 / 旅行创建：写入新鲜度基线
+- 模板克隆 / 旅行直接克隆：克隆信号
+- 模板 / 旅行详情查看：浏览信号
+- 游记点赞 / 取消点赞：计入游记关联的旅行及由该旅行发布的模板
+
+写库在后台任务队列中执行，不占用请求线程，也不在请求事务打开期间争用写锁。
+发布、克隆、点赞等事件由发布方在事务提交后才发布，回滚的请求不会计分。
+浏览信号按 (浏览者, 对象) 在去重窗口内只计一次，并在内存中按对象合并，
+每隔 view_flush_seconds 批量写入一次。
+
+尚无热度行的对象（功能上线前创建）忽略互动信号，
+由 scripts/migrate_v6_popularity_scores.py 回填。
+"""
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from shared.database.core import SessionLocal
+from shared.event_bus import get_event_bus
+from shared.infrastructure.background_tasks import BackgroundTaskQueue, get_background_task_queue
+from shared.infrastructure.ttl_cache import TTLCache
+from app_travel.domain.domain_service.popularity_service import PopularityService
+from app_travel.domain.value_objects.popularity_value_objects import PopularitySignal, RankedEntityType
+from app_travel.infrastructure.database.dao_impl.sqlalchemy_popularity_dao import SQLAlchemyPopularityDAO
+from app_travel.infrastructure.database.dao_interface.i_popularity_dao import IPopularityDAO
+from app_travel.infrastructure.database.persistent_model.popularity_po import PopularityScorePO
+
+# 信号对应的计数列
+_COUNTERS = {
+    PopularitySignal.CLONE: 'clone_count',
+    PopularitySignal.VIEW: 'view_count',
+    PopularitySignal.LIKE: 'like_count',
+}
+
+
+class PopularityHandler:
+    """热度排行事件处理器"""
+
+    # 同一浏览者对同一对象的浏览在该窗口内只计一次（秒）
+    VIEW_DEDUP_WINDOW_SECONDS = 30 * 60
+    # 合并浏览信号的写入间隔（秒）
+    VIEW_FLUSH_SECONDS = 5.0
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        task_queue: Optional[BackgroundTaskQueue] = None,
+        view_dedup_seconds: float = VIEW_DEDUP_WINDOW_SECONDS,
+        view_flush_seconds: float = VIEW_FLUSH_SECONDS
+    ):
+        """
+        Args:
+            session_factory: 会话工厂
+            task_queue: 后台任务队列；为 None 时在调用线程上立即写入（脚本与测试）
+            view_dedup_seconds: 浏览去重窗口（秒）
+            view_flush_seconds: 浏览信号合并写入的间隔（秒）
+        """
+        self._session_factory = session_factory
+        self._task_queue = task_queue
+        self._view_flush_seconds = view_flush_seconds
+        self._seen_views = TTLCache(ttl_seconds=view_dedup_seconds, max_size=100000)
+        # (对象类型, 对象ID) -> (浏览次数, 最近浏览时间)
+        self._pending_views: Dict[Tuple[RankedEntityType, str], Tuple[int, datetime]] = {}
+        self._views_lock = threading.Lock()
+
+    # ==================== 事件入口 ====================
+
+    def handle_template_published(self, event) -> None:
+        self._submit(self._apply, RankedEntityType.TEMPLATE, event.template_id,
+                     PopularitySignal.CREATED, event.occurred_at)
+
+    def handle_trip_created(self, event) -> None:
+        self._submit(self._apply, RankedEntityType.TRIP, event.trip_id,
+                     PopularitySignal.CREATED, event.occurred_at)
+
+    def handle_template_cloned(self, event) -> None:
+        self._submit(self._apply, RankedEntityType.TEMPLATE, event.template_id,
+                     PopularitySignal.CLONE, event.occurred_at)
+
+    def handle_trip_cloned(self, event) -> None:
+        self._submit(self._apply, RankedEntityType.TRIP, event.source_trip_id,
+                     PopularitySignal.CLONE, event.occurred_at)
+
+    def handle_template_viewed(self, event) -> None:
+        self._buffer_view(RankedEntityType.TEMPLATE, event.template_id, event.viewer_id, event.occurred_at)
+
+    def handle_trip_viewed(self, event) -> None:
+        self._buffer_view(RankedEntityType.TRIP, event.trip_id, event.viewer_id, event.occurred_at)
+
+    def handle_post_liked(self, event) -> None:
+        if event.trip_id:
+            self._submit(self._apply_like, event.trip_id, event.occurred_at, False)
+
+    def handle_post_unliked(self, event) -> None:
+        # 作者给自己点赞不发布 PostLikedEvent，对应的取消也不计
+        if event.trip_id and event.user_id != event.post_author_id:
+            self._submit(self._apply_like, event.trip_id, event.occurred_at, True)
+
+    def subscribe(self, event_bus) -> None:
+        """在事件总线上订阅本处理器关心的事件"""
+        event_bus.subscribe('TemplatePublishedEvent', self.handle_template_published)
+        event_bus.subscribe('TripCreatedEvent', self.handle_trip_created)
+        event_bus.subscribe('TemplateClonedEvent', self.handle_template_cloned)
+        event_bus.subscribe('TripClonedEvent', self.handle_trip_cloned)
+        event_bus.subscribe('TemplateViewedEvent', self.handle_template_viewed)
+        event_bus.subscribe('TripViewedEvent', self.handle_trip_viewed)
+        event_bus.subscribe('PostLikedEvent', self.handle_post_liked)
+        event_bus.subscribe('PostUnlikedEvent', self.handle_post_unliked)
+
+    # ==================== 浏览合并 ====================
+
+    def flush_views(self) -> int:
+        """把缓冲的浏览信号写入热度行（每个对象一次读-改-写）
+
+        Returns:
+            写入的对象数
+        """
+        with self._views_lock:
+            pending, self._pending_views = self._pending_views, {}
+        if not pending:
+            return 0
+        session = self._session_factory()
+        try:
+            dao = SQLAlchemyPopularityDAO(session)
+            for (entity_type, entity_id), (count, at) in pending.items():
+                self.record(dao, entity_type, entity_id, PopularitySignal.VIEW, at, count=count)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            print(f"Error updating popularity (view): {e}")
+        finally:
+            session.close()
+        return len(pending)
+
+    def _buffer_view(
+        self,
+        entity_type: RankedEntityType,
+        entity_id: str,
+        viewer_id: Optional[str],
+        at: datetime
+    ) -> None:
+        # 匿名浏览无法区分来源，同一对象在窗口内只计一次
+        seen_key = (viewer_id, entity_type.value, entity_id)
+        with self._views_lock:
+            if self._seen_views.get(seen_key) is not None:
+                return
+            self._seen_views.set(seen_key, True)
+            is_first = not self._pending_views
+            count, _ = self._pending_views.get((entity_type, entity_id), (0, at))
+            self._pending_views[(entity_type, entity_id)] = (count + 1, at)
+        if is_first:
+            self._submit_later(self._view_flush_seconds, self.flush_views)
+
+    # ==================== 任务调度 ====================
+
+    def _submit(self, task: Callable[..., None], *args) -> None:
+        if self._task_queue is None:
+            task(*args)
+        else:
+            self._task_queue.submit(task, *args)
+
+    def _submit_later(self, delay_seconds: float, task: Callable[..., None]) -> None:
+        if self._task_queue is None:
+            task()
+        else:
+            self._task_queue.submit_later(delay_seconds, task)
+
+    # ==================== 分值更新 ====================
+
+    def _apply_like(self, trip_id: str, at: datetime, undo: bool) -> None:
+        session = self._session_factory()
+        try:
+            dao = SQLAlchemyPopularityDAO(session)
+            targets = [(RankedEntityType.TRIP, trip_id)] + [
+                (RankedEntityType.TEMPLATE, template_id)
+                for template_id in dao.find_template_ids_by_source_trip(trip_id)
+            ]
+            for entity_type, entity_id in targets:
+                self.record(dao, entity_type, entity_id, PopularitySignal.LIKE, at, undo=undo)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            print(f"Error updating popularity for trip {trip_id}: {e}")
+        finally:
+            session.close()
+
+    def _apply(self, entity_type: RankedEntityType, entity_id: str, signal: PopularitySignal, at: datetime) -> None:
+        session = self._session_factory()
+        try:
+            self.record(SQLAlchemyPopularityDAO(session), entity_type, entity_id, signal, at)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            print(f"Error updating popularity ({signal.value}): {e}")
+        finally:
+            session.close()
+
+    @staticmethod
+    def record(
+        dao: IPopularityDAO,
+        entity_type: RankedEntityType,
+        entity_id: str,
+        signal: PopularitySignal,
+        at: datetime,
+        undo: bool = False,
+        count: int = 1
+    ) -> Optional[PopularityScorePO]:
+        """对单个对象记录一个信号（读-改-写，行锁防止并发覆盖）
+
+        count 为同一时刻合并记录的信号个数（仅用于累加）。
+
+        Returns:
+            更新后的热度行；对象尚无热度行且信号不是发布时返回 None
+        """
+        score_po = dao.get(entity_type.value, entity_id, for_update=True)
+        now = datetime.utcnow()
+
+        if signal == PopularitySignal.CREATED:
+            if score_po is None:
+                base = PopularityService.signal_score(signal, at)
+                score_po = PopularityScorePO(
+                    entity_type=entity_type.value,
+                    entity_id=entity_id,
+                    score=base,
+                    base_score=base,
+                    clone_count=0,
+                    view_count=0,
+                    like_count=0,
+                    published_at=at,
+                    updated_at=now
+                )
+                dao.add(score_po)
+            return score_po
+
+        if score_po is None:
+            return None
+
+        counter = _COUNTERS[signal]
+        if undo:
+            if getattr(score_po, counter) <= 0:
+                return score_po
+            score_po.score = PopularityService.remove_signal(score_po.score, signal, at, score_po.base_score)
+            setattr(score_po, counter, getattr(score_po, counter) - 1)
+        else:
+            score_po.score = PopularityService.add_signal(score_po.score, signal, at, count)
+            setattr(score_po, counter, getattr(score_po, counter) + count)
+        score_po.updated_at = now
+        dao.flush()
+        return score_po
+
+
+_popularity_handler: Optional[PopularityHandler] = None
+
+
+def register_popularity_handlers() -> None:
+    """订阅热度相关的领域事件"""
+    global _popularity_handler
+    if _popularity_handler is None:
+        _popularity_handler = PopularityHandler(task_queue=get_background_task_queue())
+    _popularity_handler.subscribe(get_event_bus())
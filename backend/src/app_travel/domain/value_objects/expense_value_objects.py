@@ -42,6 +42,21 @@ class ExpenseCategory(Enum):
         raise ValueError(f"Unknown expense category: {category_str}")
 
 
+class SettlementMode(Enum):
+    """结算算法选择"""
+    AUTO = "auto"      # 按成员数与时间预算选择精确或贪心
+    EXACT = "exact"    # 精确（转账次数最少），不设时间预算
+    GREEDY = "greedy"  # 贪心（最快，转账次数不一定最少）
+    
+    @classmethod
+    def from_string(cls, mode_str: str) -> 'SettlementMode':
+        mode_str = mode_str.lower()
+        for mode in cls:
+            if mode.value == mode_str:
+                return mode
+        raise ValueError(f"Unknown settlement mode: {mode_str}")
+
+
 @dataclass(frozen=True)
 class ExpenseShare:
     """费用分摊明细值对象
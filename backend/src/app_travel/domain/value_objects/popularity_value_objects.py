@@ -0,0 +1,31 @@
+"""
+热度排行值对象
+"""
+from enum import Enum
+
+
+class RankedEntityType(Enum):
+    """参与热度排行的对象类型"""
+    TEMPLATE = "template"
+    TRIP = "trip"
+
+
+class PopularitySignal(Enum):
+    """热度信号"""
+    CREATED = "created"  # 发布/创建（新鲜度基线）
+    CLONE = "clone"
+    LIKE = "like"        # 关联游记被点赞
+    VIEW = "view"
+
+
+class RankingSort(Enum):
+    """列表排序方式"""
+    LATEST = "latest"
+    TRENDING = "trending"
+
+    @classmethod
+    def from_string(cls, value: str) -> 'RankingSort':
+        try:
+            return cls(value.lower())
+        except (AttributeError, ValueError):
+            raise ValueError(f"sort must be one of {', '.join(s.value for s in cls)}")
@@ -0,0 +1,23 @@
+"""
+Template summary read model
+
+The template gallery only shows card fields. TemplateSummary is built
+directly from a DAO projection, so listing never parses days_data_json
+or reconstitutes the TripTemplate aggregate.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Tuple
+
+
+@dataclass(frozen=True)
+class TemplateSummary:
+    """Template list card (read-only)"""
+    template_id: str
+    name: str
+    description: str
+    author_id: str
+    duration_days: int
+    tags: Tuple[str, ...]
+    activity_count: int
+    created_at: datetime
@@ -36,6 +36,7 @@ class TemplateActivityData:
     cost_amount: Optional[float]
     cost_currency: str
     notes: str  # Public notes only (sanitized)
+    start_time: Optional[str] = None  # "HH:MM" in the source trip; None for older templates
     
     def __post_init__(self):
         if not self.name:
@@ -44,15 +45,38 @@ class TemplateActivityData:
             raise ValueError("Duration cannot be negative")
 
 
+@dataclass(frozen=True)
+class TemplateTransitData:
+    """Computed transit leg carried over from the source trip
+    
+    Keyed by (from_location, to_location, transport_mode) so that clones
+    can reuse the route instead of asking the geo service again.
+    """
+    from_location: str
+    to_location: str
+    transport_mode: str
+    distance_meters: float
+    duration_seconds: int
+    polyline: Optional[str]
+    cost_amount: Optional[float]
+    cost_currency: str = "CNY"
+    fuel_cost: Optional[float] = None
+    toll_cost: Optional[float] = None
+    ticket_cost: Optional[float] = None
+
+
 @dataclass(frozen=True)
 class TemplateDayData:
     """Sanitized day data for templates"""
     day_number: int
     theme: Optional[str]
     activities: Tuple[TemplateActivityData, ...]
+    transits: Tuple[TemplateTransitData, ...] = ()
     
     def __post_init__(self):
         if self.day_number < 1:
             raise ValueError("Day number must be positive")
         if not isinstance(self.activities, tuple):
             object.__setattr__(self, 'activities', tuple(self.activities))
+        if not isinstance(self.transits, tuple):
+            object.__setattr__(self, 'transits', tuple(self.transits))
@@ -36,7 +36,7 @@ class RouteInfo:
     """
     distance_meters: float    # 距离（米）
     duration_seconds: int     # 耗时（秒）
-    polyline: Optional[str] = None  # 路线编码（可选，用于地图绘制）
+    polyline: Optional[str] = None  # 路线（可选，用于地图绘制）：高德 "lng,lat;..." 文本或其编码格式
     
     def __post_init__(self):
         if self.distance_meters < 0:
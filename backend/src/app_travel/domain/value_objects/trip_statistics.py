@@ -2,13 +2,29 @@
 旅行统计值对象
 
 包含旅行统计报表等值对象。
+- DayStatistics: 单日统计（统计投影按日增量维护）
+- TripStatistics: 整个旅行的统计报表，可由各日统计合并得到
+- TripStatisticsSummary: 列表卡片使用的统计摘要（不含地点明细）
 """
 from dataclasses import dataclass
-from typing import List
+from typing import List, Sequence
 
 from app_travel.domain.value_objects.travel_value_objects import Money, Location
 
 
+@dataclass(frozen=True)
+class DayStatistics:
+    """单日统计值对象"""
+    day_number: int
+    distance_meters: float
+    play_time_minutes: int
+    transit_time_minutes: int
+    activity_cost: Money
+    transit_cost: Money
+    activity_count: int
+    visited_locations: tuple = ()
+
+
 @dataclass(frozen=True)
 class TripStatistics:
     """旅行统计报表值对象
@@ -53,6 +69,28 @@ class TripStatistics:
         object.__setattr__(self, 'activity_count', activity_count)
         object.__setattr__(self, 'visited_locations', tuple(visited_locations))
     
+    @classmethod
+    def from_days(cls, days: Sequence[DayStatistics]) -> 'TripStatistics':
+        """按日程顺序合并各日统计"""
+        activity_cost = Money.zero()
+        transit_cost = Money.zero()
+        visited_locations: List[Location] = []
+        for day in days:
+            activity_cost = activity_cost + day.activity_cost
+            transit_cost = transit_cost + day.transit_cost
+            visited_locations.extend(day.visited_locations)
+        
+        return cls(
+            total_distance_meters=sum(d.distance_meters for d in days),
+            total_play_time_minutes=sum(d.play_time_minutes for d in days),
+            total_transit_time_minutes=sum(d.transit_time_minutes for d in days),
+            total_estimated_cost=activity_cost + transit_cost,
+            activity_cost=activity_cost,
+            transit_cost=transit_cost,
+            activity_count=sum(d.activity_count for d in days),
+            visited_locations=visited_locations
+        )
+    
     @property
     def total_distance_km(self) -> float:
         """获取总里程（公里）"""
@@ -131,3 +169,24 @@ class TripStatistics:
             f"花费={self.total_estimated_cost}, "
             f"打卡点={self.visited_location_count}个)"
         )
+
+
+@dataclass(frozen=True)
+class TripStatisticsSummary:
+    """旅行统计摘要（列表卡片使用）"""
+    total_distance_meters: float
+    total_play_time_minutes: int
+    total_transit_time_minutes: int
+    total_estimated_cost: Money
+    activity_count: int
+    unique_location_count: int
+    
+    def to_dict(self) -> dict:
+        return {
+            "total_distance_km": round(self.total_distance_meters / 1000, 2),
+            "total_play_time_minutes": self.total_play_time_minutes,
+            "total_transit_time_minutes": self.total_transit_time_minutes,
+            "total_estimated_cost": str(self.total_estimated_cost),
+            "activity_count": self.activity_count,
+            "unique_location_count": self.unique_location_count
+        }
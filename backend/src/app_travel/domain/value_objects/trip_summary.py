@@ -0,0 +1,49 @@
+"""
+旅行摘要读模型
+
+列表页（我的旅行、公开旅行）只展示旅行基本信息与成员，
+不需要日程/活动/交通。TripSummary 由 DAO 投影直接构建，
+避免为每个旅行还原完整的 Trip 聚合。
+"""
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Optional, Tuple
+
+from app_travel.domain.value_objects.travel_value_objects import (
+    Money, TripStatus, TripVisibility, MemberRole
+)
+
+
+@dataclass(frozen=True)
+class TripMemberSummary:
+    """旅行成员摘要"""
+    user_id: str
+    role: MemberRole
+    nickname: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class TripSummary:
+    """旅行摘要（只读）"""
+    trip_id: str
+    name: str
+    description: str
+    creator_id: str
+    start_date: date
+    end_date: date
+    budget: Optional[Money]
+    visibility: TripVisibility
+    status: TripStatus
+    cover_image_url: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+    days_count: int
+    members: Tuple[TripMemberSummary, ...] = ()
+
+    @property
+    def member_ids(self) -> Tuple[str, ...]:
+        return tuple(m.user_id for m in self.members)
+
+    @property
+    def member_count(self) -> int:
+        return len(self.members)
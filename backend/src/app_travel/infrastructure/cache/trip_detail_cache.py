@@ -0,0 +1,101 @@
+"""
+旅行详情响应缓存
+
+旅行详情（GET /api/travel/trips/<id>）读多写少，每次请求都还原完整聚合、
+查询成员用户信息并序列化全部日程，代价较高。
+
+- 缓存条目按 (trip_id, 版本) 存储，版本为旅行的 updated_at；
+  版本不一致即视为未命中，旧条目被覆盖
+- ETag 由 trip_id 与版本计算得出，客户端携带 If-None-Match 时
+  只需查询版本即可返回 304，不访问日程相关表
+- 订阅旅行领域事件主动失效；条目另有 TTL，成员用户名/头像的变化
+  最迟在 TTL 后反映到响应中
+"""
+import hashlib
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from shared.event_bus import get_event_bus
+from shared.infrastructure.ttl_cache import TTLCache
+
+
+DEFAULT_TTL_SECONDS = float(os.getenv("TRIP_DETAIL_CACHE_TTL", "300"))
+DEFAULT_MAX_SIZE = int(os.getenv("TRIP_DETAIL_CACHE_SIZE", "2000"))
+
+# 会改变旅行详情内容的领域事件
+TRIP_EVENT_TYPES = (
+    'TripUpdatedEvent',
+    'TripStartedEvent',
+    'TripCompletedEvent',
+    'TripCancelledEvent',
+    'TripMemberAddedEvent',
+    'TripMemberRemovedEvent',
+    'TripMemberRoleChangedEvent',
+    'ActivityAddedEvent',
+    'ActivityRemovedEvent',
+    'ActivityUpdatedEvent',
+    'ItineraryUpdatedEvent',
+    'DayNoteUpdatedEvent',
+    'TransitCalculatedEvent',
+)
+
+
+class TripDetailCache:
+    """旅行详情响应缓存"""
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS, max_size: int = DEFAULT_MAX_SIZE):
+        self._cache = TTLCache(ttl_seconds=ttl_seconds, max_size=max_size)
+
+    @staticmethod
+    def make_etag(trip_id: str, version: datetime, variant: str = '') -> str:
+        """根据 trip_id、版本与表示形式（字段选择等查询参数）计算 ETag（不含引号）"""
+        raw = f"{trip_id}:{version.isoformat()}"
+        if variant:
+            raw = f"{raw}:{variant}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def get(self, trip_id: str, version: datetime) -> Optional[Dict[str, Any]]:
+        """获取指定版本的序列化结果，版本不一致时返回 None"""
+        entry = self._cache.get(trip_id)
+        if entry is None:
+            return None
+        cached_version, payload = entry
+        if cached_version != version:
+            return None
+        return payload
+
+    def set(self, trip_id: str, version: datetime, payload: Dict[str, Any]) -> None:
+        self._cache.set(trip_id, (version, payload))
+
+    def invalidate(self, trip_id: str) -> None:
+        """使某个旅行的缓存失效"""
+        self._cache.delete(trip_id)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def handle_trip_event(self, event) -> None:
+        """旅行领域事件处理器"""
+        trip_id = getattr(event, 'trip_id', None)
+        if trip_id:
+            self.invalidate(trip_id)
+
+
+_trip_detail_cache: Optional[TripDetailCache] = None
+
+
+def get_trip_detail_cache() -> TripDetailCache:
+    """获取全局旅行详情缓存"""
+    global _trip_detail_cache
+    if _trip_detail_cache is None:
+        _trip_detail_cache = TripDetailCache()
+    return _trip_detail_cache
+
+
+def register_trip_detail_cache_handlers() -> None:
+    """订阅旅行领域事件，使缓存及时失效"""
+    event_bus = get_event_bus()
+    cache = get_trip_detail_cache()
+    for event_type in TRIP_EVENT_TYPES:
+        event_bus.subscribe(event_type, cache.handle_trip_event)
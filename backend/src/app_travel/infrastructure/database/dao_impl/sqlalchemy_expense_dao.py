@@ -2,61 +2,236 @@
 费用 DAO SQLAlchemy 实现
 
 使用 SQLAlchemy 实现费用数据访问。
+
+成员余额表 trip_member_balances 在 create/delete 中与费用同一事务内
+增量维护（UPDATE ... SET paid = paid + :delta），并发新增费用不会丢失更新。
+余额表引入前的历史行程没有余额行，首次写入时在同一事务内由聚合查询
+整体回填，而不是只写入本次增量。
 """
-from typing import List, Optional
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from shared.database.core import savepoint
 from app_travel.infrastructure.database.dao_interface.i_expense_dao import IExpenseDAO
 from app_travel.infrastructure.database.persistent_model.expense_po import (
-    ExpensePO, SettlementTransferPO
+    ExpensePO, ExpenseSharePO, SettlementTransferPO, TripMemberBalancePO
 )
 
+CENT = Decimal('0.01')
+
+
+def _to_decimal(value) -> Decimal:
+    """SUM 结果统一为两位小数的 Decimal（SQLite 下 SUM 可能返回浮点）"""
+    return Decimal(str(value or 0)).quantize(CENT)
+
 
 class SQLAlchemyExpenseDAO(IExpenseDAO):
     """费用 DAO SQLAlchemy 实现"""
-    
+
     def __init__(self, session: Session):
         self.session = session
-    
+
     def create(self, expense_po: ExpensePO) -> ExpensePO:
         """创建费用"""
         self.session.add(expense_po)
         self.session.flush()
+        self._maintain_balances(expense_po.trip_id, self._balance_deltas(expense_po))
         return expense_po
-    
+
     def get_by_id(self, expense_id: str) -> Optional[ExpensePO]:
         """根据ID获取费用"""
         return self.session.query(ExpensePO).filter(ExpensePO.id == expense_id).first()
-    
+
     def get_by_trip_id(self, trip_id: str) -> List[ExpensePO]:
         """获取行程的所有费用"""
         return self.session.query(ExpensePO).filter(
             ExpensePO.trip_id == trip_id
         ).order_by(ExpensePO.created_at.desc()).all()
-    
+
     def delete(self, expense_id: str) -> bool:
         """删除费用"""
         expense = self.get_by_id(expense_id)
         if expense:
+            deltas = {
+                user_id: (-paid, -owed)
+                for user_id, (paid, owed) in self._balance_deltas(expense).items()
+            }
             self.session.delete(expense)
             self.session.flush()
+            self._maintain_balances(expense.trip_id, deltas)
             return True
         return False
-    
+
+    def has_expenses(self, trip_id: str) -> bool:
+        """行程是否存在费用"""
+        return self.session.execute(
+            select(ExpensePO.id).where(ExpensePO.trip_id == trip_id).limit(1)
+        ).first() is not None
+
+    def get_latest_currency(self, trip_id: str) -> Optional[str]:
+        """获取行程最近一笔费用的货币"""
+        return self.session.execute(
+            select(ExpensePO.currency)
+            .where(ExpensePO.trip_id == trip_id)
+            .order_by(ExpensePO.created_at.desc())
+            .limit(1)
+        ).scalar()
+
+    def sum_by_category(self, trip_id: str) -> Dict[str, Decimal]:
+        """按分类汇总费用金额"""
+        rows = self.session.execute(
+            select(ExpensePO.category, func.sum(ExpensePO.amount))
+            .where(ExpensePO.trip_id == trip_id)
+            .group_by(ExpensePO.category)
+        ).all()
+        return {category: _to_decimal(total) for category, total in rows}
+
+    def sum_paid_by_payer(self, trip_id: str) -> Dict[str, Decimal]:
+        """按付款人汇总已付金额"""
+        rows = self.session.execute(
+            select(ExpensePO.payer_id, func.sum(ExpensePO.amount))
+            .where(ExpensePO.trip_id == trip_id)
+            .group_by(ExpensePO.payer_id)
+        ).all()
+        return {user_id: _to_decimal(total) for user_id, total in rows}
+
+    def sum_owed_by_user(self, trip_id: str) -> Dict[str, Decimal]:
+        """按分摊用户汇总应付金额"""
+        rows = self.session.execute(
+            select(ExpenseSharePO.user_id, func.sum(ExpenseSharePO.amount))
+            .join(ExpensePO, ExpensePO.id == ExpenseSharePO.expense_id)
+            .where(ExpensePO.trip_id == trip_id)
+            .group_by(ExpenseSharePO.user_id)
+        ).all()
+        return {user_id: _to_decimal(total) for user_id, total in rows}
+
+    def get_member_balances(self, trip_id: str) -> List[TripMemberBalancePO]:
+        """获取行程的成员余额行"""
+        return self.session.execute(
+            select(TripMemberBalancePO)
+            .where(TripMemberBalancePO.trip_id == trip_id)
+            .order_by(TripMemberBalancePO.user_id)
+            .execution_options(populate_existing=True)
+        ).scalars().all()
+
+    def has_member_balances(self, trip_id: str) -> bool:
+        """行程是否已有成员余额行"""
+        return self.session.execute(
+            select(TripMemberBalancePO.user_id).where(TripMemberBalancePO.trip_id == trip_id).limit(1)
+        ).first() is not None
+
+    def compute_member_balances(self, trip_id: str) -> List[TripMemberBalancePO]:
+        """由费用明细的聚合查询计算成员余额（不写入余额表）"""
+        paid = self.sum_paid_by_payer(trip_id)
+        owed = self.sum_owed_by_user(trip_id)
+        now = datetime.utcnow()
+        return [
+            TripMemberBalancePO(
+                trip_id=trip_id,
+                user_id=user_id,
+                paid=paid.get(user_id, Decimal('0')),
+                owed=owed.get(user_id, Decimal('0')),
+                updated_at=now
+            )
+            for user_id in sorted(set(paid) | set(owed))
+        ]
+
+    def rebuild_member_balances(self, trip_id: str) -> List[TripMemberBalancePO]:
+        """根据费用明细的聚合查询重建行程的成员余额行"""
+        self.session.execute(
+            delete(TripMemberBalancePO).where(TripMemberBalancePO.trip_id == trip_id),
+            execution_options={'synchronize_session': False}
+        )
+        self.session.add_all(self.compute_member_balances(trip_id))
+        self.session.flush()
+        return self.get_member_balances(trip_id)
+
     def create_settlement_transfer(self, transfer_po: SettlementTransferPO) -> SettlementTransferPO:
         """创建结算转账记录"""
         self.session.add(transfer_po)
         self.session.flush()
         return transfer_po
-    
+
     def get_settlement_transfers_by_trip_id(self, trip_id: str) -> List[SettlementTransferPO]:
         """获取行程的所有结算转账记录"""
         return self.session.query(SettlementTransferPO).filter(
             SettlementTransferPO.trip_id == trip_id
         ).order_by(SettlementTransferPO.created_at.desc()).all()
-    
+
     def update_settlement_transfer(self, transfer_po: SettlementTransferPO) -> SettlementTransferPO:
         """更新结算转账记录"""
         self.session.merge(transfer_po)
         self.session.flush()
         return transfer_po
+
+    # ==================== 成员余额维护 ====================
+
+    @staticmethod
+    def _balance_deltas(expense_po: ExpensePO) -> Dict[str, Tuple[Decimal, Decimal]]:
+        """一笔费用对各成员 (已付, 应付) 的影响"""
+        deltas: Dict[str, Tuple[Decimal, Decimal]] = {}
+        paid, owed = deltas.get(expense_po.payer_id, (Decimal('0'), Decimal('0')))
+        deltas[expense_po.payer_id] = (paid + Decimal(expense_po.amount), owed)
+        for share in expense_po.shares:
+            paid, owed = deltas.get(share.user_id, (Decimal('0'), Decimal('0')))
+            deltas[share.user_id] = (paid, owed + Decimal(share.amount))
+        return deltas
+
+    def _maintain_balances(self, trip_id: str, deltas: Dict[str, Tuple[Decimal, Decimal]]) -> None:
+        """费用变更（已 flush）后维护余额表
+
+        已有余额行时累加增量；没有余额行（历史行程或首笔费用）时由聚合查询
+        整体写入，聚合结果已包含本次变更。并发事务先完成回填时主键冲突，
+        此时对方的余额行已包含其可见的费用，改为累加本次增量。
+        """
+        if self.has_member_balances(trip_id):
+            self._apply_balance_deltas(trip_id, deltas)
+            return
+        try:
+            with savepoint(self.session):
+                self.session.add_all(self.compute_member_balances(trip_id))
+        except IntegrityError:
+            self._apply_balance_deltas(trip_id, deltas)
+
+    def _apply_balance_deltas(self, trip_id: str, deltas: Dict[str, Tuple[Decimal, Decimal]]) -> None:
+        """原子地累加成员余额，余额行不存在时插入"""
+        now = datetime.utcnow()
+        for user_id, (paid, owed) in deltas.items():
+            if self._increment_balance(trip_id, user_id, paid, owed, now):
+                continue
+            try:
+                with savepoint(self.session):
+                    self.session.add(TripMemberBalancePO(
+                        trip_id=trip_id, user_id=user_id, paid=paid, owed=owed, updated_at=now
+                    ))
+            except IntegrityError:
+                # 并发事务已插入该行，改为累加
+                self._increment_balance(trip_id, user_id, paid, owed, now)
+
+    def _increment_balance(
+        self,
+        trip_id: str,
+        user_id: str,
+        paid: Decimal,
+        owed: Decimal,
+        now: datetime
+    ) -> bool:
+        result = self.session.execute(
+            update(TripMemberBalancePO)
+            .where(
+                TripMemberBalancePO.trip_id == trip_id,
+                TripMemberBalancePO.user_id == user_id
+            )
+            .values(
+                paid=TripMemberBalancePO.paid + paid,
+                owed=TripMemberBalancePO.owed + owed,
+                updated_at=now
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount > 0
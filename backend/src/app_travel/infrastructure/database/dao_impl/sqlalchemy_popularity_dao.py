@@ -0,0 +1,39 @@
+"""
+热度排行 DAO SQLAlchemy 实现
+"""
+from typing import List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app_travel.infrastructure.database.dao_interface.i_popularity_dao import IPopularityDAO
+from app_travel.infrastructure.database.persistent_model.popularity_po import PopularityScorePO
+from app_travel.infrastructure.database.persistent_model.template_po import TripTemplatePO
+
+
+class SQLAlchemyPopularityDAO(IPopularityDAO):
+    """热度排行 DAO SQLAlchemy 实现"""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get(self, entity_type: str, entity_id: str, for_update: bool = False) -> Optional[PopularityScorePO]:
+        stmt = select(PopularityScorePO).where(
+            PopularityScorePO.entity_type == entity_type,
+            PopularityScorePO.entity_id == entity_id
+        )
+        if for_update:
+            stmt = stmt.with_for_update()
+        return self.session.execute(stmt).scalar_one_or_none()
+
+    def add(self, score_po: PopularityScorePO) -> None:
+        self.session.add(score_po)
+        self.session.flush()
+
+    def find_template_ids_by_source_trip(self, trip_id: str) -> List[str]:
+        return list(self.session.execute(
+            select(TripTemplatePO.id).where(TripTemplatePO.source_trip_id == trip_id)
+        ).scalars().all())
+
+    def flush(self) -> None:
+        self.session.flush()
@@ -1,32 +1,40 @@
 """
 SQLAlchemy implementation of template DAO
+
+Keyword and tag filters go through the trip_template_search_terms and
+trip_template_tags index tables instead of LIKE scans over text columns.
+Trending pages walk the popularity_scores rank index.
 """
-from typing import List, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, desc
+from typing import List, Optional, Tuple
+from sqlalchemy.orm import Session, defer
+from sqlalchemy import and_, desc, false, func, select
 
 from app_travel.infrastructure.database.dao_interface.i_template_dao import ITemplateDAO
-from app_travel.infrastructure.database.persistent_model.template_po import TripTemplatePO
+from app_travel.infrastructure.database.persistent_model.template_po import (
+    TripTemplatePO, TripTemplateTagPO, TripTemplateSearchTermPO
+)
+from app_travel.infrastructure.database.persistent_model.popularity_po import PopularityScorePO
+from shared.infrastructure.text_search import normalize_tag, query_terms
 
 
 class SQLAlchemyTemplateDAO(ITemplateDAO):
     """SQLAlchemy implementation of template DAO"""
-    
+
     def __init__(self, session: Session):
         self._session = session
-    
+
     def create(self, template_po: TripTemplatePO) -> TripTemplatePO:
         """Create a new template"""
         self._session.add(template_po)
         self._session.flush()
         return template_po
-    
+
     def get_by_id(self, template_id: str) -> Optional[TripTemplatePO]:
         """Get template by ID"""
         return self._session.query(TripTemplatePO).filter(
             TripTemplatePO.id == template_id
         ).first()
-    
+
     def list_all(
         self,
         limit: int = 20,
@@ -35,56 +43,66 @@ class SQLAlchemyTemplateDAO(ITemplateDAO):
         tag: Optional[str] = None
     ) -> List[TripTemplatePO]:
         """List templates with optional filters"""
-        query = self._session.query(TripTemplatePO)
-        
-        # Apply keyword filter
-        if keyword:
-            search_pattern = f"%{keyword}%"
-            query = query.filter(
-                or_(
-                    TripTemplatePO.name.like(search_pattern),
-                    TripTemplatePO.description.like(search_pattern)
-                )
-            )
-        
-        # Apply tag filter
-        if tag:
-            tag_pattern = f'%"{tag}"%'
-            query = query.filter(TripTemplatePO.tags_json.like(tag_pattern))
-        
-        # Order by creation time descending
-        query = query.order_by(desc(TripTemplatePO.created_at))
-        
-        # Apply pagination
-        query = query.limit(limit).offset(offset)
-        
-        return query.all()
-    
+        stmt = self._filtered(select(TripTemplatePO), keyword, tag)
+        stmt = stmt.order_by(desc(TripTemplatePO.created_at), TripTemplatePO.id).limit(limit).offset(offset)
+        return list(self._session.execute(stmt).scalars().all())
+
     def count_all(
         self,
         keyword: Optional[str] = None,
         tag: Optional[str] = None
     ) -> int:
         """Count templates with optional filters"""
-        query = self._session.query(TripTemplatePO)
-        
-        # Apply keyword filter
-        if keyword:
-            search_pattern = f"%{keyword}%"
-            query = query.filter(
-                or_(
-                    TripTemplatePO.name.like(search_pattern),
-                    TripTemplatePO.description.like(search_pattern)
-                )
+        stmt = self._filtered(select(func.count(TripTemplatePO.id)), keyword, tag)
+        return self._session.execute(stmt).scalar() or 0
+
+    def list_page(
+        self,
+        limit: int = 20,
+        offset: int = 0,
+        keyword: Optional[str] = None,
+        tag: Optional[str] = None,
+        trending: bool = False
+    ) -> Tuple[List[TripTemplatePO], int]:
+        """List one page of templates together with the total count
+
+        The total is computed by a COUNT(*) OVER () window in the same
+        query; only an empty page past the end needs a separate count.
+        Trending pages are read in rank-index order and counted separately,
+        so the page query stops after limit + offset index entries.
+        """
+        if trending:
+            stmt = self._filtered(self._ranked(select(TripTemplatePO)), keyword, tag)
+            stmt = (
+                stmt.options(defer(TripTemplatePO.days_data_json))
+                .order_by(desc(PopularityScorePO.score), desc(PopularityScorePO.entity_id))
+                .limit(limit)
+                .offset(offset)
             )
-        
-        # Apply tag filter
-        if tag:
-            tag_pattern = f'%"{tag}"%'
-            query = query.filter(TripTemplatePO.tags_json.like(tag_pattern))
-        
-        return query.count()
-    
+            rows = list(self._session.execute(stmt).scalars().all())
+            count = self._filtered(
+                self._ranked(select(func.count(TripTemplatePO.id))), keyword, tag
+            )
+            return rows, self._session.execute(count).scalar() or 0
+
+        stmt = self._filtered(
+            select(TripTemplatePO, func.count().over().label('total')),
+            keyword,
+            tag
+        )
+        stmt = (
+            stmt.options(defer(TripTemplatePO.days_data_json))
+            .order_by(desc(TripTemplatePO.created_at), TripTemplatePO.id)
+            .limit(limit)
+            .offset(offset)
+        )
+        rows = self._session.execute(stmt).all()
+        if rows:
+            return [row[0] for row in rows], rows[0][1]
+        if offset > 0:
+            return [], self.count_all(keyword=keyword, tag=tag)
+        return [], 0
+
     def delete(self, template_id: str) -> bool:
         """Delete template by ID"""
         template = self.get_by_id(template_id)
@@ -93,3 +111,36 @@ class SQLAlchemyTemplateDAO(ITemplateDAO):
             self._session.flush()
             return True
         return False
+
+    @staticmethod
+    def _ranked(stmt):
+        """Restrict to templates that have a popularity row (joined for ordering)"""
+        return stmt.join(PopularityScorePO, and_(
+            PopularityScorePO.entity_type == 'template',
+            PopularityScorePO.entity_id == TripTemplatePO.id
+        ))
+
+    @staticmethod
+    def _filtered(stmt, keyword: Optional[str], tag: Optional[str]):
+        """Apply keyword (all terms must match) and tag filters via the index tables"""
+        if keyword:
+            terms = query_terms(keyword)
+            if not terms:
+                # Keyword has no searchable characters: nothing can match
+                return stmt.where(false())
+            for term, prefix in terms:
+                # Word terms are [0-9a-z] only, safe to use as a LIKE prefix
+                condition = (
+                    TripTemplateSearchTermPO.term.like(f"{term}%")
+                    if prefix else TripTemplateSearchTermPO.term == term
+                )
+                stmt = stmt.where(TripTemplatePO.id.in_(
+                    select(TripTemplateSearchTermPO.template_id).where(condition)
+                ))
+
+        if tag:
+            stmt = stmt.where(TripTemplatePO.id.in_(
+                select(TripTemplateTagPO.template_id).where(TripTemplateTagPO.tag == normalize_tag(tag))
+            ))
+
+        return stmt
@@ -1,18 +1,67 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import select, delete, desc, and_, or_, exists
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy import select, delete, desc, and_, or_, exists, func, insert, inspect
 
+from shared.database.core import savepoint
+from app_travel.domain.demand_interface.i_trip_repository import TripConcurrencyError
 from app_travel.infrastructure.database.dao_interface.i_trip_dao import ITripDao
-from app_travel.infrastructure.database.persistent_model.trip_po import TripPO, TripMemberPO
+from app_travel.infrastructure.database.persistent_model.trip_po import (
+    TripPO, TripMemberPO, TripDayPO, ActivityPO, TransitPO
+)
+from app_travel.infrastructure.database.persistent_model.popularity_po import PopularityScorePO
+
+# 加载策略：完整聚合加载时，每层关联一条 selectin 查询，
+# 查询数固定（旅行 + 成员 + 日程 + 活动 + 交通 = 5），与日程天数无关
+TRIP_LOAD_PROFILES = {
+    # 还原完整 Trip 聚合（to_domain / 保存前加载）
+    'full': (
+        selectinload(TripPO.members),
+        selectinload(TripPO.days).selectinload(TripDayPO.activities),
+        selectinload(TripPO.days).selectinload(TripDayPO.transits),
+    ),
+    # 只需要成员（权限判断等）
+    'members': (
+        selectinload(TripPO.members),
+    ),
+    # 不预加载，关联按需懒加载
+    'lazy': (),
+}
+
 
 class SqlAlchemyTripDao(ITripDao):
     """基于 SQLAlchemy 的旅行 DAO 实现"""
 
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, load_profile: str = 'full'):
+        """
+        Args:
+            session: 数据库会话
+            load_profile: 默认加载策略，见 TRIP_LOAD_PROFILES
+        """
         self.session = session
+        self._default_profile = self._resolve_profile(load_profile)
+
+    @staticmethod
+    def _resolve_profile(load_profile: str):
+        if load_profile not in TRIP_LOAD_PROFILES:
+            raise ValueError(f"Unknown trip load profile: {load_profile}")
+        return TRIP_LOAD_PROFILES[load_profile]
 
-    def find_by_id(self, trip_id: str) -> Optional[TripPO]:
-        stmt = select(TripPO).where(TripPO.id == trip_id)
+    def _with_profile(self, stmt, load_profile: Optional[str] = None):
+        options = self._resolve_profile(load_profile) if load_profile else self._default_profile
+        return stmt.options(*options) if options else stmt
+
+    def find_by_id(
+        self,
+        trip_id: str,
+        load_profile: Optional[str] = None,
+        refresh: bool = False
+    ) -> Optional[TripPO]:
+        stmt = self._with_profile(select(TripPO).where(TripPO.id == trip_id), load_profile)
+        if refresh:
+            stmt = stmt.execution_options(populate_existing=True)
         return self.session.execute(stmt).scalars().first()
 
     def find_by_member(self, user_id: str, status: Optional[str] = None) -> List[TripPO]:
@@ -26,7 +75,7 @@ class SqlAlchemyTripDao(ITripDao):
         if status:
             stmt = stmt.where(TripPO.status == status)
             
-        stmt = stmt.order_by(desc(TripPO.start_date))
+        stmt = self._with_profile(stmt.order_by(desc(TripPO.start_date)))
         return list(self.session.execute(stmt).scalars().all())
 
     def find_by_creator(self, creator_id: str) -> List[TripPO]:
@@ -35,10 +84,75 @@ class SqlAlchemyTripDao(ITripDao):
             .where(TripPO.creator_id == creator_id)
             .order_by(desc(TripPO.created_at))
         )
+        stmt = self._with_profile(stmt)
         return list(self.session.execute(stmt).scalars().all())
 
     def find_public(self, limit: int = 20, offset: int = 0, search_query: Optional[str] = None) -> List[TripPO]:
-        stmt = select(TripPO).where(TripPO.visibility == 'public')
+        stmt = self._public_filter(select(TripPO), search_query)
+        stmt = (
+            stmt.order_by(desc(TripPO.created_at))
+            .limit(limit)
+            .offset(offset)
+        )
+        stmt = self._with_profile(stmt)
+        return list(self.session.execute(stmt).scalars().all())
+
+    # ==================== 摘要投影 ====================
+
+    def find_summaries_by_member(self, user_id: str, status: Optional[str] = None) -> List[Tuple[TripPO, int]]:
+        stmt = (
+            self._summary_select()
+            .join(TripMemberPO, TripMemberPO.trip_id == TripPO.id)
+            .where(TripMemberPO.user_id == user_id)
+        )
+        if status:
+            stmt = stmt.where(TripPO.status == status)
+        return self._fetch_summaries(stmt.order_by(desc(TripPO.start_date)))
+
+    def find_summaries_by_creator(self, creator_id: str) -> List[Tuple[TripPO, int]]:
+        stmt = (
+            self._summary_select()
+            .where(TripPO.creator_id == creator_id)
+            .order_by(desc(TripPO.created_at))
+        )
+        return self._fetch_summaries(stmt)
+
+    def find_public_summaries(
+        self,
+        limit: int = 20,
+        offset: int = 0,
+        search_query: Optional[str] = None,
+        trending: bool = False
+    ) -> List[Tuple[TripPO, int]]:
+        stmt = self._public_filter(self._summary_select(), search_query)
+        if trending:
+            # 沿热度排行索引读取，只关联一页的旅行
+            stmt = stmt.join(PopularityScorePO, and_(
+                PopularityScorePO.entity_type == 'trip',
+                PopularityScorePO.entity_id == TripPO.id
+            )).order_by(desc(PopularityScorePO.score), desc(PopularityScorePO.entity_id))
+        else:
+            stmt = stmt.order_by(desc(TripPO.created_at))
+        stmt = stmt.limit(limit).offset(offset)
+        return self._fetch_summaries(stmt)
+
+    @staticmethod
+    def _summary_select():
+        """旅行列 + 日程天数（关联子查询），成员通过 selectinload 一次性加载"""
+        days_count = (
+            select(func.count(TripDayPO.id))
+            .where(TripDayPO.trip_id == TripPO.id)
+            .correlate(TripPO)
+            .scalar_subquery()
+        )
+        return select(TripPO, days_count).options(selectinload(TripPO.members))
+
+    def _fetch_summaries(self, stmt) -> List[Tuple[TripPO, int]]:
+        return [(row[0], row[1]) for row in self.session.execute(stmt).all()]
+
+    @staticmethod
+    def _public_filter(stmt, search_query: Optional[str]):
+        stmt = stmt.where(TripPO.visibility == 'public')
         
         if search_query:
             search_pattern = f"%{search_query}%"
@@ -48,22 +162,87 @@ class SqlAlchemyTripDao(ITripDao):
                     TripPO.description.ilike(search_pattern)
                 )
             )
-            
+        return stmt
+
+    def find_day(self, trip_id: str, day_number: int) -> Optional[TripDayPO]:
         stmt = (
-            stmt.order_by(desc(TripPO.created_at))
-            .limit(limit)
-            .offset(offset)
+            select(TripDayPO)
+            .where(TripDayPO.trip_id == trip_id, TripDayPO.day_number == day_number)
+            .options(selectinload(TripDayPO.activities), selectinload(TripDayPO.transits))
         )
-        return list(self.session.execute(stmt).scalars().all())
+        return self.session.execute(stmt).scalars().first()
 
     def add(self, trip_po: TripPO) -> None:
         self.session.add(trip_po)
         self.session.flush()
 
+    def bulk_insert(self, trip_po: TripPO) -> None:
+        now = datetime.utcnow()
+        trip_po.version = 1
+        trip_po.created_at = trip_po.created_at or now
+        trip_po.updated_at = trip_po.updated_at or now
+        
+        self._insert_rows(TripPO, [trip_po])
+        self._insert_rows(TripMemberPO, trip_po.members, trip_id=trip_po.id)
+        self._insert_rows(TripDayPO, trip_po.days, trip_id=trip_po.id)
+        if not trip_po.days:
+            return
+        
+        # 日程主键自增：插入后按日序号一次查回
+        day_ids = dict(self.session.execute(
+            select(TripDayPO.day_number, TripDayPO.id).where(TripDayPO.trip_id == trip_po.id)
+        ).all())
+        activities = []
+        transits = []
+        for day_po in trip_po.days:
+            day_id = day_ids[day_po.day_number]
+            activities.extend((po, day_id) for po in day_po.activities)
+            transits.extend((po, day_id) for po in day_po.transits)
+        self._insert_rows(ActivityPO, [po for po, _ in activities], trip_day_id=[d for _, d in activities])
+        self._insert_rows(TransitPO, [po for po, _ in transits], trip_day_id=[d for _, d in transits])
+    
+    def _insert_rows(self, po_class, pos, **overrides) -> None:
+        """以一条多行 INSERT 写入持久化对象的列值
+        
+        未赋值且有默认值（或自增主键）的列交给数据库/列默认值处理，
+        其余列即使为 None 也写入，保证同一批次各行的列集合一致。
+        overrides 的值为单个值（所有行相同）或与 pos 等长的列表。
+        """
+        if not pos:
+            return
+        defaulted = {
+            attr.key
+            for attr in inspect(po_class).column_attrs
+            if attr.columns[0].default is not None
+            or attr.columns[0].server_default is not None
+            or attr.columns[0].primary_key
+        }
+        columns = [attr.key for attr in inspect(po_class).column_attrs]
+        rows = []
+        for i, po in enumerate(pos):
+            row = {
+                key: po.__dict__.get(key)
+                for key in columns
+                if key not in defaulted or po.__dict__.get(key) is not None
+            }
+            for key, value in overrides.items():
+                row[key] = value[i] if isinstance(value, list) else value
+            rows.append(row)
+        self.session.execute(insert(po_class), rows)
+    
     def update(self, trip_po: TripPO) -> None:
         self.session.merge(trip_po)
         self.session.flush()
 
+    @contextmanager
+    def version_guard(self, trip_id: str, expected_version: Optional[int]) -> Iterator[None]:
+        # 只回滚保存点，不结束调用方（请求）的事务
+        try:
+            with savepoint(self.session):
+                yield
+        except StaleDataError:
+            raise TripConcurrencyError(trip_id, expected_version)
+
     def delete(self, trip_id: str) -> None:
         stmt = delete(TripPO).where(TripPO.id == trip_id)
         self.session.execute(stmt)
@@ -72,3 +251,7 @@ class SqlAlchemyTripDao(ITripDao):
     def exists(self, trip_id: str) -> bool:
         stmt = select(exists().where(TripPO.id == trip_id))
         return self.session.execute(stmt).scalar()
+
+    def find_version(self, trip_id: str) -> Optional[datetime]:
+        stmt = select(TripPO.updated_at).where(TripPO.id == trip_id)
+        return self.session.execute(stmt).scalar()
@@ -0,0 +1,53 @@
+from typing import List, Optional
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import select, delete
+
+from app_travel.infrastructure.database.dao_interface.i_trip_statistics_dao import ITripStatisticsDao
+from app_travel.infrastructure.database.persistent_model.trip_po import TripPO
+from app_travel.infrastructure.database.persistent_model.trip_statistics_po import (
+    TripStatisticsPO, TripDayStatisticsPO
+)
+
+
+class SqlAlchemyTripStatisticsDao(ITripStatisticsDao):
+    """基于 SQLAlchemy 的旅行统计投影 DAO 实现"""
+
+    # 单条 IN 查询的最大参数个数
+    CHUNK_SIZE = 500
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def find_by_trip_id(self, trip_id: str) -> Optional[TripStatisticsPO]:
+        stmt = (
+            select(TripStatisticsPO)
+            .where(TripStatisticsPO.trip_id == trip_id)
+            .options(selectinload(TripStatisticsPO.days))
+        )
+        return self.session.execute(stmt).scalars().first()
+
+    def find_current_by_trip_ids(self, trip_ids: List[str]) -> List[TripStatisticsPO]:
+        trip_ids = list(dict.fromkeys(trip_ids))
+        result = []
+        for i in range(0, len(trip_ids), self.CHUNK_SIZE):
+            chunk = trip_ids[i:i + self.CHUNK_SIZE]
+            stmt = (
+                select(TripStatisticsPO)
+                .join(TripPO, TripPO.id == TripStatisticsPO.trip_id)
+                .where(TripStatisticsPO.trip_id.in_(chunk))
+                .where(TripStatisticsPO.version == TripPO.updated_at)
+            )
+            result.extend(self.session.execute(stmt).scalars().all())
+        return result
+
+    def add(self, statistics_po: TripStatisticsPO) -> None:
+        self.session.add(statistics_po)
+        self.session.flush()
+
+    def flush(self) -> None:
+        self.session.flush()
+
+    def delete(self, trip_id: str) -> None:
+        self.session.execute(delete(TripDayStatisticsPO).where(TripDayStatisticsPO.trip_id == trip_id))
+        self.session.execute(delete(TripStatisticsPO).where(TripStatisticsPO.trip_id == trip_id))
+        self.session.flush()
@@ -4,10 +4,11 @@
 定义费用数据访问对象的接口。
 """
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from decimal import Decimal
+from typing import Dict, List, Optional
 
 from app_travel.infrastructure.database.persistent_model.expense_po import (
-    ExpensePO, SettlementTransferPO
+    ExpensePO, SettlementTransferPO, TripMemberBalancePO
 )
 
 
@@ -16,7 +17,7 @@ class IExpenseDAO(ABC):
     
     @abstractmethod
     def create(self, expense_po: ExpensePO) -> ExpensePO:
-        """创建费用"""
+        """创建费用（同时增量更新成员余额表）"""
         pass
     
     @abstractmethod
@@ -31,7 +32,65 @@ class IExpenseDAO(ABC):
     
     @abstractmethod
     def delete(self, expense_id: str) -> bool:
-        """删除费用"""
+        """删除费用（同时回退成员余额表）"""
+        pass
+    
+    @abstractmethod
+    def has_expenses(self, trip_id: str) -> bool:
+        """行程是否存在费用"""
+        pass
+    
+    @abstractmethod
+    def get_latest_currency(self, trip_id: str) -> Optional[str]:
+        """获取行程最近一笔费用的货币"""
+        pass
+    
+    @abstractmethod
+    def sum_by_category(self, trip_id: str) -> Dict[str, Decimal]:
+        """按分类汇总费用金额（GROUP BY category）
+        
+        Returns:
+            分类 -> 金额
+        """
+        pass
+    
+    @abstractmethod
+    def sum_paid_by_payer(self, trip_id: str) -> Dict[str, Decimal]:
+        """按付款人汇总已付金额（GROUP BY payer_id）"""
+        pass
+    
+    @abstractmethod
+    def sum_owed_by_user(self, trip_id: str) -> Dict[str, Decimal]:
+        """按分摊用户汇总应付金额（GROUP BY expense_shares.user_id）"""
+        pass
+    
+    @abstractmethod
+    def get_member_balances(self, trip_id: str) -> List[TripMemberBalancePO]:
+        """获取行程的成员余额行（每位成员一行）"""
+        pass
+    
+    @abstractmethod
+    def has_member_balances(self, trip_id: str) -> bool:
+        """行程是否已有成员余额行"""
+        pass
+    
+    @abstractmethod
+    def compute_member_balances(self, trip_id: str) -> List[TripMemberBalancePO]:
+        """由费用明细的聚合查询计算成员余额（不写入余额表）
+        
+        用于尚未回填余额表的历史行程的只读查询。
+        """
+        pass
+    
+    @abstractmethod
+    def rebuild_member_balances(self, trip_id: str) -> List[TripMemberBalancePO]:
+        """根据费用明细的聚合查询重建行程的成员余额行
+        
+        用于历史数据回填或修复。
+        
+        Returns:
+            重建后的余额行
+        """
         pass
     
     @abstractmethod
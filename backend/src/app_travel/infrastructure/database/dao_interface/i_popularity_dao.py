@@ -0,0 +1,39 @@
+"""
+热度排行 DAO 接口
+
+定义热度分值持久化对象的数据访问操作。
+"""
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+from app_travel.infrastructure.database.persistent_model.popularity_po import PopularityScorePO
+
+
+class IPopularityDAO(ABC):
+    """热度排行 DAO 接口"""
+
+    @abstractmethod
+    def get(self, entity_type: str, entity_id: str, for_update: bool = False) -> Optional[PopularityScorePO]:
+        """获取热度行
+
+        Args:
+            entity_type: 对象类型（template / trip）
+            entity_id: 对象ID
+            for_update: 是否加行锁（读-改-写时使用）
+        """
+        pass
+
+    @abstractmethod
+    def add(self, score_po: PopularityScorePO) -> None:
+        """新增热度行"""
+        pass
+
+    @abstractmethod
+    def find_template_ids_by_source_trip(self, trip_id: str) -> List[str]:
+        """查找由某个旅行发布的模板ID（游记点赞同时计入这些模板）"""
+        pass
+
+    @abstractmethod
+    def flush(self) -> None:
+        """将修改写入数据库"""
+        pass
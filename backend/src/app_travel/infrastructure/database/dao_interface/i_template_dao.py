@@ -2,7 +2,7 @@
 Template DAO interface
 """
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from app_travel.infrastructure.database.persistent_model.template_po import TripTemplatePO
 
 
@@ -39,6 +39,26 @@ class ITemplateDAO(ABC):
         """Count templates with optional filters"""
         pass
     
+    @abstractmethod
+    def list_page(
+        self,
+        limit: int = 20,
+        offset: int = 0,
+        keyword: Optional[str] = None,
+        tag: Optional[str] = None,
+        trending: bool = False
+    ) -> Tuple[List[TripTemplatePO], int]:
+        """List one page of templates for list cards together with the total count
+        
+        days_data_json is not loaded for the returned rows. Pages are ordered
+        by newest first, or by popularity score when trending is set (templates
+        without a popularity row are not listed then).
+        
+        Returns:
+            (page rows, total matching templates)
+        """
+        pass
+    
     @abstractmethod
     def delete(self, template_id: str) -> bool:
         """Delete template by ID"""
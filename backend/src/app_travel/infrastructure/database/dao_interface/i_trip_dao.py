@@ -4,20 +4,28 @@
 定义旅行持久化对象的数据访问操作。
 """
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from datetime import datetime
+from typing import ContextManager, List, Optional, Tuple
 
-from app_travel.infrastructure.database.persistent_model.trip_po import TripPO
+from app_travel.infrastructure.database.persistent_model.trip_po import TripPO, TripDayPO
 
 
 class ITripDao(ABC):
     """旅行数据访问对象接口"""
     
     @abstractmethod
-    def find_by_id(self, trip_id: str) -> Optional[TripPO]:
+    def find_by_id(
+        self,
+        trip_id: str,
+        load_profile: Optional[str] = None,
+        refresh: bool = False
+    ) -> Optional[TripPO]:
         """根据ID查找旅行
         
         Args:
             trip_id: 旅行ID
+            load_profile: 关联加载策略（如 'full'、'members'、'lazy'），None 使用默认策略
+            refresh: 会话中已加载的对象也用数据库中的最新值覆盖（保存前校验版本号）
             
         Returns:
             旅行持久化对象，不存在则返回 None
@@ -63,6 +71,65 @@ class ITripDao(ABC):
         """
         pass
     
+    @abstractmethod
+    def find_summaries_by_member(self, user_id: str, status: Optional[str] = None) -> List[Tuple[TripPO, int]]:
+        """查找用户参与的旅行摘要（不加载日程）
+        
+        Args:
+            user_id: 用户ID
+            status: 可选的状态筛选
+            
+        Returns:
+            (旅行持久化对象（已加载成员）, 日程天数) 列表
+        """
+        pass
+    
+    @abstractmethod
+    def find_summaries_by_creator(self, creator_id: str) -> List[Tuple[TripPO, int]]:
+        """查找用户创建的旅行摘要（不加载日程）
+        
+        Args:
+            creator_id: 创建者ID
+            
+        Returns:
+            (旅行持久化对象（已加载成员）, 日程天数) 列表
+        """
+        pass
+    
+    @abstractmethod
+    def find_public_summaries(
+        self,
+        limit: int = 20,
+        offset: int = 0,
+        search_query: Optional[str] = None,
+        trending: bool = False
+    ) -> List[Tuple[TripPO, int]]:
+        """查找公开的旅行摘要（不加载日程）
+        
+        Args:
+            limit: 每页数量
+            offset: 偏移量
+            search_query: 搜索关键词
+            trending: 按热度排序（没有热度记录的旅行不在结果中），默认按创建时间倒序
+            
+        Returns:
+            (旅行持久化对象（已加载成员）, 日程天数) 列表
+        """
+        pass
+    
+    @abstractmethod
+    def find_day(self, trip_id: str, day_number: int) -> Optional[TripDayPO]:
+        """查找单个日程（预加载活动与交通）
+        
+        Args:
+            trip_id: 旅行ID
+            day_number: 日程序号（从1开始）
+            
+        Returns:
+            日程持久化对象，不存在则返回 None
+        """
+        pass
+    
     @abstractmethod
     def add(self, trip_po: TripPO) -> None:
         """添加旅行
@@ -72,15 +139,45 @@ class ITripDao(ABC):
         """
         pass
     
+    @abstractmethod
+    def bulk_insert(self, trip_po: TripPO) -> None:
+        """批量插入新旅行及其成员、日程、活动、交通
+        
+        每张表一条多行 INSERT，语句数与天数、活动数无关。
+        trip_po 不加入会话，插入后回填 version 与 updated_at。
+        
+        Args:
+            trip_po: 新旅行持久化对象（含子对象）
+        """
+        pass
+    
     @abstractmethod
     def update(self, trip_po: TripPO) -> None:
-        """更新旅行
+        """更新旅行（按版本号校验）
+        
+        应在 version_guard 内修改 trip_po 并调用。
         
         Args:
             trip_po: 旅行持久化对象
         """
         pass
     
+    @abstractmethod
+    def version_guard(self, trip_id: str, expected_version: Optional[int]) -> ContextManager[None]:
+        """在保存点内修改并写入旅行
+        
+        版本号冲突时只回滚保存点（调用方事务中的其他修改保留，保存点内修改过的
+        对象过期，重新加载即为最新数据）。
+        
+        Args:
+            trip_id: 旅行ID
+            expected_version: 加载聚合时的版本号
+            
+        Raises:
+            TripConcurrencyError: 数据库中的版本号已变化
+        """
+        pass
+    
     @abstractmethod
     def delete(self, trip_id: str) -> None:
         """删除旅行
@@ -101,3 +198,15 @@ class ITripDao(ABC):
             是否存在
         """
         pass
+    
+    @abstractmethod
+    def find_version(self, trip_id: str) -> Optional[datetime]:
+        """查询旅行版本（updated_at），只访问 trips 表
+        
+        Args:
+            trip_id: 旅行ID
+            
+        Returns:
+            版本时间戳，不存在则返回 None
+        """
+        pass
@@ -0,0 +1,60 @@
+"""
+旅行统计投影 DAO 接口
+
+定义旅行统计投影持久化对象的数据访问操作。
+"""
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+from app_travel.infrastructure.database.persistent_model.trip_statistics_po import TripStatisticsPO
+
+
+class ITripStatisticsDao(ABC):
+    """旅行统计投影数据访问对象接口"""
+    
+    @abstractmethod
+    def find_by_trip_id(self, trip_id: str) -> Optional[TripStatisticsPO]:
+        """根据旅行ID查找统计投影（含按日统计）
+        
+        Args:
+            trip_id: 旅行ID
+            
+        Returns:
+            统计投影持久化对象，不存在则返回 None
+        """
+        pass
+    
+    @abstractmethod
+    def find_current_by_trip_ids(self, trip_ids: List[str]) -> List[TripStatisticsPO]:
+        """批量查找与旅行当前版本一致的统计汇总（不加载按日统计）
+        
+        Args:
+            trip_ids: 旅行ID列表
+            
+        Returns:
+            统计投影持久化对象列表，过期或不存在的旅行不在结果中
+        """
+        pass
+    
+    @abstractmethod
+    def add(self, statistics_po: TripStatisticsPO) -> None:
+        """添加统计投影
+        
+        Args:
+            statistics_po: 统计投影持久化对象
+        """
+        pass
+    
+    @abstractmethod
+    def flush(self) -> None:
+        """将已修改的统计投影写入数据库"""
+        pass
+    
+    @abstractmethod
+    def delete(self, trip_id: str) -> None:
+        """删除旅行的统计投影
+        
+        Args:
+            trip_id: 旅行ID
+        """
+        pass
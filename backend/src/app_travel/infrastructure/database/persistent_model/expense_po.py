@@ -2,13 +2,13 @@
 费用相关持久化对象 (PO - Persistent Object)
 
 用于 SQLAlchemy ORM 映射，与数据库表对应。
-包含 ExpensePO, ExpenseSharePO, SettlementTransferPO。
+包含 ExpensePO, ExpenseSharePO, SettlementTransferPO, TripMemberBalancePO。
 """
 from datetime import datetime
 from decimal import Decimal
 from typing import List
 
-from sqlalchemy import Column, String, DateTime, Text, Boolean, ForeignKey, Integer, Numeric
+from sqlalchemy import Column, String, DateTime, Text, Boolean, ForeignKey, Integer, Numeric, PrimaryKeyConstraint
 from sqlalchemy.orm import relationship
 from shared.database.core import Base
 
@@ -147,3 +147,27 @@ class SettlementTransferPO(Base):
             is_settled=transfer.is_settled,
             settled_at=datetime.utcnow() if transfer.is_settled else None
         )
+
+
+class TripMemberBalancePO(Base):
+    """行程成员收支余额持久化对象
+
+    每个行程每位成员一行，在费用新增/删除时与费用同一事务内增量维护，
+    汇总与结算只需读取 O(成员数) 行，无需加载全部费用及分摊明细。
+    """
+
+    __tablename__ = 'trip_member_balances'
+    __table_args__ = (
+        PrimaryKeyConstraint('trip_id', 'user_id'),
+    )
+
+    trip_id = Column(String(36), nullable=False)
+    user_id = Column(String(36), nullable=False)
+    paid = Column(Numeric(12, 2), nullable=False, default=Decimal('0'))
+    owed = Column(Numeric(12, 2), nullable=False, default=Decimal('0'))
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    @property
+    def balance(self) -> Decimal:
+        """净余额 = 总付出 - 总应付（正数应收，负数应付）"""
+        return Decimal(self.paid) - Decimal(self.owed)
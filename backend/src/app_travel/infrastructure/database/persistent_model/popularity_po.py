@@ -0,0 +1,38 @@
+"""
+热度排行持久化对象 (PO - Persistent Object)
+
+每个模板/旅行一行，score 为前向衰减的对数热度（见 PopularityService），
+(entity_type, score, entity_id) 索引即为预排序的排行榜：
+按热度分页只需沿索引读取一页，与对象总数无关。
+"""
+from datetime import datetime
+
+from sqlalchemy import Column, String, DateTime, Float, Integer, Index
+from shared.database.core import Base
+
+
+class PopularityScorePO(Base):
+    """热度分值持久化对象"""
+
+    __tablename__ = 'popularity_scores'
+
+    entity_type = Column(String(16), primary_key=True)
+    entity_id = Column(String(36), primary_key=True)
+
+    score = Column(Float, nullable=False)
+    # 新鲜度基线（仅发布信号时的分值），撤销信号时分值不低于此值
+    base_score = Column(Float, nullable=False)
+
+    clone_count = Column(Integer, nullable=False, default=0)
+    view_count = Column(Integer, nullable=False, default=0)
+    like_count = Column(Integer, nullable=False, default=0)
+
+    published_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_popularity_scores_rank', 'entity_type', 'score', 'entity_id'),
+    )
+
+    def __repr__(self):
+        return f"<PopularityScorePO {self.entity_type}:{self.entity_id} score={self.score}>"
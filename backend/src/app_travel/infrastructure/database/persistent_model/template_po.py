@@ -3,19 +3,47 @@ Trip template persistent object (PO)
 
 Used for SQLAlchemy ORM mapping to database tables.
 """
+from dataclasses import asdict
 from datetime import datetime
-from typing import List
+from typing import List, Tuple
 import json
 
-from sqlalchemy import Column, String, DateTime, Text, Integer
+from sqlalchemy import Column, String, DateTime, Text, Integer, ForeignKey, Index
+from sqlalchemy.orm import relationship
 from shared.database.core import Base
+from shared.infrastructure.text_search import index_terms, normalize_tag
 
 from app_travel.domain.aggregate.trip_template import TripTemplate
+from app_travel.domain.value_objects.template_summary import TemplateSummary
 from app_travel.domain.value_objects.template_value_objects import (
-    TemplateId, TemplateDayData, TemplateActivityData
+    TemplateId, TemplateDayData, TemplateActivityData, TemplateTransitData
 )
 
 
+class TripTemplateTagPO(Base):
+    """Normalized template tag (one row per template and tag)"""
+    
+    __tablename__ = 'trip_template_tags'
+    __table_args__ = (
+        Index('ix_trip_template_tags_tag', 'tag', 'template_id'),
+    )
+    
+    template_id = Column(String(36), ForeignKey('trip_templates.id', ondelete='CASCADE'), primary_key=True)
+    tag = Column(String(50), primary_key=True)
+
+
+class TripTemplateSearchTermPO(Base):
+    """Template search index term (inverted index over name/description/locations)"""
+    
+    __tablename__ = 'trip_template_search_terms'
+    __table_args__ = (
+        Index('ix_trip_template_search_terms_term', 'term', 'template_id'),
+    )
+    
+    template_id = Column(String(36), ForeignKey('trip_templates.id', ondelete='CASCADE'), primary_key=True)
+    term = Column(String(32), primary_key=True)
+
+
 class TripTemplatePO(Base):
     """Trip template persistent object - SQLAlchemy model"""
     
@@ -24,7 +52,7 @@ class TripTemplatePO(Base):
     id = Column(String(36), primary_key=True)
     name = Column(String(100), nullable=False)
     description = Column(Text, nullable=True)
-    source_trip_id = Column(String(36), nullable=False)
+    source_trip_id = Column(String(36), nullable=False, index=True)
     author_id = Column(String(36), nullable=False, index=True)
     duration_days = Column(Integer, nullable=False)
     tags_json = Column(Text, nullable=True)
@@ -32,6 +60,10 @@ class TripTemplatePO(Base):
     activity_count = Column(Integer, nullable=False)
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
     
+    # Tag table and search index, rebuilt together with the template row
+    tag_rows = relationship('TripTemplateTagPO', cascade='all, delete-orphan')
+    search_terms = relationship('TripTemplateSearchTermPO', cascade='all, delete-orphan')
+    
     def __repr__(self) -> str:
         return f"TripTemplatePO(id={self.id}, name={self.name})"
     
@@ -57,14 +89,22 @@ class TripTemplatePO(Base):
                     duration_minutes=activity_dict['duration_minutes'],
                     cost_amount=activity_dict.get('cost_amount'),
                     cost_currency=activity_dict.get('cost_currency', 'CNY'),
-                    notes=activity_dict.get('notes', '')
+                    notes=activity_dict.get('notes', ''),
+                    start_time=activity_dict.get('start_time')
                 )
                 activities_data.append(activity)
             
+            # Older templates have no transits
+            transits_data = tuple(
+                TemplateTransitData(**transit_dict)
+                for transit_dict in day_dict.get('transits', [])
+            )
+            
             day_data = TemplateDayData(
                 day_number=day_dict['day_number'],
                 theme=day_dict.get('theme'),
-                activities=tuple(activities_data)
+                activities=tuple(activities_data),
+                transits=transits_data
             )
             days_data.append(day_data)
         
@@ -81,6 +121,35 @@ class TripTemplatePO(Base):
             created_at=self.created_at
         )
     
+    def to_summary(self) -> TemplateSummary:
+        """Convert to list card read model (does not touch days_data_json)"""
+        return TemplateSummary(
+            template_id=self.id,
+            name=self.name,
+            description=self.description or '',
+            author_id=self.author_id,
+            duration_days=self.duration_days,
+            tags=tuple(json.loads(self.tags_json)) if self.tags_json else (),
+            activity_count=self.activity_count,
+            created_at=self.created_at
+        )
+    
+    @staticmethod
+    def build_index_rows(template: TripTemplate) -> Tuple[List[TripTemplateTagPO], List[TripTemplateSearchTermPO]]:
+        """Build tag rows and search terms for a template"""
+        tags = sorted({normalize_tag(tag) for tag in template.tags} - {''})
+        locations = [
+            text
+            for day_data in template.days_data
+            for activity in day_data.activities
+            for text in (activity.location_name, activity.address)
+        ]
+        terms = index_terms(template.name, template.description, *locations)
+        return (
+            [TripTemplateTagPO(template_id=template.id.value, tag=tag[:50]) for tag in tags],
+            [TripTemplateSearchTermPO(template_id=template.id.value, term=term) for term in sorted(terms)]
+        )
+    
     @classmethod
     def from_domain(cls, template: TripTemplate) -> 'TripTemplatePO':
         """Create persistent object from domain entity"""
@@ -102,19 +171,23 @@ class TripTemplatePO(Base):
                     'duration_minutes': activity.duration_minutes,
                     'cost_amount': activity.cost_amount,
                     'cost_currency': activity.cost_currency,
-                    'notes': activity.notes
+                    'notes': activity.notes,
+                    'start_time': activity.start_time
                 }
                 activities_list.append(activity_dict)
             
             day_dict = {
                 'day_number': day_data.day_number,
                 'theme': day_data.theme,
-                'activities': activities_list
+                'activities': activities_list,
+                'transits': [asdict(transit) for transit in day_data.transits]
             }
             days_data_list.append(day_dict)
         
         days_data_json = json.dumps(days_data_list)
         
+        tag_rows, search_terms = cls.build_index_rows(template)
+        
         return cls(
             id=template.id.value,
             name=template.name,
@@ -125,5 +198,7 @@ class TripTemplatePO(Base):
             tags_json=tags_json,
             days_data_json=days_data_json,
             activity_count=template.activity_count,
-            created_at=template.created_at
+            created_at=template.created_at,
+            tag_rows=tag_rows,
+            search_terms=search_terms
         )
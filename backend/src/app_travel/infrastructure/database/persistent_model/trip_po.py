@@ -11,6 +11,7 @@ import json
 
 from sqlalchemy import Column, String, DateTime, Date, Time, Text, Boolean, ForeignKey, Integer, Numeric
 from sqlalchemy.orm import relationship
+from sqlalchemy.orm.attributes import flag_modified
 from shared.database.core import Base
 
 from app_travel.domain.aggregate.trip_aggregate import Trip
@@ -25,6 +26,8 @@ from app_travel.domain.value_objects.travel_value_objects import (
 from app_travel.domain.value_objects.transit_value_objects import (
     TransportMode, RouteInfo, TransitCost
 )
+from app_travel.domain.value_objects.trip_summary import TripSummary, TripMemberSummary
+from app_travel.infrastructure.geo import polyline_codec
 
 
 class ActivityPO(Base):
@@ -86,22 +89,24 @@ class ActivityPO(Base):
     @classmethod
     def from_domain(cls, activity: Activity, trip_day_id: int) -> 'ActivityPO':
         """从领域实体创建"""
-        return cls(
-            id=activity.id,
-            trip_day_id=trip_day_id,
-            name=activity.name,
-            activity_type=activity.activity_type.value,
-            location_name=activity.location.name,
-            location_latitude=Decimal(str(activity.location.latitude)) if activity.location.latitude else None,
-            location_longitude=Decimal(str(activity.location.longitude)) if activity.location.longitude else None,
-            location_address=activity.location.address,
-            start_time=activity.start_time,
-            end_time=activity.end_time,
-            cost_amount=activity.cost.amount if activity.cost else None,
-            cost_currency=activity.cost.currency if activity.cost else None,
-            notes=activity.notes,
-            booking_reference=activity.booking_reference
-        )
+        po = cls(id=activity.id, trip_day_id=trip_day_id)
+        po.update_from_domain(activity)
+        return po
+    
+    def update_from_domain(self, activity: Activity) -> None:
+        """从领域实体更新（值未变化的列不会产生 UPDATE）"""
+        self.name = activity.name
+        self.activity_type = activity.activity_type.value
+        self.location_name = activity.location.name
+        self.location_latitude = Decimal(str(activity.location.latitude)) if activity.location.latitude else None
+        self.location_longitude = Decimal(str(activity.location.longitude)) if activity.location.longitude else None
+        self.location_address = activity.location.address
+        self.start_time = activity.start_time
+        self.end_time = activity.end_time
+        self.cost_amount = activity.cost.amount if activity.cost else None
+        self.cost_currency = activity.cost.currency if activity.cost else None
+        self.notes = activity.notes
+        self.booking_reference = activity.booking_reference
 
 
 class TransitPO(Base):
@@ -119,6 +124,7 @@ class TransitPO(Base):
     # 路线信息
     distance_meters = Column(Numeric(12, 2), nullable=False, default=0)
     duration_seconds = Column(Integer, nullable=False, default=0)
+    # Encoded Polyline（见 polyline_codec），历史数据可能仍为高德原始文本
     polyline = Column(Text, nullable=True)
     
     # 时间
@@ -142,7 +148,7 @@ class TransitPO(Base):
         route_info = RouteInfo(
             distance_meters=float(self.distance_meters),
             duration_seconds=int(self.duration_seconds),
-            polyline=self.polyline
+            polyline=self.polyline  # 保持存储格式，序列化时按需解码
         )
         
         # 构建 TransitCost
@@ -174,6 +180,12 @@ class TransitPO(Base):
     @classmethod
     def from_domain(cls, transit: Transit, trip_day_id: int) -> 'TransitPO':
         """从领域实体创建"""
+        po = cls(id=transit.id, trip_day_id=trip_day_id)
+        po.update_from_domain(transit)
+        return po
+    
+    def update_from_domain(self, transit: Transit) -> None:
+        """从领域实体更新（值未变化的列不会产生 UPDATE）"""
         cost_amount = None
         fuel_cost = None
         toll_cost = None
@@ -188,24 +200,20 @@ class TransitPO(Base):
             if transit.estimated_cost.ticket_cost:
                 ticket_cost = transit.estimated_cost.ticket_cost.amount
         
-        return cls(
-            id=transit.id,
-            trip_day_id=trip_day_id,
-            from_activity_id=transit.from_activity_id,
-            to_activity_id=transit.to_activity_id,
-            transport_mode=transit.transport_mode.value,
-            distance_meters=Decimal(str(transit.route_info.distance_meters)),
-            duration_seconds=transit.route_info.duration_seconds,
-            polyline=transit.route_info.polyline,
-            departure_time=transit.departure_time,
-            arrival_time=transit.arrival_time,
-            cost_amount=cost_amount,
-            cost_currency='CNY',
-            fuel_cost=fuel_cost,
-            toll_cost=toll_cost,
-            ticket_cost=ticket_cost,
-            notes=transit.notes
-        )
+        self.from_activity_id = transit.from_activity_id
+        self.to_activity_id = transit.to_activity_id
+        self.transport_mode = transit.transport_mode.value
+        self.distance_meters = Decimal(str(transit.route_info.distance_meters))
+        self.duration_seconds = transit.route_info.duration_seconds
+        self.polyline = polyline_codec.to_storage(transit.route_info.polyline)
+        self.departure_time = transit.departure_time
+        self.arrival_time = transit.arrival_time
+        self.cost_amount = cost_amount
+        self.cost_currency = 'CNY'
+        self.fuel_cost = fuel_cost
+        self.toll_cost = toll_cost
+        self.ticket_cost = ticket_cost
+        self.notes = transit.notes
 
 
 class TripDayPO(Base):
@@ -257,6 +265,37 @@ class TripDayPO(Base):
             notes=trip_day.notes
         )
         return po
+    
+    def sync_from_domain(self, trip_day: TripDay) -> None:
+        """按ID同步日程下的活动与交通
+        
+        已有记录原地更新（未变化的不产生写入），新增的插入，
+        不再存在的通过 delete-orphan 删除。
+        """
+        self.theme = trip_day.theme
+        self.notes = trip_day.notes
+        
+        existing_activities = {a.id: a for a in self.activities}
+        activities = []
+        for activity in trip_day.activities:
+            po = existing_activities.get(activity.id)
+            if po is None:
+                po = ActivityPO.from_domain(activity, self.id)
+            else:
+                po.update_from_domain(activity)
+            activities.append(po)
+        self.activities = activities
+        
+        existing_transits = {t.id: t for t in self.transits}
+        transits = []
+        for transit in trip_day.transits:
+            po = existing_transits.get(transit.id)
+            if po is None:
+                po = TransitPO.from_domain(transit, self.id)
+            else:
+                po.update_from_domain(transit)
+            transits.append(po)
+        self.transits = transits
 
 
 class TripMemberPO(Base):
@@ -323,15 +362,34 @@ class TripPO(Base):
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # 乐观锁版本号：UPDATE 时校验并递增，不一致抛出 StaleDataError
+    version = Column(Integer, nullable=False, server_default='1')
+    
     # 关联
     members = relationship('TripMemberPO', back_populates='trip', cascade='all, delete-orphan')
     days = relationship('TripDayPO', back_populates='trip', cascade='all, delete-orphan')
     
+    __mapper_args__ = {'version_id_col': version}
+    
     def __repr__(self) -> str:
         return f"TripPO(id={self.id}, name={self.name})"
     
     def to_domain(self) -> Trip:
         """将持久化对象转换为领域实体"""
+        domain_days = [d.to_domain() for d in sorted(self.days, key=lambda x: x.day_number)]
+        return self._reconstitute(domain_days)
+    
+    def to_day_scoped_domain(self, day_index: int, day_po: Optional['TripDayPO']) -> Trip:
+        """转换为按日加载的领域实体（只包含指定日程，不访问 self.days）
+        
+        Args:
+            day_index: 日程索引（从0开始）
+            day_po: 该日程的持久化对象，不存在时为 None
+        """
+        domain_days = [day_po.to_domain()] if day_po is not None else []
+        return self._reconstitute(domain_days, day_scope=day_index)
+    
+    def _reconstitute(self, domain_days: List[TripDay], day_scope: Optional[int] = None) -> Trip:
         date_range = DateRange(
             start_date=self.start_date,
             end_date=self.end_date
@@ -343,7 +401,6 @@ class TripPO(Base):
         
         # 转换子实体
         domain_members = [m.to_domain() for m in self.members]
-        domain_days = [d.to_domain() for d in sorted(self.days, key=lambda x: x.day_number)]
         
         return Trip.reconstitute(
             trip_id=TripId(self.id),
@@ -358,7 +415,43 @@ class TripPO(Base):
             status=TripStatus.from_string(self.status),
             cover_image_url=self.cover_image_url,
             created_at=self.created_at,
-            updated_at=self.updated_at
+            updated_at=self.updated_at,
+            version=self.version,
+            day_scope=day_scope
+        )
+    
+    def to_summary(self, days_count: int) -> TripSummary:
+        """转换为摘要读模型（只访问旅行列和成员，不触发日程加载）
+        
+        Args:
+            days_count: 日程天数（由查询聚合得到）
+        """
+        budget = None
+        if self.budget_amount is not None:
+            budget = Money(amount=self.budget_amount, currency=self.budget_currency or 'CNY')
+        
+        return TripSummary(
+            trip_id=self.id,
+            name=self.name,
+            description=self.description or '',
+            creator_id=self.creator_id,
+            start_date=self.start_date,
+            end_date=self.end_date,
+            budget=budget,
+            visibility=TripVisibility.from_string(self.visibility),
+            status=TripStatus.from_string(self.status),
+            cover_image_url=self.cover_image_url,
+            created_at=self.created_at,
+            updated_at=self.updated_at,
+            days_count=days_count or 0,
+            members=tuple(
+                TripMemberSummary(
+                    user_id=m.user_id,
+                    role=MemberRole.from_string(m.role),
+                    nickname=m.nickname
+                )
+                for m in self.members
+            )
         )
     
     @classmethod
@@ -407,3 +500,5 @@ class TripPO(Base):
         self.visibility = trip.visibility.value
         self.status = trip.status.value
         self.updated_at = trip.updated_at
+        # 只有子实体变化时旅行行本身不脏，强制 UPDATE 以递增并校验版本号
+        flag_modified(self, 'updated_at')
@@ -0,0 +1,176 @@
+"""
+旅行统计投影持久化对象 (PO - Persistent Object)
+
+统计投影随行程写入同步维护，读取统计时无需加载完整 Trip 聚合。
+- TripStatisticsPO: 旅行级汇总（列表卡片直接读取），version 为对应的 trips.updated_at
+- TripDayStatisticsPO: 按日统计，行程变更时只改写发生变化的日期
+"""
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import List
+
+from sqlalchemy import Column, String, DateTime, Text, Integer, Numeric, ForeignKey
+from sqlalchemy.orm import relationship
+from shared.database.core import Base
+
+from app_travel.domain.value_objects.travel_value_objects import Money, Location
+from app_travel.domain.value_objects.trip_statistics import (
+    DayStatistics, TripStatistics, TripStatisticsSummary
+)
+
+
+def _amount(money: Money) -> Decimal:
+    return Decimal(money.amount).quantize(Decimal('0.01'))
+
+
+def _distance(meters: float) -> Decimal:
+    return Decimal(str(meters)).quantize(Decimal('0.01'))
+
+
+class TripDayStatisticsPO(Base):
+    """单日统计持久化对象"""
+
+    __tablename__ = 'trip_day_statistics'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    trip_id = Column(String(36), ForeignKey('trip_statistics.trip_id'), nullable=False, index=True)
+    day_number = Column(Integer, nullable=False)
+
+    distance_meters = Column(Numeric(12, 2), nullable=False, default=0)
+    play_time_minutes = Column(Integer, nullable=False, default=0)
+    transit_time_minutes = Column(Integer, nullable=False, default=0)
+    activity_cost_amount = Column(Numeric(12, 2), nullable=False, default=0)
+    transit_cost_amount = Column(Numeric(12, 2), nullable=False, default=0)
+    currency = Column(String(3), nullable=False, default='CNY')
+    activity_count = Column(Integer, nullable=False, default=0)
+    locations_json = Column(Text, nullable=True)
+
+    # 关联
+    trip_statistics = relationship('TripStatisticsPO', back_populates='days')
+
+    def to_domain(self) -> DayStatistics:
+        """转换为领域值对象"""
+        currency = self.currency or 'CNY'
+        locations = json.loads(self.locations_json) if self.locations_json else []
+        return DayStatistics(
+            day_number=self.day_number,
+            distance_meters=float(self.distance_meters),
+            play_time_minutes=self.play_time_minutes,
+            transit_time_minutes=self.transit_time_minutes,
+            activity_cost=Money(amount=self.activity_cost_amount, currency=currency),
+            transit_cost=Money(amount=self.transit_cost_amount, currency=currency),
+            activity_count=self.activity_count,
+            visited_locations=tuple(Location(**loc) for loc in locations)
+        )
+
+    @classmethod
+    def from_domain(cls, day: DayStatistics, trip_id: str) -> 'TripDayStatisticsPO':
+        """从领域值对象创建"""
+        po = cls(trip_id=trip_id, day_number=day.day_number)
+        po.update_from_domain(day)
+        return po
+
+    def update_from_domain(self, day: DayStatistics) -> None:
+        """从领域值对象更新（值未变化的列不会产生 UPDATE）"""
+        self.distance_meters = _distance(day.distance_meters)
+        self.play_time_minutes = day.play_time_minutes
+        self.transit_time_minutes = day.transit_time_minutes
+        self.activity_cost_amount = _amount(day.activity_cost)
+        self.transit_cost_amount = _amount(day.transit_cost)
+        self.currency = day.activity_cost.currency if day.activity_cost.amount else day.transit_cost.currency
+        self.activity_count = day.activity_count
+        self.locations_json = json.dumps([
+            {
+                'name': loc.name,
+                'latitude': loc.latitude,
+                'longitude': loc.longitude,
+                'address': loc.address
+            }
+            for loc in day.visited_locations
+        ], ensure_ascii=False)
+
+
+class TripStatisticsPO(Base):
+    """旅行统计汇总持久化对象"""
+
+    __tablename__ = 'trip_statistics'
+
+    trip_id = Column(String(36), primary_key=True)
+    # 统计对应的旅行版本（trips.updated_at），不一致即视为过期
+    version = Column(DateTime, nullable=False)
+
+    total_distance_meters = Column(Numeric(14, 2), nullable=False, default=0)
+    total_play_time_minutes = Column(Integer, nullable=False, default=0)
+    total_transit_time_minutes = Column(Integer, nullable=False, default=0)
+    activity_cost_amount = Column(Numeric(12, 2), nullable=False, default=0)
+    transit_cost_amount = Column(Numeric(12, 2), nullable=False, default=0)
+    currency = Column(String(3), nullable=False, default='CNY')
+    activity_count = Column(Integer, nullable=False, default=0)
+    unique_location_count = Column(Integer, nullable=False, default=0)
+
+    computed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    # 关联
+    days = relationship(
+        'TripDayStatisticsPO', back_populates='trip_statistics',
+        cascade='all, delete-orphan', order_by='TripDayStatisticsPO.day_number'
+    )
+
+    def __repr__(self) -> str:
+        return f"TripStatisticsPO(trip_id={self.trip_id}, version={self.version})"
+
+    def to_domain(self) -> TripStatistics:
+        """由各日统计合并为完整统计报表"""
+        return TripStatistics.from_days([d.to_domain() for d in self.days])
+
+    def to_summary(self) -> TripStatisticsSummary:
+        """转换为统计摘要（只读取汇总列，不加载按日统计）"""
+        currency = self.currency or 'CNY'
+        return TripStatisticsSummary(
+            total_distance_meters=float(self.total_distance_meters),
+            total_play_time_minutes=self.total_play_time_minutes,
+            total_transit_time_minutes=self.total_transit_time_minutes,
+            total_estimated_cost=Money(
+                amount=self.activity_cost_amount + self.transit_cost_amount,
+                currency=currency
+            ),
+            activity_count=self.activity_count,
+            unique_location_count=self.unique_location_count
+        )
+
+    def update_totals(self, stats: TripStatistics, version: datetime) -> None:
+        """更新汇总列"""
+        self.version = version
+        self.total_distance_meters = _distance(stats.total_distance_meters)
+        self.total_play_time_minutes = stats.total_play_time_minutes
+        self.total_transit_time_minutes = stats.total_transit_time_minutes
+        self.activity_cost_amount = _amount(stats.activity_cost)
+        self.transit_cost_amount = _amount(stats.transit_cost)
+        self.currency = stats.total_estimated_cost.currency
+        self.activity_count = stats.activity_count
+        self.unique_location_count = len(stats.unique_locations)
+        self.computed_at = datetime.utcnow()
+
+    def merge_days(self, days: List[DayStatistics]) -> None:
+        """只更新（或添加）给出的日期，其余日期保持不变"""
+        existing = {d.day_number: d for d in self.days}
+        for day in days:
+            po = existing.get(day.day_number)
+            if po is None:
+                self.days.append(TripDayStatisticsPO.from_domain(day, self.trip_id))
+            else:
+                po.update_from_domain(day)
+
+    def sync_days(self, days: List[DayStatistics]) -> None:
+        """同步按日统计：更新已有日期、添加新日期、删除不再存在的日期"""
+        existing = {d.day_number: d for d in self.days}
+        synced = []
+        for day in days:
+            po = existing.get(day.day_number)
+            if po is None:
+                po = TripDayStatisticsPO.from_domain(day, self.trip_id)
+            else:
+                po.update_from_domain(day)
+            synced.append(po)
+        self.days = synced
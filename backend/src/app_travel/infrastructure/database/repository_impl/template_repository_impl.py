@@ -4,10 +4,12 @@ Template repository implementation
 Implements ITemplateRepository interface.
 Handles persistence of TripTemplate aggregate root.
 """
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from app_travel.domain.demand_interface.i_template_repository import ITemplateRepository
 from app_travel.domain.aggregate.trip_template import TripTemplate
+from app_travel.domain.value_objects.popularity_value_objects import RankingSort
+from app_travel.domain.value_objects.template_summary import TemplateSummary
 from app_travel.domain.value_objects.template_value_objects import TemplateId
 from app_travel.infrastructure.database.dao_interface.i_template_dao import ITemplateDAO
 from app_travel.infrastructure.database.persistent_model.template_po import TripTemplatePO
@@ -81,6 +83,35 @@ class TemplateRepositoryImpl(ITemplateRepository):
         )
         return [po.to_domain() for po in template_pos]
     
+    def find_summaries(
+        self,
+        limit: int = 20,
+        offset: int = 0,
+        keyword: Optional[str] = None,
+        tag: Optional[str] = None,
+        sort: RankingSort = RankingSort.LATEST
+    ) -> Tuple[List[TemplateSummary], int]:
+        """Find one page of template summaries and the total count
+        
+        Args:
+            limit: Page size
+            offset: Offset
+            keyword: Optional keyword search
+            tag: Optional tag filter
+            sort: Newest first, or by popularity score
+            
+        Returns:
+            (summaries, total matching templates)
+        """
+        template_pos, total = self._template_dao.list_page(
+            limit=limit,
+            offset=offset,
+            keyword=keyword,
+            tag=tag,
+            trending=sort == RankingSort.TRENDING
+        )
+        return [po.to_summary() for po in template_pos], total
+    
     def count_all(
         self,
         keyword: Optional[str] = None,
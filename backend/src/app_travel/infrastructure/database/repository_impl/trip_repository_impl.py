@@ -4,27 +4,33 @@
 实现 ITripRepository 接口。
 负责 Trip 聚合根及其子实体（TripMember, TripDay, Activity, Transit）的持久化。
 """
+from datetime import datetime
 from typing import List, Optional
 
-from app_travel.domain.demand_interface.i_trip_repository import ITripRepository
+from app_travel.domain.demand_interface.i_trip_repository import ITripRepository, TripConcurrencyError
+from app_travel.domain.demand_interface.i_trip_statistics_repository import ITripStatisticsRepository
 from app_travel.domain.aggregate.trip_aggregate import Trip
 from app_travel.domain.value_objects.travel_value_objects import TripId, TripStatus
+from app_travel.domain.value_objects.trip_summary import TripSummary
+from app_travel.domain.value_objects.popularity_value_objects import RankingSort
 from app_travel.infrastructure.database.dao_interface.i_trip_dao import ITripDao
 from app_travel.infrastructure.database.persistent_model.trip_po import (
-    TripPO, TripMemberPO, TripDayPO, ActivityPO, TransitPO
+    TripPO, TripMemberPO, TripDayPO
 )
 
 
 class TripRepositoryImpl(ITripRepository):
     """旅行仓库实现"""
     
-    def __init__(self, trip_dao: ITripDao):
+    def __init__(self, trip_dao: ITripDao, statistics_repository: Optional[ITripStatisticsRepository] = None):
         """初始化仓库
         
         Args:
             trip_dao: 旅行数据访问对象
+            statistics_repository: 统计投影仓库（可选，提供时在保存旅行的同一事务内刷新统计）
         """
         self._trip_dao = trip_dao
+        self._statistics_repository = statistics_repository
     
     def save(self, trip: Trip) -> None:
         """保存旅行（新增或更新）
@@ -32,19 +38,80 @@ class TripRepositoryImpl(ITripRepository):
         Args:
             trip: 旅行聚合根
         """
-        existing_po = self._trip_dao.find_by_id(trip.id.value)
+        if trip.is_day_scoped:
+            # 按日加载的聚合不含其他日程，整体同步会清空它们
+            raise ValueError("Day-scoped trip must be saved with save_day")
+        
+        # 聚合通常由同一会话加载，refresh 用数据库中的最新值覆盖会话缓存，版本比较才有意义
+        existing_po = self._trip_dao.find_by_id(trip.id.value, refresh=True)
         
         if existing_po:
-            # 更新现有旅行
-            existing_po.update_from_domain(trip)
-            # 同步子实体
-            self._sync_members(existing_po, trip)
-            self._sync_days(existing_po, trip)
-            self._trip_dao.update(existing_po)
+            # 聚合加载后旅行已被修改
+            if trip.version is not None and existing_po.version != trip.version:
+                raise TripConcurrencyError(trip.id.value, trip.version, existing_po.version)
+            # 更新现有旅行（与写入之间被抢先修改时只回滚保存点）
+            with self._trip_dao.version_guard(trip.id.value, trip.version):
+                existing_po.update_from_domain(trip)
+                # 同步子实体
+                self._sync_members(existing_po, trip)
+                self._sync_days(existing_po, trip)
+                self._trip_dao.update(existing_po)
+            trip_po = existing_po
         else:
             # 添加新旅行
             trip_po = TripPO.from_domain(trip)
             self._trip_dao.add(trip_po)
+        
+        trip.assign_version(trip_po.version)
+        
+        if self._statistics_repository:
+            self._statistics_repository.refresh(trip, trip_po.updated_at)
+    
+    def add_new(self, trip: Trip) -> None:
+        """批量插入新建的旅行
+        
+        Args:
+            trip: 新建的旅行聚合根
+        """
+        trip_po = TripPO.from_domain(trip)
+        self._trip_dao.bulk_insert(trip_po)
+        trip.assign_version(trip_po.version)
+        
+        if self._statistics_repository:
+            self._statistics_repository.refresh(trip, trip_po.updated_at)
+    
+    def save_day(self, trip: Trip) -> None:
+        """保存按日加载的旅行
+        
+        只更新旅行行（递增并校验版本号）和已加载日程的活动、交通，
+        写入量与旅行总天数无关。
+        
+        Args:
+            trip: 按日加载的旅行聚合根
+        """
+        if not trip.is_day_scoped:
+            raise ValueError("save_day requires a day-scoped trip")
+        
+        trip_po = self._trip_dao.find_by_id(trip.id.value, load_profile='lazy', refresh=True)
+        if trip_po is None:
+            raise ValueError(f"Trip {trip.id.value} not found")
+        if trip.version is not None and trip_po.version != trip.version:
+            raise TripConcurrencyError(trip.id.value, trip.version, trip_po.version)
+        
+        previous_version = trip_po.updated_at
+        with self._trip_dao.version_guard(trip.id.value, trip.version):
+            trip_po.update_from_domain(trip)
+            
+            day = trip.get_day(trip.day_scope)
+            if day is not None:
+                day_po = self._trip_dao.find_day(trip.id.value, day.day_number)
+                day_po.sync_from_domain(day)
+            
+            self._trip_dao.update(trip_po)
+        trip.assign_version(trip_po.version)
+        
+        if self._statistics_repository:
+            self._statistics_repository.refresh_days(trip, previous_version, trip_po.updated_at)
     
     def _sync_members(self, trip_po: TripPO, trip: Trip) -> None:
         """同步成员
@@ -76,19 +143,19 @@ class TripRepositoryImpl(ITripRepository):
             trip_po: 旅行持久化对象
             trip: Trip 领域实体
         """
-        # 简化处理：清空并重新创建日程
-        # 生产环境中应该做更精细的同步
-        trip_po.days.clear()
-        
+        # 按日序号匹配已有日程，活动与交通按ID同步：
+        # 未变化的行（包括较大的 polyline）不会被删除重建
+        existing_days = {d.day_number: d for d in trip_po.days}
+        days = []
         for day in trip.days:
-            day_po = TripDayPO.from_domain(day, trip.id.value)
-            # 添加活动
-            for activity in day.activities:
-                day_po.activities.append(ActivityPO.from_domain(activity, 0))  # ID 将由数据库生成
-            # 添加交通
-            for transit in day.transits:
-                day_po.transits.append(TransitPO.from_domain(transit, 0))  # ID 将由数据库生成
-            trip_po.days.append(day_po)
+            day_po = existing_days.get(day.day_number)
+            if day_po is None:
+                day_po = TripDayPO.from_domain(day, trip.id.value)
+            else:
+                day_po.date = day.date
+            day_po.sync_from_domain(day)
+            days.append(day_po)
+        trip_po.days = days
     
     def find_by_id(self, trip_id: TripId) -> Optional[Trip]:
         """根据ID查找旅行
@@ -104,6 +171,24 @@ class TripRepositoryImpl(ITripRepository):
             return trip_po.to_domain()
         return None
     
+    def find_day_scoped(self, trip_id: TripId, day_index: int) -> Optional[Trip]:
+        """按日加载旅行
+        
+        查询数固定（旅行 + 成员 + 日程 + 活动 + 交通），与旅行总天数无关。
+        
+        Args:
+            trip_id: 旅行ID
+            day_index: 日程索引（从0开始）
+            
+        Returns:
+            按日加载的旅行实例，不存在则返回 None
+        """
+        trip_po = self._trip_dao.find_by_id(trip_id.value, load_profile='members')
+        if not trip_po:
+            return None
+        day_po = self._trip_dao.find_day(trip_id.value, day_index + 1) if day_index >= 0 else None
+        return trip_po.to_day_scoped_domain(day_index, day_po)
+    
     def find_by_member(self, user_id: str, status: Optional[TripStatus] = None) -> List[Trip]:
         """查找用户参与的旅行
         
@@ -147,12 +232,63 @@ class TripRepositoryImpl(ITripRepository):
             trip_pos = self._trip_dao.find_public(limit, offset, search_query)
         return [po.to_domain() for po in trip_pos]
     
+    def find_summaries_by_member(self, user_id: str, status: Optional[TripStatus] = None) -> List[TripSummary]:
+        """查找用户参与的旅行摘要
+        
+        Args:
+            user_id: 用户ID
+            status: 可选的状态筛选
+            
+        Returns:
+            旅行摘要列表
+        """
+        status_value = status.value if status else None
+        rows = self._trip_dao.find_summaries_by_member(user_id, status_value)
+        return [po.to_summary(days_count) for po, days_count in rows]
+    
+    def find_summaries_by_creator(self, creator_id: str) -> List[TripSummary]:
+        """查找用户创建的旅行摘要
+        
+        Args:
+            creator_id: 创建者ID
+            
+        Returns:
+            旅行摘要列表
+        """
+        rows = self._trip_dao.find_summaries_by_creator(creator_id)
+        return [po.to_summary(days_count) for po, days_count in rows]
+    
+    def find_public_summaries(
+        self,
+        limit: int = 20,
+        offset: int = 0,
+        search_query: Optional[str] = None,
+        sort: RankingSort = RankingSort.LATEST
+    ) -> List[TripSummary]:
+        """查找公开的旅行摘要
+        
+        Args:
+            limit: 每页数量
+            offset: 偏移量
+            search_query: 搜索关键词
+            sort: 排序方式（最新或热度）
+            
+        Returns:
+            旅行摘要列表
+        """
+        rows = self._trip_dao.find_public_summaries(
+            limit, offset, search_query, trending=sort == RankingSort.TRENDING
+        )
+        return [po.to_summary(days_count) for po, days_count in rows]
+    
     def delete(self, trip_id: TripId) -> None:
         """删除旅行
         
         Args:
             trip_id: 旅行ID
         """
+        if self._statistics_repository:
+            self._statistics_repository.delete(trip_id.value)
         self._trip_dao.delete(trip_id.value)
     
     def exists(self, trip_id: TripId) -> bool:
@@ -165,3 +301,14 @@ class TripRepositoryImpl(ITripRepository):
             是否存在
         """
         return self._trip_dao.exists(trip_id.value)
+    
+    def find_version(self, trip_id: TripId) -> Optional[datetime]:
+        """查询旅行版本（最后更新时间）
+        
+        Args:
+            trip_id: 旅行ID
+            
+        Returns:
+            版本时间戳，不存在则返回 None
+        """
+        return self._trip_dao.find_version(trip_id.value)
@@ -0,0 +1,108 @@
+"""
+旅行统计投影仓库实现
+
+实现 ITripStatisticsRepository 接口。
+"""
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app_travel.domain.aggregate.trip_aggregate import Trip
+from app_travel.domain.demand_interface.i_trip_statistics_repository import ITripStatisticsRepository
+from app_travel.domain.value_objects.trip_statistics import TripStatistics, TripStatisticsSummary
+from app_travel.infrastructure.database.dao_interface.i_trip_statistics_dao import ITripStatisticsDao
+from app_travel.infrastructure.database.persistent_model.trip_statistics_po import TripStatisticsPO
+
+
+class TripStatisticsRepositoryImpl(ITripStatisticsRepository):
+    """旅行统计投影仓库实现"""
+    
+    def __init__(self, statistics_dao: ITripStatisticsDao):
+        """初始化仓库
+        
+        Args:
+            statistics_dao: 统计投影数据访问对象
+        """
+        self._statistics_dao = statistics_dao
+    
+    def find_by_trip_id(self, trip_id: str, version: datetime) -> Optional[TripStatistics]:
+        """查找指定版本的旅行统计报表
+        
+        Args:
+            trip_id: 旅行ID
+            version: 旅行当前版本
+            
+        Returns:
+            统计报表，不存在或已过期则返回 None
+        """
+        po = self._statistics_dao.find_by_trip_id(trip_id)
+        if po is None or po.version != version:
+            return None
+        return po.to_domain()
+    
+    def find_summaries(self, trip_ids: List[str]) -> Dict[str, TripStatisticsSummary]:
+        """批量查找旅行统计摘要
+        
+        Args:
+            trip_ids: 旅行ID列表
+            
+        Returns:
+            trip_id -> 统计摘要
+        """
+        if not trip_ids:
+            return {}
+        return {
+            po.trip_id: po.to_summary()
+            for po in self._statistics_dao.find_current_by_trip_ids(trip_ids)
+        }
+    
+    def refresh(self, trip: Trip, version: datetime) -> None:
+        """根据旅行聚合刷新统计投影
+        
+        各日统计由内存中的聚合计算；与已存储的值比较后，
+        只有发生变化的日期会产生写入。
+        
+        Args:
+            trip: 旅行聚合根
+            version: 旅行持久化后的版本
+        """
+        day_stats = trip.generate_day_statistics()
+        stats = TripStatistics.from_days(day_stats)
+        
+        po = self._statistics_dao.find_by_trip_id(trip.id.value)
+        if po is None:
+            po = TripStatisticsPO(trip_id=trip.id.value)
+            po.sync_days(day_stats)
+            po.update_totals(stats, version)
+            self._statistics_dao.add(po)
+            return
+        
+        po.sync_days(day_stats)
+        po.update_totals(stats, version)
+        self._statistics_dao.flush()
+    
+    def refresh_days(self, trip: Trip, previous_version: datetime, version: datetime) -> None:
+        """只刷新按日加载的旅行中已加载日期的统计
+        
+        汇总由已存储的各日统计重新合并。投影缺失或本次保存前已过期时
+        不做处理，由读取时回退到聚合计算并回填。
+        
+        Args:
+            trip: 按日加载的旅行聚合根
+            previous_version: 本次保存前的旅行版本
+            version: 旅行持久化后的版本
+        """
+        po = self._statistics_dao.find_by_trip_id(trip.id.value)
+        if po is None or po.version != previous_version:
+            return
+        
+        po.merge_days(trip.generate_day_statistics())
+        po.update_totals(po.to_domain(), version)
+        self._statistics_dao.flush()
+    
+    def delete(self, trip_id: str) -> None:
+        """删除旅行的统计投影
+        
+        Args:
+            trip_id: 旅行ID
+        """
+        self._statistics_dao.delete(trip_id)
@@ -0,0 +1,208 @@
+"""
+路线 polyline 编码与简化
+
+高德返回的路线为 "lng,lat;lng,lat;..." 文本，点多时体积很大。
+- 存储：使用 Google Encoded Polyline 算法（精度 1e-6，与高德坐标小数位一致，
+  无损），坐标按 (lat, lng) 顺序差分编码，体积约为原文本的 1/4~1/3
+- 编码结果只包含 ASCII 63~126 字符，不会出现 ',' 与 ';'，
+  因此可以与历史遗留的原始文本共存于同一列，读取时自动识别
+- 简化：Douglas-Peucker，容差按地图缩放级别换算（默认 1 像素），
+  也可通过 POLYLINE_ZOOM_TOLERANCES 为各缩放级别单独配置（单位：度），
+  如 "10:0.0008,14:0.00005"
+"""
+import math
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# (lng, lat)
+Point = Tuple[float, float]
+
+PRECISION = 6
+_FACTOR = 10 ** PRECISION
+
+# 简化容差（屏幕像素）
+DEFAULT_TOLERANCE_PIXELS = float(os.getenv("POLYLINE_TOLERANCE_PIXELS", "1.0"))
+MIN_ZOOM = 3
+MAX_ZOOM = 20
+
+
+def _parse_zoom_tolerances(raw: Optional[str]) -> Dict[int, float]:
+    tolerances = {}
+    for item in (raw or '').split(','):
+        if ':' not in item:
+            continue
+        zoom, tolerance = item.split(':', 1)
+        try:
+            tolerances[int(zoom)] = float(tolerance)
+        except ValueError:
+            continue
+    return tolerances
+
+
+ZOOM_TOLERANCES = _parse_zoom_tolerances(os.getenv("POLYLINE_ZOOM_TOLERANCES"))
+
+
+# ==================== 格式转换 ====================
+
+def is_encoded(polyline: Optional[str]) -> bool:
+    """是否为编码格式（原始文本总是包含 ','）"""
+    return bool(polyline) and ',' not in polyline
+
+
+def parse_gaode(text: str) -> List[Point]:
+    """解析高德 "lng,lat;lng,lat" 文本，忽略空段与非法段"""
+    points = []
+    for segment in text.split(';'):
+        parts = segment.split(',')
+        if len(parts) != 2:
+            continue
+        try:
+            points.append((float(parts[0]), float(parts[1])))
+        except ValueError:
+            continue
+    return points
+
+
+def _format_coord(value: float) -> str:
+    return f"{value:.{PRECISION}f}".rstrip('0').rstrip('.')
+
+
+def format_gaode(points: Sequence[Point]) -> str:
+    """格式化为高德 "lng,lat;lng,lat" 文本"""
+    return ';'.join(f"{_format_coord(lng)},{_format_coord(lat)}" for lng, lat in points)
+
+
+def _encode_value(value: int, out: List[str]) -> None:
+    value = ~(value << 1) if value < 0 else value << 1
+    while value >= 0x20:
+        out.append(chr((0x20 | (value & 0x1f)) + 63))
+        value >>= 5
+    out.append(chr(value + 63))
+
+
+def encode(points: Sequence[Point]) -> str:
+    """编码为 Encoded Polyline"""
+    out: List[str] = []
+    prev_lat = prev_lng = 0
+    for lng, lat in points:
+        ilat = int(round(lat * _FACTOR))
+        ilng = int(round(lng * _FACTOR))
+        _encode_value(ilat - prev_lat, out)
+        _encode_value(ilng - prev_lng, out)
+        prev_lat, prev_lng = ilat, ilng
+    return ''.join(out)
+
+
+def decode(encoded: str) -> List[Point]:
+    """解码 Encoded Polyline"""
+    points = []
+    index = 0
+    lat = lng = 0
+    length = len(encoded)
+    while index < length:
+        deltas = []
+        for _ in range(2):
+            result = shift = 0
+            while True:
+                byte = ord(encoded[index]) - 63
+                index += 1
+                result |= (byte & 0x1f) << shift
+                shift += 5
+                if byte < 0x20:
+                    break
+            deltas.append(~(result >> 1) if result & 1 else result >> 1)
+        lat += deltas[0]
+        lng += deltas[1]
+        points.append((lng / _FACTOR, lat / _FACTOR))
+    return points
+
+
+def to_points(polyline: Optional[str]) -> List[Point]:
+    """从存储值（编码或原始文本）得到坐标点"""
+    if not polyline:
+        return []
+    return decode(polyline) if is_encoded(polyline) else parse_gaode(polyline)
+
+
+def to_storage(polyline: Optional[str]) -> Optional[str]:
+    """转换为存储格式（已编码的原样返回）"""
+    if not polyline:
+        return None
+    if is_encoded(polyline):
+        return polyline
+    return encode(parse_gaode(polyline)) or None
+
+
+def to_gaode(polyline: Optional[str]) -> Optional[str]:
+    """转换为高德原始文本（前端地图直接使用的格式）"""
+    if not polyline:
+        return polyline
+    if not is_encoded(polyline):
+        return polyline
+    return format_gaode(decode(polyline))
+
+
+# ==================== 简化 ====================
+
+def tolerance_for_zoom(zoom: int, latitude: float = 0.0, pixels: float = DEFAULT_TOLERANCE_PIXELS) -> float:
+    """缩放级别对应的简化容差（度）
+
+    优先使用 ZOOM_TOLERANCES 中的配置，否则按 Web 墨卡托
+    每像素米数换算：156543.03 * cos(lat) / 2^zoom。
+    """
+    zoom = max(MIN_ZOOM, min(MAX_ZOOM, int(zoom)))
+    if zoom in ZOOM_TOLERANCES:
+        return ZOOM_TOLERANCES[zoom]
+    meters_per_pixel = 156543.03 * math.cos(math.radians(latitude)) / (2 ** zoom)
+    return meters_per_pixel * pixels / 111320.0
+
+
+def simplify(points: Sequence[Point], tolerance: float) -> List[Point]:
+    """Douglas-Peucker 简化（迭代实现，保留首尾点）
+
+    经度按 cos(lat) 缩放后计算垂直距离，容差单位为纬度方向的度。
+    """
+    n = len(points)
+    if n <= 2 or tolerance <= 0:
+        return list(points)
+
+    scale = math.cos(math.radians(sum(p[1] for p in points) / n))
+    xy = [(lng * scale, lat) for lng, lat in points]
+    keep = [False] * n
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    tolerance_sq = tolerance * tolerance
+
+    while stack:
+        start, end = stack.pop()
+        ax, ay = xy[start]
+        bx, by = xy[end]
+        dx, dy = bx - ax, by - ay
+        seg_len_sq = dx * dx + dy * dy
+        max_dist_sq = -1.0
+        index = start
+        for i in range(start + 1, end):
+            px, py = xy[i]
+            if seg_len_sq == 0:
+                dist_sq = (px - ax) ** 2 + (py - ay) ** 2
+            else:
+                t = max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / seg_len_sq))
+                dist_sq = (px - ax - t * dx) ** 2 + (py - ay - t * dy) ** 2
+            if dist_sq > max_dist_sq:
+                max_dist_sq = dist_sq
+                index = i
+        if max_dist_sq > tolerance_sq:
+            keep[index] = True
+            stack.append((start, index))
+            stack.append((index, end))
+
+    return [p for p, k in zip(points, keep) if k]
+
+
+def simplify_for_zoom(polyline: Optional[str], zoom: int) -> Optional[str]:
+    """按缩放级别简化，返回高德原始文本"""
+    points = to_points(polyline)
+    if not points:
+        return polyline
+    latitude = points[0][1]
+    return format_gaode(simplify(points, tolerance_for_zoom(zoom, latitude)))
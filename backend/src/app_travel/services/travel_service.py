@@ -5,13 +5,16 @@
 遵循 DDD 原则：应用层保持无状态，尽可能薄。
 复杂业务逻辑由领域层（聚合根、领域服务）处理。
 """
-from datetime import date, time
-from typing import List, Optional, Dict, Any
+from datetime import date, datetime, time
+from functools import partial
+from typing import Callable, List, Optional, Dict, Any, Tuple, TypeVar
 from decimal import Decimal
 
 from app_travel.domain.aggregate.trip_aggregate import Trip
 from app_travel.domain.entity.activity import Activity
-from app_travel.domain.demand_interface.i_trip_repository import ITripRepository
+from app_travel.domain.demand_interface.i_trip_repository import ITripRepository, TripConcurrencyError
+from app_travel.domain.demand_interface.i_trip_statistics_repository import ITripStatisticsRepository
+from app_travel.domain.demand_interface.i_template_repository import ITemplateRepository
 from app_travel.domain.demand_interface.i_geo_service import IGeoService
 from app_travel.domain.domain_service.itinerary_service import ItineraryService
 from app_travel.domain.value_objects.travel_value_objects import (
@@ -19,9 +22,17 @@ from app_travel.domain.value_objects.travel_value_objects import (
     TripStatus, TripVisibility, MemberRole, ActivityType, Location
 )
 from app_travel.domain.value_objects.itinerary_value_objects import TransitCalculationResult
-from app_travel.domain.value_objects.trip_statistics import TripStatistics
+from app_travel.domain.value_objects.popularity_value_objects import RankingSort
+from app_travel.domain.domain_event.travel_events import (
+    TripViewedEvent, TripClonedEvent, TemplatePublishedEvent, TemplateClonedEvent, TemplateViewedEvent
+)
+from app_travel.domain.value_objects.trip_statistics import TripStatistics, TripStatisticsSummary
+from app_travel.domain.value_objects.trip_summary import TripSummary
+from app_travel.infrastructure.database.dao_interface.i_expense_dao import IExpenseDAO
 from shared.event_bus import EventBus
 
+T = TypeVar('T')
+
 
 class TravelService:
     """旅行应用服务
@@ -41,7 +52,11 @@ class TravelService:
         self,
         trip_repository: ITripRepository,
         geo_service: IGeoService,
-        event_bus: Optional[EventBus] = None
+        event_bus: Optional[EventBus] = None,
+        statistics_repository: Optional[ITripStatisticsRepository] = None,
+        expense_dao: Optional[IExpenseDAO] = None,
+        template_repository: Optional[ITemplateRepository] = None,
+        defer_until_commit: Optional[Callable[[Callable[[], None]], None]] = None
     ):
         """初始化应用服务
         
@@ -49,19 +64,96 @@ class TravelService:
             trip_repository: 旅行仓库
             geo_service: 地理服务（用于创建 ItineraryService）
             event_bus: 事件总线（可选，默认使用全局实例）
+            statistics_repository: 统计投影仓库（可选，提供时统计从投影读取）
+            expense_dao: 费用 DAO（费用相关用例需要，与旅行仓库共用同一会话）
+            template_repository: 模板仓库（模板相关用例需要）
+            defer_until_commit: 登记在调用方事务提交后执行的任务（可选，不传则立即执行）
         """
         self._trip_repository = trip_repository
         self._geo_service = geo_service
         self._event_bus = event_bus or EventBus.get_instance()
+        self._statistics_repository = statistics_repository
+        self._expense_dao = expense_dao
+        self._template_repository = template_repository
+        self._defer_until_commit = defer_until_commit
     
     def _create_itinerary_service(self) -> ItineraryService:
         """创建行程服务实例（无状态，每次调用创建新实例）"""
         return ItineraryService(self._geo_service)
     
+    def _after_commit(self, task: Callable[[], None]) -> None:
+        """在调用方事务提交后执行任务（未提供 defer_until_commit 时立即执行）
+
+        写操作的事件在提交后才发布：处理器用自己的会话写派生数据（通知、好友推荐、
+        热度），提交前执行会与请求争用写锁，请求回滚时还会留下多算的计数。
+        """
+        if self._defer_until_commit is None:
+            task()
+        else:
+            self._defer_until_commit(task)
+    
     def _publish_events(self, trip: Trip) -> None:
-        """发布聚合根中累积的领域事件"""
+        """发布聚合根中累积的领域事件（调用方事务提交后）"""
         events = trip.pop_events()
-        self._event_bus.publish_all(events)
+        self._after_commit(partial(self._event_bus.publish_all, events))
+    
+    def _load_trip(self, trip_id: str, day_index: Optional[int] = None) -> Optional[Trip]:
+        """加载旅行；指定 day_index 时只加载该日程（活动类命令无需完整聚合）"""
+        if day_index is None:
+            return self._trip_repository.find_by_id(TripId(trip_id))
+        return self._trip_repository.find_day_scoped(TripId(trip_id), day_index)
+    
+    def _save_trip(self, trip: Trip) -> None:
+        """保存旅行；按日加载的聚合只写入该日程"""
+        if trip.is_day_scoped:
+            self._trip_repository.save_day(trip)
+        else:
+            self._trip_repository.save(trip)
+    
+    # 并发冲突时的最大尝试次数（含首次）
+    MAX_CONFLICT_ATTEMPTS = 3
+    
+    def execute_with_retry(
+        self,
+        trip_id: str,
+        mutation: Callable[[Trip], T],
+        max_attempts: Optional[int] = None,
+        day_index: Optional[int] = None
+    ) -> Optional[Tuple[Trip, T]]:
+        """加载旅行、执行修改并保存；发生并发冲突时重新加载并重试
+        
+        只适用于可交换的操作（如添加成员、添加活动、修改某日备注），
+        即在他人修改后的最新状态上重新执行，结果仍符合用户意图。
+        失败尝试中产生的领域事件随旧聚合丢弃，不会发布。
+        
+        Args:
+            trip_id: 旅行ID
+            mutation: 对聚合根执行的修改，返回值原样返回
+            max_attempts: 最大尝试次数，默认 MAX_CONFLICT_ATTEMPTS
+            day_index: 指定时按日加载与保存（只涉及该日程的修改）
+            
+        Returns:
+            (保存后的旅行, mutation 返回值)，旅行不存在返回 None
+            
+        Raises:
+            TripConcurrencyError: 重试次数用尽仍然冲突
+        """
+        attempts = max_attempts or self.MAX_CONFLICT_ATTEMPTS
+        for attempt in range(1, attempts + 1):
+            trip = self._load_trip(trip_id, day_index)
+            if not trip:
+                return None
+            
+            result = mutation(trip)
+            try:
+                self._save_trip(trip)
+            except TripConcurrencyError:
+                if attempt >= attempts:
+                    raise
+                continue
+            
+            self._publish_events(trip)
+            return trip, result
     
     # ==================== Trip CRUD ====================
     
@@ -130,6 +222,17 @@ class TravelService:
         """
         return self._trip_repository.find_by_id(TripId(trip_id))
     
+    def get_trip_version(self, trip_id: str) -> Optional[datetime]:
+        """获取旅行版本（最后更新时间），用于缓存校验
+        
+        Args:
+            trip_id: 旅行ID
+            
+        Returns:
+            版本时间戳，不存在返回 None
+        """
+        return self._trip_repository.find_version(TripId(trip_id))
+    
     def update_trip(
         self,
         trip_id: str,
@@ -238,6 +341,35 @@ class TravelService:
         """获取公开的旅行列表"""
         return self._trip_repository.find_public(limit, offset, search_query)
     
+    def list_user_trip_summaries(self, user_id: str, status: Optional[str] = None) -> List[TripSummary]:
+        """获取用户参与的旅行摘要列表（列表页使用，不加载日程）"""
+        trip_status = TripStatus.from_string(status) if status else None
+        return self._trip_repository.find_summaries_by_member(user_id, trip_status)
+    
+    def list_created_trip_summaries(self, creator_id: str) -> List[TripSummary]:
+        """获取用户创建的旅行摘要列表"""
+        return self._trip_repository.find_summaries_by_creator(creator_id)
+    
+    def list_public_trip_summaries(
+        self,
+        limit: int = 20,
+        offset: int = 0,
+        search_query: Optional[str] = None,
+        sort: str = RankingSort.LATEST.value
+    ) -> List[TripSummary]:
+        """获取公开的旅行摘要列表（sort: latest 最新 / trending 热度，无效值抛出 ValueError）"""
+        return self._trip_repository.find_public_summaries(
+            limit, offset, search_query, sort=RankingSort.from_string(sort)
+        )
+    
+    def record_trip_view(self, trip_id: str, viewer_id: Optional[str] = None) -> None:
+        """记录旅行详情浏览（热度信号，由事件处理器计入排行）"""
+        self._event_bus.publish(TripViewedEvent(trip_id=trip_id, viewer_id=viewer_id))
+    
+    def record_template_view(self, template_id: str, viewer_id: Optional[str] = None) -> None:
+        """记录模板详情浏览（热度信号）"""
+        self._event_bus.publish(TemplateViewedEvent(template_id=template_id, viewer_id=viewer_id))
+    
     # ==================== 成员管理 ====================
     
     def add_member(
@@ -255,16 +387,14 @@ class TravelService:
             role: 角色
             added_by: 操作者ID
         """
-        trip = self._trip_repository.find_by_id(TripId(trip_id))
-        if not trip:
+        if not self._trip_repository.exists(TripId(trip_id)):
             return None
         
         # 检查是否为好友
         if added_by and added_by != user_id:
             try:
-                from app_social.services.social_service import SocialService
-                social_service = SocialService()
-                if not social_service.are_friends(added_by, user_id):
+                from app_social.infrastructure.cache.friend_graph_cache import get_friend_graph_cache
+                if not get_friend_graph_cache().are_friends(added_by, user_id):
                     raise ValueError(f"User {user_id} is not your friend")
             except ImportError:
                 # 忽略循环依赖或模块未找到，降级处理
@@ -273,17 +403,13 @@ class TravelService:
                 # 重新抛出业务异常
                 raise e
 
-        # 委托给聚合根（业务规则在聚合根中）
-        trip.add_member(
+        # 委托给聚合根（业务规则在聚合根中）；添加成员可交换，冲突时重试
+        outcome = self.execute_with_retry(trip_id, lambda trip: trip.add_member(
             user_id=user_id,
             role=MemberRole.from_string(role),
             added_by=added_by
-        )
-        
-        self._trip_repository.save(trip)
-        self._publish_events(trip)
-        
-        return trip
+        ))
+        return outcome[0] if outcome else None
     
     def remove_member(
         self,
@@ -349,8 +475,7 @@ class TravelService:
         Returns:
             TransitCalculationResult 包含计算的交通和可能的警告
         """
-        trip = self._trip_repository.find_by_id(TripId(trip_id))
-        if not trip:
+        if not self._trip_repository.exists(TripId(trip_id)):
             return None
         
         # Auto-geocode if coordinates are missing
@@ -387,14 +512,17 @@ class TravelService:
             notes=notes
         )
         
-        # 委托给聚合根，传入行程服务（无状态）
+        # 委托给聚合根，传入行程服务（无状态）；添加活动可交换，冲突时重试
         itinerary_service = self._create_itinerary_service()
-        result = trip.add_activity(day_index, activity, operator_id, itinerary_service)
-        
-        self._trip_repository.save(trip)
-        self._publish_events(trip)
+        outcome = self.execute_with_retry(
+            trip_id,
+            lambda trip: trip.add_activity(day_index, activity, operator_id, itinerary_service),
+            day_index=day_index
+        )
+        if outcome is None:
+            return None
         
-        return result or TransitCalculationResult()
+        return outcome[1] or TransitCalculationResult()
     
     def modify_activity(
         self,
@@ -415,7 +543,7 @@ class TravelService:
             operator_id: 操作者ID
             **updates: 要更新的字段
         """
-        trip = self._trip_repository.find_by_id(TripId(trip_id))
+        trip = self._load_trip(trip_id, day_index)
         if not trip:
             return None
         
@@ -456,7 +584,7 @@ class TravelService:
         itinerary_service = self._create_itinerary_service()
         result = trip.modify_activity(day_index, activity_id, operator_id, itinerary_service, **updates)
         
-        self._trip_repository.save(trip)
+        self._save_trip(trip)
         self._publish_events(trip)
         
         return result or TransitCalculationResult()
@@ -470,7 +598,7 @@ class TravelService:
         transport_mode: Optional[str] = None
     ) -> Optional[TransitCalculationResult]:
         """修改交通方式"""
-        trip = self._trip_repository.find_by_id(TripId(trip_id))
+        trip = self._load_trip(trip_id, day_index)
         if not trip:
             return None
             
@@ -484,7 +612,7 @@ class TravelService:
         )
         
         if result:
-            self._trip_repository.save(trip)
+            self._save_trip(trip)
             self._publish_events(trip)
         
         return result
@@ -497,14 +625,14 @@ class TravelService:
         operator_id: str
     ) -> Optional[TransitCalculationResult]:
         """移除活动"""
-        trip = self._trip_repository.find_by_id(TripId(trip_id))
+        trip = self._load_trip(trip_id, day_index)
         if not trip:
             return None
         
         itinerary_service = self._create_itinerary_service()
         result = trip.remove_activity(day_index, activity_id, operator_id, itinerary_service)
         
-        self._trip_repository.save(trip)
+        self._save_trip(trip)
         self._publish_events(trip)
         
         return result or TransitCalculationResult()
@@ -606,7 +734,8 @@ class TravelService:
     def get_trip_statistics(self, trip_id: str) -> Optional[Dict[str, Any]]:
         """获取旅行统计报表
         
-        委托给聚合根生成统计信息。
+        优先读取与旅行当前版本一致的统计投影；投影缺失或过期时
+        加载聚合重新计算，并回填投影。
         
         Args:
             trip_id: 旅行ID
@@ -614,14 +743,55 @@ class TravelService:
         Returns:
             统计信息字典
         """
-        trip = self._trip_repository.find_by_id(TripId(trip_id))
+        tid = TripId(trip_id)
+        if self._statistics_repository:
+            version = self._trip_repository.find_version(tid)
+            if version is None:
+                return None
+            stats = self._statistics_repository.find_by_trip_id(trip_id, version)
+            if stats:
+                return stats.to_dict()
+        
+        trip = self._trip_repository.find_by_id(tid)
         if not trip:
             return None
         
         # 委托给聚合根
         stats = trip.generate_statistics()
+        if self._statistics_repository:
+            self._statistics_repository.refresh(trip, trip.updated_at)
         return stats.to_dict()
     
+    def get_trip_statistics_summaries(self, trip_ids: List[str]) -> Dict[str, TripStatisticsSummary]:
+        """批量获取旅行统计摘要（列表卡片使用，只读取投影）
+        
+        Args:
+            trip_ids: 旅行ID列表
+            
+        Returns:
+            trip_id -> 统计摘要，投影缺失或过期的旅行不在结果中
+        """
+        if not self._statistics_repository:
+            return {}
+        return self._statistics_repository.find_summaries(trip_ids)
+    
+    def rebuild_trip_statistics(self, trip_id: str) -> bool:
+        """全量重算旅行的统计投影
+        
+        Args:
+            trip_id: 旅行ID
+            
+        Returns:
+            旅行是否存在
+        """
+        if not self._statistics_repository:
+            return False
+        trip = self._trip_repository.find_by_id(TripId(trip_id))
+        if not trip:
+            return False
+        self._statistics_repository.refresh(trip, trip.updated_at)
+        return True
+    
     # ==================== 状态管理 ====================
     
     def start_trip(self, trip_id: str) -> Optional[Trip]:
@@ -667,16 +837,8 @@ class TravelService:
     
     def update_day_notes(self, trip_id: str, day_index: int, notes: str) -> Optional[Trip]:
         """更新日程备注"""
-        trip = self._trip_repository.find_by_id(TripId(trip_id))
-        if not trip:
-            return None
-        
-        trip.update_day_notes(day_index, notes)
-        
-        self._trip_repository.save(trip)
-        self._publish_events(trip)
-        
-        return trip
+        outcome = self.execute_with_retry(trip_id, lambda trip: trip.update_day_notes(day_index, notes))
+        return outcome[0] if outcome else None
     
     def update_day_theme(self, trip_id: str, day_index: int, theme: str) -> Optional[Trip]:
         """更新日程主题"""
@@ -733,9 +895,7 @@ class TravelService:
             SplitMode, ExpenseCategory
         )
         from app_travel.domain.domain_event.expense_events import ExpenseAddedEvent
-        from app_travel.infrastructure.database.dao_impl.sqlalchemy_expense_dao import SQLAlchemyExpenseDAO
         from app_travel.infrastructure.database.persistent_model.expense_po import ExpensePO
-        from shared.database.core import get_db_session
         
         # 获取行程
         trip = self._trip_repository.find_by_id(TripId(trip_id))
@@ -779,12 +939,8 @@ class TravelService:
             percentages=decimal_percentages
         )
         
-        # 持久化
-        session = get_db_session()
-        expense_dao = SQLAlchemyExpenseDAO(session)
-        expense_po = ExpensePO.from_domain(expense)
-        expense_dao.create(expense_po)
-        session.commit()
+        # 持久化（成员余额表在同一事务内增量更新）
+        self._require_expense_dao().create(ExpensePO.from_domain(expense))
         
         # 发布事件
         event = ExpenseAddedEvent(
@@ -795,7 +951,7 @@ class TravelService:
             currency=currency,
             description=description
         )
-        self._event_bus.publish(event)
+        self._after_commit(partial(self._event_bus.publish, event))
         
         return expense
     
@@ -808,12 +964,7 @@ class TravelService:
         Returns:
             费用列表
         """
-        from app_travel.infrastructure.database.dao_impl.sqlalchemy_expense_dao import SQLAlchemyExpenseDAO
-        from shared.database.core import get_db_session
-        
-        session = get_db_session()
-        expense_dao = SQLAlchemyExpenseDAO(session)
-        expense_pos = expense_dao.get_by_trip_id(trip_id)
+        expense_pos = self._require_expense_dao().get_by_trip_id(trip_id)
         
         return [po.to_domain() for po in expense_pos]
     
@@ -834,44 +985,46 @@ class TravelService:
             是否成功删除
         """
         from app_travel.domain.domain_event.expense_events import ExpenseDeletedEvent
-        from app_travel.infrastructure.database.dao_impl.sqlalchemy_expense_dao import SQLAlchemyExpenseDAO
-        from shared.database.core import get_db_session
         
         # 验证行程存在
         trip = self._trip_repository.find_by_id(TripId(trip_id))
         if not trip:
             return False
         
-        # 删除费用
-        session = get_db_session()
-        expense_dao = SQLAlchemyExpenseDAO(session)
+        # 删除费用（仅限本行程的费用）
+        expense_dao = self._require_expense_dao()
+        expense_po = expense_dao.get_by_id(expense_id)
+        if not expense_po or expense_po.trip_id != trip_id:
+            return False
         success = expense_dao.delete(expense_id)
         
         if success:
-            session.commit()
-            
             # 发布事件
             event = ExpenseDeletedEvent(
                 trip_id=trip_id,
                 expense_id=expense_id,
                 deleted_by=deleted_by
             )
-            self._event_bus.publish(event)
+            self._after_commit(partial(self._event_bus.publish, event))
         
         return success
     
     def get_expense_summary(self, trip_id: str) -> Dict[str, Any]:
         """获取费用汇总
         
+        分类汇总由 GROUP BY 查询完成，成员收支读取余额表（每位成员一行），
+        不加载费用明细。
+        
         Args:
             trip_id: 行程ID
             
         Returns:
             费用汇总信息
         """
-        expenses = self.list_expenses(trip_id)
+        expense_dao = self._require_expense_dao()
+        by_category = expense_dao.sum_by_category(trip_id)
         
-        if not expenses:
+        if not by_category:
             return {
                 'total_amount': 0,
                 'currency': 'CNY',
@@ -879,48 +1032,22 @@ class TravelService:
                 'by_category': {}
             }
         
-        # 总金额
-        total_amount = sum(e.amount for e in expenses)
-        currency = expenses[0].currency if expenses else 'CNY'
-        
-        # 每个成员的统计
-        per_member = {}
-        for expense in expenses:
-            # 付款人
-            if expense.payer_id not in per_member:
-                per_member[expense.payer_id] = {'paid': Decimal('0'), 'owed': Decimal('0')}
-            per_member[expense.payer_id]['paid'] += expense.amount
-            
-            # 参与者
-            for share in expense.shares:
-                if share.user_id not in per_member:
-                    per_member[share.user_id] = {'paid': Decimal('0'), 'owed': Decimal('0')}
-                per_member[share.user_id]['owed'] += share.amount
-        
-        # 转换为字符串
-        per_member_str = {
-            user_id: {
-                'paid': str(stats['paid']),
-                'owed': str(stats['owed'])
+        total_amount = sum(by_category.values(), Decimal('0'))
+        currency = expense_dao.get_latest_currency(trip_id) or 'CNY'
+        
+        per_member = {
+            row.user_id: {
+                'paid': str(row.paid),
+                'owed': str(row.owed)
             }
-            for user_id, stats in per_member.items()
+            for row in self._load_member_balances(trip_id)
         }
         
-        # 按分类统计
-        by_category = {}
-        for expense in expenses:
-            category = expense.category.value
-            if category not in by_category:
-                by_category[category] = Decimal('0')
-            by_category[category] += expense.amount
-        
-        by_category_str = {cat: str(amt) for cat, amt in by_category.items()}
-        
         return {
             'total_amount': str(total_amount),
             'currency': currency,
-            'per_member': per_member_str,
-            'by_category': by_category_str
+            'per_member': per_member,
+            'by_category': {cat: str(amt) for cat, amt in by_category.items()}
         }
     
     def get_settlement(self, trip_id: str) -> List[Dict[str, Any]]:
@@ -934,16 +1061,15 @@ class TravelService:
         """
         from app_travel.domain.domain_service.settlement_service import SettlementService
         
-        expenses = self.list_expenses(trip_id)
+        # 计算余额（读取余额表，O(成员数)）
+        balances = {row.user_id: row.balance for row in self._load_member_balances(trip_id)}
         
-        if not expenses:
+        if not balances:
             return []
         
-        # 计算余额
-        balances = SettlementService.calculate_balances(expenses)
-        
-        # 最小化转账
-        transfers = SettlementService.minimize_transfers(balances)
+        # 最小化转账（成员较少时精确求解，超出时间预算回退贪心）
+        currency = self._require_expense_dao().get_latest_currency(trip_id) or 'CNY'
+        transfers = SettlementService.minimize_transfers(balances, currency=currency)
         
         # 转换为字典
         return [
@@ -957,6 +1083,23 @@ class TravelService:
             for t in transfers
         ]
     
+    def _require_expense_dao(self) -> IExpenseDAO:
+        if self._expense_dao is None:
+            raise RuntimeError("TravelService was created without an expense DAO")
+        return self._expense_dao
+    
+    def _load_member_balances(self, trip_id: str) -> list:
+        """读取成员余额行
+
+        余额表缺失（历史行程尚未有新的费用写入）时由聚合查询计算，只读不回填；
+        回填在下一次费用写入时于同一事务内完成，或由迁移脚本批量完成。
+        """
+        expense_dao = self._require_expense_dao()
+        balances = expense_dao.get_member_balances(trip_id)
+        if not balances and expense_dao.has_expenses(trip_id):
+            balances = expense_dao.compute_member_balances(trip_id)
+        return balances
+    
     def mark_transfer_settled(
         self,
         trip_id: str,
@@ -976,13 +1119,10 @@ class TravelService:
             是否成功标记
         """
         from app_travel.domain.domain_event.expense_events import SettlementMarkedEvent
-        from app_travel.infrastructure.database.dao_impl.sqlalchemy_expense_dao import SQLAlchemyExpenseDAO
         from app_travel.infrastructure.database.persistent_model.expense_po import SettlementTransferPO
-        from shared.database.core import get_db_session
         
         # 查找或创建结算转账记录
-        session = get_db_session()
-        expense_dao = SQLAlchemyExpenseDAO(session)
+        expense_dao = self._require_expense_dao()
         
         transfers = expense_dao.get_settlement_transfers_by_trip_id(trip_id)
         
@@ -1015,7 +1155,6 @@ class TravelService:
             target_transfer.settled_at = datetime.utcnow()
             expense_dao.update_settlement_transfer(target_transfer)
         
-        session.commit()
         
         # 发布事件
         event = SettlementMarkedEvent(
@@ -1025,12 +1164,17 @@ class TravelService:
             amount=str(decimal_amount),
             currency='CNY'
         )
-        self._event_bus.publish(event)
+        self._after_commit(partial(self._event_bus.publish, event))
         
         return True
 
     # ==================== 模板管理 ====================
     
+    def _require_template_repository(self) -> ITemplateRepository:
+        if self._template_repository is None:
+            raise RuntimeError("TravelService was created without a template repository")
+        return self._template_repository
+    
     def publish_template(
         self,
         trip_id: str,
@@ -1049,9 +1193,6 @@ class TravelService:
             ValueError: 如果行程不满足发布条件
         """
         from app_travel.domain.domain_service.template_service import TemplateService
-        from app_travel.infrastructure.database.repository_impl.template_repository_impl import TemplateRepositoryImpl
-        from app_travel.infrastructure.database.dao_impl.sqlalchemy_template_dao import SQLAlchemyTemplateDAO
-        from shared.database.core import get_db_session
         
         # 获取源行程
         trip = self.get_trip(trip_id)
@@ -1061,12 +1202,13 @@ class TravelService:
         # 创建模板（会验证状态和可见性）
         template = TemplateService.create_from_trip(trip, author_id)
         
-        # 持久化
-        session = get_db_session()
-        template_dao = SQLAlchemyTemplateDAO(session)
-        template_repo = TemplateRepositoryImpl(template_dao)
-        template_repo.save(template)
-        session.commit()
+        # 持久化（同时写入标签表与检索词索引）
+        self._require_template_repository().save(template)
+        self._after_commit(partial(self._event_bus.publish, TemplatePublishedEvent(
+            template_id=template.id.value,
+            source_trip_id=template.source_trip_id,
+            author_id=author_id
+        )))
         
         return {
             'id': template.id.value,
@@ -1085,7 +1227,8 @@ class TravelService:
         limit: int = 20,
         offset: int = 0,
         keyword: Optional[str] = None,
-        tag: Optional[str] = None
+        tag: Optional[str] = None,
+        sort: str = RankingSort.LATEST.value
     ) -> Dict[str, Any]:
         """浏览模板列表
         
@@ -1094,46 +1237,45 @@ class TravelService:
             offset: 偏移量
             keyword: 关键词搜索（可选）
             tag: 标签过滤（可选）
+            sort: 排序方式 latest（最新）/ trending（热度）
             
         Returns:
             包含模板列表和总数的字典
+            
+        Raises:
+            ValueError: 排序方式无效
         """
-        from app_travel.infrastructure.database.repository_impl.template_repository_impl import TemplateRepositoryImpl
-        from app_travel.infrastructure.database.dao_impl.sqlalchemy_template_dao import SQLAlchemyTemplateDAO
-        from shared.database.core import get_db_session
-        
-        session = get_db_session()
-        template_dao = SQLAlchemyTemplateDAO(session)
-        template_repo = TemplateRepositoryImpl(template_dao)
+        ranking = RankingSort.from_string(sort)
         
-        templates = template_repo.find_all(
+        # 列表卡片投影（不解析 days_data_json），分页与总数一次查询返回
+        summaries, total = self._require_template_repository().find_summaries(
             limit=limit,
             offset=offset,
             keyword=keyword,
-            tag=tag
+            tag=tag,
+            sort=ranking
         )
         
-        total = template_repo.count_all(keyword=keyword, tag=tag)
-        
         template_list = [
             {
-                'id': t.id.value,
+                'id': t.template_id,
                 'name': t.name,
                 'description': t.description,
                 'author_id': t.author_id,
                 'duration_days': t.duration_days,
-                'tags': t.tags,
+                'tags': list(t.tags),
                 'activity_count': t.activity_count,
                 'created_at': t.created_at.isoformat()
             }
-            for t in templates
+            for t in summaries
         ]
         
         return {
             'templates': template_list,
             'total': total,
             'limit': limit,
-            'offset': offset
+            'offset': offset,
+            'sort': ranking.value
         }
     
     def get_template(self, template_id: str) -> Optional[Dict[str, Any]]:
@@ -1146,15 +1288,8 @@ class TravelService:
             模板详情字典，不存在返回 None
         """
         from app_travel.domain.value_objects.template_value_objects import TemplateId
-        from app_travel.infrastructure.database.repository_impl.template_repository_impl import TemplateRepositoryImpl
-        from app_travel.infrastructure.database.dao_impl.sqlalchemy_template_dao import SQLAlchemyTemplateDAO
-        from shared.database.core import get_db_session
-        
-        session = get_db_session()
-        template_dao = SQLAlchemyTemplateDAO(session)
-        template_repo = TemplateRepositoryImpl(template_dao)
         
-        template = template_repo.find_by_id(TemplateId(template_id))
+        template = self._require_template_repository().find_by_id(TemplateId(template_id))
         
         if not template:
             return None
@@ -1220,27 +1355,23 @@ class TravelService:
         """
         from app_travel.domain.value_objects.template_value_objects import TemplateId
         from app_travel.domain.domain_service.template_service import TemplateService
-        from app_travel.infrastructure.database.repository_impl.template_repository_impl import TemplateRepositoryImpl
-        from app_travel.infrastructure.database.dao_impl.sqlalchemy_template_dao import SQLAlchemyTemplateDAO
-        from shared.database.core import get_db_session
         
         # 获取模板
-        session = get_db_session()
-        template_dao = SQLAlchemyTemplateDAO(session)
-        template_repo = TemplateRepositoryImpl(template_dao)
-        
-        template = template_repo.find_by_id(TemplateId(template_id))
+        template = self._require_template_repository().find_by_id(TemplateId(template_id))
         if not template:
             raise ValueError(f"Template {template_id} not found")
         
         # 克隆为新行程
         trip = TemplateService.clone_to_trip(template, user_id, start_date, end_date)
         
-        # 持久化
-        self._trip_repository.save(trip)
+        # 持久化（新行程整棵对象图批量插入）
+        self._trip_repository.add_new(trip)
         
         # 发布事件
         self._publish_events(trip)
+        self._after_commit(partial(self._event_bus.publish, TemplateClonedEvent(
+            template_id=template_id, trip_id=trip.id.value, user_id=user_id
+        )))
         
         return trip
     
@@ -1275,10 +1406,13 @@ class TravelService:
         # 克隆行程
         trip = TemplateService.clone_trip_directly(source_trip, user_id, start_date, end_date)
         
-        # 持久化
-        self._trip_repository.save(trip)
+        # 持久化（新行程整棵对象图批量插入）
+        self._trip_repository.add_new(trip)
         
         # 发布事件
         self._publish_events(trip)
+        self._after_commit(partial(self._event_bus.publish, TripClonedEvent(
+            source_trip_id=source_trip_id, trip_id=trip.id.value, user_id=user_id
+        )))
         
         return trip
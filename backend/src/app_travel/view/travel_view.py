@@ -2,20 +2,43 @@ from flask import Blueprint, request, jsonify, g, current_app, session
 from datetime import datetime, date, time
 from decimal import Decimal
 import traceback
+from functools import partial
+from typing import Any, Dict, Iterable, List, Optional
 
-from shared.database.core import SessionLocal
+from shared.database.core import SessionLocal, after_commit
 from shared.storage.local_file_storage import LocalFileStorageService
+from shared.infrastructure.json_stream import (
+    FieldSelection, parse_fields, select_fields, stream_json_response
+)
 from app_travel.infrastructure.database.dao_impl.sqlalchemy_trip_dao import SqlAlchemyTripDao
 from app_travel.infrastructure.database.repository_impl.trip_repository_impl import TripRepositoryImpl
+from app_travel.infrastructure.database.dao_impl.sqlalchemy_trip_statistics_dao import SqlAlchemyTripStatisticsDao
+from app_travel.infrastructure.database.dao_impl.sqlalchemy_expense_dao import SQLAlchemyExpenseDAO
+from app_travel.infrastructure.database.dao_impl.sqlalchemy_template_dao import SQLAlchemyTemplateDAO
+from app_travel.infrastructure.database.repository_impl.template_repository_impl import TemplateRepositoryImpl
+from app_travel.infrastructure.database.repository_impl.trip_statistics_repository_impl import TripStatisticsRepositoryImpl
 from app_travel.infrastructure.external_service.gaode_geo_service_impl import GaodeGeoServiceImpl
+from app_travel.infrastructure.geo import polyline_codec
+from app_travel.infrastructure.cache.trip_detail_cache import (
+    get_trip_detail_cache, register_trip_detail_cache_handlers
+)
+from app_travel.domain.event_handler.popularity_handler import register_popularity_handlers
 from app_travel.services.travel_service import TravelService
 from app_travel.domain.aggregate.trip_aggregate import Trip
+from app_travel.domain.demand_interface.i_trip_repository import TripConcurrencyError
 from app_travel.domain.value_objects.itinerary_value_objects import TransitCalculationResult
 from app_travel.domain.value_objects.travel_value_objects import Location
+from app_travel.domain.value_objects.trip_summary import TripSummary
+from app_travel.domain.value_objects.trip_statistics import TripStatisticsSummary
 
 # 创建蓝图
 travel_bp = Blueprint('travel', __name__, url_prefix='/api/travel')
 
+# 旅行变更事件使详情缓存失效
+register_trip_detail_cache_handlers()
+# 模板/旅行的克隆、浏览、游记点赞等事件更新热度排行
+register_popularity_handlers()
+
 
 @travel_bp.record_once
 def configure_app(state):
@@ -35,56 +58,104 @@ def shutdown_session(exception=None):
     if hasattr(g, 'session'):
         g.session.close()
 
+def conflict_response(error: TripConcurrencyError):
+    """并发修改冲突：客户端应重新获取旅行后再提交"""
+    return jsonify({'error': str(error), 'code': 'conflict'}), 409
+
+@travel_bp.errorhandler(TripConcurrencyError)
+def handle_trip_conflict(error):
+    g.session.rollback()
+    return conflict_response(error)
+
 def get_travel_service() -> TravelService:
     """获取 TravelService 实例
     
     组装依赖：
     TravelService -> TripRepositoryImpl -> SqlAlchemyTripDao -> Session
+                  -> TripStatisticsRepositoryImpl -> SqlAlchemyTripStatisticsDao -> Session
+                  -> SQLAlchemyExpenseDAO -> Session
+                  -> TemplateRepositoryImpl -> SQLAlchemyTemplateDAO -> Session
                   -> GaodeGeoServiceImpl
     """
+    statistics_repo = TripStatisticsRepositoryImpl(SqlAlchemyTripStatisticsDao(g.session))
     trip_dao = SqlAlchemyTripDao(g.session)
-    trip_repo = TripRepositoryImpl(trip_dao)
+    trip_repo = TripRepositoryImpl(trip_dao, statistics_repo)
     # 这里可以从配置获取 API Key，暂使用默认值
     geo_service = GaodeGeoServiceImpl()
     
-    return TravelService(trip_repo, geo_service)
+    return TravelService(
+        trip_repo,
+        geo_service,
+        statistics_repository=statistics_repo,
+        expense_dao=SQLAlchemyExpenseDAO(g.session),
+        template_repository=TemplateRepositoryImpl(SQLAlchemyTemplateDAO(g.session)),
+        defer_until_commit=partial(after_commit, g.session)
+    )
 
-from app_auth.infrastructure.database.persistent_model.user_po import UserPO
+from app_auth.infrastructure.cache.user_profile_cache import get_user_profile_cache
 
 # ==================== 序列化辅助函数 ====================
 
-def serialize_trip(trip: Trip, detail: bool = True) -> dict:
-    """将 Trip 聚合根序列化为字典
+def load_member_profiles(user_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """批量获取成员的用户名和头像（经用户资料缓存，未命中的用户一次查询加载）"""
+    # 跨模块读取用户资料是为了性能（避免逐个调用 Auth Service）
+    try:
+        return get_user_profile_cache().get_many(user_ids, session=g.session)
+    except Exception:
+        # 如果查询失败，降级处理
+        return {}
+
+def serialize_members(members, profiles: Optional[Dict[str, Dict[str, Any]]] = None) -> list:
+    """序列化旅行成员（TripMember 或 TripMemberSummary），附带用户名和头像
     
     Args:
-        trip: Trip 对象
-        detail: 是否包含详细的日程（days/activities）信息。
-                列表页建议设为 False 以提高性能。
+        members: 成员列表
+        profiles: 已批量加载的 user_id -> {"name", "avatar"}（列表页按整页加载一次），
+                  None 时按本旅行的成员加载
     """
-    
-    # 批量获取用户信息以展示头像和用户名
     members_data = []
-    if trip.members:
-        user_ids = [m.user_id for m in trip.members]
-        # 使用 g.session 查询 UserPO
-        # 注意：UserPO 属于 auth 模块，这里跨模块查询是为了性能（避免 N+1 调用 Auth Service）
-        # 在严格的微服务架构中，应该调用 AuthService 的批量接口
-        try:
-            users = g.session.query(UserPO).filter(UserPO.id.in_(user_ids)).all()
-            user_map = {u.id: u for u in users}
-        except Exception:
-            # 如果查询失败，降级处理
-            user_map = {}
+    if members:
+        if profiles is None:
+            profiles = load_member_profiles(m.user_id for m in members)
             
-        for m in trip.members:
-            user = user_map.get(m.user_id)
+        for m in members:
+            profile = profiles.get(m.user_id)
             members_data.append({
                 'user_id': m.user_id,
                 'role': m.role.value,
                 'nickname': m.nickname, # 这里的 nickname 是 trip 内的备注名
-                'username': user.username if user else 'Unknown',
-                'avatar_url': user.avatar_url if user else None
+                'username': profile['name'] if profile else 'Unknown',
+                'avatar_url': profile['avatar'] if profile else None
             })
+    return members_data
+
+# polyline 输出方式：
+#   full       高德原始文本 "lng,lat;..."（默认，存储为编码格式时按需解码）
+#   encoded    Encoded Polyline（精度 1e-6，坐标顺序 lat,lng），体积最小
+#   simplified 按 ?zoom= 缩放级别做 Douglas-Peucker 简化后的高德文本
+#   none       省略
+POLYLINE_MODES = ('full', 'encoded', 'simplified', 'none')
+DEFAULT_POLYLINE_ZOOM = 14
+
+def format_polyline(polyline: Optional[str], mode: str = 'full', zoom: Optional[int] = None) -> Optional[str]:
+    """按输出方式转换 polyline 存储值"""
+    if mode == 'encoded':
+        return polyline_codec.to_storage(polyline)
+    if mode == 'simplified':
+        return polyline_codec.simplify_for_zoom(polyline, zoom if zoom is not None else DEFAULT_POLYLINE_ZOOM)
+    return polyline_codec.to_gaode(polyline)
+
+def serialize_trip(trip: Trip, detail: bool = True, include_members: bool = True) -> dict:
+    """将 Trip 聚合根序列化为字典
+    
+    Args:
+        trip: Trip 对象
+        detail: 是否包含详细的日程（days/activities）信息。
+                列表页建议设为 False 以提高性能。
+        include_members: 是否查询并返回成员信息
+    """
+    
+    members_data = serialize_members(trip.members) if include_members else []
 
     result = {
         'id': trip.id.value,
@@ -104,6 +175,7 @@ def serialize_trip(trip: Trip, detail: bool = True) -> dict:
         'cover_image_url': trip.cover_image_url,
         'created_at': trip.created_at.isoformat(),
         'updated_at': trip.updated_at.isoformat(),
+        'version': trip.version,
         'member_count': len(trip.members), # Helper count
         'members': members_data,
     }
@@ -116,7 +188,70 @@ def serialize_trip(trip: Trip, detail: bool = True) -> dict:
         
     return result
 
-def serialize_trip_day(day) -> dict:
+def serialize_trip_stream(
+    trip: Trip,
+    selection: Optional[FieldSelection] = None,
+    polyline: str = 'full',
+    zoom: Optional[int] = None
+) -> dict:
+    """序列化旅行详情，days 为逐日生成的生成器（配合 stream_json_response）
+    
+    未选择的日程/成员不会被序列化（也不会触发地理编码或用户查询）。
+    
+    Args:
+        trip: Trip 对象
+        selection: 字段选择树，None 表示全部字段
+        polyline: polyline 输出方式，见 POLYLINE_MODES
+        zoom: simplified 方式使用的地图缩放级别
+    """
+    include_members = selection is None or 'members' in selection
+    result = select_fields(serialize_trip(trip, detail=False, include_members=include_members), selection)
+    
+    if selection is None or 'days' in selection:
+        day_selection = selection.get('days') if selection else None
+        result['days'] = (
+            select_fields(serialize_trip_day(day, polyline, zoom), day_selection)
+            for day in trip.days
+        )
+    return result
+
+def serialize_trip_summary(
+    summary: TripSummary,
+    statistics: Optional[TripStatisticsSummary] = None,
+    profiles: Optional[Dict[str, Dict[str, Any]]] = None
+) -> dict:
+    """序列化旅行摘要（列表页），字段与 serialize_trip(detail=False) 一致，另附统计摘要"""
+    return {
+        'id': summary.trip_id,
+        'name': summary.name,
+        'description': summary.description,
+        'creator_id': summary.creator_id,
+        'start_date': summary.start_date.isoformat(),
+        'end_date': summary.end_date.isoformat(),
+        'days_count': summary.days_count,
+        'budget': {
+            'amount': float(summary.budget.amount),
+            'currency': summary.budget.currency
+        } if summary.budget else None,
+        'budget_amount': float(summary.budget.amount) if summary.budget else 0,
+        'visibility': summary.visibility.value,
+        'status': summary.status.value,
+        'cover_image_url': summary.cover_image_url,
+        'created_at': summary.created_at.isoformat(),
+        'updated_at': summary.updated_at.isoformat(),
+        'member_count': summary.member_count,
+        'members': serialize_members(summary.members, profiles),
+        'days': [],
+        'statistics': statistics.to_dict() if statistics else None,
+    }
+
+def serialize_trip_summaries(service: TravelService, summaries: List[TripSummary]) -> list:
+    """序列化旅行摘要列表，统计摘要从投影批量读取，整页成员的用户资料一次加载"""
+    statistics = service.get_trip_statistics_summaries([t.trip_id for t in summaries])
+    profiles = load_member_profiles(m.user_id for t in summaries for m in t.members)
+    return [serialize_trip_summary(t, statistics.get(t.trip_id), profiles) for t in summaries]
+
+def serialize_trip_day(day, polyline: str = 'full', zoom: Optional[int] = None) -> dict:
     """序列化 TripDay"""
     # 实例化高德服务 (注意：频繁实例化可能有性能损耗，但在 View 层简单处理即可)
     geo_service = GaodeGeoServiceImpl()
@@ -169,7 +304,7 @@ def serialize_trip_day(day) -> dict:
         'theme': day.theme,
         'notes': day.notes,
         'activities': [serialize_activity(a) for a in day.activities],
-        'transits': [serialize_transit(t) for t in day.transits],
+        'transits': [serialize_transit(t, polyline, zoom) for t in day.transits],
         'initial_center': initial_center # [lng, lat] or None
     }
 
@@ -198,9 +333,14 @@ def serialize_activity(activity) -> dict:
         'notes': activity.notes
     }
 
-def serialize_transit(transit) -> dict:
-    """序列化 Transit"""
-    return {
+def serialize_transit(transit, polyline: str = 'full', zoom: Optional[int] = None) -> dict:
+    """序列化 Transit
+    
+    Args:
+        polyline: polyline 输出方式，见 POLYLINE_MODES
+        zoom: simplified 方式使用的地图缩放级别
+    """
+    result = {
         'id': transit.id,
         'from_activity_id': transit.from_activity_id,
         'to_activity_id': transit.to_activity_id,
@@ -214,9 +354,11 @@ def serialize_transit(transit) -> dict:
             'toll_cost': float(transit.estimated_cost.toll_cost.amount) if transit.estimated_cost.toll_cost else 0,
             'ticket_cost': float(transit.estimated_cost.ticket_cost.amount) if transit.estimated_cost.ticket_cost else 0
         } if transit.estimated_cost else None,
-        # polyline 可能很长，视前端需求决定是否返回
-        'polyline': transit.route_info.polyline 
     }
+    # polyline 可能很长，由客户端通过 ?polyline= 决定是否返回
+    if polyline != 'none':
+        result['polyline'] = format_polyline(transit.route_info.polyline, polyline, zoom)
+    return result
 
 def serialize_transit_result(result: TransitCalculationResult) -> dict:
     """序列化交通计算结果"""
@@ -291,14 +433,58 @@ def create_trip():
 
 @travel_bp.route('/trips/<trip_id>', methods=['GET'])
 def get_trip(trip_id):
-    """获取旅行详情"""
-    service = get_travel_service()
-    trip = service.get_trip(trip_id)
+    """获取旅行详情
     
-    if not trip:
+    查询参数：
+        fields: 只返回选择的字段，如 fields=id,name,days.date,days.activities.name
+        polyline: 交通路线输出方式，见 POLYLINE_MODES（默认 full）
+        zoom: polyline=simplified 时的地图缩放级别
+    
+    响应以流式 JSON 输出，并带 ETag（随旅行版本与上述参数变化）：
+    客户端携带匹配的 If-None-Match 时直接返回 304，只查询 trips 表。
+    默认表示按版本缓存；带参数的表示不缓存，日程逐日序列化输出。
+    """
+    selection = parse_fields(request.args.get('fields'))
+    polyline = request.args.get('polyline', 'full')
+    if polyline not in POLYLINE_MODES:
+        return jsonify({'error': f'polyline must be one of {", ".join(POLYLINE_MODES)}'}), 400
+    zoom = request.args.get('zoom', type=int)
+    if polyline != 'simplified':
+        zoom = None
+    variant = '' if selection is None and polyline == 'full' else f"{request.args.get('fields', '')}|{polyline}|{zoom}"
+    
+    service = get_travel_service()
+    version = service.get_trip_version(trip_id)
+    if version is None:
         return jsonify({'error': 'Trip not found'}), 404
-        
-    return jsonify(serialize_trip(trip))
+    cache = get_trip_detail_cache()
+    etag = cache.make_etag(trip_id, version, variant)
+    if request.if_none_match.contains(etag):
+        # 304 是客户端重新验证缓存，不计为浏览
+        response = current_app.response_class(status=304)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    service.record_trip_view(trip_id, session.get('user_id'))
+    
+    payload = cache.get(trip_id, version) if not variant else None
+    if payload is None:
+        trip = service.get_trip(trip_id)
+        if not trip:
+            return jsonify({'error': 'Trip not found'}), 404
+        # 以实际加载到的版本为准，避免与版本查询之间的并发修改错配
+        version = trip.updated_at
+        etag = cache.make_etag(trip_id, version, variant)
+        if variant:
+            payload = serialize_trip_stream(trip, selection, polyline, zoom)
+        else:
+            payload = serialize_trip(trip)
+            cache.set(trip_id, version, payload)
+    
+    response = stream_json_response(payload)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 @travel_bp.route('/trips/<trip_id>', methods=['PUT'])
 def update_trip(trip_id):
@@ -365,6 +551,8 @@ def add_member(trip_id):
             
         g.session.commit()
         return jsonify(serialize_trip(trip)), 201
+    except TripConcurrencyError as e:
+        return conflict_response(e)
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
     except Exception as e:
@@ -377,21 +565,25 @@ def list_user_trips(user_id):
     status = request.args.get('status')
     service = get_travel_service()
     
-    trips = service.list_user_trips(user_id, status)
-    # 列表页不需要详细的 days/activities 信息，避免触发昂贵的 geocoding
-    return jsonify([serialize_trip(t, detail=False) for t in trips])
+    # 列表页只查询摘要投影，不加载 days/activities，也不触发昂贵的 geocoding
+    trips = service.list_user_trip_summaries(user_id, status)
+    return jsonify(serialize_trip_summaries(service, trips))
 
 @travel_bp.route('/trips/public', methods=['GET'])
 def list_public_trips():
-    """获取公开旅行"""
+    """获取公开旅行（sort=latest 最新，sort=trending 按热度）"""
     limit = int(request.args.get('limit', 20))
     offset = int(request.args.get('offset', 0))
     search_query = request.args.get('search') or request.args.get('q')
+    sort = request.args.get('sort', 'latest')
     service = get_travel_service()
     
-    trips = service.list_public_trips(limit, offset, search_query)
-    # 列表页同样不需要详细信息
-    return jsonify([serialize_trip(t, detail=False) for t in trips])
+    # 列表页同样只查询摘要
+    try:
+        trips = service.list_public_trip_summaries(limit, offset, search_query, sort=sort)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(serialize_trip_summaries(service, trips))
 
 @travel_bp.route('/trips/<trip_id>/members/<user_id>', methods=['DELETE'])
 def remove_member(trip_id, user_id):
@@ -413,6 +605,8 @@ def remove_member(trip_id, user_id):
             
         g.session.commit()
         return jsonify(serialize_trip(updated_trip)), 200
+    except TripConcurrencyError as e:
+        return conflict_response(e)
     except ValueError as e:
         g.session.rollback()
         return jsonify({'error': str(e)}), 400
@@ -467,6 +661,8 @@ def add_activity(trip_id, day_index):
 
         g.session.commit()
         return jsonify(serialize_transit_result(result)), 201
+    except TripConcurrencyError as e:
+        return conflict_response(e)
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
     except Exception as e:
@@ -541,6 +737,8 @@ def modify_transit(trip_id, day_index, transit_id):
             return jsonify(serialize_transit(result.transits[0]))
         # 如果没有 Transit，退回通用结构
         return jsonify(serialize_transit_result(result))
+    except TripConcurrencyError as e:
+        return conflict_response(e)
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
     except Exception as e:
@@ -577,7 +775,10 @@ def get_trip_statistics(trip_id):
     
     if not stats:
         return jsonify({'error': 'Trip not found'}), 404
-        
+    
+    # 投影缺失或过期时会在读取中回填
+    g.session.commit()
+    
     return jsonify(stats)
 
 @travel_bp.route('/locations/geocode', methods=['GET'])
@@ -628,6 +829,8 @@ def update_day_itinerary(trip_id, day_index):
 
         g.session.commit()
         return jsonify(serialize_transit_result(result))
+    except TripConcurrencyError as e:
+        return conflict_response(e)
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
     except Exception as e:
@@ -661,6 +864,7 @@ def add_expense(trip_id):
             percentages=[float(p) for p in data['percentages']] if data.get('percentages') else None,
             created_by=current_user_id
         )
+        g.session.commit()
         
         return jsonify({
             'id': expense.id,
@@ -742,6 +946,7 @@ def delete_expense(trip_id, expense_id):
         success = service.delete_expense(trip_id, expense_id, current_user_id)
         
         if success:
+            g.session.commit()
             return '', 204
         else:
             return jsonify({'error': 'Expense not found'}), 404
@@ -803,6 +1008,7 @@ def mark_transfer_settled(trip_id):
         )
         
         if success:
+            g.session.commit()
             return jsonify({'message': 'Transfer marked as settled'})
         else:
             return jsonify({'error': 'Failed to mark transfer'}), 400
@@ -827,6 +1033,7 @@ def publish_template(trip_id):
             trip_id=trip_id,
             author_id=current_user_id
         )
+        g.session.commit()
         return jsonify(template), 201
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
@@ -845,15 +1052,19 @@ def list_templates():
     offset = request.args.get('offset', 0, type=int)
     keyword = request.args.get('keyword', None, type=str)
     tag = request.args.get('tag', None, type=str)
+    sort = request.args.get('sort', 'latest', type=str)
     
     try:
         result = service.list_templates(
             limit=limit,
             offset=offset,
             keyword=keyword,
-            tag=tag
+            tag=tag,
+            sort=sort
         )
         return jsonify(result)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         traceback.print_exc()
         return jsonify({'error': 'Internal server error'}), 500
@@ -868,6 +1079,7 @@ def get_template(template_id):
         template = service.get_template(template_id)
         if not template:
             return jsonify({'error': 'Template not found'}), 404
+        service.record_template_view(template_id, session.get('user_id'))
         return jsonify(template)
     except Exception as e:
         traceback.print_exc()
@@ -899,6 +1111,7 @@ def clone_from_template(template_id):
             start_date=start_date,
             end_date=end_date
         )
+        g.session.commit()
         
         return jsonify({
             'id': trip.id.value,
@@ -941,6 +1154,7 @@ def clone_from_trip(trip_id):
             start_date=start_date,
             end_date=end_date
         )
+        g.session.commit()
         
         return jsonify({
             'id': trip.id.value,
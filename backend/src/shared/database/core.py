@@ -1,6 +1,9 @@
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 from dotenv import load_dotenv
 
 # 加载环境变量
@@ -31,3 +34,59 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+@contextmanager
+def savepoint(session: Session) -> Iterator[None]:
+    """在保存点中执行：出错时只回滚保存点内的修改，调用方事务中的其他修改保留
+
+    pysqlite 在第一条写语句前才发出 BEGIN，事务外的 SAVEPOINT 会自己开启事务，
+    RELEASE 时直接提交，之后调用方的回滚撤销不了保存点内的修改。
+    因此 SQLite 下先确保外层事务已经开始。
+    """
+    connection = session.connection()
+    if connection.dialect.name == 'sqlite' and not connection.connection.driver_connection.in_transaction:
+        connection.exec_driver_sql("BEGIN")
+    with session.begin_nested():
+        yield
+
+
+# session.info 中暂存提交后回调的键
+_AFTER_COMMIT_KEY = '_after_commit_callbacks'
+
+
+def after_commit(session: Session, callback: Callable[..., Any], *args: Any) -> None:
+    """在 session 当前事务提交后执行回调；事务回滚或关闭时丢弃
+
+    用于必须等请求事务落库后才能做的副作用（用自己会话写库的操作、
+    基于本次修改的派生数据）：提交前执行会与请求争用 SQLite 写锁，
+    请求回滚时还会留下与数据库不一致的结果。
+    回调在提交之后执行，不能再使用本 session 访问数据库；回调出错只记录不抛出。
+    """
+    callbacks = session.info.get(_AFTER_COMMIT_KEY)
+    if callbacks is None:
+        callbacks = session.info[_AFTER_COMMIT_KEY] = []
+        event.listen(session, 'after_commit', _run_after_commit_callbacks)
+        event.listen(session, 'after_transaction_end', _discard_after_commit_callbacks)
+    callbacks.append((callback, args))
+
+
+def _run_after_commit_callbacks(session: Session) -> None:
+    callbacks = session.info.get(_AFTER_COMMIT_KEY)
+    if not callbacks:
+        return
+    pending = list(callbacks)
+    callbacks.clear()
+    for callback, args in pending:
+        try:
+            callback(*args)
+        except Exception as e:
+            print(f"After-commit callback error: {e}")
+
+
+def _discard_after_commit_callbacks(session: Session, transaction) -> None:
+    # 只在最外层事务结束时丢弃（保存点结束不影响）；提交时回调已先执行并清空
+    if transaction.parent is None:
+        callbacks = session.info.get(_AFTER_COMMIT_KEY)
+        if callbacks:
+            callbacks.clear()
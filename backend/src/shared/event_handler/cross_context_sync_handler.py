@@ -2,8 +2,24 @@
 跨限界上下文事件处理器
 
 处理需要在不同限界上下文之间同步的事件。
+
+支持批量处理：定时任务等批量操作可在 batching() 上下文中发布事件，
+退出时按事件类型合并为少量批量调用；每个事件带幂等键，重复投递不会
+产生重复副作用。
+
+一个事件可能触发多个副作用（如分别在旅行、社交上下文创建档案），每个
+副作用步骤完成后按事件登记进度（"<幂等键>#<步骤>"），重试时只补做失败的
+步骤与失败的事件，已成功的副作用不会重复执行。
 """
-from typing import Optional
+import threading
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from shared.event_handler.processed_event_store import (
+    IProcessedEventStore,
+    InMemoryProcessedEventStore,
+)
 
 # 从各个上下文导入事件类型
 # 注意：实际部署时可能需要通过事件总线传递序列化的事件
@@ -11,139 +27,314 @@ from typing import Optional
 
 class CrossContextSyncHandler:
     """跨上下文同步事件处理器
-    
+
     处理：
     - 用户注册后在其他上下文创建用户档案
     - 用户停用后在其他上下文标记用户状态
     - 旅行完成后在社交上下文触发游记提示
+
+    协作服务若提供批量方法（如 deactivate_users），批量处理时优先调用，
+    否则退化为逐个调用单实体方法（如 deactivate_user）。
     """
-    
+
+    HANDLER_NAME = "cross_context_sync"
+
     def __init__(
         self,
         travel_user_profile_service=None,
         social_user_profile_service=None,
-        notification_service=None
+        notification_service=None,
+        processed_event_store: Optional[IProcessedEventStore] = None
     ):
         """
         Args:
             travel_user_profile_service: app_travel 的用户档案服务
             social_user_profile_service: app_social 的用户档案服务
             notification_service: 通知服务
+            processed_event_store: 幂等键存储，默认进程内存储
         """
         self._travel_user_profile_service = travel_user_profile_service
         self._social_user_profile_service = social_user_profile_service
         self._notification_service = notification_service
-    
+        self._processed_store = processed_event_store or InMemoryProcessedEventStore()
+        self._local = threading.local()
+
+    # ==================== 事件入口 ====================
+
     def handle_user_registered(self, event) -> None:
         """处理用户注册事件
-        
+
         在 app_travel 和 app_social 创建对应的用户档案。
-        
+
         Args:
             event: UserRegisteredEvent
         """
-        user_id = event.user_id
-        username = event.username
-        
-        # 在 app_travel 创建旅行者档案
-        if self._travel_user_profile_service:
-            try:
-                self._travel_user_profile_service.create_traveler_profile(
-                    user_id=user_id,
-                    username=username
-                )
-            except Exception as e:
-                # 记录错误但不阻断流程
-                print(f"Failed to create traveler profile: {e}")
-        
-        # 在 app_social 创建社交档案
-        if self._social_user_profile_service:
-            try:
-                self._social_user_profile_service.create_social_profile(
-                    user_id=user_id,
-                    username=username
-                )
-            except Exception as e:
-                print(f"Failed to create social profile: {e}")
-    
+        self._dispatch(event)
+
     def handle_user_deactivated(self, event) -> None:
         """处理用户停用事件
-        
+
         在其他上下文标记用户状态为停用。
-        
+
         Args:
             event: UserDeactivatedEvent
         """
-        user_id = event.user_id
-        
-        # 在 app_travel 标记用户状态
-        if self._travel_user_profile_service:
-            try:
-                self._travel_user_profile_service.deactivate_user(user_id)
-            except Exception as e:
-                print(f"Failed to deactivate user in travel: {e}")
-        
-        # 在 app_social 标记用户状态
-        if self._social_user_profile_service:
-            try:
-                self._social_user_profile_service.deactivate_user(user_id)
-            except Exception as e:
-                print(f"Failed to deactivate user in social: {e}")
-    
+        self._dispatch(event)
+
     def handle_trip_completed(self, event) -> None:
         """处理旅行完成事件
-        
+
         在 app_social 触发游记创建提示。
-        
+
         Args:
             event: TripCompletedEvent
         """
-        trip_id = event.trip_id
-        creator_id = event.creator_id
-        trip_name = event.name
-        
-        # 通知用户可以创建游记
-        if self._notification_service:
-            self._notification_service.send_push(
-                user_id=creator_id,
-                title="旅行已完成，记录精彩瞬间 ✨",
-                body=f"您的「{trip_name}」旅行已完成！现在可以分享您的旅行故事了。",
-                data={
-                    "type": "trip_completed",
-                    "trip_id": trip_id,
-                    "action": "create_travel_log"
-                }
-            )
-        
-        # 如果有社交档案服务，可以在用户的待办中添加"创建游记"提示
-        if self._social_user_profile_service:
-            try:
-                self._social_user_profile_service.add_travel_log_prompt(
-                    user_id=creator_id,
-                    trip_id=trip_id,
-                    trip_name=trip_name
-                )
-            except Exception as e:
-                print(f"Failed to add travel log prompt: {e}")
-    
+        self._dispatch(event)
+
     def handle_user_reactivated(self, event) -> None:
         """处理用户重新激活事件
-        
+
         在其他上下文恢复用户状态。
-        
+
         Args:
             event: UserReactivatedEvent
         """
-        user_id = event.user_id
-        
-        if self._travel_user_profile_service:
+        self._dispatch(event)
+
+    def subscribe(self, event_bus) -> None:
+        """在事件总线上订阅本处理器关心的事件"""
+        event_bus.subscribe('UserRegisteredEvent', self.handle_user_registered)
+        event_bus.subscribe('UserDeactivatedEvent', self.handle_user_deactivated)
+        event_bus.subscribe('UserReactivatedEvent', self.handle_user_reactivated)
+        event_bus.subscribe('TripCompletedEvent', self.handle_trip_completed)
+
+    # ==================== 批量处理 ====================
+
+    @contextmanager
+    def batching(self):
+        """在当前线程内收集事件，退出上下文时一次性批量处理
+
+        用法：
+            with handler.batching():
+                for user in users:
+                    user.deactivate()
+                    event_bus.publish_all(user.pop_events())
+        """
+        if getattr(self._local, 'buffer', None) is not None:
+            # 嵌套调用时并入外层批次
+            yield
+            return
+        self._local.buffer = []
+        try:
+            yield
+        finally:
+            events, self._local.buffer = self._local.buffer, None
+        self.handle_batch(events)
+
+    def handle_batch(self, events: Iterable[Any]) -> int:
+        """批量处理事件
+
+        1. 按幂等键去重，并过滤已处理过的事件
+        2. 按事件类型分组，每组调用一次批量处理
+        3. 所有步骤都成功的事件登记幂等键；失败的事件不登记，可重试
+
+        Returns:
+            本次实际处理的事件数
+        """
+        keyed: Dict[str, Any] = OrderedDict()
+        for event in events:
+            keyed.setdefault(self.idempotency_key(event), event)
+        if not keyed:
+            return 0
+
+        processed = self._processed_store.find_processed(keyed.keys())
+        groups: Dict[str, Dict[str, Any]] = defaultdict(OrderedDict)
+        for key, event in keyed.items():
+            if key not in processed:
+                groups[self._group_of(event)][key] = event
+
+        handled = 0
+        for group, pending in groups.items():
+            processor = self._processors().get(group)
+            if processor is None:
+                continue
+            failed = processor(pending)
+            succeeded = [key for key in pending if key not in failed]
+            if succeeded:
+                self._processed_store.mark_processed(succeeded, self.HANDLER_NAME)
+            handled += len(pending)
+        return handled
+
+    @staticmethod
+    def idempotency_key(event) -> str:
+        """事件幂等键：优先使用事件自带的 idempotency_key，否则为类型 + 事件ID"""
+        key = getattr(event, 'idempotency_key', None)
+        if key:
+            return key
+        return f"{event.event_type}:{event.event_id}"
+
+    def _dispatch(self, event) -> None:
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is not None:
+            buffer.append(event)
+        else:
+            self.handle_batch([event])
+
+    @staticmethod
+    def _group_of(event) -> str:
+        # 停用/激活需要按发生顺序合并为最终状态，归为同一组
+        if event.event_type in ('UserDeactivatedEvent', 'UserReactivatedEvent'):
+            return 'user_status'
+        return event.event_type
+
+    def _processors(self) -> Dict[str, Callable[[Dict[str, Any]], Set[str]]]:
+        return {
+            'UserRegisteredEvent': self._process_user_registered,
+            'user_status': self._process_user_status,
+            'TripCompletedEvent': self._process_trip_completed,
+        }
+
+    def _process_user_registered(self, events: Dict[str, Any]) -> Set[str]:
+        profiles = [
+            ([key], {"user_id": e.user_id, "username": e.username})
+            for key, e in events.items()
+        ]
+        # 在 app_travel 创建旅行者档案
+        failed = self._run_step(
+            'travel_profile', self._travel_user_profile_service,
+            'create_traveler_profiles', 'create_traveler_profile',
+            profiles, "Failed to create traveler profile"
+        )
+        # 在 app_social 创建社交档案
+        failed |= self._run_step(
+            'social_profile', self._social_user_profile_service,
+            'create_social_profiles', 'create_social_profile',
+            profiles, "Failed to create social profile"
+        )
+        return failed
+
+    def _process_user_status(self, events: Dict[str, Any]) -> Set[str]:
+        # 同一用户在批次内多次停用/激活时，以最后发生的事件为准
+        final_state: Dict[str, bool] = OrderedDict()
+        keys_by_user: Dict[str, List[str]] = defaultdict(list)
+        for key, e in sorted(events.items(), key=lambda item: item[1].occurred_at):
+            final_state.pop(e.user_id, None)
+            final_state[e.user_id] = e.event_type == 'UserReactivatedEvent'
+            keys_by_user[e.user_id].append(key)
+        deactivated = [(keys_by_user[uid], uid) for uid, active in final_state.items() if not active]
+        reactivated = [(keys_by_user[uid], uid) for uid, active in final_state.items() if active]
+
+        failed: Set[str] = set()
+        for service, context in (
+            (self._travel_user_profile_service, "travel"),
+            (self._social_user_profile_service, "social"),
+        ):
+            failed |= self._run_step(
+                f'{context}_deactivate', service, 'deactivate_users', 'deactivate_user',
+                deactivated, f"Failed to deactivate user in {context}"
+            )
+            failed |= self._run_step(
+                f'{context}_reactivate', service, 'reactivate_users', 'reactivate_user',
+                reactivated, f"Failed to reactivate user in {context}"
+            )
+        return failed
+
+    def _process_trip_completed(self, events: Dict[str, Any]) -> Set[str]:
+        # 通知用户可以创建游记
+        pushes = [([key], {
+            "user_id": e.creator_id,
+            "title": "旅行已完成，记录精彩瞬间 ✨",
+            "body": f"您的「{e.name}」旅行已完成！现在可以分享您的旅行故事了。",
+            "data": {
+                "type": "trip_completed",
+                "trip_id": e.trip_id,
+                "action": "create_travel_log"
+            }
+        }) for key, e in events.items()]
+        failed = self._run_step(
+            'push', self._notification_service, 'send_push_batch', 'send_push',
+            pushes, "Failed to send trip completed push"
+        )
+
+        # 如果有社交档案服务，可以在用户的待办中添加"创建游记"提示
+        prompts = [([key], {
+            "user_id": e.creator_id,
+            "trip_id": e.trip_id,
+            "trip_name": e.name
+        }) for key, e in events.items()]
+        failed |= self._run_step(
+            'travel_log_prompt', self._social_user_profile_service,
+            'add_travel_log_prompts', 'add_travel_log_prompt',
+            prompts, "Failed to add travel log prompt"
+        )
+        return failed
+
+    def _run_step(
+        self,
+        step: str,
+        service,
+        batch_method: str,
+        single_method: str,
+        items: List[Tuple[List[str], Any]],
+        error_message: str
+    ) -> Set[str]:
+        """执行一个副作用步骤并按事件登记进度
+
+        Args:
+            step: 步骤名，与事件幂等键组成步骤进度键
+            items: (事件幂等键列表, 调用参数)；参数为 dict 时按关键字参数调用单实体方法，否则按位置参数
+            batch_method: 批量方法名（需为全部成功或全部失败）
+            single_method: 单实体方法名
+
+        已完成本步骤的项跳过；批量方法失败时逐项重试，成功的项登记进度。
+
+        Returns:
+            本步骤失败的事件幂等键
+        """
+        if not service or not items:
+            return set()
+        done = self._processed_store.find_processed(
+            self._step_key(key, step) for keys, _ in items for key in keys
+        )
+        todo = [
+            (keys, arg) for keys, arg in items
+            if not all(self._step_key(key, step) in done for key in keys)
+        ]
+        if not todo:
+            return set()
+
+        succeeded: List[Tuple[List[str], Any]] = []
+        failed: Set[str] = set()
+        if hasattr(service, batch_method):
             try:
-                self._travel_user_profile_service.reactivate_user(user_id)
+                getattr(service, batch_method)([arg for _, arg in todo])
+                succeeded = todo
+                todo = []
             except Exception as e:
-                print(f"Failed to reactivate user in travel: {e}")
-        
-        if self._social_user_profile_service:
+                # 记录错误但不阻断流程
+                print(f"{error_message}: {e}")
+                if not hasattr(service, single_method):
+                    failed = {key for keys, _ in todo for key in keys}
+                    todo = []
+        for keys, arg in todo:
             try:
-                self._social_user_profile_service.reactivate_user(user_id)
+                method = getattr(service, single_method)
+                if isinstance(arg, dict):
+                    method(**arg)
+                else:
+                    method(arg)
+                succeeded.append((keys, arg))
             except Exception as e:
-                print(f"Failed to reactivate user in social: {e}")
+                print(f"{error_message}: {e}")
+                failed.update(keys)
+
+        if succeeded:
+            self._processed_store.mark_processed(
+                [self._step_key(key, step) for keys, _ in succeeded for key in keys],
+                self.HANDLER_NAME
+            )
+        return failed
+
+    @staticmethod
+    def _step_key(key: str, step: str) -> str:
+        return f"{key}#{step}"
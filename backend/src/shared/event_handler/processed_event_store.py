@@ -0,0 +1,109 @@
+"""
+已处理事件记录（幂等键存储）
+
+事件处理器在批量处理前过滤掉已处理过的幂等键，处理成功后批量登记，
+使重放、重试或定时任务重复投递的事件不会产生重复副作用。
+
+- InMemoryProcessedEventStore: 进程内实现（有容量与过期上限）
+- SqlAlchemyProcessedEventStore: 持久化实现，查询与登记均为集合操作
+"""
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Callable, Iterable, Set
+
+from sqlalchemy import Column, DateTime, String, select
+from sqlalchemy.orm import Session
+
+from shared.database.core import Base, SessionLocal
+from shared.infrastructure.ttl_cache import TTLCache
+
+
+class ProcessedEventPO(Base):
+    """已处理事件持久化对象"""
+
+    __tablename__ = 'processed_events'
+
+    idempotency_key = Column(String(128), primary_key=True)
+    handler = Column(String(100), nullable=False, index=True)
+    processed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class IProcessedEventStore(ABC):
+    """幂等键存储接口"""
+
+    @abstractmethod
+    def find_processed(self, keys: Iterable[str]) -> Set[str]:
+        """返回 keys 中已处理过的键"""
+        pass
+
+    @abstractmethod
+    def mark_processed(self, keys: Iterable[str], handler: str) -> None:
+        """批量登记已处理的键"""
+        pass
+
+
+class InMemoryProcessedEventStore(IProcessedEventStore):
+    """进程内幂等键存储"""
+
+    def __init__(self, ttl_seconds: float = 7 * 24 * 3600, max_size: int = 100000):
+        self._keys = TTLCache(ttl_seconds=ttl_seconds, max_size=max_size)
+
+    def find_processed(self, keys: Iterable[str]) -> Set[str]:
+        return set(self._keys.get_many(keys).keys())
+
+    def mark_processed(self, keys: Iterable[str], handler: str) -> None:
+        for key in keys:
+            self._keys.set(key, handler)
+
+
+class SqlAlchemyProcessedEventStore(IProcessedEventStore):
+    """基于数据库表 processed_events 的幂等键存储"""
+
+    # 单条 IN 查询的最大参数个数
+    CHUNK_SIZE = 500
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal):
+        self._session_factory = session_factory
+
+    def find_processed(self, keys: Iterable[str]) -> Set[str]:
+        keys = list(set(keys))
+        if not keys:
+            return set()
+        session = self._session_factory()
+        try:
+            found = set()
+            for i in range(0, len(keys), self.CHUNK_SIZE):
+                chunk = keys[i:i + self.CHUNK_SIZE]
+                stmt = select(ProcessedEventPO.idempotency_key).where(
+                    ProcessedEventPO.idempotency_key.in_(chunk)
+                )
+                found.update(session.execute(stmt).scalars().all())
+            return found
+        finally:
+            session.close()
+
+    def mark_processed(self, keys: Iterable[str], handler: str) -> None:
+        keys = list(set(keys))
+        if not keys:
+            return
+        session = self._session_factory()
+        try:
+            # 并发处理时可能已有其他 worker 登记，先过滤避免主键冲突
+            existing = set()
+            for i in range(0, len(keys), self.CHUNK_SIZE):
+                chunk = keys[i:i + self.CHUNK_SIZE]
+                stmt = select(ProcessedEventPO.idempotency_key).where(
+                    ProcessedEventPO.idempotency_key.in_(chunk)
+                )
+                existing.update(session.execute(stmt).scalars().all())
+            now = datetime.utcnow()
+            session.add_all([
+                ProcessedEventPO(idempotency_key=key, handler=handler, processed_at=now)
+                for key in keys if key not in existing
+            ])
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
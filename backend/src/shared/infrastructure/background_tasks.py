@@ -0,0 +1,73 @@
+"""
+后台任务队列
+
+事件处理器的写库副作用（热度、好友推荐等派生数据）不在请求线程上执行：
+请求线程只把任务放入队列，由单个后台线程按提交顺序依次执行。
+
+- 处理器使用自己的会话，在请求事务打开期间执行会与请求争用写锁
+  （SQLite 下整个库只有一个写锁），放到后台后请求不再等待
+- 单线程顺序执行，同一对象的增量按事件发生顺序写入
+- submit_later 延迟执行，用于把短时间内的高频信号合并为一次写入
+"""
+import queue
+import threading
+from typing import Any, Callable, Optional
+
+
+class BackgroundTaskQueue:
+    """单线程后台任务队列"""
+
+    def __init__(self, name: str = 'background-tasks'):
+        """
+        Args:
+            name: 后台线程名
+        """
+        self._name = name
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, task: Callable[..., Any], *args: Any) -> None:
+        """提交任务，立即返回"""
+        self._ensure_started()
+        self._queue.put((task, args))
+
+    def submit_later(self, delay_seconds: float, task: Callable[..., Any], *args: Any) -> None:
+        """delay_seconds 秒后提交任务"""
+        timer = threading.Timer(delay_seconds, self.submit, args=(task, *args))
+        timer.daemon = True
+        timer.start()
+
+    def join(self) -> None:
+        """等待已提交的任务全部执行完（用于测试与优雅退出）"""
+        self._queue.join()
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            task, args = self._queue.get()
+            try:
+                task(*args)
+            except Exception as e:
+                # 记录错误但不中断后续任务
+                print(f"Background task error in {self._name}: {e}")
+            finally:
+                self._queue.task_done()
+
+
+_background_task_queue: Optional[BackgroundTaskQueue] = None
+
+
+def get_background_task_queue() -> BackgroundTaskQueue:
+    """获取全局后台任务队列"""
+    global _background_task_queue
+    if _background_task_queue is None:
+        _background_task_queue = BackgroundTaskQueue()
+    return _background_task_queue
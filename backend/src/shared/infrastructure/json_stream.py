@@ -0,0 +1,135 @@
+"""
+流式 JSON 序列化与字段选择
+
+大响应（多周行程、含路线 polyline）如果先构建完整的嵌套 dict 再整体
+json.dumps，峰值内存为 dict + 整个 JSON 字符串。这里按块生成 JSON：
+- 值为生成器/迭代器时逐项序列化，已输出的元素即可被回收
+- 输出按 chunk_size 聚合，避免过多的小块写入
+
+字段选择（?fields=id,name,days.date,days.activities.name）解析为嵌套的
+选择树，None 表示选择整个子树。
+"""
+import json
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+from flask import current_app, stream_with_context
+
+# 选择树：字段名 -> 子选择（None 表示整个字段）
+FieldSelection = Dict[str, Optional['FieldSelection']]
+
+DEFAULT_CHUNK_SIZE = 16 * 1024
+
+
+def parse_fields(raw: Optional[str]) -> Optional[FieldSelection]:
+    """解析字段选择参数
+
+    Args:
+        raw: 逗号分隔的字段路径，嵌套字段用点号分隔
+
+    Returns:
+        选择树；参数为空时返回 None（选择全部字段）
+    """
+    if not raw:
+        return None
+
+    selection: FieldSelection = {}
+    for path in raw.split(','):
+        parts = [p.strip() for p in path.split('.') if p.strip()]
+        if not parts:
+            continue
+        node = selection
+        for i, part in enumerate(parts):
+            last = i == len(parts) - 1
+            if part in node and node[part] is None:
+                # 父字段已整体选择
+                break
+            if last:
+                node[part] = None
+            else:
+                node = node.setdefault(part, {})
+    return selection or None
+
+
+def select_fields(value: Any, selection: Optional[FieldSelection]) -> Any:
+    """按选择树裁剪 dict / list，生成器按元素惰性裁剪"""
+    if selection is None:
+        return value
+    if isinstance(value, dict):
+        return {
+            key: select_fields(value[key], sub)
+            for key, sub in selection.items()
+            if key in value
+        }
+    if isinstance(value, (list, tuple)):
+        return [select_fields(item, selection) for item in value]
+    if isinstance(value, Iterator):
+        return (select_fields(item, selection) for item in value)
+    return value
+
+
+def _iter_value(value: Any, dumps: Callable[[Any], str]) -> Iterator[str]:
+    if isinstance(value, dict):
+        yield '{'
+        first = True
+        for key, item in value.items():
+            if not first:
+                yield ','
+            first = False
+            yield dumps(str(key))
+            yield ':'
+            yield from _iter_value(item, dumps)
+        yield '}'
+    elif isinstance(value, (list, tuple)) or isinstance(value, Iterator):
+        yield '['
+        first = True
+        for item in value:
+            if not first:
+                yield ','
+            first = False
+            yield from _iter_value(item, dumps)
+        yield ']'
+    else:
+        yield dumps(value)
+
+
+def iter_json(
+    value: Any,
+    default: Optional[Callable[[Any], Any]] = None,
+    ensure_ascii: bool = True,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterable[str]:
+    """按块生成 value 的 JSON 文本
+
+    Args:
+        value: 待序列化的值，dict/list 中可包含生成器
+        default: 无法直接序列化的对象的转换函数（同 json.dumps）
+        ensure_ascii: 同 json.dumps
+        chunk_size: 每块的近似字符数
+    """
+    def dumps(v: Any) -> str:
+        return json.dumps(v, default=default, ensure_ascii=ensure_ascii)
+
+    buffer = []
+    size = 0
+    for piece in _iter_value(value, dumps):
+        buffer.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield ''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def stream_json_response(value: Any, status: int = 200):
+    """以流式 JSON 构造 Flask 响应（使用应用的 JSON 配置）"""
+    provider = current_app.json
+    chunks = iter_json(
+        value,
+        default=getattr(provider, 'default', None),
+        ensure_ascii=getattr(provider, 'ensure_ascii', True)
+    )
+    return current_app.response_class(
+        stream_with_context(chunks), status=status, mimetype='application/json'
+    )
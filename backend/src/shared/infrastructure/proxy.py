@@ -0,0 +1,36 @@
+"""
+反向代理配置
+
+部署在反向代理（Nginx、负载均衡、开发环境的 Vite 代理）之后时，
+request.remote_addr 是代理的地址，按 IP 限流等逻辑会让所有用户共用一个桶。
+配置可信代理层数后用 ProxyFix 从 X-Forwarded-* 头还原客户端信息：
+
+配置项（app.config 优先，其次环境变量）：
+    TRUSTED_PROXY_HOPS: 请求到达应用前经过的可信代理层数，默认 0（直接对外，
+        不信任转发头）。只按层数从右向左取 X-Forwarded-For，客户端自行伪造的
+        左侧条目不会被采用；层数大于实际代理数时客户端可伪造 IP，需按部署如实配置
+"""
+import os
+from typing import Any, Mapping, Optional
+
+from flask import Flask
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+
+def get_trusted_proxy_hops(config: Optional[Mapping[str, Any]] = None) -> int:
+    """读取可信代理层数"""
+    config = config or {}
+    value = config.get('TRUSTED_PROXY_HOPS')
+    if value is None:
+        value = os.getenv('TRUSTED_PROXY_HOPS', '0')
+    hops = int(value)
+    if hops < 0:
+        raise ValueError("TRUSTED_PROXY_HOPS must not be negative")
+    return hops
+
+
+def apply_proxy_fix(app: Flask) -> None:
+    """按可信代理层数包装 wsgi_app（层数为 0 时不处理）"""
+    hops = get_trusted_proxy_hops(app.config)
+    if hops:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops, x_host=hops)
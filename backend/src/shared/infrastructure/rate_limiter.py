@@ -0,0 +1,157 @@
+"""
+滑动窗口限流器
+
+按键（IP、账号等）记录最近一个窗口内的请求时间戳，窗口内次数达到上限即拒绝，
+并给出最早可重试的秒数。
+
+存储后端可替换：
+- InMemoryRateLimitBackend：进程内，适合单实例部署
+- 多实例部署可实现 RateLimitBackend（如 Redis 有序集合：ZADD / ZREMRANGEBYSCORE / ZCARD），
+  各方法需对单个键原子执行
+"""
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from typing import Callable, Hashable, Optional
+
+
+class RateLimitBackend(ABC):
+    """限流存储后端接口
+
+    所有方法先丢弃 now - window_seconds 之前的时间戳，再执行操作。
+    返回值为需要等待的秒数，0 表示未超限。
+    """
+
+    @abstractmethod
+    def acquire(self, key: Hashable, now: float, window_seconds: float, limit: int) -> float:
+        """未超限时记录一次并返回 0；超限时不记录，返回需等待的秒数"""
+        pass
+
+    @abstractmethod
+    def peek(self, key: Hashable, now: float, window_seconds: float, limit: int) -> float:
+        """只检查是否超限，不记录"""
+        pass
+
+    @abstractmethod
+    def record(self, key: Hashable, now: float, window_seconds: float) -> None:
+        """无条件记录一次"""
+        pass
+
+    @abstractmethod
+    def reset(self, key: Hashable) -> None:
+        """清空某个键的记录"""
+        pass
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """进程内滑动窗口日志
+
+    每个键一个按时间递增的 deque，过期时间戳在访问时从队头弹出；
+    键数超过 max_keys 时淘汰最久未访问的键，防止被随机键撑爆内存。
+    """
+
+    def __init__(self, max_keys: int = 100000):
+        if max_keys <= 0:
+            raise ValueError("max_keys must be positive")
+        self._max_keys = max_keys
+        self._windows: "OrderedDict[Hashable, deque]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key: Hashable, now: float, window_seconds: float, limit: int) -> float:
+        with self._lock:
+            stamps = self._window(key, now, window_seconds, create=True)
+            wait = _wait_seconds(stamps, now, window_seconds, limit)
+            if wait == 0:
+                stamps.append(now)
+            return wait
+
+    def peek(self, key: Hashable, now: float, window_seconds: float, limit: int) -> float:
+        with self._lock:
+            stamps = self._window(key, now, window_seconds, create=False)
+            return _wait_seconds(stamps, now, window_seconds, limit) if stamps else 0.0
+
+    def record(self, key: Hashable, now: float, window_seconds: float) -> None:
+        with self._lock:
+            self._window(key, now, window_seconds, create=True).append(now)
+
+    def reset(self, key: Hashable) -> None:
+        with self._lock:
+            self._windows.pop(key, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._windows)
+
+    def _window(self, key: Hashable, now: float, window_seconds: float, create: bool) -> Optional[deque]:
+        stamps = self._windows.get(key)
+        if stamps is None:
+            if not create:
+                return None
+            stamps = deque()
+            self._windows[key] = stamps
+            while len(self._windows) > self._max_keys:
+                self._windows.popitem(last=False)
+        else:
+            self._windows.move_to_end(key)
+        cutoff = now - window_seconds
+        while stamps and stamps[0] <= cutoff:
+            stamps.popleft()
+        return stamps
+
+
+def _wait_seconds(stamps: deque, now: float, window_seconds: float, limit: int) -> float:
+    """窗口内已有 limit 次时，等到第 len-limit+1 早的记录滑出窗口即可再请求一次"""
+    if len(stamps) < limit:
+        return 0.0
+    return max(stamps[len(stamps) - limit] + window_seconds - now, 0.001)
+
+
+class SlidingWindowRateLimiter:
+    """滑动窗口限流器：每个键在任意 window_seconds 内最多 limit 次"""
+
+    def __init__(
+        self,
+        limit: int,
+        window_seconds: float,
+        backend: Optional[RateLimitBackend] = None,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Args:
+            limit: 窗口内允许的次数
+            window_seconds: 窗口长度（秒）
+            backend: 存储后端，默认进程内
+            clock: 时间源（便于测试注入；跨进程后端需使用墙上时间）
+        """
+        if limit <= 0:
+            raise ValueError("limit must be positive")
+        if window_seconds <= 0:
+            raise ValueError("window_seconds must be positive")
+        self._limit = limit
+        self._window = window_seconds
+        self._backend = backend if backend is not None else InMemoryRateLimitBackend()
+        self._clock = clock
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @property
+    def window_seconds(self) -> float:
+        return self._window
+
+    def hit(self, key: Hashable) -> float:
+        """计一次请求，返回需等待的秒数（0 表示放行，超限的请求不计入）"""
+        return self._backend.acquire(key, self._clock(), self._window, self._limit)
+
+    def peek(self, key: Hashable) -> float:
+        """检查是否超限，不计数"""
+        return self._backend.peek(key, self._clock(), self._window, self._limit)
+
+    def record(self, key: Hashable) -> None:
+        """无条件计一次（用于事后才知道是否应计数的场景，如登录失败）"""
+        self._backend.record(key, self._clock(), self._window)
+
+    def reset(self, key: Hashable) -> None:
+        self._backend.reset(key)
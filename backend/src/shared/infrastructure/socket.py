@@ -1,5 +1,185 @@
+"""
+Socket.IO 基础设施
+
+- 全局共享的 SocketIO 实例
+- 可配置的消息队列（多 worker 间广播 emit）
+- emit 耗时统计
+"""
+import json
+import os
+import queue
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Dict, List, Mapping, Optional
+
+import socketio as python_socketio
 from flask_socketio import SocketIO
 
+
+# ==================== 本地消息代理 ====================
+
+class LocalMessageBroker:
+    """进程内发布/订阅代理
+
+    作为 Redis/RabbitMQ 等消息队列的本地替身：同一进程内的多个 SocketIO
+    服务器实例（例如测试中模拟的多个 worker）通过它共享 emit。
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[str, List[queue.Queue]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def publish(self, channel: str, message: str) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, []))
+        for subscriber in subscribers:
+            subscriber.put(message)
+
+    def subscribe(self, channel: str) -> queue.Queue:
+        subscriber = queue.Queue()
+        with self._lock:
+            self._subscribers[channel].append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, channel: str, subscriber: queue.Queue) -> None:
+        with self._lock:
+            if subscriber in self._subscribers.get(channel, []):
+                self._subscribers[channel].remove(subscriber)
+
+
+local_message_broker = LocalMessageBroker()
+
+
+class LocalPubSubManager(python_socketio.PubSubManager):
+    """基于 LocalMessageBroker 的客户端管理器（消息队列 URL: local://）"""
+
+    name = 'local'
+
+    def __init__(self, url: str = 'local://', channel: str = 'flask-socketio',
+                 write_only: bool = False, logger=None, broker: Optional[LocalMessageBroker] = None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.url = url
+        self._broker = broker or local_message_broker
+
+    def _publish(self, data):
+        self._broker.publish(self.channel, json.dumps(data))
+
+    def _listen(self):
+        subscriber = self._broker.subscribe(self.channel)
+        try:
+            while True:
+                yield subscriber.get()
+        finally:
+            self._broker.unsubscribe(self.channel, subscriber)
+
+
+def get_socketio_options(config: Optional[Mapping[str, Any]] = None) -> Dict[str, Any]:
+    """根据应用配置/环境变量构建 SocketIO.init_app 参数
+
+    配置项（app.config 优先，其次环境变量）：
+        SOCKETIO_MESSAGE_QUEUE: 消息队列 URL，如 redis://localhost:6379/0、
+            amqp://...，或 local://（进程内代理）。未配置时为单进程模式。
+        SOCKETIO_CHANNEL: 消息队列频道名，默认 flask-socketio
+    """
+    config = config or {}
+    url = _message_queue_url(config)
+    channel = config.get('SOCKETIO_CHANNEL') or os.getenv('SOCKETIO_CHANNEL', 'flask-socketio')
+
+    if not url:
+        # 显式传入 None，避免沿用上一次 init_app 留下的 client_manager
+        return {'client_manager': None}
+    if url.startswith('local://'):
+        return {'client_manager': LocalPubSubManager(url, channel=channel)}
+    return {'message_queue': url, 'channel': channel}
+
+
+def is_multi_process(config: Optional[Mapping[str, Any]] = None) -> bool:
+    """是否通过外部消息队列在多个进程间广播（进程内状态在此模式下不完整）"""
+    url = _message_queue_url(config or {})
+    return bool(url) and not url.startswith('local://')
+
+
+def _message_queue_url(config: Mapping[str, Any]) -> Optional[str]:
+    return config.get('SOCKETIO_MESSAGE_QUEUE') or os.getenv('SOCKETIO_MESSAGE_QUEUE')
+
+
+# ==================== emit 耗时统计 ====================
+
+class EmitMetrics:
+    """记录 emit 调用次数与耗时（毫秒），按事件名聚合"""
+
+    def __init__(self, window_size: int = 1000):
+        self._window_size = window_size
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, event: str, elapsed_ms: float, failed: bool = False) -> None:
+        with self._lock:
+            stats = self._stats.get(event)
+            if stats is None:
+                stats = {
+                    'count': 0,
+                    'errors': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                    'recent': deque(maxlen=self._window_size)
+                }
+                self._stats[event] = stats
+            stats['count'] += 1
+            if failed:
+                stats['errors'] += 1
+            stats['total_ms'] += elapsed_ms
+            stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+            stats['recent'].append(elapsed_ms)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """返回各事件的统计快照（avg/p50/p95 基于最近窗口）"""
+        with self._lock:
+            result = {}
+            for event, stats in self._stats.items():
+                recent = sorted(stats['recent'])
+                result[event] = {
+                    'count': stats['count'],
+                    'errors': stats['errors'],
+                    'avg_ms': round(stats['total_ms'] / stats['count'], 3),
+                    'max_ms': round(stats['max_ms'], 3),
+                    'p50_ms': round(_percentile(recent, 0.50), 3),
+                    'p95_ms': round(_percentile(recent, 0.95), 3),
+                }
+            return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class InstrumentedSocketIO(SocketIO):
+    """记录 emit 耗时的 SocketIO"""
+
+    def __init__(self, app=None, **kwargs):
+        self.emit_metrics = EmitMetrics()
+        super().__init__(app, **kwargs)
+
+    def emit(self, event, *args, **kwargs):
+        started = time.perf_counter()
+        failed = False
+        try:
+            return super().emit(event, *args, **kwargs)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self.emit_metrics.record(event, (time.perf_counter() - started) * 1000, failed)
+
+
 # Initialize SocketIO
 # Shared instance to be used across modules
-socketio = SocketIO(cors_allowed_origins="*")
+socketio = InstrumentedSocketIO(cors_allowed_origins="*")
@@ -0,0 +1,121 @@
+"""
+轻量全文检索分词
+
+为 LIKE '%kw%' 全表扫描提供可走索引的替代：写入时把文本拆成检索词存入
+倒排表（term, 目标ID），查询时把关键词按同样规则拆分后逐词匹配。
+
+分词规则（索引与查询一致，不依赖词典）：
+- 字母/数字连续片段作为一个词（小写），查询时按前缀匹配
+- 中日韩文字连续片段拆为单字与相邻二字组（bigram），
+  查询时长度为 1 用单字、否则用 bigram 全部命中，近似子串匹配
+
+短文本（如用户名）另有后缀检索词：索引全部后缀，查询按前缀匹配即为精确子串匹配；
+汉字可附加拼音全拼与首字母（需安装 pypinyin，未安装时不生成拼音检索词）。
+"""
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    from pypinyin import lazy_pinyin
+except ImportError:  # 可选依赖
+    lazy_pinyin = None
+
+MAX_TERM_LENGTH = 32
+
+_TOKEN_PATTERN = re.compile(r'[0-9a-z]+|[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+')
+
+
+def _is_word(token: str) -> bool:
+    return token[0].isascii()
+
+
+def _ngrams(run: str) -> List[str]:
+    if len(run) == 1:
+        return [run]
+    return [run[i:i + 2] for i in range(len(run) - 1)]
+
+
+def index_terms(*texts: Optional[str]) -> Set[str]:
+    """文本 -> 检索词集合（写入倒排表）"""
+    terms: Set[str] = set()
+    for text in texts:
+        if not text:
+            continue
+        for token in _TOKEN_PATTERN.findall(text.lower()):
+            if _is_word(token):
+                terms.add(token[:MAX_TERM_LENGTH])
+            else:
+                terms.update(token)
+                terms.update(_ngrams(token))
+    return terms
+
+
+def query_terms(keyword: Optional[str]) -> List[Tuple[str, bool]]:
+    """关键词 -> [(检索词, 是否前缀匹配)]，全部命中才算匹配"""
+    terms: List[Tuple[str, bool]] = []
+    seen = set()
+    for token in _TOKEN_PATTERN.findall((keyword or '').lower()):
+        if _is_word(token):
+            candidates: Iterable[Tuple[str, bool]] = [(token[:MAX_TERM_LENGTH], True)]
+        else:
+            candidates = ((gram, False) for gram in _ngrams(token))
+        for term in candidates:
+            if term not in seen:
+                seen.add(term)
+                terms.append(term)
+    return terms
+
+
+def has_cjk(text: Optional[str]) -> bool:
+    """是否包含中日韩文字"""
+    return any(not token[0].isascii() for token in _TOKEN_PATTERN.findall((text or '').lower()))
+
+
+def pinyin_syllables(text: Optional[str]) -> List[str]:
+    """汉字转拼音音节（不带声调，非汉字片段原样保留）；未安装 pypinyin 时返回空列表"""
+    if not text or lazy_pinyin is None or not has_cjk(text):
+        return []
+    return [syllable.lower() for syllable in lazy_pinyin(text) if syllable]
+
+
+def suffix_terms(text: Optional[str], max_length: int) -> List[str]:
+    """小写文本的全部后缀（截断到 max_length），按起始位置排列，第一个即文本本身"""
+    text = (text or '').strip().lower()
+    return [text[i:i + max_length] for i in range(len(text))]
+
+
+def short_text_terms(text: Optional[str], max_length: int) -> Dict[str, int]:
+    """短文本（用户名等）检索词 -> 匹配等级（越小越相关）
+
+    - 0：文本本身（前缀匹配即文本开头匹配）
+    - 1：拼音全拼、拼音首字母
+    - 2：其余后缀与从第二个音节起的拼音后缀（子串匹配）
+    """
+    terms: Dict[str, int] = {}
+
+    def add(term: str, rank: int) -> None:
+        if term and rank < terms.get(term, rank + 1):
+            terms[term] = rank
+
+    suffixes = suffix_terms(text, max_length)
+    for position, term in enumerate(suffixes):
+        add(term, 0 if position == 0 else 2)
+
+    syllables = pinyin_syllables(text)
+    if syllables:
+        add(''.join(syllables)[:max_length], 1)
+        add(''.join(syllable[0] for syllable in syllables)[:max_length], 1)
+        for start in range(1, len(syllables)):
+            add(''.join(syllables[start:])[:max_length], 2)
+    return terms
+
+
+def like_prefix(keyword: str) -> str:
+    """前缀匹配的 LIKE 模式（转义 %、_ 与反斜杠，查询时需指定反斜杠为转义符）"""
+    escaped = keyword.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"{escaped}%"
+
+
+def normalize_tag(tag: Optional[str]) -> str:
+    """标签规范化（去首尾空白、小写）"""
+    return (tag or '').strip().lower()
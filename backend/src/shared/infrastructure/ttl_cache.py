@@ -0,0 +1,111 @@
+"""
+进程内 TTL 缓存
+
+线程安全的键值缓存，条目在 TTL 到期后失效，超出容量时按 LRU 淘汰。
+用于缓存跨请求复用、允许短时间陈旧的读模型数据。
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+
+class TTLCache:
+    """带过期时间与容量上限的 LRU 缓存
+
+    - get/set/delete 均为 O(1)
+    - 过期条目在访问时惰性清理
+    - 超出 max_size 时淘汰最久未使用的条目
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 60.0,
+        max_size: int = 10000,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            ttl_seconds: 条目存活时间（秒）
+            max_size: 最大条目数
+            clock: 时间源（便于测试注入）
+        """
+        if ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be positive")
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+
+        self._ttl = ttl_seconds
+        self._max_size = max_size
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def ttl_seconds(self) -> float:
+        return self._ttl
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """读取条目，不存在或已过期时返回 default"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def get_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        """批量读取，仅返回命中的条目"""
+        result = {}
+        with self._lock:
+            now = self._clock()
+            for key in keys:
+                entry = self._data.get(key)
+                if entry is None:
+                    continue
+                expires_at, value = entry
+                if expires_at <= now:
+                    del self._data[key]
+                    continue
+                self._data.move_to_end(key)
+                result[key] = value
+        return result
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """写入条目
+
+        Args:
+            key: 键
+            value: 值
+            ttl_seconds: 覆盖默认 TTL
+        """
+        ttl = self._ttl if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._data[key] = (self._clock() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self._max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        """删除条目（不存在时忽略）"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+_MISSING = object()
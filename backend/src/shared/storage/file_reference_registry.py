@@ -0,0 +1,97 @@
+"""
+文件引用计数登记
+
+内容相同的上传共用一个文件，每次上传记一次引用，调用方不再使用某个 URL 时
+（如更换头像）释放一次引用。计数在独立的短会话中更新，不参与调用方的事务；
+登记失败不影响上传本身。
+
+计数以 scripts/gc_uploads.py 按数据库中实际引用的 URL 重新统计的结果为准，
+acquire/release 只是提示：目前只有更换头像会 release，删除帖子、消息、旅行
+和更换旅行封面都不 release，这些引用的减少由清理脚本统计得出。acquire 同时
+刷新 updated_at，清理脚本不会删除宽限期内登记过的文件。
+"""
+from datetime import datetime
+from typing import Callable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from shared.database.core import SessionLocal
+from shared.storage.stored_file_po import StoredFilePO
+
+
+class FileReferenceRegistry:
+    """文件引用计数登记"""
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal):
+        self._session_factory = session_factory
+
+    def acquire(self, path: str, sha256: str, size: int) -> None:
+        """为文件增加一次引用（首次出现时登记）"""
+        # 并发首次登记同一文件时插入冲突，重试一次即走更新分支
+        for attempt in range(2):
+            session = self._session_factory()
+            try:
+                stored = self._get(session, path)
+                now = datetime.utcnow()
+                if stored is None:
+                    session.add(StoredFilePO(
+                        path=path, sha256=sha256, size=size, ref_count=1, created_at=now, updated_at=now
+                    ))
+                else:
+                    stored.ref_count += 1
+                    stored.updated_at = now
+                session.commit()
+                return
+            except IntegrityError:
+                session.rollback()
+                if attempt:
+                    raise
+            except Exception:
+                session.rollback()
+                raise
+            finally:
+                session.close()
+
+    def release(self, path: str) -> None:
+        """释放文件的一次引用（未登记的文件忽略）"""
+        session = self._session_factory()
+        try:
+            stored = self._get(session, path)
+            if stored is not None and stored.ref_count > 0:
+                stored.ref_count -= 1
+                stored.updated_at = datetime.utcnow()
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def ref_count(self, path: str) -> int:
+        """当前引用计数"""
+        session = self._session_factory()
+        try:
+            stored = self._get(session, path, for_update=False)
+            return stored.ref_count if stored else 0
+        finally:
+            session.close()
+
+    @staticmethod
+    def _get(session: Session, path: str, for_update: bool = True) -> Optional[StoredFilePO]:
+        stmt = select(StoredFilePO).where(StoredFilePO.path == path)
+        if for_update:
+            stmt = stmt.with_for_update()
+        return session.execute(stmt).scalar_one_or_none()
+
+
+_file_reference_registry: Optional[FileReferenceRegistry] = None
+
+
+def get_file_reference_registry() -> FileReferenceRegistry:
+    """获取全局文件引用计数登记"""
+    global _file_reference_registry
+    if _file_reference_registry is None:
+        _file_reference_registry = FileReferenceRegistry()
+    return _file_reference_registry
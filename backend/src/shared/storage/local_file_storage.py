@@ -1,61 +1,143 @@
 """
 本地文件存储服务
 
-简单的文件存储实现，将文件保存到本地文件系统。
+内容寻址的文件存储实现，将文件保存到本地文件系统：
+- 边写临时文件边计算 SHA-256（单次流式读取，不把整个文件读入内存），
+  写完后原子重命名到以哈希命名的位置；内容已存在时直接丢弃临时文件（去重）
+- 目录按哈希前缀分片（<分类>/ab/cd/<sha256>.jpg），单个目录的文件数保持较小
+- 每次上传在 stored_files 中记一次引用。引用计数以清理脚本
+  scripts/gc_uploads.py 按数据库中实际引用重新统计的结果为准：上传与
+  release 只是提示（目前只有头像替换会 release，删除帖子/消息/旅行、
+  更换封面不 release），文件是否可删由清理脚本重新统计后决定
 """
+import hashlib
 import os
-import uuid
+import re
+import tempfile
+from typing import Optional
+
 from werkzeug.utils import secure_filename
-from typing import BinaryIO
+
+from shared.storage.file_reference_registry import FileReferenceRegistry, get_file_reference_registry
+
+# 返回给前端的 URL 前缀（与 Flask static 目录对应）
+URL_PREFIX = "/static/uploads/"
+
+# 流式读取的块大小
+CHUNK_SIZE = 64 * 1024
+
+# 临时文件目录（位于上传目录内，保证与目标在同一文件系统，重命名才是原子的）
+TMP_DIR_NAME = ".tmp"
+
+# 内容寻址文件的相对路径：<分类>/<2位哈希>/<2位哈希>/<64位哈希><扩展名>
+CONTENT_PATH_PATTERN = re.compile(r'^[\w-]+/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}(\.[\w]+)?$')
+
 
 class LocalFileStorageService:
     """本地文件存储服务"""
-    
-    def __init__(self, upload_folder: str = "static/uploads"):
+
+    def __init__(self, upload_folder: str = "static/uploads", registry: Optional[FileReferenceRegistry] = None):
         """初始化存储服务
-        
+
         Args:
             upload_folder: 上传文件保存的基础目录（相对于后端根目录）
+            registry: 文件引用计数登记（默认使用全局实例）
         """
         # 确保基础目录存在
         # 假设当前运行目录是 backend/src，向上两级是 backend
         # 但通常建议配置绝对路径，这里为了简单使用相对路径
         self.base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
         self.upload_folder = os.path.join(self.base_dir, upload_folder)
-        
+        self._registry = registry if registry is not None else get_file_reference_registry()
+
         if not os.path.exists(self.upload_folder):
             os.makedirs(self.upload_folder)
-            
+
     def save(self, file_storage, sub_folder: str = "images") -> str:
-        """保存文件
-        
+        """保存文件（内容相同的文件只保存一份）
+
         Args:
             file_storage: Flask 的 FileStorage 对象
             sub_folder: 子文件夹名称，用于分类存储
-            
+
         Returns:
-            str: 文件的访问 URL（相对路径）
+            str: 文件的访问 URL（相对路径），如 /static/uploads/images/ab/cd/<sha256>.jpg
         """
         if not file_storage:
             raise ValueError("No file provided")
-            
-        # 1. 准备保存目录
-        save_dir = os.path.join(self.upload_folder, sub_folder)
-        if not os.path.exists(save_dir):
-            os.makedirs(save_dir)
-            
-        # 2. 生成安全的文件名
-        original_filename = secure_filename(file_storage.filename)
-        # 提取扩展名
-        _, ext = os.path.splitext(original_filename)
-        # 使用 UUID 生成唯一文件名，防止重名覆盖
-        unique_filename = f"{uuid.uuid4().hex}{ext}"
-        
-        # 3. 保存文件
-        file_path = os.path.join(save_dir, unique_filename)
-        file_storage.save(file_path)
-        
-        # 4. 返回访问 URL
+
+        # 1. 提取扩展名（内容相同、扩展名大小写不同的上传视为同一文件）
+        _, ext = os.path.splitext(secure_filename(file_storage.filename or ""))
+        ext = ext.lower()
+
+        # 2. 流式写入临时文件并计算哈希
+        tmp_dir = os.path.join(self.upload_folder, TMP_DIR_NAME)
+        os.makedirs(tmp_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        try:
+            digest = hashlib.sha256()
+            size = 0
+            stream = getattr(file_storage, "stream", file_storage)
+            with os.fdopen(fd, "wb") as out:
+                while True:
+                    chunk = stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    out.write(chunk)
+                    size += len(chunk)
+            content_hash = digest.hexdigest()
+
+            relative_path = self.content_path(sub_folder, content_hash, ext)
+
+            # 3. 先记一次引用再落盘：登记会刷新 updated_at，清理脚本不会删除
+            #    刚登记的文件；若文件在登记前已被清理，下一步会重新写入
+            #    （登记失败不影响上传，计数由清理脚本校正）
+            try:
+                self._registry.acquire(relative_path, content_hash, size)
+            except Exception as e:
+                print(f"Error registering stored file {relative_path}: {e}")
+
+            # 4. 原子重命名到内容地址；已存在则去重
+            target_path = self._absolute_path(relative_path)
+            if os.path.exists(target_path):
+                os.remove(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(target_path), exist_ok=True)
+                # mkstemp 创建的文件仅属主可读，静态文件服务需要可读权限
+                os.chmod(tmp_path, 0o644)
+                os.replace(tmp_path, target_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        # 5. 返回访问 URL
         # 注意：这里返回的是相对 URL，前端可以直接访问
-        # 例如：/static/uploads/images/xxx.jpg
-        return f"/static/uploads/{sub_folder}/{unique_filename}"
+        return f"{URL_PREFIX}{relative_path}"
+
+    def release(self, url: Optional[str]) -> None:
+        """释放 save 返回的 URL 的一次引用（非本存储管理的 URL 忽略）"""
+        relative_path = self.path_from_url(url)
+        if relative_path is None:
+            return
+        try:
+            self._registry.release(relative_path)
+        except Exception as e:
+            print(f"Error releasing stored file {relative_path}: {e}")
+
+    @staticmethod
+    def content_path(sub_folder: str, content_hash: str, ext: str = "") -> str:
+        """内容地址对应的相对路径（按哈希前缀两级分片）"""
+        return f"{sub_folder}/{content_hash[:2]}/{content_hash[2:4]}/{content_hash}{ext}"
+
+    @staticmethod
+    def path_from_url(url: Optional[str]) -> Optional[str]:
+        """从访问 URL 解析内容寻址文件的相对路径，旧版 UUID 文件名或外部 URL 返回 None"""
+        if not url or not url.startswith(URL_PREFIX):
+            return None
+        relative_path = url[len(URL_PREFIX):]
+        return relative_path if CONTENT_PATH_PATTERN.match(relative_path) else None
+
+    def _absolute_path(self, relative_path: str) -> str:
+        return os.path.join(self.upload_folder, *relative_path.split("/"))
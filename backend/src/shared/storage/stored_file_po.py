@@ -0,0 +1,34 @@
+"""
+已存储文件持久化对象 (PO - Persistent Object)
+
+内容寻址存储中每个文件一行：path 为相对上传目录的路径
+（<分类>/<哈希前两位>/<哈希三四位>/<sha256><扩展名>），
+ref_count 为引用该文件的次数，以 scripts/gc_uploads.py 按数据库中实际
+引用重新统计的结果为准；归零且超过宽限期的文件由该脚本清理。
+"""
+from datetime import datetime
+
+from sqlalchemy import Column, String, DateTime, Integer, BigInteger, Index
+from shared.database.core import Base
+
+
+class StoredFilePO(Base):
+    """已存储文件持久化对象"""
+
+    __tablename__ = 'stored_files'
+
+    path = Column(String(255), primary_key=True)
+    sha256 = Column(String(64), nullable=False)
+    size = Column(BigInteger, nullable=False, default=0)
+    ref_count = Column(Integer, nullable=False, default=0)
+
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    # 最近一次引用计数变化的时间（判断孤立文件是否已过宽限期）
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_stored_files_orphans', 'ref_count', 'updated_at'),
+    )
+
+    def __repr__(self):
+        return f"<StoredFilePO {self.path} refs={self.ref_count}>"
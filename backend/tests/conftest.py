@@ -14,8 +14,15 @@ from app_auth.infrastructure.database.persistent_model.user_po import UserPO
 from app_social.infrastructure.database.persistent_model.post_po import PostPO, CommentPO, LikePO
 from app_social.infrastructure.database.persistent_model.conversation_po import ConversationPO
 from app_social.infrastructure.database.persistent_model.message_po import MessagePO
+from app_social.infrastructure.database.persistent_model.friend_suggestion_po import FriendSuggestionPO
+from app_social.infrastructure.database.persistent_model.socket_room_membership_po import SocketRoomMembershipPO
 from app_social.infrastructure.database.po.friendship_po import FriendshipPO
 from app_travel.infrastructure.database.persistent_model.trip_po import TripPO, TripMemberPO, TripDayPO, ActivityPO
+from app_travel.infrastructure.database.persistent_model.trip_statistics_po import TripStatisticsPO, TripDayStatisticsPO
+from app_travel.infrastructure.database.persistent_model.expense_po import ExpensePO, ExpenseSharePO, TripMemberBalancePO
+from app_travel.infrastructure.database.persistent_model.template_po import TripTemplatePO, TripTemplateTagPO, TripTemplateSearchTermPO
+from app_travel.infrastructure.database.persistent_model.popularity_po import PopularityScorePO
+from shared.storage.stored_file_po import StoredFilePO
 
 @pytest.fixture(scope="session")
 def engine():
@@ -1,8 +1,12 @@
 import pytest
 import sys
 import os
+import time
+from functools import partial
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../src')))
 from flask import Flask
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
 from app_auth.services.auth_application_service import AuthApplicationService
 from app_auth.domain.domain_service.auth_service import AuthService as DomainAuthService
 from app_auth.infrastructure.database.dao_impl.sqlalchemy_user_dao import SqlAlchemyUserDao
@@ -10,6 +14,10 @@ from app_auth.infrastructure.database.repository_impl.user_repository_impl impor
 from app_auth.infrastructure.external_service.password_hasher_impl import PasswordHasherImpl
 from app_auth.infrastructure.external_service.console_email_service import ConsoleEmailService
 from app_auth.domain.value_objects.user_value_objects import UserId
+from app_auth.infrastructure.database.persistent_model.user_po import UserPO
+from shared.database.core import Base, after_commit
+from shared.storage.file_reference_registry import FileReferenceRegistry
+from shared.storage.local_file_storage import LocalFileStorageService
 
 class TestAuthServiceIntegration:
     
@@ -169,3 +177,54 @@ class TestAuthServiceIntegration:
             
             not_found = auth_service.get_user_by_id("non_existent_id")
             assert not_found is None
+
+    def test_old_avatar_is_released_only_after_commit(self, tmp_path):
+        # 文件数据库：请求事务持有写锁时，用自己会话写 stored_files 的 release 会等待锁
+        engine = create_engine(f"sqlite:///{tmp_path / 'avatars.db'}", connect_args={"timeout": 1})
+        Base.metadata.create_all(engine)
+        session_factory = sessionmaker(bind=engine)
+        registry = FileReferenceRegistry(session_factory=session_factory)
+        storage = LocalFileStorageService(upload_folder=str(tmp_path / "uploads"), registry=registry)
+        old_path = storage.content_path("avatars", "a" * 64, ".jpg")
+        new_path = storage.content_path("avatars", "b" * 64, ".jpg")
+        registry.acquire(old_path, "a" * 64, 10)
+
+        setup = session_factory()
+        setup.add(UserPO(
+            id="avatar_u1", username="avatar_user", email="avatar@test.com",
+            hashed_password="x", role="user", avatar_url=f"/static/uploads/{old_path}"
+        ))
+        setup.commit()
+        setup.close()
+
+        def update_avatar(commit):
+            session = session_factory()
+            user_repo = UserRepositoryImpl(SqlAlchemyUserDao(session))
+            service = AuthApplicationService(
+                domain_auth_service=DomainAuthService(
+                    user_repo=user_repo,
+                    password_hasher=PasswordHasherImpl(),
+                    email_service=ConsoleEmailService()
+                ),
+                user_repository=user_repo,
+                defer_until_commit=partial(after_commit, session)
+            )
+            service._storage_service = storage
+            try:
+                started = time.perf_counter()
+                service.update_profile("avatar_u1", avatar_url=f"/static/uploads/{new_path}")
+                assert time.perf_counter() - started < 0.5
+                assert registry.ref_count(old_path) == 1
+                session.commit() if commit else session.rollback()
+            finally:
+                session.close()
+
+        try:
+            # 请求回滚：头像没换，旧头像的引用保留
+            update_avatar(commit=False)
+            assert registry.ref_count(old_path) == 1
+
+            update_avatar(commit=True)
+            assert registry.ref_count(old_path) == 0
+        finally:
+            engine.dispose()
@@ -4,6 +4,7 @@ import os
 import sys
 import shutil
 from unittest.mock import patch
+from sqlalchemy.orm import sessionmaker
 from werkzeug.datastructures import FileStorage
 from io import BytesIO
 
@@ -11,6 +12,7 @@ from io import BytesIO
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../src')))
 
 from app_social.services.social_service import SocialService
+from shared.storage.file_reference_registry import FileReferenceRegistry
 from app_social.domain.value_objects.social_value_objects import ConversationType
 
 @pytest.fixture
@@ -27,6 +29,10 @@ def social_service(db_session):
         
         # We need to access the storage service instance inside social_service
         service._storage_service.upload_folder = test_upload_folder
+        # Record file references in the test database, not the global registry's dev database
+        service._storage_service._registry = FileReferenceRegistry(
+            session_factory=sessionmaker(bind=db_session.connection())
+        )
         
         yield service
         
@@ -0,0 +1,54 @@
+import pytest
+import uuid
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../src')))
+from unittest.mock import patch
+
+from app_auth.infrastructure.database.persistent_model.user_po import UserPO
+from app_social.domain.value_objects.friendship_value_objects import FriendshipStatus
+from app_social.infrastructure.database.po.friendship_po import FriendshipPO
+from app_social.services.friendship_service import FriendshipService
+
+
+@pytest.fixture
+def friendship_service(db_session):
+    with patch('app_social.services.friendship_service.SessionLocal', return_value=db_session):
+        yield FriendshipService()
+
+
+def make_user(db_session, name):
+    user_id = str(uuid.uuid4())
+    db_session.add(UserPO(
+        id=user_id, username=f"{name}_{user_id[:8]}", email=f"{user_id}@example.com",
+        hashed_password="hashed", avatar_url=f"/static/{name}.png", bio=f"{name} bio"
+    ))
+    return user_id
+
+
+class TestFriendshipServiceIntegration:
+
+    def test_get_friends_returns_accepted_friends_with_profiles(self, friendship_service, db_session):
+        alice = make_user(db_session, "alice")
+        bob = make_user(db_session, "bob")
+        carol = make_user(db_session, "carol")
+        db_session.add_all([
+            FriendshipPO(id=str(uuid.uuid4()), requester_id=alice, addressee_id=bob,
+                         status=FriendshipStatus.ACCEPTED),
+            FriendshipPO(id=str(uuid.uuid4()), requester_id=carol, addressee_id=alice,
+                         status=FriendshipStatus.PENDING),
+        ])
+        db_session.flush()
+
+        friends = friendship_service.get_friends(alice)
+
+        assert [f["id"] for f in friends] == [bob]
+        assert friends[0]["avatar"] == "/static/bob.png"
+        assert friends[0]["bio"] == "bob bio"
+        assert friends[0]["name"].startswith("bob_")
+
+    def test_get_friends_without_friends(self, friendship_service, db_session):
+        loner = make_user(db_session, "loner")
+        db_session.flush()
+
+        assert friendship_service.get_friends(loner) == []
@@ -143,3 +143,29 @@ def test_realtime_message_push(app, client, social_service):
     
     assert len(message_events_after) == 0, "Client received message after leaving the room"
 
+
+def test_reconnect_restores_rooms_per_client_session(app, client):
+    """A reconnecting tab rejoins its own rooms; a new tab of the same user does not"""
+    with client.session_transaction() as sess:
+        sess['user_id'] = "user_rooms_1"
+
+    def connect(client_session):
+        return socketio.test_client(app, flask_test_client=client, auth={'client_session': client_session})
+
+    def received_probe(socket_client):
+        socketio.emit('room_probe', {'room': 'conv-rooms-1'}, to='conv-rooms-1')
+        return any(evt['name'] == 'room_probe' for evt in socket_client.get_received())
+
+    tab = connect("tab-1")
+    tab.emit('join', {'room': 'conv-rooms-1'})
+    assert received_probe(tab)
+    tab.disconnect()
+
+    other_tab = connect("tab-2")
+    reconnected = connect("tab-1")
+    try:
+        assert received_probe(reconnected)
+        assert not received_probe(other_tab)
+    finally:
+        other_tab.disconnect()
+        reconnected.disconnect()
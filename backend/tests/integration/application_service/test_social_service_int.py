@@ -5,10 +5,12 @@ import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../src')))
 import shutil
 from unittest.mock import patch, MagicMock
+from sqlalchemy.orm import sessionmaker
 from werkzeug.datastructures import FileStorage
 from io import BytesIO
 
 from app_social.services.social_service import SocialService
+from shared.storage.file_reference_registry import FileReferenceRegistry
 from shared.database.core import SessionLocal
 
 @pytest.fixture
@@ -22,6 +24,10 @@ def social_service(db_session):
         os.makedirs(test_upload_folder)
         
         service._storage_service.upload_folder = test_upload_folder
+        # Record file references in the test database, not the global registry's dev database
+        service._storage_service._registry = FileReferenceRegistry(
+            session_factory=sessionmaker(bind=db_session.connection())
+        )
         
         yield service
         
@@ -61,18 +67,10 @@ class TestSocialServiceIntegration:
         assert image_url.endswith(".jpg")
         
         # Check if file exists on disk
-        # image_url is relative like /static/uploads/post_images/xxx.jpg
-        # We need to map it back to our test folder
-        # Our test folder is mounted at service._storage_service.upload_folder
-        # The service returns path relative to static/uploads (hardcoded in LocalFileStorageService?)
-        # Let's check LocalFileStorageService.save implementation:
-        # return f"/static/uploads/{sub_folder}/{unique_filename}"
-        
-        # But we changed upload_folder in fixture.
-        # The file is saved in test_upload_folder/post_images/unique_filename
-        
-        filename = os.path.basename(image_url)
-        expected_path = os.path.join(social_service._storage_service.upload_folder, "post_images", filename)
+        # image_url is relative like /static/uploads/post_images/ab/cd/<sha256>.jpg
+        # and maps onto the upload folder overridden in the fixture
+        relative_path = image_url[len("/static/uploads/"):]
+        expected_path = os.path.join(social_service._storage_service.upload_folder, *relative_path.split("/"))
         assert os.path.exists(expected_path)
 
     def test_create_post(self, social_service, db_session):
@@ -139,6 +137,27 @@ class TestSocialServiceIntegration:
         assert dto["like_count"] == 0
         assert dto["is_liked"] is False
 
+    def test_like_is_published_only_after_commit(self, social_service, db_session):
+        author_id = str(uuid.uuid4())
+        post_id = social_service.create_post(author_id, "Like Me", "...")["post_id"]
+        event_bus = MagicMock()
+        social_service._event_bus = event_bus
+
+        commits = []
+        event_bus.publish_all.side_effect = lambda events: commits.append(list(events))
+        with patch.object(db_session, 'commit', side_effect=lambda: commits.append('commit')):
+            social_service.like_post(post_id, str(uuid.uuid4()))
+        assert commits[0] == 'commit'
+        assert [type(e).__name__ for e in commits[1]] == ['PostLikedEvent']
+
+        # 提交失败的点赞不发布事件（热度等派生数据不计入）
+        event_bus.reset_mock()
+        with patch.object(db_session, 'commit', side_effect=RuntimeError("database is locked")), \
+             patch.object(db_session, 'rollback'):
+            with pytest.raises(RuntimeError):
+                social_service.like_post(post_id, str(uuid.uuid4()))
+        event_bus.publish_all.assert_not_called()
+
     def test_comment_post(self, social_service):
         author_id = str(uuid.uuid4())
         commenter_id = str(uuid.uuid4())
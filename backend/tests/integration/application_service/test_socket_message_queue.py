@@ -0,0 +1,127 @@
+import time
+from datetime import datetime, timedelta
+
+import socketio
+from flask import Flask
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from shared.infrastructure.socket import (
+    InstrumentedSocketIO,
+    LocalMessageBroker,
+    LocalPubSubManager,
+)
+from app_social.infrastructure.database.persistent_model.socket_room_membership_po import SocketRoomMembershipPO
+from app_social.infrastructure.socket.room_registry import (
+    DatabaseRoomMembershipRegistry,
+    RoomMembershipRegistry,
+    room_client_key,
+)
+
+
+def _make_worker(broker):
+    """Build an isolated Socket.IO server attached to the given broker.
+
+    The Flask-SocketIO test client refuses pub/sub managers, so frames are
+    captured at the engine.io send hook instead.
+    """
+    server = socketio.Server(
+        client_manager=LocalPubSubManager(channel="test-channel", broker=broker),
+        async_mode="threading"
+    )
+    sent = []
+    server._send_eio_packet = lambda eio_sid, pkt: sent.append((eio_sid, pkt.data))
+    server._send_packet = lambda eio_sid, pkt: sent.append((eio_sid, pkt.encode()))
+    server.manager.initialize()
+    return server, sent
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        result = predicate()
+        if result:
+            return result
+        time.sleep(0.02)
+    return predicate()
+
+
+def test_emit_fans_out_across_workers():
+    broker = LocalMessageBroker()
+    worker_a, sent_a = _make_worker(broker)
+    worker_b, sent_b = _make_worker(broker)
+
+    # A client connected to worker A joins the conversation room
+    sid = worker_a.manager.connect("eio-a", "/")
+    worker_a.manager.enter_room(sid, "/", "conv-1")
+
+    # Worker B has no local connections; the frame must travel through the queue
+    worker_b.emit("new_message", {"content": "hi"}, room="conv-1")
+
+    frames = _wait_for(lambda: [data for eio_sid, data in sent_a if eio_sid == "eio-a"])
+    assert frames and "new_message" in frames[0] and "hi" in frames[0]
+    assert sent_b == []
+
+
+def test_instrumented_socketio_records_emit_latency():
+    sio = InstrumentedSocketIO(cors_allowed_origins="*")
+    sio.init_app(Flask(__name__))
+
+    sio.emit("new_message", {"content": "hi"}, room="conv-1")
+
+    metrics = sio.emit_metrics.snapshot()
+    assert metrics["new_message"]["count"] == 1
+    assert metrics["new_message"]["errors"] == 0
+    assert metrics["new_message"]["max_ms"] >= metrics["new_message"]["p50_ms"] >= 0
+
+
+def test_room_registry_restores_rooms_until_retention_expires():
+    now = [0.0]
+    registry = RoomMembershipRegistry(retention_seconds=30, clock=lambda: now[0])
+
+    registry.remember("u1", "conv-1")
+    registry.remember("u1", "conv-2")
+    registry.forget("u1", "conv-2")
+    assert registry.rooms_for("u1") == {"conv-1"}
+
+    now[0] = 31
+    assert registry.rooms_for("u1") == set()
+
+
+def test_database_room_registry_is_shared_between_workers(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'rooms.db'}")
+    SocketRoomMembershipPO.__table__.create(engine)
+    session_factory = sessionmaker(bind=engine)
+    now = [datetime(2024, 6, 1)]
+    # Two workers, each with its own registry over the shared database
+    worker_a = DatabaseRoomMembershipRegistry(30, session_factory=session_factory, clock=lambda: now[0])
+    worker_b = DatabaseRoomMembershipRegistry(30, session_factory=session_factory, clock=lambda: now[0])
+    try:
+        worker_a.remember("u1:tab-1", "conv-1")
+        worker_a.remember("u1:tab-1", "conv-1")
+        worker_a.remember("u1:tab-1", "conv-2")
+        worker_a.remember("u1:tab-2", "conv-3")
+        worker_a.forget("u1:tab-1", "conv-2")
+
+        # The client reconnects to the other worker
+        assert worker_b.rooms_for("u1:tab-1") == {"conv-1"}
+        assert worker_b.rooms_for("u1:tab-3") == set()
+
+        # Restoring renews the retention; tab-2 never reconnects and expires
+        now[0] += timedelta(seconds=20)
+        assert worker_b.rooms_for("u1:tab-1") == {"conv-1"}
+        now[0] += timedelta(seconds=20)
+        assert worker_a.rooms_for("u1:tab-1") == {"conv-1"}
+        assert worker_a.rooms_for("u1:tab-2") == set()
+        with session_factory() as session:
+            assert session.query(SocketRoomMembershipPO).count() == 1
+    finally:
+        engine.dispose()
+
+
+def test_room_client_key_requires_a_client_session():
+    assert room_client_key("u1", "tab-1") == "u1:tab-1"
+    assert room_client_key("u1", None) is None
+    assert room_client_key("u1", "") is None
+    assert room_client_key("u1", "x" * 65) is None
+    assert room_client_key(None, "tab-1") is None
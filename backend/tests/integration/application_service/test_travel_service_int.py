@@ -15,6 +15,7 @@ from app_travel.domain.value_objects.travel_value_objects import (
 )
 from app_travel.domain.aggregate.trip_aggregate import Trip
 from app_social.infrastructure.database.po.friendship_po import FriendshipPO
+from app_social.infrastructure.cache.friend_graph_cache import FriendGraphCache
 from app_social.domain.value_objects.friendship_value_objects import FriendshipStatus
 from unittest.mock import MagicMock, patch
 
@@ -120,7 +121,8 @@ class TestTravelServiceIntegration:
         session_proxy = MagicMock(wraps=db_session)
         session_proxy.close = MagicMock()
         
-        with patch('app_social.services.social_service.SessionLocal', return_value=session_proxy):
+        friend_graph = FriendGraphCache(session_factory=lambda: session_proxy)
+        with patch('app_social.infrastructure.cache.friend_graph_cache.get_friend_graph_cache', return_value=friend_graph):
             updated_trip = travel_service.add_member(
                 trip_id=trip.id.value,
                 user_id=member_id,
@@ -390,7 +392,8 @@ class TestTravelServiceIntegration:
         session_proxy = MagicMock(wraps=db_session)
         session_proxy.close = MagicMock()
         
-        with patch('app_social.services.social_service.SessionLocal', return_value=session_proxy):
+        friend_graph = FriendGraphCache(session_factory=lambda: session_proxy)
+        with patch('app_social.infrastructure.cache.friend_graph_cache.get_friend_graph_cache', return_value=friend_graph):
             # 1. Test adding non-friend member (Should Fail)
             with pytest.raises(ValueError, match="not your friend"):
                 travel_service.add_member(
@@ -410,6 +413,7 @@ class TestTravelServiceIntegration:
             )
             db_session.add(friendship)
             db_session.commit()
+            # Inserted directly without an event: the cached "not a friend" answer is re-checked
             
             travel_service.add_member(
                 trip_id=trip.id.value,
@@ -5,10 +5,15 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../.
 import json
 from datetime import date, datetime, time
 from flask import Flask
+import uuid
 from unittest.mock import patch
 
+from sqlalchemy import event
+
 from app_travel.view.travel_view import travel_bp
 from app_travel.domain.value_objects.travel_value_objects import TripStatus
+from app_auth.infrastructure.database.persistent_model.user_po import UserPO
+from app_travel.infrastructure.database.persistent_model.trip_po import TripMemberPO
 
 # ==================== Fixtures ====================
 
@@ -96,6 +101,95 @@ class TestTravelViewIntegration:
         assert res_json['name'] == "Updated Trip Name"
         assert res_json['budget']['amount'] == 10000.0
 
+    def test_get_trip_etag_and_cache(self, client, mock_db_session):
+        create_res = client.post('/api/travel/trips', json={
+            "name": "Cached Trip", "creator_id": "user_123",
+            "start_date": "2023-01-01", "end_date": "2023-01-03"
+        })
+        trip_id = create_res.get_json()['id']
+        
+        first = client.get(f'/api/travel/trips/{trip_id}')
+        etag = first.headers['ETag']
+        assert first.status_code == 200
+        
+        # 版本未变：304，且不再加载聚合
+        with patch('app_travel.services.travel_service.TravelService.get_trip') as get_trip:
+            not_modified = client.get(f'/api/travel/trips/{trip_id}', headers={'If-None-Match': etag})
+            cached = client.get(f'/api/travel/trips/{trip_id}')
+            get_trip.assert_not_called()
+        assert not_modified.status_code == 304
+        assert not_modified.data == b''
+        assert cached.get_json() == first.get_json()
+        
+        # 修改后版本变化，旧 ETag 不再匹配
+        client.put(f'/api/travel/trips/{trip_id}', json={"name": "Renamed"})
+        changed = client.get(f'/api/travel/trips/{trip_id}', headers={'If-None-Match': etag})
+        assert changed.status_code == 200
+        assert changed.headers['ETag'] != etag
+        assert changed.get_json()['name'] == "Renamed"
+
+    def test_get_trip_field_selection_and_polyline(self, client, mock_db_session):
+        create_res = client.post('/api/travel/trips', json={
+            "name": "Selected Trip", "creator_id": "user_123",
+            "start_date": "2023-01-01", "end_date": "2023-01-03"
+        })
+        trip_id = create_res.get_json()['id']
+        full = client.get(f'/api/travel/trips/{trip_id}')
+        
+        selected = client.get(f'/api/travel/trips/{trip_id}?fields=id,name,days.date&polyline=none')
+        assert selected.status_code == 200
+        assert selected.get_json() == {
+            'id': trip_id,
+            'name': "Selected Trip",
+            'days': [{'date': '2023-01-01'}, {'date': '2023-01-02'}, {'date': '2023-01-03'}],
+        }
+        # 不同表示形式使用不同的 ETag
+        assert selected.headers['ETag'] != full.headers['ETag']
+        etag = selected.headers['ETag']
+        again = client.get(
+            f'/api/travel/trips/{trip_id}?fields=id,name,days.date&polyline=none',
+            headers={'If-None-Match': etag}
+        )
+        assert again.status_code == 304
+        
+        assert client.get(f'/api/travel/trips/{trip_id}?polyline=gzip').status_code == 400
+
+    def test_get_trip_polyline_formats(self, client, mock_db_session):
+        from app_travel.domain.entity.transit import Transit
+        from app_travel.domain.value_objects.transit_value_objects import RouteInfo, TransportMode
+        from app_travel.domain.value_objects.travel_value_objects import TripId
+        from app_travel.infrastructure.database.dao_impl.sqlalchemy_trip_dao import SqlAlchemyTripDao
+        from app_travel.infrastructure.database.repository_impl.trip_repository_impl import TripRepositoryImpl
+        from app_travel.infrastructure.geo import polyline_codec
+        
+        trip_id = client.post('/api/travel/trips', json={
+            "name": "Route Trip", "creator_id": "user_123",
+            "start_date": "2023-01-01", "end_date": "2023-01-01"
+        }).get_json()['id']
+        raw = "116.481028,39.989643;116.465302,40.004717;116.450001,40.010002"
+        repo = TripRepositoryImpl(SqlAlchemyTripDao(mock_db_session))
+        trip = repo.find_by_id(TripId(trip_id))
+        trip.get_day(0).add_transit(Transit.create(
+            from_activity_id="a1", to_activity_id="a2", transport_mode=TransportMode.DRIVING,
+            route_info=RouteInfo(3000, 600, raw), departure_time=time(9, 0)
+        ))
+        repo.save(trip)
+        mock_db_session.commit()
+        
+        def transit(query=''):
+            res = client.get(f'/api/travel/trips/{trip_id}{query}')
+            assert res.status_code == 200
+            return res.get_json()['days'][0]['transits'][0]
+        
+        # 默认仍返回高德原始文本，前端无需修改
+        assert transit()['polyline'] == raw
+        assert transit('?polyline=encoded')['polyline'] == polyline_codec.to_storage(raw)
+        assert transit('?polyline=simplified&zoom=3')['polyline'].count(';') < raw.count(';')
+        assert 'polyline' not in transit('?polyline=none')
+
+    def test_get_missing_trip_returns_404(self, client, mock_db_session):
+        assert client.get('/api/travel/trips/does-not-exist').status_code == 404
+
     def test_geocode_location_real_api(self, client, mock_db_session):
         """
         Test geocoding using REAL Gaode API.
@@ -200,6 +294,45 @@ class TestTravelViewIntegration:
         trips_completed = res_completed.get_json()
         assert len(trips_completed) == 0
 
+    def test_list_trips_loads_member_profiles_once_per_page(self, client, mock_db_session):
+        users = [UserPO(id=str(uuid.uuid4()), username=f"member{i}_{uuid.uuid4().hex[:6]}",
+                        email=f"{uuid.uuid4().hex}@test.com", hashed_password="pw",
+                        avatar_url=f"/static/uploads/avatars/{i}.jpg") for i in range(3)]
+        mock_db_session.add_all(users)
+        mock_db_session.flush()
+        user_ids = [u.id for u in users]
+        usernames = {u.id: u.username for u in users}
+        owner = user_ids[0]
+        for name in ("P1", "P2", "P3"):
+            trip_id = client.post('/api/travel/trips', json={
+                "name": name, "creator_id": owner, "start_date": "2023-01-01", "end_date": "2023-01-01"
+            }).get_json()['id']
+            mock_db_session.add_all(TripMemberPO(trip_id=trip_id, user_id=uid, role='member') for uid in user_ids[1:])
+        mock_db_session.flush()
+
+        user_queries = []
+
+        def count_user_queries(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT") and "FROM users" in statement:
+                user_queries.append(statement)
+
+        engine = mock_db_session.get_bind().engine
+        event.listen(engine, "before_cursor_execute", count_user_queries)
+        try:
+            res = client.get(f'/api/travel/users/{owner}/trips')
+        finally:
+            event.remove(engine, "before_cursor_execute", count_user_queries)
+
+        assert res.status_code == 200
+        trips = res.get_json()
+        assert len(trips) == 3
+        assert len(user_queries) == 1
+        for trip in trips:
+            members = {m['user_id']: m for m in trip['members']}
+            assert set(members) == set(user_ids)
+            assert members[user_ids[2]]['username'] == usernames[user_ids[2]]
+            assert members[user_ids[2]]['avatar_url'] == "/static/uploads/avatars/2.jpg"
+
     def test_modify_transit(self, client, mock_db_session):
         """Test modifying transit mode"""
         # 1. Create Trip
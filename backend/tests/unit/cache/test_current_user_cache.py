@@ -0,0 +1,72 @@
+import pytest
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../src')))
+from unittest.mock import Mock
+
+from app_auth.domain.domain_event.user_events import UserPasswordChangedEvent, UserProfileUpdatedEvent
+from app_auth.domain.entity.user_entity import User
+from app_auth.domain.value_objects.user_value_objects import (
+    Email, HashedPassword, UserId, UserProfile, UserRole, Username
+)
+from app_auth.infrastructure.cache.current_user_cache import CurrentUserCache
+from app_auth.services.auth_application_service import AuthApplicationService
+
+
+def make_user(user_id="u1", bio="hello"):
+    return User.reconstitute(
+        user_id=UserId(user_id), username=Username("cached_user"), email=Email("cached@test.com"),
+        hashed_password=HashedPassword("x"), role=UserRole.USER, profile=UserProfile(bio=bio)
+    )
+
+
+class TestCurrentUserCache:
+
+    @pytest.fixture
+    def repo(self):
+        repo = Mock()
+        repo.find_by_id.side_effect = lambda user_id: make_user(user_id.value)
+        return repo
+
+    @pytest.fixture
+    def cache(self):
+        return CurrentUserCache(ttl_seconds=60)
+
+    def service(self, repo, cache):
+        return AuthApplicationService(
+            domain_auth_service=Mock(), user_repository=repo,
+            event_bus=Mock(), current_user_cache=cache
+        )
+
+    def test_repeated_lookups_hit_cache(self, repo, cache):
+        service = self.service(repo, cache)
+
+        first = service.get_current_user("u1")
+        second = service.get_current_user("u1")
+
+        assert first == second and first is not second
+        assert repo.find_by_id.call_count == 1
+
+    def test_returned_entity_does_not_leak_into_cache(self, repo, cache):
+        service = self.service(repo, cache)
+        user = service.get_current_user("u1")
+        user.update_profile(UserProfile(bio="changed locally"))
+
+        assert service.get_current_user("u1").profile.bio == "hello"
+
+    def test_profile_and_password_events_invalidate(self, repo, cache):
+        service = self.service(repo, cache)
+        service.get_current_user("u1")
+
+        cache.handle_user_changed(UserProfileUpdatedEvent(user_id="u1", updated_fields=('profile',)))
+        service.get_current_user("u1")
+        cache.handle_user_changed(UserPasswordChangedEvent(user_id="u1"))
+        service.get_current_user("u1")
+
+        assert repo.find_by_id.call_count == 3
+
+    def test_missing_user_is_not_cached(self, cache):
+        loader = Mock(return_value=None)
+        assert cache.get("ghost", loader) is None
+        assert cache.get("ghost", loader) is None
+        assert loader.call_count == 2
@@ -0,0 +1,93 @@
+import pytest
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../src')))
+from unittest.mock import MagicMock
+
+from app_social.domain.aggregate.friendship_aggregate import Friendship
+from app_social.domain.domain_event.friendship_events import FriendshipAcceptedEvent, FriendshipBlockedEvent
+from app_social.domain.value_objects.friendship_value_objects import FriendshipStatus
+from app_social.infrastructure.cache.friend_graph_cache import FriendGraphCache
+from app_social.infrastructure.database.dao_impl.sqlalchemy_friendship_dao import SqlAlchemyFriendshipDao
+from app_social.infrastructure.database.po.friendship_po import FriendshipPO
+from app_social.infrastructure.database.repository_impl.friendship_repository_impl import FriendshipRepositoryImpl
+
+
+class TestFriendGraphCache:
+
+    @pytest.fixture
+    def graph_rows(self, db_session):
+        rows = [
+            ("f1", "alice", "bob", FriendshipStatus.ACCEPTED),
+            ("f2", "carol", "alice", FriendshipStatus.ACCEPTED),
+            ("f3", "alice", "dave", FriendshipStatus.PENDING),
+            ("f4", "erin", "alice", FriendshipStatus.BLOCKED),
+        ]
+        for friendship_id, requester, addressee, status in rows:
+            db_session.add(FriendshipPO(
+                id=friendship_id, requester_id=requester, addressee_id=addressee, status=status
+            ))
+        db_session.flush()
+
+    def test_adjacency_covers_both_directions_and_accepted_only(self, db_session, graph_rows):
+        graph = FriendGraphCache(ttl_seconds=60)
+
+        assert graph.friend_ids("alice", session=db_session) == {"bob", "carol"}
+        assert graph.are_friends("bob", "alice", session=db_session)
+        assert not graph.are_friends("alice", "dave", session=db_session)
+        assert not graph.are_friends("alice", "erin", session=db_session)
+        assert graph.filter_friends("alice", ["bob", "dave", "carol", "zed"], session=db_session) == {"bob", "carol"}
+        assert FriendshipRepositoryImpl(SqlAlchemyFriendshipDao(db_session)).find_friends("alice") == ["bob", "carol"]
+
+    def test_misses_are_batched_and_hits_skip_the_database(self, db_session, graph_rows):
+        graph = FriendGraphCache(ttl_seconds=60)
+        spy = MagicMock(wraps=db_session)
+
+        result = graph.friend_ids_many(["alice", "bob", "nobody"], session=spy)
+        assert result == {"alice": {"bob", "carol"}, "bob": {"alice"}, "nobody": frozenset()}
+        # One query per direction, regardless of how many users were missing
+        assert spy.execute.call_count == 2
+
+        graph.are_friends("alice", "bob", session=spy)
+        graph.friend_ids("nobody", session=spy)
+        assert spy.execute.call_count == 2
+
+    def test_accept_and_block_events_invalidate_both_sides(self, db_session, graph_rows):
+        graph = FriendGraphCache(ttl_seconds=60)
+        repo = FriendshipRepositoryImpl(SqlAlchemyFriendshipDao(db_session))
+        assert graph.friend_ids("dave", session=db_session) == frozenset()
+        assert graph.friend_ids("alice", session=db_session) == {"bob", "carol"}
+
+        friendship = repo.find_by_users("alice", "dave")
+        friendship.accept("dave")
+        repo.save(friendship)
+        db_session.flush()
+        [event] = friendship.pop_events()
+        assert isinstance(event, FriendshipAcceptedEvent)
+        graph.handle_friendship_changed(event)
+
+        assert graph.are_friends("dave", "alice", session=db_session)
+        assert "dave" in graph.friend_ids("alice", session=db_session)
+
+        friendship.block("alice")
+        repo.save(friendship)
+        db_session.flush()
+        [event] = friendship.pop_events()
+        assert isinstance(event, FriendshipBlockedEvent)
+        graph.handle_friendship_changed(event)
+
+        assert not graph.are_friends("alice", "dave", session=db_session)
+
+    def test_other_workers_confirm_new_friends_without_the_event(self, db_session, graph_rows):
+        # Each worker has its own cache; the accept event only reaches the worker that handled it
+        other_worker = FriendGraphCache(ttl_seconds=60)
+        assert not other_worker.are_friends("alice", "dave", session=db_session)
+        assert other_worker.friend_ids("alice", session=db_session) == {"bob", "carol"}
+
+        friendship = db_session.get(FriendshipPO, "f3")
+        friendship.status = FriendshipStatus.ACCEPTED
+        db_session.flush()
+
+        assert other_worker.are_friends("alice", "dave", session=db_session)
+        assert other_worker.filter_friends("alice", ["dave", "bob", "zed"], session=db_session) == {"dave", "bob"}
+        assert other_worker.friend_ids("alice", session=db_session) == {"bob", "carol", "dave"}
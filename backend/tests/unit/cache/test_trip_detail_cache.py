@@ -0,0 +1,35 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../src')))
+from datetime import datetime
+
+from app_travel.infrastructure.cache.trip_detail_cache import TripDetailCache
+from app_travel.domain.domain_event.travel_events import ActivityAddedEvent
+
+
+class TestTripDetailCache:
+
+    def setup_method(self):
+        self.cache = TripDetailCache(ttl_seconds=60)
+        self.v1 = datetime(2024, 1, 1, 10, 0, 0)
+        self.v2 = datetime(2024, 1, 1, 10, 0, 1)
+
+    def test_entry_only_served_for_matching_version(self):
+        self.cache.set("t1", self.v1, {"name": "Trip"})
+
+        assert self.cache.get("t1", self.v1) == {"name": "Trip"}
+        assert self.cache.get("t1", self.v2) is None
+
+    def test_etag_changes_with_version(self):
+        assert self.cache.make_etag("t1", self.v1) == self.cache.make_etag("t1", self.v1)
+        assert self.cache.make_etag("t1", self.v1) != self.cache.make_etag("t1", self.v2)
+        assert self.cache.make_etag("t1", self.v1) != self.cache.make_etag("t2", self.v1)
+
+    def test_travel_event_invalidates_trip(self):
+        self.cache.set("t1", self.v1, {"name": "Trip"})
+        self.cache.set("t2", self.v1, {"name": "Other"})
+
+        self.cache.handle_trip_event(ActivityAddedEvent(trip_id="t1"))
+
+        assert self.cache.get("t1", self.v1) is None
+        assert self.cache.get("t2", self.v1) == {"name": "Other"}
@@ -0,0 +1,79 @@
+import pytest
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../src')))
+from unittest.mock import MagicMock
+
+from shared.infrastructure.ttl_cache import TTLCache
+from app_auth.infrastructure.cache.user_profile_cache import UserProfileCache
+from app_auth.infrastructure.database.persistent_model.user_po import UserPO
+from app_auth.domain.domain_event.user_events import UserProfileUpdatedEvent
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache:
+
+    def test_entries_expire_after_ttl(self):
+        clock = FakeClock()
+        cache = TTLCache(ttl_seconds=10, clock=clock)
+        cache.set("k", "v")
+        assert cache.get("k") == "v"
+
+        clock.now = 10
+        assert cache.get("k") is None
+        assert len(cache) == 0
+
+    def test_lru_eviction_when_full(self):
+        cache = TTLCache(ttl_seconds=60, max_size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # a becomes most recently used
+        cache.set("c", 3)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert cache.get_many(["a", "b", "c"]) == {"a": 1, "c": 3}
+
+
+class TestUserProfileCache:
+
+    @pytest.fixture
+    def user(self, db_session):
+        po = UserPO(
+            id="cache_u1", username="cached_alice", email="cache_alice@example.com",
+            hashed_password="x", role="user", avatar_url="/a.png"
+        )
+        db_session.add(po)
+        db_session.flush()
+        return po
+
+    def test_get_many_loads_misses_once(self, db_session, user):
+        cache = UserProfileCache(ttl_seconds=60)
+        spy = MagicMock(wraps=db_session)
+
+        result = cache.get_many(["cache_u1", "missing"], session=spy)
+        assert result == {"cache_u1": {"name": "cached_alice", "avatar": "/a.png"}}
+        assert spy.execute.call_count == 1
+
+        # Second lookup is served from memory; the unknown user is retried
+        result = cache.get_many(["cache_u1"], session=spy)
+        assert result["cache_u1"]["name"] == "cached_alice"
+        assert spy.execute.call_count == 1
+
+    def test_profile_updated_event_invalidates(self, db_session, user):
+        cache = UserProfileCache(ttl_seconds=60)
+        assert cache.get("cache_u1", session=db_session)["avatar"] == "/a.png"
+
+        user.avatar_url = "/b.png"
+        db_session.flush()
+        assert cache.get("cache_u1", session=db_session)["avatar"] == "/a.png"
+
+        cache.handle_user_profile_updated(UserProfileUpdatedEvent(user_id="cache_u1"))
+        assert cache.get("cache_u1", session=db_session)["avatar"] == "/b.png"
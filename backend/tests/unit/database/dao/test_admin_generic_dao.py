@@ -0,0 +1,97 @@
+import pytest
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../src')))
+from datetime import datetime, timedelta
+
+from app_admin.dao import AdminGenericDao
+from app_social.infrastructure.database.persistent_model.message_po import MessagePO
+from app_social.infrastructure.database.persistent_model.post_po import LikePO
+
+T0 = datetime(2024, 6, 1)
+
+
+class TestAdminGenericDao:
+
+    @pytest.fixture
+    def dao(self, db_session):
+        return AdminGenericDao(db_session)
+
+    @pytest.fixture
+    def likes(self, db_session):
+        # 每 3 条共用一个时间戳，排序键需要主键兜底才能翻页无重复
+        rows = [
+            LikePO(id=i, user_id=f"user_{i % 4}", post_id=f"post_{i % 2}", created_at=T0 + timedelta(minutes=i // 3))
+            for i in range(1, 26)
+        ]
+        db_session.add_all(rows)
+        db_session.flush()
+        return rows
+
+    def collect(self, dao, per_page, **kwargs):
+        pages = []
+        cursor = None
+        while True:
+            items, cursor = dao.get_page(LikePO, per_page, cursor, **kwargs)
+            pages.append([item.id for item in items])
+            if cursor is None:
+                return pages
+
+    def test_keyset_pages_cover_all_rows_once(self, dao, likes):
+        pages = self.collect(dao, 10)
+        assert [len(p) for p in pages] == [10, 10, 5]
+        assert sum(pages, []) == list(range(1, 26))
+
+        by_time = sum(self.collect(dao, 4, sort='created_at', descending=True), [])
+        expected = sorted(likes, key=lambda r: (r.created_at, r.id), reverse=True)
+        assert by_time == [r.id for r in expected]
+
+    def test_filters_are_pushed_into_sql(self, dao, likes):
+        def ids(params):
+            items, _ = dao.get_page(LikePO, 100, filters=dao.build_filters(LikePO, params))
+            return [item.id for item in items]
+
+        assert ids({'user_id': 'user_1'}) == [1, 5, 9, 13, 17, 21, 25]
+        assert ids({'user_id__in': 'user_1,user_2', 'id__lt': '7'}) == [1, 2, 5, 6]
+        assert ids({'created_at__gte': (T0 + timedelta(minutes=8)).isoformat()}) == [24, 25]
+        assert ids({'post_id__prefix': 'post_'}) == list(range(1, 26))
+        assert ids({'post_id__prefix': 'post%'}) == []
+
+        with pytest.raises(ValueError):
+            dao.build_filters(LikePO, {'password': 'x'})
+        with pytest.raises(ValueError):
+            dao.build_filters(LikePO, {'id__regex': '.*'})
+        with pytest.raises(ValueError):
+            dao.build_filters(LikePO, {'id': 'abc'})
+
+    def test_invalid_sort_and_cursor_are_rejected(self, dao, likes):
+        with pytest.raises(ValueError):
+            dao.get_page(MessagePO, 10, sort='media_url')
+        with pytest.raises(ValueError):
+            dao.get_page(LikePO, 10, cursor='not-a-cursor')
+        _, cursor = dao.get_page(LikePO, 10)
+        with pytest.raises(ValueError):
+            # 游标与排序键不匹配
+            dao.get_page(LikePO, 10, cursor=cursor, sort='created_at')
+
+    def test_count_modes(self, dao, likes, monkeypatch):
+        user_1 = dao.build_filters(LikePO, {'user_id': 'user_1'})
+
+        # 没有统计信息的小表：精确计数
+        assert dao.estimate_count(LikePO) is None
+        assert dao.count(LikePO) == (25, False)
+        assert dao.count(LikePO, user_1, mode='estimate') == (None, False)
+        assert dao.count(LikePO, mode='none') == (None, False)
+
+        monkeypatch.setattr(dao, 'estimate_count', lambda model_class: 5_000_000)
+        assert dao.count(LikePO) == (5_000_000, True)
+        assert dao.count(LikePO, user_1) == (None, False)
+        assert dao.count(LikePO, user_1, mode='exact') == (7, False)
+
+    def test_iter_rows_streams_in_keyset_batches(self, dao, likes):
+        rows = dao.iter_rows(LikePO, sort='created_at', descending=True, batch_size=7)
+        ids = [row['id'] for row in rows]
+
+        assert ids == [r.id for r in sorted(likes, key=lambda r: (r.created_at, r.id), reverse=True)]
+        with pytest.raises(ValueError):
+            dao.iter_rows(LikePO, sort='missing')
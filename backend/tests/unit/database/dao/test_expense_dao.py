@@ -0,0 +1,142 @@
+import pytest
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../src')))
+from datetime import date
+from decimal import Decimal
+from unittest.mock import Mock
+
+from sqlalchemy import event
+
+from shared.event_bus import EventBus
+from app_travel.domain.aggregate.trip_aggregate import Trip
+from app_travel.domain.domain_service.settlement_service import SettlementService
+from app_travel.domain.value_objects.travel_value_objects import (
+    TripName, TripDescription, DateRange, MemberRole
+)
+from app_travel.infrastructure.database.dao_impl.sqlalchemy_expense_dao import SQLAlchemyExpenseDAO
+from app_travel.infrastructure.database.dao_impl.sqlalchemy_trip_dao import SqlAlchemyTripDao
+from app_travel.infrastructure.database.persistent_model.expense_po import TripMemberBalancePO
+from app_travel.infrastructure.database.repository_impl.trip_repository_impl import TripRepositoryImpl
+from app_travel.services.travel_service import TravelService
+
+
+class TestExpenseAggregation:
+
+    @pytest.fixture
+    def expense_dao(self, db_session):
+        return SQLAlchemyExpenseDAO(db_session)
+
+    @pytest.fixture
+    def service(self, db_session, expense_dao):
+        trip_repo = TripRepositoryImpl(SqlAlchemyTripDao(db_session))
+        return TravelService(trip_repo, Mock(), event_bus=EventBus(), expense_dao=expense_dao)
+
+    @pytest.fixture
+    def trip_id(self, db_session):
+        trip = Trip.create(
+            name=TripName("Split"), description=TripDescription(""), creator_id="u1",
+            date_range=DateRange(date(2024, 5, 1), date(2024, 5, 3))
+        )
+        trip.add_member("u2", MemberRole.MEMBER, added_by="u1")
+        trip.add_member("u3", MemberRole.MEMBER, added_by="u1")
+        TripRepositoryImpl(SqlAlchemyTripDao(db_session)).save(trip)
+        return trip.id.value
+
+    def add_expenses(self, service, trip_id):
+        return [
+            service.add_expense(trip_id, "Hotel", 300, "u1", category="accommodation"),
+            service.add_expense(trip_id, "Dinner", 90.5, "u2", category="dining",
+                                participant_ids=["u1", "u2"]),
+            service.add_expense(trip_id, "Taxi", 40, "u3", category="transport",
+                                split_mode="exact", participant_ids=["u1", "u3"],
+                                exact_amounts=[25, 15]),
+            service.add_expense(trip_id, "Lunch", 60, "u1", category="dining"),
+        ]
+
+    def test_summary_matches_expense_details(self, service, trip_id):
+        self.add_expenses(service, trip_id)
+        expenses = service.list_expenses(trip_id)
+
+        summary = service.get_expense_summary(trip_id)
+
+        assert summary['total_amount'] == "490.50"
+        assert summary['by_category'] == {
+            'accommodation': "300.00", 'dining': "150.50", 'transport': "40.00"
+        }
+        balances = SettlementService.calculate_balances(expenses)
+        for user_id, stats in summary['per_member'].items():
+            assert Decimal(stats['paid']) - Decimal(stats['owed']) == balances[user_id]
+
+    def test_settlement_matches_full_recalculation(self, service, trip_id):
+        self.add_expenses(service, trip_id)
+        expected = SettlementService.minimize_transfers(
+            SettlementService.calculate_balances(service.list_expenses(trip_id))
+        )
+
+        settlement = service.get_settlement(trip_id)
+
+        assert [(t['from_user_id'], t['to_user_id'], Decimal(t['amount'])) for t in settlement] == [
+            (t.from_user_id, t.to_user_id, t.amount) for t in expected
+        ]
+
+    def test_summary_reads_balance_rows_not_shares(self, service, trip_id, db_session):
+        self.add_expenses(service, trip_id)
+        statements = []
+        listener = lambda conn, cursor, stmt, params, context, executemany: statements.append(stmt)
+        event.listen(db_session.bind, "before_cursor_execute", listener)
+        try:
+            service.get_expense_summary(trip_id)
+            service.get_settlement(trip_id)
+        finally:
+            event.remove(db_session.bind, "before_cursor_execute", listener)
+
+        assert not any("expense_shares" in s for s in statements)
+
+    def test_delete_reverts_balances(self, service, expense_dao, trip_id):
+        expenses = self.add_expenses(service, trip_id)
+        for expense in expenses[1:]:
+            assert service.delete_expense(trip_id, expense.id, "u1")
+
+        balances = {row.user_id: row for row in expense_dao.get_member_balances(trip_id)}
+        assert balances["u1"].paid == Decimal("300.00")
+        assert all(row.owed == Decimal("100.00") for row in balances.values())
+        assert service.get_settlement(trip_id)[0]['amount'] == "100.00"
+        # 其他行程的费用不能被删除
+        assert not service.delete_expense("other-trip", expenses[0].id, "u1")
+
+    def test_rebuild_matches_maintained_rows(self, service, expense_dao, trip_id, db_session):
+        self.add_expenses(service, trip_id)
+        maintained = {(r.user_id, r.paid, r.owed) for r in expense_dao.get_member_balances(trip_id)}
+
+        db_session.query(TripMemberBalancePO).delete()
+        expense_dao.rebuild_member_balances(trip_id)
+
+        rebuilt = {(r.user_id, r.paid, r.owed) for r in expense_dao.get_member_balances(trip_id)}
+        assert rebuilt == maintained
+
+    def test_legacy_trip_reads_without_writing_balances(self, service, expense_dao, trip_id, db_session):
+        self.add_expenses(service, trip_id)
+        expected = service.get_settlement(trip_id)
+
+        # 模拟上线前的历史数据：余额表为空时只读计算，不在 GET 中回填
+        db_session.query(TripMemberBalancePO).delete()
+        assert service.get_settlement(trip_id) == expected
+        assert service.get_expense_summary(trip_id)['per_member']
+        assert expense_dao.get_member_balances(trip_id) == []
+
+    def test_first_expense_on_legacy_trip_backfills_balances(self, service, expense_dao, trip_id, db_session):
+        service.add_expense(trip_id, "Hotel", 150, "u1", participant_ids=["u1", "u2"])
+        db_session.query(TripMemberBalancePO).delete()
+
+        service.add_expense(trip_id, "Coffee", 10, "u2", participant_ids=["u1", "u2"])
+
+        balances = {row.user_id: (row.paid, row.owed) for row in expense_dao.get_member_balances(trip_id)}
+        assert balances == {
+            "u1": (Decimal("150.00"), Decimal("80.00")),
+            "u2": (Decimal("10.00"), Decimal("80.00")),
+        }
+        settlement = service.get_settlement(trip_id)
+        assert [(t['from_user_id'], t['to_user_id'], t['amount']) for t in settlement] == [
+            ("u2", "u1", "70.00")
+        ]
@@ -0,0 +1,108 @@
+import pytest
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../src')))
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app_travel.domain.aggregate.trip_template import TripTemplate
+from app_travel.domain.value_objects.template_value_objects import (
+    TemplateId, TemplateDayData, TemplateActivityData
+)
+from app_travel.infrastructure.database.dao_impl.sqlalchemy_template_dao import SQLAlchemyTemplateDAO
+from app_travel.infrastructure.database.persistent_model.template_po import (
+    TripTemplateTagPO, TripTemplateSearchTermPO
+)
+from app_travel.infrastructure.database.repository_impl.template_repository_impl import TemplateRepositoryImpl
+
+
+def make_template(name, description="", tags=(), locations=(), created_at=None):
+    activities = tuple(
+        TemplateActivityData(
+            name=f"Visit {location}", activity_type="sightseeing", location_name=location,
+            latitude=None, longitude=None, address=None, duration_minutes=60,
+            cost_amount=None, cost_currency="CNY", notes=""
+        )
+        for location in locations
+    )
+    return TripTemplate.reconstitute(
+        template_id=TemplateId.generate(), name=name, description=description,
+        source_trip_id="trip-1", author_id="author", duration_days=1, tags=list(tags),
+        days_data=[TemplateDayData(day_number=1, theme=None, activities=activities)],
+        activity_count=len(activities), created_at=created_at or datetime(2024, 1, 1)
+    )
+
+
+class TestTemplateCatalogue:
+
+    @pytest.fixture
+    def dao(self, db_session):
+        return SQLAlchemyTemplateDAO(db_session)
+
+    @pytest.fixture
+    def repo(self, dao):
+        return TemplateRepositoryImpl(dao)
+
+    @pytest.fixture
+    def templates(self, repo):
+        base = datetime(2024, 1, 1)
+        templates = [
+            make_template("北京三日游", "故宫与长城", tags=["Culture", "Beijing"],
+                          locations=["故宫博物院", "八达岭长城"], created_at=base),
+            make_template("Tokyo Food Tour", "Ramen and sushi", tags=["food"],
+                          locations=["Tsukiji Market"], created_at=base + timedelta(days=1)),
+            make_template("上海周末", "外滩夜景", tags=["city"],
+                          locations=["Shanghai Bund"], created_at=base + timedelta(days=2)),
+        ]
+        for template in templates:
+            repo.save(template)
+        return templates
+
+    def names(self, summaries):
+        return [s.name for s in summaries]
+
+    def test_keyword_search_uses_index_terms(self, repo, templates):
+        assert self.names(repo.find_summaries(keyword="故宫")[0]) == ["北京三日游"]
+        # 活动地点也被索引；英文按前缀匹配，不区分大小写
+        assert self.names(repo.find_summaries(keyword="tsuki")[0]) == ["Tokyo Food Tour"]
+        assert self.names(repo.find_summaries(keyword="长城")[0]) == ["北京三日游"]
+        # 多个词必须全部命中
+        assert self.names(repo.find_summaries(keyword="tokyo ramen")[0]) == ["Tokyo Food Tour"]
+        assert repo.find_summaries(keyword="tokyo 外滩") == ([], 0)
+        assert repo.find_summaries(keyword="!!!") == ([], 0)
+
+    def test_tag_filter_uses_normalized_tag_table(self, repo, templates):
+        summaries, total = repo.find_summaries(tag=" culture ")
+        assert total == 1
+        assert summaries[0].tags == ("Culture", "Beijing")
+        assert repo.count_all(tag="FOOD") == 1
+        assert repo.count_all(tag="food", keyword="北京") == 0
+
+    def test_page_and_total_in_one_query_without_days_data(self, dao, templates, db_session):
+        statements = []
+        listener = lambda conn, cursor, stmt, params, context, executemany: statements.append(stmt)
+        event.listen(db_session.bind, "before_cursor_execute", listener)
+        try:
+            rows, total = dao.list_page(limit=2, offset=0)
+        finally:
+            event.remove(db_session.bind, "before_cursor_execute", listener)
+
+        assert len(statements) == 1
+        assert total == 3
+        assert [row.name for row in rows] == ["上海周末", "Tokyo Food Tour"]
+        assert all('days_data_json' not in row.__dict__ for row in rows)
+        assert "days_data_json" not in statements[0]
+
+        # 超出末页时单独计数
+        assert dao.list_page(limit=2, offset=10) == ([], 3)
+
+    def test_index_rows_follow_template_lifecycle(self, repo, templates, db_session):
+        template = templates[0]
+        repo.save(template)
+        assert db_session.query(TripTemplateTagPO).filter_by(template_id=template.id.value).count() == 2
+
+        repo.delete(template.id)
+        assert db_session.query(TripTemplateTagPO).filter_by(template_id=template.id.value).count() == 0
+        assert db_session.query(TripTemplateSearchTermPO).filter_by(template_id=template.id.value).count() == 0
+        assert repo.find_summaries()[1] == 2
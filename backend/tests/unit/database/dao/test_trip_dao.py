@@ -2,8 +2,11 @@ import pytest
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../src')))
-from datetime import date, datetime
-from app_travel.infrastructure.database.persistent_model.trip_po import TripPO, TripMemberPO
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import event
+from app_travel.infrastructure.database.persistent_model.trip_po import (
+    TripPO, TripMemberPO, TripDayPO, ActivityPO, TransitPO
+)
 from app_travel.infrastructure.database.dao_impl.sqlalchemy_trip_dao import SqlAlchemyTripDao
 
 class TestTripDao:
@@ -73,6 +76,97 @@ class TestTripDao:
         assert len(public_trips) == 1
         assert public_trips[0].id == "pub"
 
+    def test_find_summaries_by_member_uses_constant_queries(self, trip_dao, db_session):
+        for i in range(5):
+            db_session.add(TripPO(
+                id=f"s{i}", name=f"Trip {i}", creator_id="creator",
+                start_date=date(2024, 1, 1), end_date=date(2024, 1, 3)
+            ))
+            db_session.add(TripMemberPO(trip_id=f"s{i}", user_id="u_sum", role="admin"))
+            db_session.add(TripMemberPO(trip_id=f"s{i}", user_id=f"friend{i}", role="member"))
+            for day in range(1, 4):
+                db_session.add(TripDayPO(trip_id=f"s{i}", day_number=day, date=date(2024, 1, day)))
+        db_session.flush()
+        db_session.expunge_all()
+        
+        statements = []
+        listener = lambda conn, cursor, stmt, params, context, executemany: statements.append(stmt)
+        event.listen(db_session.bind, "before_cursor_execute", listener)
+        try:
+            rows = trip_dao.find_summaries_by_member("u_sum")
+            summaries = [po.to_summary(days_count) for po, days_count in rows]
+        finally:
+            event.remove(db_session.bind, "before_cursor_execute", listener)
+        
+        # 旅行 + 成员，两条查询，不访问 trip_days/activities/transits 明细
+        assert len(statements) == 2
+        assert not any("FROM activities" in s or "FROM transits" in s for s in statements)
+        assert len(summaries) == 5
+        assert all(s.days_count == 3 for s in summaries)
+        assert all(s.member_count == 2 for s in summaries)
+        assert "u_sum" in summaries[0].member_ids
+
+    def test_find_public_summaries_search(self, trip_dao, db_session):
+        db_session.add_all([
+            TripPO(id="ps1", name="Paris Spring", creator_id="u", start_date=date.today(), end_date=date.today(), visibility="public"),
+            TripPO(id="ps2", name="Tokyo", creator_id="u", start_date=date.today(), end_date=date.today(), visibility="public"),
+            TripPO(id="ps3", name="Paris Hidden", creator_id="u", start_date=date.today(), end_date=date.today(), visibility="private"),
+        ])
+        db_session.flush()
+        
+        rows = trip_dao.find_public_summaries(search_query="Paris")
+        assert [po.id for po, _ in rows] == ["ps1"]
+        assert rows[0][1] == 0
+
+    def _seed_itinerary(self, db_session, trip_id, days):
+        trip = TripPO(
+            id=trip_id, name=trip_id, creator_id="u",
+            start_date=date(2024, 1, 1), end_date=date(2024, 1, 1) + timedelta(days=days - 1)
+        )
+        trip.members = [TripMemberPO(user_id="u", role="admin")]
+        for d in range(days):
+            day = TripDayPO(day_number=d + 1, date=date(2024, 1, 1) + timedelta(days=d))
+            day.activities = [
+                ActivityPO(id=f"{trip_id}-a{d}-{i}", name="A", activity_type="sightseeing",
+                           location_name="P", start_time=time(9 + i), end_time=time(10 + i))
+                for i in range(2)
+            ]
+            day.transits = [
+                TransitPO(id=f"{trip_id}-t{d}", from_activity_id=f"{trip_id}-a{d}-0",
+                          to_activity_id=f"{trip_id}-a{d}-1", transport_mode="walking",
+                          departure_time=time(10), arrival_time=time(10, 30))
+            ]
+            trip.days.append(day)
+        db_session.add(trip)
+        db_session.flush()
+        db_session.expunge_all()
+
+    def _count_full_load(self, trip_dao, db_session, trip_id):
+        statements = []
+        listener = lambda conn, cursor, stmt, params, context, executemany: statements.append(stmt)
+        event.listen(db_session.bind, "before_cursor_execute", listener)
+        try:
+            trip = trip_dao.find_by_id(trip_id).to_domain()
+        finally:
+            event.remove(db_session.bind, "before_cursor_execute", listener)
+        return trip, len(statements)
+
+    def test_full_load_query_count_independent_of_trip_length(self, trip_dao, db_session):
+        self._seed_itinerary(db_session, "short", days=1)
+        self._seed_itinerary(db_session, "long", days=10)
+        
+        short_trip, short_queries = self._count_full_load(trip_dao, db_session, "short")
+        db_session.expunge_all()
+        long_trip, long_queries = self._count_full_load(trip_dao, db_session, "long")
+        
+        assert short_queries == long_queries == 5
+        assert len(long_trip.days) == 10
+        assert all(len(day.activities) == 2 and len(day.transits) == 1 for day in long_trip.days)
+
+    def test_unknown_load_profile_rejected(self, db_session):
+        with pytest.raises(ValueError):
+            SqlAlchemyTripDao(db_session, load_profile="everything")
+
     def test_crud(self, trip_dao, db_session):
         t = TripPO(
             id="new_trip", name="New", creator_id="u", 
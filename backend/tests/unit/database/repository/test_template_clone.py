@@ -0,0 +1,195 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../src')))
+from datetime import date, time
+from decimal import Decimal
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy import event
+
+from app_travel.domain.aggregate.trip_aggregate import Trip
+from app_travel.domain.aggregate.trip_template import TripTemplate
+from app_travel.domain.domain_service.template_service import TemplateService
+from app_travel.domain.entity.activity import Activity
+from app_travel.domain.entity.transit import Transit
+from app_travel.domain.value_objects.template_value_objects import (
+    TemplateId, TemplateDayData, TemplateActivityData, TemplateTransitData
+)
+from app_travel.domain.value_objects.transit_value_objects import RouteInfo, TransitCost, TransportMode
+from app_travel.domain.value_objects.travel_value_objects import (
+    TripName, TripDescription, DateRange, ActivityType, Location, Money, TripVisibility
+)
+from app_travel.infrastructure.database.dao_impl.sqlalchemy_template_dao import SQLAlchemyTemplateDAO
+from app_travel.infrastructure.database.dao_impl.sqlalchemy_trip_dao import SqlAlchemyTripDao
+from app_travel.infrastructure.database.repository_impl.template_repository_impl import TemplateRepositoryImpl
+from app_travel.infrastructure.database.repository_impl.trip_repository_impl import TripRepositoryImpl
+from app_travel.services.travel_service import TravelService
+
+
+def make_source_trip():
+    """已完成的公开行程：第 1 天两个活动之间有一段驾车路线"""
+    trip = Trip.create(
+        name=TripName("Hangzhou"), description=TripDescription(""), creator_id="author",
+        date_range=DateRange(date(2024, 5, 1), date(2024, 5, 2))
+    )
+    lake = Activity.create(
+        name="West Lake", activity_type=ActivityType.SIGHTSEEING,
+        location=Location(name="West Lake", latitude=30.24, longitude=120.15),
+        start_time=time(9, 0), end_time=time(11, 0)
+    )
+    temple = Activity.create(
+        name="Lingyin Temple", activity_type=ActivityType.SIGHTSEEING,
+        location=Location(name="Lingyin Temple", latitude=30.24, longitude=120.10),
+        start_time=time(13, 0), end_time=time(15, 0),
+        cost=Money(Decimal("75"), "CNY")
+    )
+    trip.add_activity(0, lake, "author")
+    trip.add_activity(0, temple, "author")
+    trip.get_day(0).add_transit(Transit.create(
+        from_activity_id=lake.id, to_activity_id=temple.id,
+        transport_mode=TransportMode.DRIVING,
+        route_info=RouteInfo(6500, 1500, "120.15,30.24;120.12,30.25;120.10,30.24"),
+        departure_time=time(11, 0),
+        estimated_cost=TransitCost(
+            estimated_cost=Money(Decimal("8.25"), "CNY"), fuel_cost=Money(Decimal("3.25"), "CNY")
+        )
+    ))
+    trip.update_visibility(TripVisibility.PUBLIC)
+    trip.start()
+    trip.complete()
+    return trip
+
+
+def count_statements(session, action):
+    statements = []
+    listener = lambda conn, cursor, stmt, params, context, executemany: statements.append(stmt)
+    event.listen(session.bind, "before_cursor_execute", listener)
+    try:
+        action()
+    finally:
+        event.remove(session.bind, "before_cursor_execute", listener)
+    return len(statements)
+
+
+class TestTemplateClone:
+
+    @pytest.fixture
+    def trip_repo(self, db_session):
+        return TripRepositoryImpl(SqlAlchemyTripDao(db_session))
+
+    @pytest.fixture
+    def template_repo(self, db_session):
+        return TemplateRepositoryImpl(SQLAlchemyTemplateDAO(db_session))
+
+    def test_clone_reuses_routes_without_geo_calls(self, db_session, trip_repo, template_repo):
+        template = TemplateService.create_from_trip(make_source_trip(), "author")
+        template_repo.save(template)
+        geo_service = Mock()
+        service = TravelService(trip_repo, geo_service, event_bus=Mock(), template_repository=template_repo)
+
+        trip = service.clone_from_template(
+            template.id.value, "cloner", date(2024, 6, 1), date(2024, 6, 2)
+        )
+        db_session.expire_all()
+        day = trip_repo.find_by_id(trip.id).get_day(0)
+
+        assert [(a.name, a.start_time, a.end_time) for a in day.activities] == [
+            ("West Lake", time(9, 0), time(11, 0)),
+            ("Lingyin Temple", time(13, 0), time(15, 0)),
+        ]
+        assert len(day.transits) == 1
+        transit = day.transits[0]
+        assert transit.from_activity_id == day.activities[0].id
+        assert transit.to_activity_id == day.activities[1].id
+        assert transit.transport_mode == TransportMode.DRIVING
+        assert transit.route_info.duration_seconds == 1500
+        assert transit.route_info.polyline
+        assert transit.estimated_cost.estimated_cost.amount == Decimal("8.25")
+        assert transit.estimated_cost.fuel_cost.amount == Decimal("3.25")
+        assert not geo_service.mock_calls
+
+    def test_legacy_template_activities_do_not_overlap(self):
+        activities = tuple(
+            TemplateActivityData(
+                name=name, activity_type="sightseeing", location_name=name,
+                latitude=None, longitude=None, address=None, duration_minutes=90,
+                cost_amount=None, cost_currency="CNY", notes=""
+            )
+            for name in ("A", "B", "C")
+        )
+        template = TripTemplate.reconstitute(
+            template_id=TemplateId.generate(), name="Legacy", description="",
+            source_trip_id="trip-1", author_id="author", duration_days=1, tags=[],
+            days_data=[TemplateDayData(day_number=1, theme=None, activities=activities)],
+            activity_count=3, created_at=None
+        )
+
+        trip = TemplateService.clone_to_trip(template, "cloner", date(2024, 6, 1), date(2024, 6, 1))
+
+        assert [(a.start_time, a.end_time) for a in trip.get_day(0).activities] == [
+            (time(9, 0), time(10, 30)), (time(10, 30), time(12, 0)), (time(12, 0), time(13, 30))
+        ]
+
+    def test_same_pair_keeps_each_days_transport_mode(self):
+        def activity(name):
+            return TemplateActivityData(
+                name=name, activity_type="sightseeing", location_name=name,
+                latitude=None, longitude=None, address=None, duration_minutes=60,
+                cost_amount=None, cost_currency="CNY", notes=""
+            )
+
+        def leg(mode, duration_seconds):
+            return TemplateTransitData(
+                from_location="name:a", to_location="name:b", transport_mode=mode,
+                distance_meters=2000, duration_seconds=duration_seconds, polyline=None, cost_amount=None
+            )
+
+        days = [
+            TemplateDayData(day_number=1, theme=None, activities=(activity("A"), activity("B")),
+                            transits=(leg("walking", 1800),)),
+            TemplateDayData(day_number=2, theme=None, activities=(activity("A"), activity("B")),
+                            transits=(leg("driving", 300),)),
+            TemplateDayData(day_number=3, theme=None, activities=(activity("A"), activity("B"))),
+        ]
+        template = TripTemplate.reconstitute(
+            template_id=TemplateId.generate(), name="Modes", description="",
+            source_trip_id="trip-1", author_id="author", duration_days=3, tags=[],
+            days_data=days, activity_count=6, created_at=None
+        )
+
+        trip = TemplateService.clone_to_trip(template, "cloner", date(2024, 6, 1), date(2024, 6, 3))
+
+        assert [
+            [(t.transport_mode, t.route_info.duration_seconds) for t in trip.get_day(i).transits]
+            for i in range(3)
+        ] == [
+            [(TransportMode.WALKING, 1800)],
+            [(TransportMode.DRIVING, 300)],
+            [(TransportMode.WALKING, 1800)],
+        ]
+
+    def test_add_new_statement_count_independent_of_days(self, db_session, trip_repo, template_repo):
+        template = TemplateService.create_from_trip(make_source_trip(), "author")
+
+        def clone(days):
+            trip = TemplateService.clone_to_trip(
+                template, "cloner", date(2024, 6, 1), date(2024, 6, days)
+            )
+            return trip, count_statements(db_session, lambda: trip_repo.add_new(trip))
+
+        _, short = clone(2)
+        long_trip, long = clone(20)
+
+        assert short == long
+        db_session.expire_all()
+        reloaded = trip_repo.find_by_id(long_trip.id)
+        assert reloaded.version == long_trip.version == 1
+        assert len(reloaded.days) == 20
+        assert [m.user_id for m in reloaded.members] == ["cloner"]
+        assert [a.id for a in reloaded.get_day(0).activities] == [
+            a.id for a in long_trip.get_day(0).activities
+        ]
+        assert [t.id for t in reloaded.get_day(0).transits] == [
+            t.id for t in long_trip.get_day(0).transits
+        ]
@@ -0,0 +1,192 @@
+import pytest
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../src')))
+from datetime import date
+from unittest.mock import Mock
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from shared.database.core import Base
+from shared.event_bus import EventBus
+from app_travel.domain.aggregate.trip_aggregate import Trip
+from app_travel.domain.demand_interface.i_trip_repository import TripConcurrencyError
+from app_travel.domain.value_objects.travel_value_objects import (
+    TripName, TripDescription, DateRange, MemberRole
+)
+from app_travel.infrastructure.database.dao_impl.sqlalchemy_trip_dao import SqlAlchemyTripDao
+from app_travel.infrastructure.database.repository_impl.trip_repository_impl import TripRepositoryImpl
+from app_travel.services.travel_service import TravelService
+
+
+class TestTripOptimisticLocking:
+    """两个会话并发修改同一旅行（使用文件数据库，两个会话各自持有连接）"""
+
+    @pytest.fixture
+    def session_factory(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'concurrency.db'}")
+        Base.metadata.create_all(engine)
+        yield sessionmaker(bind=engine)
+        engine.dispose()
+
+    @pytest.fixture
+    def trip_id(self, session_factory):
+        session = session_factory()
+        trip = Trip.create(
+            name=TripName("Shared"), description=TripDescription(""), creator_id="u1",
+            date_range=DateRange(date(2024, 5, 1), date(2024, 5, 3))
+        )
+        TripRepositoryImpl(SqlAlchemyTripDao(session)).save(trip)
+        session.commit()
+        session.close()
+        return trip.id
+
+    def test_version_increments_on_save(self, session_factory, trip_id):
+        session = session_factory()
+        repo = TripRepositoryImpl(SqlAlchemyTripDao(session))
+
+        trip = repo.find_by_id(trip_id)
+        assert trip.version == 1
+
+        trip.update_day_notes(0, "Arrive")
+        repo.save(trip)
+        session.commit()
+
+        assert trip.version == 2
+        assert repo.find_by_id(trip_id).version == 2
+        session.close()
+
+    def test_stale_save_raises_conflict(self, session_factory, trip_id):
+        session_a, session_b = session_factory(), session_factory()
+        repo_a = TripRepositoryImpl(SqlAlchemyTripDao(session_a))
+        repo_b = TripRepositoryImpl(SqlAlchemyTripDao(session_b))
+
+        trip_a = repo_a.find_by_id(trip_id)
+        trip_b = repo_b.find_by_id(trip_id)
+
+        trip_b.update_day_notes(0, "From B")
+        repo_b.save(trip_b)
+        session_b.commit()
+
+        trip_a.update_day_notes(0, "From A")
+        with pytest.raises(TripConcurrencyError) as exc_info:
+            repo_a.save(trip_a)
+        assert exc_info.value.trip_id == trip_id.value
+        assert exc_info.value.expected_version == 1
+
+        # 冲突时已用最新值刷新会话缓存，重新加载可看到对方的修改
+        reloaded = repo_a.find_by_id(trip_id)
+        assert reloaded.version == 2
+        assert reloaded.days[0].notes == "From B"
+        session_a.close()
+        session_b.close()
+
+    def test_conflict_keeps_other_work_in_request_transaction(self, session_factory, trip_id):
+        session_a, session_b = session_factory(), session_factory()
+        dao_a = SqlAlchemyTripDao(session_a)
+        repo_a = TripRepositoryImpl(dao_a)
+        repo_b = TripRepositoryImpl(SqlAlchemyTripDao(session_b))
+
+        trip_a = repo_a.find_by_id(trip_id)
+        # 请求中仍持有已加载的持久化对象，会话缓存中是旧版本
+        loaded_po = dao_a.find_by_id(trip_id.value)
+        trip_b = repo_b.find_by_id(trip_id)
+        trip_b.update_day_notes(1, "From B")
+        repo_b.save(trip_b)
+        session_b.commit()
+
+        # 同一请求事务中已写入的其他修改
+        other = Trip.create(
+            name=TripName("Other"), description=TripDescription(""), creator_id="u1",
+            date_range=DateRange(date(2024, 6, 1), date(2024, 6, 2))
+        )
+        repo_a.save(other)
+
+        trip_a.update_day_notes(0, "From A")
+        with pytest.raises(TripConcurrencyError):
+            repo_a.save(trip_a)
+        assert loaded_po.version == 2
+
+        retry = repo_a.find_by_id(trip_id)
+        assert retry.version == 2
+        retry.update_day_notes(0, "From A")
+        repo_a.save(retry)
+        session_a.commit()
+
+        check = TripRepositoryImpl(SqlAlchemyTripDao(session_factory()))
+        assert check.find_by_id(other.id) is not None
+        saved = check.find_by_id(trip_id)
+        assert (saved.version, saved.days[0].notes, saved.days[1].notes) == (3, "From A", "From B")
+        session_a.close()
+        session_b.close()
+
+    def test_conflict_at_flush_rolls_back_only_the_savepoint(self, session_factory, trip_id):
+        session_a, session_b = session_factory(), session_factory()
+        dao_a = SqlAlchemyTripDao(session_a)
+        repo_a = TripRepositoryImpl(dao_a)
+        repo_b = TripRepositoryImpl(SqlAlchemyTripDao(session_b))
+        trip_a = repo_a.find_by_id(trip_id)
+        real_update = dao_a.update
+
+        def update_after_concurrent_commit(trip_po):
+            # 版本预检之后、写入之前另一请求提交
+            trip_b = repo_b.find_by_id(trip_id)
+            trip_b.update_day_notes(1, "From B")
+            repo_b.save(trip_b)
+            session_b.commit()
+            real_update(trip_po)
+
+        dao_a.update = update_after_concurrent_commit
+        trip_a.update_day_notes(0, "From A")
+        with pytest.raises(TripConcurrencyError):
+            repo_a.save(trip_a)
+        dao_a.update = real_update
+
+        # 会话未被回滚，保存点内修改过的对象已过期，重新加载即为最新数据
+        retry = repo_a.find_by_id(trip_id)
+        assert (retry.version, retry.days[1].notes) == (2, "From B")
+        retry.update_day_notes(0, "From A")
+        repo_a.save(retry)
+        session_a.commit()
+        assert TripRepositoryImpl(SqlAlchemyTripDao(session_factory())).find_by_id(trip_id).version == 3
+        session_a.close()
+        session_b.close()
+
+    def test_retry_reapplies_commutative_change(self, session_factory, trip_id):
+        session_a, session_b = session_factory(), session_factory()
+        repo_b = TripRepositoryImpl(SqlAlchemyTripDao(session_b))
+        service = TravelService(
+            TripRepositoryImpl(SqlAlchemyTripDao(session_a)), Mock(), event_bus=EventBus()
+        )
+        attempts = []
+
+        def add_member(trip):
+            attempts.append(trip.version)
+            if len(attempts) == 1:
+                # 模拟另一成员在本次修改保存前抢先提交
+                other = repo_b.find_by_id(trip_id)
+                other.add_member("u3", MemberRole.MEMBER, added_by="u1")
+                repo_b.save(other)
+                session_b.commit()
+            trip.add_member("u2", MemberRole.MEMBER, added_by="u1")
+
+        trip, _ = service.execute_with_retry(trip_id.value, add_member)
+        session_a.commit()
+
+        assert attempts == [1, 2]
+        assert trip.version == 3
+        assert {"u1", "u2", "u3"} <= {m.user_id for m in trip.members}
+        session_a.close()
+        session_b.close()
+
+    def test_retry_gives_up_after_max_attempts(self, session_factory, trip_id):
+        session = session_factory()
+        repo = TripRepositoryImpl(SqlAlchemyTripDao(session))
+        repo.save = Mock(side_effect=TripConcurrencyError(trip_id.value, 1))
+        service = TravelService(repo, Mock(), event_bus=EventBus())
+
+        with pytest.raises(TripConcurrencyError):
+            service.execute_with_retry(trip_id.value, lambda trip: None, max_attempts=2)
+        assert repo.save.call_count == 2
+        session.close()
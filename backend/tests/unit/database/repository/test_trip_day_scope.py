@@ -0,0 +1,127 @@
+import pytest
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../src')))
+from datetime import date, time, timedelta
+from decimal import Decimal
+from sqlalchemy import event
+
+from app_travel.domain.aggregate.trip_aggregate import Trip
+from app_travel.domain.entity.activity import Activity
+from app_travel.domain.value_objects.travel_value_objects import (
+    TripName, TripDescription, DateRange, Money, ActivityType, Location
+)
+from app_travel.infrastructure.database.dao_impl.sqlalchemy_trip_dao import SqlAlchemyTripDao
+from app_travel.infrastructure.database.dao_impl.sqlalchemy_trip_statistics_dao import SqlAlchemyTripStatisticsDao
+from app_travel.infrastructure.database.repository_impl.trip_repository_impl import TripRepositoryImpl
+from app_travel.infrastructure.database.repository_impl.trip_statistics_repository_impl import TripStatisticsRepositoryImpl
+
+
+def make_activity(name, hour, cost=None):
+    return Activity.create(
+        name=name,
+        activity_type=ActivityType.SIGHTSEEING,
+        location=Location(name=name, latitude=39.9, longitude=116.4),
+        start_time=time(hour, 0),
+        end_time=time(hour + 1, 0),
+        cost=Money(Decimal(cost)) if cost else None
+    )
+
+
+class TestDayScopedTripPersistence:
+
+    @pytest.fixture
+    def stats_repo(self, db_session):
+        return TripStatisticsRepositoryImpl(SqlAlchemyTripStatisticsDao(db_session))
+
+    @pytest.fixture
+    def trip_repo(self, db_session, stats_repo):
+        return TripRepositoryImpl(SqlAlchemyTripDao(db_session), stats_repo)
+
+    def make_trip(self, trip_repo, days):
+        start = date(2024, 5, 1)
+        trip = Trip.create(
+            name=TripName(f"{days} days"), description=TripDescription(""), creator_id="u1",
+            date_range=DateRange(start, start + timedelta(days=days - 1))
+        )
+        for i in range(days):
+            trip.add_activity(i, make_activity(f"Day {i} morning", 9, "10"), "u1")
+        trip_repo.save(trip)
+        return trip
+
+    def count_statements(self, db_session, action):
+        statements = []
+        listener = lambda conn, cursor, stmt, params, context, executemany: statements.append(stmt)
+        event.listen(db_session.bind, "before_cursor_execute", listener)
+        try:
+            action()
+        finally:
+            event.remove(db_session.bind, "before_cursor_execute", listener)
+        return statements
+
+    def test_load_only_requested_day(self, trip_repo):
+        trip = self.make_trip(trip_repo, 3)
+
+        scoped = trip_repo.find_day_scoped(trip.id, 1)
+
+        assert scoped.is_day_scoped
+        assert scoped.total_days == 3
+        assert [d.day_number for d in scoped.days] == [2]
+        assert scoped.get_day(1).activities[0].name == "Day 1 morning"
+        assert scoped.get_day(0) is None
+        assert scoped.is_member("u1")
+
+    def test_day_edit_cost_does_not_grow_with_trip_length(self, trip_repo, db_session):
+        def edit(trip):
+            def action():
+                scoped = trip_repo.find_day_scoped(trip.id, 0)
+                scoped.add_activity(0, make_activity("Lunch", 12), "u1")
+                trip_repo.save_day(scoped)
+            return self.count_statements(db_session, action)
+
+        short = edit(self.make_trip(trip_repo, 1))
+        long = edit(self.make_trip(trip_repo, 10))
+
+        assert len(short) == len(long)
+        assert not any(s.startswith("DELETE FROM activities") for s in long)
+
+    def test_save_day_keeps_other_days(self, trip_repo):
+        trip = self.make_trip(trip_repo, 3)
+
+        scoped = trip_repo.find_day_scoped(trip.id, 1)
+        scoped.add_activity(1, make_activity("Dinner", 18, "30"), "u1")
+        removed = scoped.get_day(1).activities[0].id
+        scoped.remove_activity(1, removed, "u1")
+        trip_repo.save_day(scoped)
+
+        reloaded = trip_repo.find_by_id(trip.id)
+        assert reloaded.version == trip.version + 1
+        assert [a.name for a in reloaded.days[0].activities] == ["Day 0 morning"]
+        assert [a.name for a in reloaded.days[1].activities] == ["Dinner"]
+        assert [a.name for a in reloaded.days[2].activities] == ["Day 2 morning"]
+
+    def test_save_day_refreshes_statistics_projection(self, trip_repo, stats_repo):
+        trip = self.make_trip(trip_repo, 3)
+
+        scoped = trip_repo.find_day_scoped(trip.id, 2)
+        scoped.add_activity(2, make_activity("Show", 20, "100"), "u1")
+        trip_repo.save_day(scoped)
+
+        version = trip_repo.find_version(trip.id)
+        stats = stats_repo.find_by_trip_id(trip.id.value, version)
+        assert stats is not None
+        assert stats.to_dict() == trip_repo.find_by_id(trip.id).generate_statistics().to_dict()
+        assert stats.total_estimated_cost.amount == Decimal("130")
+
+    def test_invalid_day_and_full_save_are_rejected(self, trip_repo):
+        trip = self.make_trip(trip_repo, 2)
+
+        scoped = trip_repo.find_day_scoped(trip.id, 5)
+        with pytest.raises(ValueError, match="Invalid day index"):
+            scoped.add_activity(5, make_activity("Nowhere", 9), "u1")
+
+        scoped = trip_repo.find_day_scoped(trip.id, 0)
+        with pytest.raises(ValueError):
+            scoped.add_activity(1, make_activity("Other day", 9), "u1")
+        with pytest.raises(ValueError):
+            trip_repo.save(scoped)
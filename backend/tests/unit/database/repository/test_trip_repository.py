@@ -14,7 +14,8 @@ class TestTripRepository:
     
     @pytest.fixture
     def mock_dao(self):
-        return Mock()
+        # MagicMock: version_guard 作为上下文管理器使用
+        return MagicMock()
 
     @pytest.fixture
     def repo(self, mock_dao):
@@ -50,6 +51,8 @@ class TestTripRepository:
         
         repo.save(trip)
         
+        mock_dao.find_by_id.assert_called_once_with(trip.id.value, refresh=True)
+        mock_dao.version_guard.assert_called_once_with(trip.id.value, None)
         existing_po.update_from_domain.assert_called_once_with(trip)
         mock_dao.update.assert_called_once_with(existing_po)
         
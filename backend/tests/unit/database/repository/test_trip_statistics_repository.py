@@ -0,0 +1,95 @@
+import pytest
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../src')))
+from datetime import date, time, timedelta
+from decimal import Decimal
+from sqlalchemy import event
+
+from app_travel.domain.aggregate.trip_aggregate import Trip
+from app_travel.domain.entity.activity import Activity
+from app_travel.domain.value_objects.travel_value_objects import (
+    TripId, TripName, TripDescription, DateRange, Money, ActivityType, Location
+)
+from app_travel.infrastructure.database.dao_impl.sqlalchemy_trip_dao import SqlAlchemyTripDao
+from app_travel.infrastructure.database.dao_impl.sqlalchemy_trip_statistics_dao import SqlAlchemyTripStatisticsDao
+from app_travel.infrastructure.database.repository_impl.trip_repository_impl import TripRepositoryImpl
+from app_travel.infrastructure.database.repository_impl.trip_statistics_repository_impl import TripStatisticsRepositoryImpl
+
+
+def make_activity(name, hour, cost=None, place=None):
+    return Activity.create(
+        name=name,
+        activity_type=ActivityType.SIGHTSEEING,
+        location=Location(name=place or name, latitude=39.9, longitude=116.4),
+        start_time=time(hour, 0),
+        end_time=time(hour + 1, 0),
+        cost=Money(Decimal(cost)) if cost else None
+    )
+
+
+class TestTripStatisticsProjection:
+
+    @pytest.fixture
+    def stats_repo(self, db_session):
+        return TripStatisticsRepositoryImpl(SqlAlchemyTripStatisticsDao(db_session))
+
+    @pytest.fixture
+    def trip_repo(self, db_session, stats_repo):
+        return TripRepositoryImpl(SqlAlchemyTripDao(db_session), stats_repo)
+
+    @pytest.fixture
+    def trip(self, trip_repo):
+        trip = Trip.create(
+            name=TripName("Stats"), description=TripDescription(""), creator_id="u1",
+            date_range=DateRange(date(2024, 5, 1), date(2024, 5, 3))
+        )
+        trip.add_activity(0, make_activity("Museum", 9, "50", place="Museum"), "u1")
+        trip.add_activity(1, make_activity("Park", 9, "20", place="Park"), "u1")
+        trip.add_activity(1, make_activity("Museum again", 13, place="Museum"), "u1")
+        trip_repo.save(trip)
+        return trip
+
+    def test_projection_matches_aggregate(self, trip, trip_repo, stats_repo):
+        version = trip_repo.find_version(trip.id)
+        stats = stats_repo.find_by_trip_id(trip.id.value, version)
+
+        assert stats is not None
+        assert stats.to_dict() == trip.generate_statistics().to_dict()
+
+        summary = stats_repo.find_summaries([trip.id.value])[trip.id.value]
+        assert summary.activity_count == 3
+        assert summary.unique_location_count == 2
+        assert summary.total_estimated_cost.amount == Decimal("70")
+
+    def test_edit_rewrites_only_changed_day(self, trip, trip_repo, stats_repo, db_session):
+        updates = []
+        listener = lambda conn, cursor, stmt, params, context, executemany: (
+            updates.append(stmt) if stmt.startswith("UPDATE trip_day_statistics") else None
+        )
+        event.listen(db_session.bind, "before_cursor_execute", listener)
+        try:
+            trip.add_activity(2, make_activity("Tower", 10, "80"), "u1")
+            trip_repo.save(trip)
+        finally:
+            event.remove(db_session.bind, "before_cursor_execute", listener)
+
+        assert len(updates) == 1
+        summary = stats_repo.find_summaries([trip.id.value])[trip.id.value]
+        assert summary.activity_count == 4
+        assert summary.total_estimated_cost.amount == Decimal("150")
+
+    def test_stale_projection_is_ignored(self, trip, trip_repo, stats_repo):
+        version = trip_repo.find_version(trip.id)
+
+        assert stats_repo.find_by_trip_id(trip.id.value, version + timedelta(seconds=1)) is None
+
+        # 未挂统计投影的写入方修改了旅行：版本不一致，摘要不再返回
+        plain_repo = TripRepositoryImpl(SqlAlchemyTripDao(trip_repo._trip_dao.session))
+        trip.add_activity(0, make_activity("Cafe", 14), "u1")
+        plain_repo.save(trip)
+        assert stats_repo.find_summaries([trip.id.value]) == {}
+
+    def test_delete_trip_removes_projection(self, trip, trip_repo, stats_repo):
+        trip_repo.delete(trip.id)
+        assert stats_repo.find_summaries([trip.id.value]) == {}
@@ -0,0 +1,96 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../src')))
+from unittest.mock import Mock
+
+import pytest
+
+from shared.infrastructure import text_search
+from app_auth.domain.entity.user_entity import User
+from app_auth.domain.value_objects.user_value_objects import (
+    Email, HashedPassword, UserId, UserRole, Username
+)
+from app_auth.infrastructure.database.dao_impl.sqlalchemy_user_dao import SqlAlchemyUserDao
+from app_auth.infrastructure.database.persistent_model.user_po import UserSearchTermPO
+from app_auth.infrastructure.database.repository_impl.user_repository_impl import UserRepositoryImpl
+from app_auth.services.auth_application_service import AuthApplicationService
+
+PINYIN = {'张': 'zhang', '三': 'san', '丰': 'feng', '李': 'li', '四': 'si'}
+
+
+def fake_lazy_pinyin(text):
+    syllables, run = [], ''
+    for ch in text:
+        if ch in PINYIN:
+            if run:
+                syllables.append(run)
+                run = ''
+            syllables.append(PINYIN[ch])
+        else:
+            run += ch
+    if run:
+        syllables.append(run)
+    return syllables
+
+
+class TestUserSearch:
+
+    @pytest.fixture
+    def repo(self, db_session):
+        return UserRepositoryImpl(SqlAlchemyUserDao(db_session))
+
+    def add_users(self, repo, *names):
+        users = {}
+        for i, name in enumerate(names):
+            user = User.reconstitute(
+                user_id=UserId(f"search-u{i}"), username=Username(name), email=Email(f"s{i}@test.com"),
+                hashed_password=HashedPassword("x"), role=UserRole.USER
+            )
+            repo.save(user)
+            users[name] = user.id.value
+        return users
+
+    def names(self, users):
+        return [u.username.value for u in users]
+
+    def test_prefix_matches_rank_before_substring_matches(self, repo):
+        self.add_users(repo, "hannah", "anna", "ann_lee", "bob")
+
+        assert self.names(repo.search_by_username("ANN")) == ["ann_lee", "anna", "hannah"]
+        assert self.names(repo.search_by_username("ann", limit=2)) == ["ann_lee", "anna"]
+        # 下划线按字面匹配，不是 LIKE 通配符
+        assert self.names(repo.search_by_username("n_")) == ["ann_lee"]
+        assert repo.search_by_username("  ") == []
+
+    def test_friends_rank_first(self, repo, db_session):
+        ids = self.add_users(repo, "hannah", "anna", "ann_lee")
+        service = AuthApplicationService(
+            domain_auth_service=Mock(), user_repository=repo, event_bus=Mock(),
+            friend_ids_provider=Mock(return_value=[ids["hannah"], "not-a-user"])
+        )
+
+        assert self.names(service.search_users("ann", viewer_id="viewer")) == ["hannah", "ann_lee", "anna"]
+        assert self.names(service.search_users("ann")) == ["ann_lee", "anna", "hannah"]
+
+    def test_rename_and_delete_keep_index_in_sync(self, repo, db_session):
+        ids = self.add_users(repo, "oldname")
+        user = repo.find_by_id(UserId(ids["oldname"]))
+        user.update_username(Username("newname"))
+        repo.save(user)
+
+        assert repo.search_by_username("old") == []
+        assert self.names(repo.search_by_username("new")) == ["newname"]
+        assert self.names(repo.search_by_username("name")) == ["newname"]
+
+        repo.delete(UserId(ids["oldname"]))
+        assert db_session.query(UserSearchTermPO).filter_by(user_id=ids["oldname"]).count() == 0
+
+    def test_chinese_usernames_match_pinyin(self, repo, monkeypatch):
+        monkeypatch.setattr(text_search, "lazy_pinyin", fake_lazy_pinyin)
+        self.add_users(repo, "张三丰", "李四", "zsmith")
+
+        assert self.names(repo.search_by_username("zs")) == ["zsmith", "张三丰"]
+        assert self.names(repo.search_by_username("zhangsan")) == ["张三丰"]
+        assert self.names(repo.search_by_username("sanfeng")) == ["张三丰"]
+        assert self.names(repo.search_by_username("三丰")) == ["张三丰"]
+        assert self.names(repo.search_by_username("li")) == ["李四"]
@@ -0,0 +1,100 @@
+import pytest
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../src')))
+import random
+from decimal import Decimal
+
+from app_travel.domain.domain_service.settlement_service import SettlementService
+from app_travel.domain.value_objects.expense_value_objects import SettlementMode
+
+
+def balances_of(**amounts):
+    return {user: Decimal(str(amount)) for user, amount in amounts.items()}
+
+
+def assert_settles(balances, transfers):
+    remaining = dict(balances)
+    for t in transfers:
+        assert t.amount > 0
+        remaining[t.from_user_id] += t.amount
+        remaining[t.to_user_id] -= t.amount
+    assert all(v == 0 for v in remaining.values())
+
+
+class TestSettlementService:
+
+    def test_exact_finds_zero_sum_groups_greedy_misses(self):
+        # {d,f} 与 {a,b,c,e} 各自零和：最优 1 + 3 = 4 笔，贪心需要 5 笔
+        balances = balances_of(a=-8, b=6, c=-2, d=3, e=4, f=-3)
+
+        greedy = SettlementService.minimize_transfers(balances, mode=SettlementMode.GREEDY)
+        exact = SettlementService.minimize_transfers(balances, mode=SettlementMode.EXACT)
+
+        assert_settles(balances, greedy)
+        assert_settles(balances, exact)
+        assert len(greedy) == 5
+        assert len(exact) == 4
+
+    def test_exact_never_worse_than_greedy(self):
+        rng = random.Random(7)
+        for _ in range(50):
+            n = rng.randint(2, 9)
+            values = [rng.randint(-50, 50) * 100 for _ in range(n - 1)]
+            values.append(-sum(values))
+            balances = {f"u{i}": Decimal(v) / 100 for i, v in enumerate(values)}
+
+            exact = SettlementService.minimize_transfers(balances, mode=SettlementMode.EXACT)
+            greedy = SettlementService.minimize_transfers(balances, mode=SettlementMode.GREEDY)
+
+            assert_settles(balances, exact)
+            assert len(exact) <= len(greedy)
+            # 下界：n' 个非零成员至少需要 ceil(n'/2) 笔
+            nonzero = sum(1 for v in values if v)
+            assert len(exact) >= (nonzero + 1) // 2
+
+    def test_amounts_keep_cents_and_currency(self):
+        balances = balances_of(a="-10.05", b="10.05")
+
+        transfers = SettlementService.minimize_transfers(balances, currency="USD")
+
+        assert [(t.from_user_id, t.to_user_id, str(t.amount), t.currency) for t in transfers] == [
+            ("a", "b", "10.05", "USD")
+        ]
+
+    def test_falls_back_to_greedy_when_over_budget_or_too_large(self):
+        rng = random.Random(3)
+        values = [rng.randint(1, 500) for _ in range(SettlementService.EXACT_MAX_MEMBERS)]
+        values += [-v - 1000 for v in values[:5]] + [-(sum(values) - sum(v + 1000 for v in values[:5]))]
+        balances = {f"u{i}": Decimal(v) for i, v in enumerate(values)}
+        assert sum(balances.values()) == 0
+
+        assert SettlementService.exact_transfers(balances) is None
+        transfers = SettlementService.minimize_transfers(balances)
+        assert_settles(balances, transfers)
+
+        values = [rng.randint(1, 500) * 2 + 1 for _ in range(11)]
+        values.append(-sum(values))
+        medium = {f"u{i}": Decimal(v) for i, v in enumerate(values)}
+        assert SettlementService.exact_transfers(medium, deadline=0) is None
+        timed_out = SettlementService.minimize_transfers(medium, time_budget=-1)
+        assert timed_out == SettlementService.greedy_transfers(medium)
+        assert_settles(medium, timed_out)
+
+    def test_auto_picks_greedy_up_front_above_member_limit(self):
+        rng = random.Random(5)
+        values = [rng.randint(1, 500) * 2 + 1 for _ in range(SettlementService.AUTO_EXACT_MAX_MEMBERS)]
+        values.append(-sum(values))
+        balances = {f"u{i}": Decimal(v) for i, v in enumerate(values)}
+
+        # 即使时间预算足够，AUTO 也不尝试精确算法
+        assert SettlementService.minimize_transfers(balances, time_budget=60) == \
+            SettlementService.greedy_transfers(balances)
+        assert SettlementService.exact_transfers(balances, max_members=len(values) - 1) is None
+        assert_settles(balances, SettlementService.minimize_transfers(balances, mode=SettlementMode.EXACT))
+
+    def test_unbalanced_input_uses_greedy(self):
+        balances = balances_of(a=-5, b=3)
+        assert SettlementService.exact_transfers(balances) is None
+        transfers = SettlementService.minimize_transfers(balances)
+        assert [(t.from_user_id, t.to_user_id, t.amount) for t in transfers] == [("a", "b", Decimal("3"))]
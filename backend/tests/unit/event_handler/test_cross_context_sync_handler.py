@@ -0,0 +1,130 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../src')))
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+from sqlalchemy.orm import sessionmaker
+
+from shared.event_handler.cross_context_sync_handler import CrossContextSyncHandler
+from shared.event_handler.processed_event_store import SqlAlchemyProcessedEventStore
+from app_auth.domain.domain_event.user_events import (
+    UserDeactivatedEvent, UserReactivatedEvent, UserRegisteredEvent
+)
+from app_travel.domain.domain_event.travel_events import TripCompletedEvent
+
+
+class BatchProfileService:
+    def __init__(self):
+        self.deactivated = []
+        self.reactivated = []
+        self.created = []
+
+    def create_traveler_profiles(self, profiles):
+        self.created.append(profiles)
+
+    def deactivate_users(self, user_ids):
+        self.deactivated.append(list(user_ids))
+
+    def reactivate_users(self, user_ids):
+        self.reactivated.append(list(user_ids))
+
+
+def test_batching_collapses_events_into_one_call_per_type():
+    service = BatchProfileService()
+    handler = CrossContextSyncHandler(travel_user_profile_service=service)
+
+    with handler.batching():
+        for i in range(50):
+            handler.handle_user_deactivated(UserDeactivatedEvent(user_id=f"u{i}"))
+        assert service.deactivated == []
+
+    assert service.deactivated == [[f"u{i}" for i in range(50)]]
+
+
+def test_last_status_event_per_user_wins_within_batch():
+    service = BatchProfileService()
+    handler = CrossContextSyncHandler(travel_user_profile_service=service)
+    t0 = datetime(2024, 1, 1)
+
+    handler.handle_batch([
+        UserDeactivatedEvent(user_id="u1", occurred_at=t0),
+        UserReactivatedEvent(user_id="u1", occurred_at=t0 + timedelta(seconds=1)),
+        UserDeactivatedEvent(user_id="u2", occurred_at=t0),
+    ])
+
+    assert service.deactivated == [["u2"]]
+    assert service.reactivated == [["u1"]]
+
+
+def test_redelivered_events_are_skipped(engine, tables):
+    store = SqlAlchemyProcessedEventStore(session_factory=sessionmaker(bind=engine))
+    notification_service = MagicMock(spec=["send_push"])
+    handler = CrossContextSyncHandler(
+        notification_service=notification_service,
+        processed_event_store=store
+    )
+    event = TripCompletedEvent(trip_id="t1", creator_id="u1", name="Trip")
+
+    assert handler.handle_batch([event, event]) == 1
+    assert notification_service.send_push.call_count == 1
+
+    # A second handler instance (e.g. another worker) sees the persisted key
+    other = CrossContextSyncHandler(
+        notification_service=notification_service,
+        processed_event_store=store
+    )
+    assert other.handle_batch([event]) == 0
+    assert notification_service.send_push.call_count == 1
+
+
+def test_failed_group_is_not_marked_processed():
+    service = MagicMock(spec=["create_traveler_profile"])
+    service.create_traveler_profile.side_effect = [RuntimeError("db down"), None]
+    handler = CrossContextSyncHandler(travel_user_profile_service=service)
+    event = UserRegisteredEvent(user_id="u1", username="alice")
+
+    handler.handle_user_registered(event)
+    handler.handle_user_registered(event)
+
+    assert service.create_traveler_profile.call_count == 2
+
+
+def test_retry_only_repeats_failed_steps_and_events():
+    travel = MagicMock(spec=["create_traveler_profiles", "create_traveler_profile"])
+    social = MagicMock(spec=["create_social_profile"])
+    social.create_social_profile.side_effect = [None, RuntimeError("db down"), None]
+    handler = CrossContextSyncHandler(
+        travel_user_profile_service=travel,
+        social_user_profile_service=social
+    )
+    events = [
+        UserRegisteredEvent(user_id="u1", username="alice"),
+        UserRegisteredEvent(user_id="u2", username="bob"),
+    ]
+
+    handler.handle_batch(events)
+    assert travel.create_traveler_profiles.call_count == 1
+    assert social.create_social_profile.call_count == 2
+
+    # Only u2's social profile is retried; the travel profiles already exist
+    assert handler.handle_batch(events) == 1
+    assert travel.create_traveler_profiles.call_count == 1
+    social.create_social_profile.assert_called_with(user_id="u2", username="bob")
+    assert social.create_social_profile.call_count == 3
+
+    assert handler.handle_batch(events) == 0
+
+
+def test_failed_batch_call_falls_back_to_single_calls():
+    service = MagicMock(spec=["deactivate_users", "deactivate_user"])
+    service.deactivate_users.side_effect = RuntimeError("batch failed")
+    service.deactivate_user.side_effect = [None, RuntimeError("db down")]
+    handler = CrossContextSyncHandler(travel_user_profile_service=service)
+    events = [UserDeactivatedEvent(user_id="u1"), UserDeactivatedEvent(user_id="u2")]
+
+    handler.handle_batch(events)
+    service.deactivate_users.side_effect = None
+    handler.handle_batch(events)
+
+    service.deactivate_users.assert_called_with(["u2"])
@@ -0,0 +1,270 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../src')))
+import time
+from datetime import date, datetime
+from functools import partial
+from unittest.mock import Mock, patch
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from shared.database.core import Base, after_commit
+from shared.event_bus import EventBus
+from shared.infrastructure.background_tasks import BackgroundTaskQueue
+from app_social.infrastructure.cache.friend_graph_cache import FriendGraphCache
+
+from app_social.domain.domain_event.friendship_events import FriendshipAcceptedEvent, FriendshipBlockedEvent
+from app_social.domain.domain_service.friend_suggestion_service import FriendSuggestionService
+from app_social.domain.event_handler.friend_suggestion_handler import FriendSuggestionHandler
+from app_social.domain.value_objects.friendship_value_objects import FriendshipStatus
+from app_social.infrastructure.database.dao_impl.sqlalchemy_friend_suggestion_dao import SqlAlchemyFriendSuggestionDao
+from app_social.infrastructure.database.dao_impl.sqlalchemy_friendship_dao import SqlAlchemyFriendshipDao
+from app_social.infrastructure.database.persistent_model.friend_suggestion_po import FriendSuggestionPO
+from app_social.infrastructure.database.po.friendship_po import FriendshipPO
+from app_travel.domain.domain_event.travel_events import TripMemberAddedEvent, TripMemberRemovedEvent
+from app_travel.domain.aggregate.trip_aggregate import Trip
+from app_travel.domain.value_objects.travel_value_objects import (
+    TripName, TripDescription, DateRange, MemberRole
+)
+from app_travel.infrastructure.database.dao_impl.sqlalchemy_trip_dao import SqlAlchemyTripDao
+from app_travel.infrastructure.database.persistent_model.trip_po import TripMemberPO, TripPO
+from app_travel.infrastructure.database.repository_impl.trip_repository_impl import TripRepositoryImpl
+from app_travel.services.travel_service import TravelService
+
+T0 = datetime(2024, 6, 1)
+
+
+class TestFriendSuggestionHandler:
+
+    @pytest.fixture
+    def handler(self, db_session):
+        return FriendSuggestionHandler(session_factory=sessionmaker(bind=db_session.connection()))
+
+    def befriend(self, db_session, handler, requester, addressee):
+        db_session.add(FriendshipPO(
+            id=f"{requester}-{addressee}", requester_id=requester, addressee_id=addressee,
+            status=FriendshipStatus.ACCEPTED
+        ))
+        db_session.flush()
+        handler.handle_friendship_accepted(FriendshipAcceptedEvent(
+            friendship_id=f"{requester}-{addressee}", requester_id=requester,
+            addressee_id=addressee, accepted_at=T0
+        ))
+
+    def join_trip(self, db_session, handler, trip_id, user_id):
+        if db_session.get(TripPO, trip_id) is None:
+            db_session.add(TripPO(
+                id=trip_id, name=trip_id, creator_id=user_id,
+                start_date=date(2024, 7, 1), end_date=date(2024, 7, 3)
+            ))
+        db_session.add(TripMemberPO(trip_id=trip_id, user_id=user_id))
+        db_session.flush()
+        handler.handle_trip_member_added(TripMemberAddedEvent(
+            trip_id=trip_id, user_id=user_id, role='member', added_by=user_id
+        ))
+
+    def materialized(self, db_session):
+        db_session.expire_all()
+        return {
+            (row.user_id, row.candidate_id): (row.mutual_friends, row.shared_trips)
+            for row in db_session.execute(select(FriendSuggestionPO)).scalars()
+        }
+
+    def rebuilt(self, db_session, user_ids):
+        friendship_dao = SqlAlchemyFriendshipDao(db_session)
+        suggestion_dao = SqlAlchemyFriendSuggestionDao(db_session)
+        friends = friendship_dao.find_friend_ids_many(user_ids)
+        expected = {}
+        for user_id in user_ids:
+            counts = FriendSuggestionService.compute_for_user(
+                user_id, friends.get(user_id, set()), friends, suggestion_dao.count_co_members(user_id)
+            )
+            expected.update({(user_id, candidate_id): c for candidate_id, c in counts.items()})
+        return expected
+
+    def test_incremental_updates_match_full_rebuild(self, db_session, handler):
+        users = ["alice", "bob", "carol", "dave", "erin"]
+        self.befriend(db_session, handler, "alice", "bob")
+        self.befriend(db_session, handler, "carol", "bob")
+        self.befriend(db_session, handler, "dave", "alice")
+        self.befriend(db_session, handler, "dave", "carol")
+        for user_id in ("alice", "erin", "carol"):
+            self.join_trip(db_session, handler, "trip-1", user_id)
+        for user_id in ("erin", "alice"):
+            self.join_trip(db_session, handler, "trip-2", user_id)
+
+        rows = self.materialized(db_session)
+        # alice 与 carol 的共同好友为 bob、dave
+        assert rows[("alice", "carol")] == (2, 1)
+        assert rows[("carol", "alice")] == (2, 1)
+        assert rows[("alice", "erin")] == (0, 2)
+        assert rows == self.rebuilt(db_session, users)
+
+        # carol 离开 trip-1，bob 拉黑 carol
+        db_session.query(TripMemberPO).filter_by(trip_id="trip-1", user_id="carol").delete()
+        db_session.flush()
+        handler.handle_trip_member_removed(TripMemberRemovedEvent(
+            trip_id="trip-1", user_id="carol", removed_by="alice", reason=None
+        ))
+        friendship = db_session.get(FriendshipPO, "carol-bob")
+        friendship.status = FriendshipStatus.BLOCKED
+        db_session.flush()
+        handler.handle_friendship_blocked(FriendshipBlockedEvent(
+            friendship_id="carol-bob", requester_id="carol", addressee_id="bob",
+            operator_id="bob", blocked_at=T0, was_friends=True
+        ))
+
+        rows = self.materialized(db_session)
+        assert rows[("alice", "carol")] == (1, 0)
+        assert ("erin", "carol") not in rows
+        assert rows == self.rebuilt(db_session, users)
+
+    def test_blocking_a_pending_request_changes_nothing(self, db_session, handler):
+        self.befriend(db_session, handler, "alice", "bob")
+        before = self.materialized(db_session)
+
+        handler.handle_friendship_blocked(FriendshipBlockedEvent(
+            friendship_id="x", requester_id="bob", addressee_id="carol",
+            operator_id="carol", blocked_at=T0, was_friends=False
+        ))
+
+        assert self.materialized(db_session) == before
+
+    def test_page_is_ranked_and_excludes_existing_relations(self, db_session, handler):
+        self.befriend(db_session, handler, "alice", "bob")
+        for candidate in ("carol", "dave", "erin"):
+            self.befriend(db_session, handler, "bob", candidate)
+        self.join_trip(db_session, handler, "trip-1", "alice")
+        self.join_trip(db_session, handler, "trip-1", "erin")
+        # alice 已向 dave 发出好友请求
+        db_session.add(FriendshipPO(
+            id="alice-dave", requester_id="alice", addressee_id="dave", status=FriendshipStatus.PENDING
+        ))
+        db_session.flush()
+
+        dao = SqlAlchemyFriendSuggestionDao(db_session)
+        page = dao.find_page("alice", limit=10)
+
+        assert [(r.candidate_id, r.mutual_friends, r.shared_trips) for r in page] == [
+            ("erin", 1, 1), ("carol", 1, 0)
+        ]
+        assert [r.candidate_id for r in dao.find_page("alice", limit=1, offset=1)] == ["carol"]
+
+
+class TestFriendSuggestionPublishPath:
+
+    @pytest.fixture
+    def file_engine(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'suggestions.db'}")
+        Base.metadata.create_all(engine)
+        yield engine
+        engine.dispose()
+
+    @pytest.fixture
+    def event_bus(self):
+        bus = EventBus()
+        saved = {event_type: list(handlers) for event_type, handlers in bus._handlers.items()}
+        bus.reset()
+        yield bus
+        bus.reset()
+        bus._handlers.update(saved)
+
+    def seed_trip(self, Session) -> Trip:
+        seed = Session()
+        trip = Trip.create(
+            name=TripName("Trip"), description=TripDescription(""), creator_id="alice",
+            date_range=DateRange(date(2024, 7, 1), date(2024, 7, 2))
+        )
+        trip.add_member("bob", MemberRole.MEMBER, added_by="alice")
+        TripRepositoryImpl(SqlAlchemyTripDao(seed)).save(trip)
+        for friend_id in ("carol", "dave"):
+            seed.add(FriendshipPO(
+                id=f"alice-{friend_id}", requester_id="alice", addressee_id=friend_id,
+                status=FriendshipStatus.ACCEPTED
+            ))
+        seed.commit()
+        seed.close()
+        return trip
+
+    def request_service(self, request_session, event_bus) -> TravelService:
+        # 与视图组装方式一致：事件在请求会话提交后发布
+        return TravelService(
+            TripRepositoryImpl(SqlAlchemyTripDao(request_session)), Mock(), event_bus=event_bus,
+            defer_until_commit=partial(after_commit, request_session)
+        )
+
+    def add_member_in_request(self, Session, event_bus, trip_id, user_id, commit=True):
+        request_session = Session()
+        try:
+            with patch('app_social.infrastructure.cache.friend_graph_cache.get_friend_graph_cache',
+                       return_value=FriendGraphCache(session_factory=Session)):
+                self.request_service(request_session, event_bus).add_member(trip_id, user_id, added_by="alice")
+            request_session.commit() if commit else request_session.rollback()
+        finally:
+            request_session.close()
+
+    def suggestion_rows(self, Session):
+        check = Session()
+        try:
+            return {
+                (row.user_id, row.candidate_id): (row.mutual_friends, row.shared_trips)
+                for row in check.execute(select(FriendSuggestionPO)).scalars()
+            }
+        finally:
+            check.close()
+
+    def test_add_member_through_event_bus_while_request_transaction_is_open(self, file_engine, event_bus):
+        Session = sessionmaker(bind=file_engine)
+        trip = self.seed_trip(Session)
+
+        tasks = BackgroundTaskQueue()
+        FriendSuggestionHandler(session_factory=Session, task_queue=tasks).subscribe(event_bus)
+
+        # 与请求一样：服务在请求会话中写入并发布事件，由视图稍后提交
+        request_session = Session()
+        service = self.request_service(request_session, event_bus)
+        with patch('app_social.infrastructure.cache.friend_graph_cache.get_friend_graph_cache',
+                   return_value=FriendGraphCache(session_factory=Session)):
+            started = time.monotonic()
+            service.add_member(trip.id.value, "carol", added_by="alice")
+            assert time.monotonic() - started < 1.0
+        request_session.commit()
+        request_session.close()
+        tasks.join()
+
+        assert self.suggestion_rows(Session) == {
+            ("carol", "alice"): (0, 1), ("alice", "carol"): (0, 1),
+            ("carol", "bob"): (0, 1), ("bob", "carol"): (0, 1),
+        }
+
+    def test_rolled_back_request_leaves_no_counts(self, file_engine, event_bus):
+        Session = sessionmaker(bind=file_engine)
+        trip = self.seed_trip(Session)
+        tasks = BackgroundTaskQueue()
+        FriendSuggestionHandler(session_factory=Session, task_queue=tasks).subscribe(event_bus)
+
+        self.add_member_in_request(Session, event_bus, trip.id.value, "dave", commit=False)
+        tasks.join()
+
+        assert self.suggestion_rows(Session) == {}
+
+    def test_concurrent_joins_count_the_new_pair_once(self, file_engine, event_bus):
+        Session = sessionmaker(bind=file_engine)
+        trip = self.seed_trip(Session)
+        queued = []
+        tasks = Mock()
+        tasks.submit.side_effect = lambda task, *args: queued.append((task, args))
+        FriendSuggestionHandler(session_factory=Session, task_queue=tasks).subscribe(event_bus)
+
+        # 两个请求先后提交，后台任务在两者都提交之后才执行
+        for user_id in ("carol", "dave"):
+            self.add_member_in_request(Session, event_bus, trip.id.value, user_id)
+        for task, args in queued:
+            task(*args)
+
+        rows = self.suggestion_rows(Session)
+        assert rows[("carol", "dave")] == (0, 1)
+        assert rows[("dave", "carol")] == (0, 1)
+        assert rows[("dave", "alice")] == rows[("carol", "bob")] == (0, 1)
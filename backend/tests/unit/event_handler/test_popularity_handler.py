@@ -0,0 +1,227 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../src')))
+import time
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from shared.event_bus import EventBus
+from shared.infrastructure.background_tasks import BackgroundTaskQueue
+
+from app_travel.domain.aggregate.trip_aggregate import Trip
+from app_travel.domain.aggregate.trip_template import TripTemplate
+from app_travel.domain.domain_event.travel_events import (
+    TemplatePublishedEvent, TemplateClonedEvent, TemplateViewedEvent, TripCreatedEvent, TripViewedEvent
+)
+from app_travel.domain.domain_service.popularity_service import PopularityService
+from app_travel.domain.event_handler.popularity_handler import PopularityHandler
+from app_travel.domain.value_objects.popularity_value_objects import PopularitySignal, RankingSort
+from app_travel.domain.value_objects.template_value_objects import TemplateId, TemplateDayData
+from app_travel.domain.value_objects.travel_value_objects import (
+    TripName, TripDescription, DateRange, TripVisibility
+)
+from app_travel.infrastructure.database.dao_impl.sqlalchemy_template_dao import SQLAlchemyTemplateDAO
+from app_travel.infrastructure.database.dao_impl.sqlalchemy_trip_dao import SqlAlchemyTripDao
+from app_travel.infrastructure.database.persistent_model.popularity_po import PopularityScorePO
+from app_travel.infrastructure.database.repository_impl.template_repository_impl import TemplateRepositoryImpl
+from app_travel.infrastructure.database.repository_impl.trip_repository_impl import TripRepositoryImpl
+from app_social.domain.domain_event.social_events import PostLikedEvent, PostUnlikedEvent
+
+T0 = datetime(2024, 6, 1)
+
+
+class TestPopularityScore:
+
+    def test_value_halves_every_half_life(self):
+        score = PopularityService.signal_score(PopularitySignal.CLONE, T0)
+        later = T0 + timedelta(hours=PopularityService.HALF_LIFE_HOURS)
+
+        assert PopularityService.current_value(score, T0) == pytest.approx(5.0)
+        assert PopularityService.current_value(score, later) == pytest.approx(2.5)
+
+    def test_recent_activity_outranks_older_activity(self):
+        # 两周前 3 次克隆 vs 昨天 1 次克隆
+        old = None
+        for _ in range(3):
+            old = PopularityService.add_signal(old, PopularitySignal.CLONE, T0)
+        recent = PopularityService.add_signal(None, PopularitySignal.CLONE, T0 + timedelta(days=13))
+
+        assert recent > old
+        now = T0 + timedelta(days=14)
+        assert PopularityService.current_value(recent, now) > PopularityService.current_value(old, now)
+
+    def test_add_accumulates_and_remove_is_floored(self):
+        base = PopularityService.signal_score(PopularitySignal.CREATED, T0)
+        liked = PopularityService.add_signal(base, PopularitySignal.LIKE, T0)
+
+        assert PopularityService.current_value(liked, T0) == pytest.approx(12.0)
+        assert PopularityService.remove_signal(liked, PopularitySignal.LIKE, T0, base) == pytest.approx(base)
+        # 稍后撤销：扣除量更大，但不低于基线
+        later = T0 + timedelta(days=1)
+        assert PopularityService.remove_signal(liked, PopularitySignal.LIKE, later, base) == base
+
+    def test_invalid_sort(self):
+        assert RankingSort.from_string("Trending") == RankingSort.TRENDING
+        with pytest.raises(ValueError):
+            RankingSort.from_string("random")
+
+
+def make_template(name, source_trip_id="trip-x", created_at=T0):
+    return TripTemplate.reconstitute(
+        template_id=TemplateId.generate(), name=name, description="",
+        source_trip_id=source_trip_id, author_id="author", duration_days=1, tags=[],
+        days_data=[TemplateDayData(day_number=1, theme=None, activities=())],
+        activity_count=0, created_at=created_at
+    )
+
+
+class TestPopularityRanking:
+
+    @pytest.fixture
+    def handler(self, db_session):
+        return PopularityHandler(session_factory=sessionmaker(bind=db_session.connection()))
+
+    @pytest.fixture
+    def template_repo(self, db_session):
+        return TemplateRepositoryImpl(SQLAlchemyTemplateDAO(db_session))
+
+    def publish(self, handler, template_repo, template, at):
+        template_repo.save(template)
+        handler.handle_template_published(TemplatePublishedEvent(
+            template_id=template.id.value, source_trip_id=template.source_trip_id, occurred_at=at
+        ))
+
+    def test_trending_templates_follow_clones_and_views(self, db_session, handler, template_repo):
+        older = make_template("Older")
+        newer = make_template("Newer")
+        self.publish(handler, template_repo, older, T0)
+        self.publish(handler, template_repo, newer, T0 + timedelta(days=1))
+
+        summaries, total = template_repo.find_summaries(sort=RankingSort.TRENDING)
+        assert [s.name for s in summaries] == ["Newer", "Older"] and total == 2
+
+        for _ in range(3):
+            handler.handle_template_cloned(TemplateClonedEvent(
+                template_id=older.id.value, occurred_at=T0 + timedelta(days=2)
+            ))
+        handler.handle_template_viewed(TemplateViewedEvent(
+            template_id=newer.id.value, occurred_at=T0 + timedelta(days=2)
+        ))
+
+        summaries, total = template_repo.find_summaries(sort=RankingSort.TRENDING)
+        assert [s.name for s in summaries] == ["Older", "Newer"] and total == 2
+        page, _ = template_repo.find_summaries(limit=1, offset=1, sort=RankingSort.TRENDING)
+        assert [s.name for s in page] == ["Newer"]
+
+        rows = {r.entity_id: r for r in db_session.query(PopularityScorePO).all()}
+        assert rows[older.id.value].clone_count == 3
+        assert rows[newer.id.value].view_count == 1
+
+    def test_signals_for_unranked_entities_are_ignored(self, db_session, handler):
+        handler.handle_template_cloned(TemplateClonedEvent(template_id="missing", occurred_at=T0))
+        assert db_session.query(PopularityScorePO).count() == 0
+
+    def test_post_likes_count_for_trip_and_its_templates(self, db_session, handler, template_repo):
+        trip_repo = TripRepositoryImpl(SqlAlchemyTripDao(db_session))
+        trips = []
+        for name in ("Liked", "Plain", "Private"):
+            trip = Trip.create(
+                name=TripName(name), description=TripDescription(""), creator_id="author",
+                date_range=DateRange(date(2024, 5, 1), date(2024, 5, 2)),
+                visibility=TripVisibility.PRIVATE if name == "Private" else TripVisibility.PUBLIC
+            )
+            trip_repo.save(trip)
+            handler.handle_trip_created(TripCreatedEvent(trip_id=trip.id.value, occurred_at=T0))
+            trips.append(trip)
+        liked_trip = trips[0]
+        template = make_template("From liked trip", source_trip_id=liked_trip.id.value)
+        self.publish(handler, template_repo, template, T0)
+
+        handler.handle_post_liked(PostLikedEvent(
+            post_id="p1", user_id="fan", post_author_id="author",
+            trip_id=liked_trip.id.value, occurred_at=T0 + timedelta(hours=1)
+        ))
+
+        summaries = trip_repo.find_public_summaries(sort=RankingSort.TRENDING)
+        assert [s.name for s in summaries][0] == "Liked"
+        assert "Private" not in [s.name for s in summaries]
+        rows = {r.entity_id: r for r in db_session.query(PopularityScorePO).all()}
+        assert rows[liked_trip.id.value].like_count == 1
+        assert rows[template.id.value].like_count == 1
+
+        # 作者自己的取消点赞不计；他人取消点赞回到基线
+        handler.handle_post_unliked(PostUnlikedEvent(
+            post_id="p1", user_id="author", post_author_id="author", trip_id=liked_trip.id.value
+        ))
+        db_session.expire_all()
+        assert db_session.get(PopularityScorePO, ("trip", liked_trip.id.value)).like_count == 1
+        handler.handle_post_unliked(PostUnlikedEvent(
+            post_id="p1", user_id="fan", post_author_id="author", trip_id=liked_trip.id.value
+        ))
+        db_session.expire_all()
+        row = db_session.get(PopularityScorePO, ("trip", liked_trip.id.value))
+        assert row.like_count == 0
+        assert row.score == row.base_score
+
+    def test_views_count_once_per_viewer_within_window(self, db_session, handler):
+        handler.handle_trip_created(TripCreatedEvent(trip_id="t1", occurred_at=T0))
+        for viewer_id in ("u1", "u1", "u2", None, None):
+            handler.handle_trip_viewed(TripViewedEvent(trip_id="t1", viewer_id=viewer_id, occurred_at=T0))
+
+        db_session.expire_all()
+        assert db_session.get(PopularityScorePO, ("trip", "t1")).view_count == 3
+
+
+class TestPopularityBackgroundWrites:
+
+    @pytest.fixture
+    def file_engine(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'popularity.db'}")
+        PopularityScorePO.__table__.create(engine)
+        yield engine
+        engine.dispose()
+
+    @pytest.fixture
+    def event_bus(self):
+        bus = EventBus()
+        saved = {event_type: list(handlers) for event_type, handlers in bus._handlers.items()}
+        bus.reset()
+        yield bus
+        bus.reset()
+        bus._handlers.update(saved)
+
+    def test_publish_does_not_wait_for_open_request_transaction(self, file_engine, event_bus):
+        Session = sessionmaker(bind=file_engine)
+        tasks = BackgroundTaskQueue()
+        handler = PopularityHandler(session_factory=Session, task_queue=tasks)
+        handler.subscribe(event_bus)
+
+        # 请求事务持有写锁期间发布事件
+        request_session = Session()
+        request_session.add(PopularityScorePO(
+            entity_type="trip", entity_id="other", score=1.0, base_score=1.0, published_at=T0
+        ))
+        request_session.flush()
+        started = time.monotonic()
+        event_bus.publish(TripCreatedEvent(trip_id="t1", occurred_at=T0))
+        assert time.monotonic() - started < 1.0
+        request_session.commit()
+        request_session.close()
+        tasks.join()
+
+        for viewer_id in ("u1", "u2", "u1"):
+            event_bus.publish(TripViewedEvent(trip_id="t1", viewer_id=viewer_id, occurred_at=T0))
+        # 不等待定时写入，直接合并写入缓冲的浏览
+        handler.flush_views()
+        tasks.join()
+
+        check = Session()
+        try:
+            row = check.get(PopularityScorePO, ("trip", "t1"))
+            assert row.view_count == 2
+            assert row.score > row.base_score
+        finally:
+            check.close()
@@ -0,0 +1,67 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../src')))
+import json
+from decimal import Decimal
+
+from shared.infrastructure.json_stream import iter_json, parse_fields, select_fields
+
+
+class TestParseFields:
+
+    def test_empty_selects_everything(self):
+        assert parse_fields(None) is None
+        assert parse_fields(" , ") is None
+
+    def test_nested_paths(self):
+        assert parse_fields("id,days.date,days.activities.name") == {
+            'id': None,
+            'days': {'date': None, 'activities': {'name': None}},
+        }
+
+    def test_whole_field_wins_over_subfields(self):
+        assert parse_fields("days,days.date") == {'days': None}
+        assert parse_fields("days.date,days") == {'days': None}
+
+
+class TestSelectFields:
+
+    def test_selects_into_lists_and_generators(self):
+        data = {
+            'id': 't1', 'name': 'Trip', 'secret': 'x',
+            'days': (d for d in [{'date': '2024-01-01', 'notes': 'a'}, {'date': '2024-01-02', 'notes': 'b'}]),
+            'members': [{'user_id': 'u1', 'role': 'admin'}],
+        }
+        selected = select_fields(data, parse_fields("id,days.date,members.user_id,missing"))
+
+        assert set(selected) == {'id', 'days', 'members'}
+        assert list(selected['days']) == [{'date': '2024-01-01'}, {'date': '2024-01-02'}]
+        assert selected['members'] == [{'user_id': 'u1'}]
+
+
+class TestIterJson:
+
+    def test_matches_json_dumps(self):
+        value = {'a': [1, 2.5, None, True], 'b': {'c': '中文', 'd': []}, 'e': {}}
+        compact = (',', ':')
+        assert ''.join(iter_json(value)) == json.dumps(value, separators=compact)
+        assert ''.join(iter_json(value, ensure_ascii=False)) == json.dumps(value, separators=compact, ensure_ascii=False)
+
+    def test_generators_are_consumed_lazily(self):
+        produced = []
+
+        def days():
+            for i in range(3):
+                produced.append(i)
+                yield {'day': i, 'payload': 'x' * 100}
+
+        chunks = iter(iter_json({'days': days()}, chunk_size=64))
+        first = next(chunks)
+        assert first.startswith('{"days":[')
+        assert len(produced) < 3
+
+        text = first + ''.join(chunks)
+        assert [d['day'] for d in json.loads(text)['days']] == [0, 1, 2]
+
+    def test_default_handles_unknown_types(self):
+        assert ''.join(iter_json({'amount': Decimal('1.50')}, default=str)) == '{"amount":"1.50"}'
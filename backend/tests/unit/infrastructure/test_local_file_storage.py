@@ -0,0 +1,94 @@
+import pytest
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../src')))
+import hashlib
+from io import BytesIO
+
+from sqlalchemy.orm import sessionmaker
+from werkzeug.datastructures import FileStorage
+
+from shared.storage.file_reference_registry import FileReferenceRegistry
+from shared.storage.local_file_storage import LocalFileStorageService, TMP_DIR_NAME
+
+
+def upload(content: bytes, filename: str = "photo.jpg") -> FileStorage:
+    return FileStorage(stream=BytesIO(content), filename=filename, content_type="image/jpeg")
+
+
+class TestLocalFileStorageService:
+
+    @pytest.fixture
+    def registry(self, db_session):
+        return FileReferenceRegistry(session_factory=sessionmaker(bind=db_session.connection()))
+
+    @pytest.fixture
+    def storage(self, tmp_path, registry):
+        return LocalFileStorageService(upload_folder=str(tmp_path), registry=registry)
+
+    def files_on_disk(self, storage):
+        found = []
+        for root, _, files in os.walk(storage.upload_folder):
+            found.extend(os.path.relpath(os.path.join(root, f), storage.upload_folder) for f in files)
+        return sorted(found)
+
+    def test_identical_content_is_stored_once_in_sharded_path(self, storage, registry):
+        content = b"same avatar bytes" * 10000
+        digest = hashlib.sha256(content).hexdigest()
+
+        first = storage.save(upload(content, "me.JPG"), sub_folder="avatars")
+        second = storage.save(upload(content, "repost.jpg"), sub_folder="avatars")
+
+        assert first == second == f"/static/uploads/avatars/{digest[:2]}/{digest[2:4]}/{digest}.jpg"
+        assert self.files_on_disk(storage) == [os.path.join("avatars", digest[:2], digest[2:4], f"{digest}.jpg")]
+        assert os.listdir(os.path.join(storage.upload_folder, TMP_DIR_NAME)) == []
+        with open(os.path.join(storage.upload_folder, *first[len("/static/uploads/"):].split("/")), "rb") as f:
+            assert f.read() == content
+
+        path = storage.path_from_url(first)
+        assert registry.ref_count(path) == 2
+
+    def test_release_decrements_and_ignores_unmanaged_urls(self, storage, registry):
+        url = storage.save(upload(b"cover"), sub_folder="trip_covers")
+        other = storage.save(upload(b"other cover"), sub_folder="trip_covers")
+        path = storage.path_from_url(url)
+
+        storage.release(url)
+        storage.release(url)
+        storage.release("/static/uploads/trip_covers/3f2a9c.jpg")
+        storage.release("https://cdn.example.com/a.jpg")
+        storage.release(None)
+
+        assert registry.ref_count(path) == 0
+        assert registry.ref_count(storage.path_from_url(other)) == 1
+        # 文件保留到清理脚本确认没有引用后再删除
+        assert len(self.files_on_disk(storage)) == 2
+
+    def test_failed_upload_leaves_no_temp_file(self, storage):
+        class BrokenStream:
+            def read(self, size):
+                raise IOError("client disconnected")
+
+        broken = FileStorage(stream=BrokenStream(), filename="x.jpg")
+        with pytest.raises(IOError):
+            storage.save(broken)
+
+        assert self.files_on_disk(storage) == []
+
+    def test_save_registers_before_placing_and_restores_collected_file(self, storage, registry):
+        content = b"shared post image"
+        url = storage.save(upload(content), sub_folder="post_images")
+        path = storage.path_from_url(url)
+        target = os.path.join(storage.upload_folder, *path.split("/"))
+
+        # 清理脚本在去重判断之后删掉了文件：再次上传登记后会重新写入
+        os.remove(target)
+        seen_on_acquire = []
+        acquire = registry.acquire
+        registry.acquire = lambda *args: (seen_on_acquire.append(os.path.exists(target)), acquire(*args))
+
+        assert storage.save(upload(content), sub_folder="post_images") == url
+        assert seen_on_acquire == [False]
+        with open(target, "rb") as f:
+            assert f.read() == content
+        assert registry.ref_count(path) == 2
@@ -0,0 +1,111 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../src')))
+from unittest.mock import Mock, patch
+
+import pytest
+
+from shared.infrastructure.rate_limiter import InMemoryRateLimitBackend, SlidingWindowRateLimiter
+from app_auth.domain.demand_interface.i_login_rate_limiter import LoginRateLimitedError
+from app_auth.infrastructure.external_service.login_rate_limiter_impl import LoginRateLimiterImpl
+from app_auth.services.auth_application_service import AuthApplicationService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSlidingWindowRateLimiter:
+
+    def test_window_slides_instead_of_resetting(self):
+        clock = FakeClock()
+        limiter = SlidingWindowRateLimiter(limit=2, window_seconds=10, clock=clock)
+
+        assert limiter.hit("k") == 0
+        clock.now += 6
+        assert limiter.hit("k") == 0
+        # 第一次请求在 10 秒后滑出窗口
+        assert limiter.hit("k") == pytest.approx(4)
+        clock.now += 4
+        assert limiter.hit("k") == 0
+        assert limiter.hit("k") == pytest.approx(6)
+
+    def test_peek_and_record_do_not_interfere_with_other_keys(self):
+        clock = FakeClock()
+        limiter = SlidingWindowRateLimiter(limit=1, window_seconds=10, clock=clock)
+
+        assert limiter.peek("a") == 0
+        limiter.record("a")
+        assert limiter.peek("a") > 0
+        assert limiter.peek("b") == 0
+        limiter.reset("a")
+        assert limiter.peek("a") == 0
+
+    def test_backend_key_count_is_bounded(self):
+        backend = InMemoryRateLimitBackend(max_keys=2)
+        limiter = SlidingWindowRateLimiter(limit=1, window_seconds=60, backend=backend)
+        for key in ("a", "b", "c"):
+            limiter.hit(key)
+
+        assert len(backend) == 2
+        assert limiter.peek("a") == 0
+
+
+class TestLoginRateLimiter:
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    @pytest.fixture
+    def limiter(self, clock):
+        return LoginRateLimiterImpl(
+            ip_max_attempts=5, ip_window_seconds=60,
+            account_max_failures=3, account_window_seconds=300, clock=clock
+        )
+
+    def test_account_locks_after_failures_and_success_clears(self, limiter, clock):
+        for _ in range(3):
+            limiter.check("Alice@Test.com", "1.1.1.1")
+            limiter.record_failure("Alice@Test.com", "1.1.1.1")
+
+        # 不同 IP、不同大小写也被锁
+        with pytest.raises(LoginRateLimitedError) as exc:
+            limiter.check("alice@test.com", "2.2.2.2")
+        assert exc.value.retry_after == pytest.approx(300)
+        limiter.check("bob@test.com", "2.2.2.2")
+
+        clock.now += 300
+        limiter.check("alice@test.com", "3.3.3.3")
+        limiter.record_failure("alice@test.com", "3.3.3.3")
+        limiter.record_success("alice@test.com", "3.3.3.3")
+        limiter.check("alice@test.com", "3.3.3.3")
+        assert limiter.stats() == {'rejected_ip': 0, 'rejected_account': 1}
+
+    def test_ip_limit_counts_every_attempt(self, limiter):
+        for i in range(5):
+            limiter.check(f"user{i}@test.com", "9.9.9.9")
+        with pytest.raises(LoginRateLimitedError):
+            limiter.check("other@test.com", "9.9.9.9")
+        limiter.check("other@test.com", "8.8.8.8")
+        assert limiter.stats()['rejected_ip'] == 1
+
+    @patch('app_auth.services.auth_application_service.session', new={})
+    def test_rejected_login_skips_lookup_and_bcrypt(self, limiter):
+        domain_service = Mock()
+        domain_service.authenticate.return_value = None
+        service = AuthApplicationService(
+            domain_auth_service=domain_service, user_repository=Mock(),
+            event_bus=Mock(), rate_limiter=limiter
+        )
+
+        for _ in range(3):
+            assert service.login("victim@test.com", "wrong-password", ip_address="1.1.1.1") is None
+        with pytest.raises(LoginRateLimitedError):
+            service.login("victim@test.com", "right-password", ip_address="1.1.1.1")
+
+        assert domain_service.authenticate.call_count == 3
@@ -0,0 +1,174 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../src')))
+import threading
+from unittest.mock import Mock, patch
+
+import bcrypt
+import pytest
+
+from app_auth.domain.demand_interface.i_password_hasher import PasswordHasherBusyError
+from app_auth.domain.domain_service.auth_service import AuthService
+from app_auth.domain.entity.user_entity import User
+from app_auth.domain.value_objects.user_value_objects import Email, Password, Username, HashedPassword
+from app_auth.infrastructure.external_service.password_hasher_impl import PasswordHasherImpl
+
+PASSWORD = Password("correct horse")
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasherImpl(rounds=4, max_workers=2)
+    yield hasher
+    hasher.shutdown()
+
+
+class TestPasswordHasher:
+
+    def test_hash_and_verify_run_on_pool_threads(self, hasher):
+        threads = []
+        real_checkpw = bcrypt.checkpw
+
+        def checkpw(*args):
+            threads.append(threading.current_thread().name)
+            return real_checkpw(*args)
+
+        hashed = hasher.hash(PASSWORD)
+        assert hashed.value.startswith("$2b$04$")
+        with patch.object(bcrypt, "checkpw", side_effect=checkpw):
+            assert hasher.verify(PASSWORD, hashed)
+            assert not hasher.verify(Password("wrong horse"), hashed)
+
+        assert all(name.startswith("bcrypt") for name in threads)
+        metrics = hasher.metrics.snapshot()
+        assert metrics["verify"]["count"] == 2
+        assert metrics["verify"]["failures"] == 1
+        assert metrics["verify_per_minute"] == 2
+        assert metrics["hash"]["count"] == 1
+
+    def test_needs_rehash_when_cost_changes(self, hasher):
+        hashed = hasher.hash(PASSWORD)
+        stronger = PasswordHasherImpl(rounds=5)
+        try:
+            assert not hasher.needs_rehash(hashed)
+            assert stronger.needs_rehash(hashed)
+            assert not stronger.needs_rehash(HashedPassword("not-a-bcrypt-hash"))
+            # 只有真正重新哈希才计数
+            assert stronger.metrics.snapshot()["rehashes"] == 0
+        finally:
+            stronger.shutdown()
+
+    def test_rejects_when_pool_is_full(self):
+        hasher = PasswordHasherImpl(rounds=4, max_workers=1, max_pending=0)
+        hashed = HashedPassword(bcrypt.hashpw(PASSWORD.value.encode(), bcrypt.gensalt(4)).decode())
+        started, release = threading.Event(), threading.Event()
+
+        def slow_checkpw(*args):
+            started.set()
+            release.wait(5)
+            return True
+
+        try:
+            with patch.object(bcrypt, "checkpw", side_effect=slow_checkpw):
+                worker = threading.Thread(target=hasher.verify, args=(PASSWORD, hashed))
+                worker.start()
+                assert started.wait(5)
+                with pytest.raises(PasswordHasherBusyError):
+                    hasher.verify(PASSWORD, hashed)
+                release.set()
+                worker.join(5)
+            # 计算结束后释放名额
+            assert hasher.verify(PASSWORD, hashed)
+            assert hasher.metrics.snapshot()["rejected"] == 1
+        finally:
+            release.set()
+            hasher.shutdown()
+
+    def test_invalid_rounds(self):
+        with pytest.raises(ValueError):
+            PasswordHasherImpl(rounds=3)
+
+
+class TestRehashOnLogin:
+
+    def test_login_upgrades_hash_to_configured_cost(self, hasher):
+        user = User.register(
+            username=Username("rehash_user"), email=Email("rehash@test.com"),
+            password=PASSWORD, password_hasher=hasher
+        )
+        repo = Mock()
+        repo.find_by_email.return_value = user
+        stronger = PasswordHasherImpl(rounds=5)
+        try:
+            service = AuthService(user_repo=repo, password_hasher=stronger, email_service=Mock())
+
+            assert service.authenticate(Email("rehash@test.com"), PASSWORD) is user
+            assert user.hashed_password.value.startswith("$2b$05$")
+            assert stronger.verify(PASSWORD, user.hashed_password)
+            repo.save.assert_called_once_with(user)
+            assert stronger.metrics.snapshot()["rehashes"] == 1
+
+            # 已是当前 cost，不再重新哈希
+            current = user.hashed_password
+            service.authenticate(Email("rehash@test.com"), PASSWORD)
+            assert user.hashed_password == current
+        finally:
+            stronger.shutdown()
+
+    def test_rehash_only_runs_on_an_idle_worker(self):
+        stronger = PasswordHasherImpl(rounds=5, max_workers=1)
+        hashed = HashedPassword(bcrypt.hashpw(PASSWORD.value.encode(), bcrypt.gensalt(4)).decode())
+        started, release = threading.Event(), threading.Event()
+
+        def slow_checkpw(*args):
+            started.set()
+            release.wait(5)
+            return True
+
+        try:
+            with patch.object(bcrypt, "checkpw", side_effect=slow_checkpw):
+                worker = threading.Thread(target=stronger.verify, args=(PASSWORD, hashed))
+                worker.start()
+                assert started.wait(5)
+                # 唯一的计算线程被占用：不排队，直接拒绝
+                with pytest.raises(PasswordHasherBusyError):
+                    stronger.rehash(PASSWORD)
+                release.set()
+                worker.join(5)
+            assert stronger.rehash(PASSWORD).value.startswith("$2b$05$")
+            metrics = stronger.metrics.snapshot()
+            assert (metrics["rehashes"], metrics["rehashes_skipped"], metrics["rejected"]) == (1, 1, 0)
+        finally:
+            release.set()
+            stronger.shutdown()
+
+    def test_busy_rehash_does_not_fail_verified_login(self, hasher):
+        user = User.register(
+            username=Username("rehash_busy2"), email=Email("rehash_busy2@test.com"),
+            password=PASSWORD, password_hasher=hasher
+        )
+        original = user.hashed_password
+        repo = Mock()
+        repo.find_by_email.return_value = user
+        busy = Mock(wraps=hasher)
+        busy.needs_rehash.return_value = True
+        busy.rehash.side_effect = PasswordHasherBusyError("busy")
+        service = AuthService(user_repo=repo, password_hasher=busy, email_service=Mock())
+
+        assert service.authenticate(Email("rehash_busy2@test.com"), PASSWORD) is user
+        assert user.hashed_password == original
+        repo.save.assert_called_once_with(user)
+
+    def test_failed_login_does_not_rehash(self, hasher):
+        user = User.register(
+            username=Username("rehash_user2"), email=Email("rehash2@test.com"),
+            password=PASSWORD, password_hasher=hasher
+        )
+        original = user.hashed_password
+        repo = Mock()
+        repo.find_by_email.return_value = user
+        service = AuthService(user_repo=repo, password_hasher=PasswordHasherImpl(rounds=5), email_service=Mock())
+
+        assert service.authenticate(Email("rehash2@test.com"), Password("wrong password")) is None
+        assert user.hashed_password == original
+        repo.save.assert_not_called()
@@ -0,0 +1,117 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../src')))
+import math
+from datetime import date, time
+
+from sqlalchemy import event
+
+from app_travel.domain.aggregate.trip_aggregate import Trip
+from app_travel.domain.entity.activity import Activity
+from app_travel.domain.entity.transit import Transit
+from app_travel.domain.value_objects.transit_value_objects import RouteInfo, TransportMode
+from app_travel.domain.value_objects.travel_value_objects import (
+    TripName, TripDescription, DateRange, ActivityType, Location
+)
+from app_travel.infrastructure.database.dao_impl.sqlalchemy_trip_dao import SqlAlchemyTripDao
+from app_travel.infrastructure.database.persistent_model.trip_po import TransitPO
+from app_travel.infrastructure.database.repository_impl.trip_repository_impl import TripRepositoryImpl
+from app_travel.infrastructure.geo import polyline_codec
+
+
+def wavy_route(n=400):
+    """沿经度方向的路线，带少量抖动"""
+    return [(116.3 + i * 0.0005, 39.9 + 0.00001 * math.sin(i)) for i in range(n)]
+
+
+class TestPolylineEncoding:
+
+    def test_round_trip_is_lossless_at_gaode_precision(self):
+        raw = "116.481028,39.989643;116.465302,40.004717;116.481028,39.989643"
+        encoded = polyline_codec.to_storage(raw)
+
+        assert polyline_codec.is_encoded(encoded)
+        assert polyline_codec.to_gaode(encoded) == raw
+        # 已编码的值原样返回
+        assert polyline_codec.to_storage(encoded) == encoded
+
+    def test_encoded_is_much_smaller(self):
+        raw = polyline_codec.format_gaode(wavy_route())
+        encoded = polyline_codec.to_storage(raw)
+        assert len(encoded) < len(raw) / 2
+
+    def test_legacy_text_and_empty_values(self):
+        assert polyline_codec.to_points("121.5,31.2;;bad;121.6,31.3") == [(121.5, 31.2), (121.6, 31.3)]
+        assert polyline_codec.to_gaode("121.5,31.2;121.6,31.3") == "121.5,31.2;121.6,31.3"
+        assert polyline_codec.to_storage("") is None
+        assert polyline_codec.to_storage(None) is None
+
+
+class TestPolylineSimplification:
+
+    def test_keeps_endpoints_and_corners(self):
+        points = [(0.0, 0.0), (0.5, 0.0), (1.0, 0.0), (1.0, 0.5), (1.0, 1.0)]
+        assert polyline_codec.simplify(points, 0.01) == [(0.0, 0.0), (1.0, 0.0), (1.0, 1.0)]
+
+    def test_lower_zoom_simplifies_more(self):
+        encoded = polyline_codec.encode(wavy_route())
+        far = polyline_codec.to_points(polyline_codec.simplify_for_zoom(encoded, 8))
+        near = polyline_codec.to_points(polyline_codec.simplify_for_zoom(encoded, 18))
+
+        assert len(far) < len(near) <= 400
+        assert far[0] == (116.3, 39.9)
+        assert polyline_codec.tolerance_for_zoom(8) > polyline_codec.tolerance_for_zoom(18)
+
+
+class TestTransitPolylinePersistence:
+
+    def make_trip(self):
+        trip = Trip.create(
+            name=TripName("Route"), description=TripDescription(""), creator_id="u1",
+            date_range=DateRange(date(2024, 5, 1), date(2024, 5, 2))
+        )
+        activities = [
+            Activity.create(
+                name=name, activity_type=ActivityType.SIGHTSEEING,
+                location=Location(name=name, latitude=39.9, longitude=116.3),
+                start_time=time(hour, 0), end_time=time(hour + 1, 0)
+            )
+            for name, hour in (("A", 9), ("B", 12))
+        ]
+        for activity in activities:
+            trip.add_activity(0, activity, "u1")
+        trip.get_day(0).add_transit(Transit.create(
+            from_activity_id=activities[0].id,
+            to_activity_id=activities[1].id,
+            transport_mode=TransportMode.WALKING,
+            route_info=RouteInfo(1200, 900, polyline_codec.format_gaode(wavy_route())),
+            departure_time=time(10, 0)
+        ))
+        return trip
+
+    def test_stored_encoded_and_unchanged_rows_not_rewritten(self, db_session):
+        repo = TripRepositoryImpl(SqlAlchemyTripDao(db_session))
+        trip = self.make_trip()
+        repo.save(trip)
+
+        stored = db_session.query(TransitPO).one().polyline
+        assert polyline_codec.is_encoded(stored)
+
+        reloaded = repo.find_by_id(trip.id)
+        route = reloaded.get_day(0).transits[0].route_info
+        assert polyline_codec.to_points(route.polyline) == polyline_codec.to_points(
+            polyline_codec.format_gaode(wavy_route())
+        )
+
+        writes = []
+        listener = lambda conn, cursor, stmt, params, context, executemany: (
+            writes.append(stmt) if stmt.split()[0] in ("INSERT", "DELETE") else None
+        )
+        event.listen(db_session.bind, "before_cursor_execute", listener)
+        try:
+            reloaded.update_day_notes(1, "Rest day")
+            repo.save(reloaded)
+        finally:
+            event.remove(db_session.bind, "before_cursor_execute", listener)
+
+        assert not any("transits" in w or "activities" in w for w in writes)
@@ -0,0 +1,43 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../src')))
+from unittest.mock import patch
+
+import pytest
+from flask import Flask, request
+
+from shared.infrastructure.proxy import apply_proxy_fix, get_trusted_proxy_hops
+
+
+def make_app(hops):
+    app = Flask(__name__)
+    app.config['TRUSTED_PROXY_HOPS'] = hops
+    apply_proxy_fix(app)
+
+    @app.route('/ip')
+    def ip():
+        return request.remote_addr
+
+    return app.test_client()
+
+
+class TestProxyFix:
+
+    def test_direct_exposure_ignores_forwarded_headers(self):
+        client = make_app(0)
+        response = client.get('/ip', headers={'X-Forwarded-For': '203.0.113.9'})
+        assert response.get_data(as_text=True) == '127.0.0.1'
+
+    def test_trusted_hops_restore_client_address(self):
+        client = make_app(1)
+        assert client.get('/ip', headers={'X-Forwarded-For': '203.0.113.9'}).get_data(as_text=True) == '203.0.113.9'
+        # 客户端伪造的左侧条目不被采用，只取最后一层代理追加的地址
+        spoofed = client.get('/ip', headers={'X-Forwarded-For': '10.0.0.1, 198.51.100.7'})
+        assert spoofed.get_data(as_text=True) == '198.51.100.7'
+
+    def test_hops_read_from_config_then_environment(self):
+        with patch.dict(os.environ, {'TRUSTED_PROXY_HOPS': '2'}):
+            assert get_trusted_proxy_hops({}) == 2
+            assert get_trusted_proxy_hops({'TRUSTED_PROXY_HOPS': 0}) == 0
+        with pytest.raises(ValueError):
+            get_trusted_proxy_hops({'TRUSTED_PROXY_HOPS': -1})
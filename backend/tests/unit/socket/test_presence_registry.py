@@ -0,0 +1,152 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../src')))
+import time
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from shared.infrastructure.background_tasks import BackgroundTaskQueue
+from app_social.infrastructure.socket.presence_registry import PresenceRegistry
+from app_social.domain.domain_event.social_events import MessageSentEvent
+from app_notification.domain.event_handler import notification_event_handler
+from app_notification.infrastructure.database.persistent_model.notification_po import NotificationPO
+
+
+class TestPresenceRegistry:
+
+    def setup_method(self):
+        self.now = 0.0
+        self.registry = PresenceRegistry(expiry_seconds=60, clock=lambda: self.now)
+
+    def test_user_online_while_any_connection_alive(self):
+        self.registry.connect("u1", "sid-a")
+        self.registry.connect("u1", "sid-b")
+        self.registry.disconnect("sid-a")
+        assert self.registry.is_online("u1")
+
+        self.registry.disconnect("sid-b")
+        assert not self.registry.is_online("u1")
+
+    def test_connections_expire_without_heartbeat(self):
+        self.registry.connect("u1", "sid-a")
+        self.registry.connect("u2", "sid-b")
+
+        self.now = 50
+        self.registry.heartbeat("sid-a")
+        self.now = 70
+
+        assert self.registry.get_online_users(["u1", "u2", "u3"]) == {"u1"}
+
+    def test_viewing_tracks_each_connection(self):
+        self.registry.connect("u1", "sid-a")
+        self.registry.connect("u1", "sid-b")
+        self.registry.set_viewing("sid-a", "conv-1")
+        self.registry.set_viewing("sid-b", "conv-1")
+
+        self.registry.stop_viewing("sid-a", "conv-1")
+        assert self.registry.is_viewing("u1", "conv-1")
+
+        self.registry.set_viewing("sid-b", "conv-2")
+        assert not self.registry.is_viewing("u1", "conv-1")
+        assert self.registry.get_viewing_users("conv-2", ["u1", "u2"]) == {"u1"}
+
+
+def test_message_notifications_skip_users_viewing_conversation():
+    registry = PresenceRegistry()
+    registry.connect("viewer", "sid-1")
+    registry.set_viewing("sid-1", "conv-1")
+
+    event = MessageSentEvent(
+        conversation_id="conv-1",
+        message_id="m1",
+        sender_id="sender",
+        recipient_ids=("viewer", "away"),
+        content="hi"
+    )
+
+    saved = []
+    with patch.object(notification_event_handler, "_conversation_presence", registry), \
+         patch.object(notification_event_handler, "_task_queue", None), \
+         patch.object(notification_event_handler, "SessionLocal"), \
+         patch.object(notification_event_handler, "NotificationRepositoryImpl") as repo_cls:
+        repo_cls.return_value.refresh_unread.return_value = set()
+        repo_cls.return_value.save.side_effect = saved.append
+        notification_event_handler.handle_message_sent(event)
+
+    assert [n.user_id for n in saved] == ["away"]
+
+
+def test_message_notifications_coalesce_per_conversation(db_session):
+    def send(message_id, sender_id):
+        notification_event_handler.handle_message_sent(MessageSentEvent(
+            conversation_id="conv-1",
+            message_id=message_id,
+            sender_id=sender_id,
+            recipient_ids=("reader", "sender-a", "sender-b"),
+            content="hi"
+        ))
+
+    def unread_for(user_id):
+        return db_session.query(NotificationPO).filter(
+            NotificationPO.user_id == user_id,
+            NotificationPO.is_read == False
+        ).all()
+
+    session_factory = sessionmaker(bind=db_session.connection())
+    with patch.object(notification_event_handler, "_conversation_presence", None), \
+         patch.object(notification_event_handler, "_task_queue", None), \
+         patch.object(notification_event_handler, "SessionLocal", session_factory):
+        send("m1", "sender-a")
+        send("m2", "sender-b")
+        send("m3", "sender-b")
+
+        unread = unread_for("reader")
+        assert len(unread) == 1
+        assert unread[0].resource_id == "conv-1"
+        assert unread[0].actor_id == "sender-b"
+
+        # 已读后再来新消息，重新生成一条
+        unread[0].is_read = True
+        db_session.flush()
+        send("m4", "sender-a")
+
+    assert len(unread_for("reader")) == 1
+    assert db_session.query(NotificationPO).filter(NotificationPO.user_id == "reader").count() == 2
+
+
+def test_message_notifications_do_not_block_on_another_writer(tmp_path):
+    # 文件数据库：另一个连接持有写事务时，SQLite 的写入会等待锁
+    engine = create_engine(f"sqlite:///{tmp_path / 'notifications.db'}")
+    NotificationPO.__table__.create(engine)
+    session_factory = sessionmaker(bind=engine)
+    task_queue = BackgroundTaskQueue(name="test-notifications")
+    writer = engine.connect()
+    writer.exec_driver_sql("BEGIN IMMEDIATE")
+    try:
+        with patch.object(notification_event_handler, "_conversation_presence", None), \
+             patch.object(notification_event_handler, "_task_queue", task_queue), \
+             patch.object(notification_event_handler, "SessionLocal", session_factory):
+            started = time.perf_counter()
+            notification_event_handler.handle_message_sent(MessageSentEvent(
+                conversation_id="conv-1",
+                message_id="m1",
+                sender_id="sender",
+                recipient_ids=("sender", "reader"),
+                content="hi"
+            ))
+            assert time.perf_counter() - started < 1
+
+            writer.exec_driver_sql("COMMIT")
+            task_queue.join()
+
+        session = session_factory()
+        try:
+            assert [n.user_id for n in session.query(NotificationPO).all()] == ["reader"]
+        finally:
+            session.close()
+    finally:
+        writer.close()
+        engine.dispose()
+
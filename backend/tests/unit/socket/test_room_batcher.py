@@ -0,0 +1,107 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../src')))
+
+from app_social.infrastructure.socket.room_batcher import RoomEventBatcher, get_batching_options
+
+
+class ManualScheduler:
+    """Collects background tasks and runs them with a simulated clock"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.tasks = []
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+    def start_task(self, target, *args):
+        self.tasks.append((target, args))
+
+    def run_all(self):
+        tasks, self.tasks = self.tasks, []
+        for target, args in tasks:
+            target(*args)
+
+
+def _make_batcher(scheduler, frames, **kwargs):
+    return RoomEventBatcher(
+        lambda room, frame: frames.append((room, frame)),
+        start_task=scheduler.start_task,
+        sleep=scheduler.sleep,
+        clock=scheduler.clock,
+        **kwargs
+    )
+
+
+def test_events_in_window_are_coalesced_into_one_frame():
+    scheduler = ManualScheduler()
+    frames = []
+    batcher = _make_batcher(scheduler, frames, window_ms=5, max_latency_ms=50)
+
+    batcher.add_message("c1", {"id": "m1"})
+    batcher.set_typing("c1", "u1", True)
+    scheduler.now += 0.002
+    batcher.add_message("c1", {"id": "m2"})
+    batcher.set_typing("c1", "u1", False)
+    batcher.add_read_receipt("c1", "u2", "m1")
+    batcher.add_read_receipt("c1", "u2", "m2")
+
+    # Only one flush task is scheduled per buffered room
+    assert len(scheduler.tasks) == 1
+    scheduler.run_all()
+
+    assert len(frames) == 1
+    room, frame = frames[0]
+    assert room == "c1"
+    assert [m["id"] for m in frame["messages"]] == ["m1", "m2"]
+    assert frame["typing"] == [{"user_id": "u1", "is_typing": False}]
+    assert frame["reads"] == [{"user_id": "u2", "up_to_message_id": "m2"}]
+    assert batcher.pending_rooms() == []
+
+
+def test_max_latency_bounds_continuous_traffic():
+    scheduler = ManualScheduler()
+    frames = []
+    batcher = _make_batcher(scheduler, frames, window_ms=5, max_latency_ms=20)
+
+    batcher.add_message("c1", {"id": "m0"})
+    task, args = scheduler.tasks.pop()
+
+    # Keep the room busy: a message every 4ms would postpone a pure window forever
+    original_sleep = scheduler.sleep
+
+    def busy_sleep(seconds):
+        original_sleep(seconds)
+        batcher.add_message("c1", {"id": f"m{int(scheduler.now * 1000)}"})
+
+    scheduler.sleep = busy_sleep
+    batcher._sleep = busy_sleep
+    task(*args)
+
+    assert len(frames) == 1
+    assert scheduler.now <= 0.020 + 1e-9
+
+
+def test_full_buffer_flushes_immediately():
+    scheduler = ManualScheduler()
+    frames = []
+    batcher = _make_batcher(scheduler, frames, window_ms=5, max_batch_size=2)
+
+    batcher.add_message("c1", {"id": "m1"})
+    batcher.add_message("c1", {"id": "m2"})
+    assert len(frames) == 1
+
+    # The stale scheduled task must not emit an empty or duplicate frame
+    scheduler.run_all()
+    assert len(frames) == 1
+
+
+def test_batching_disabled_by_default():
+    assert get_batching_options({}) is None
+    options = get_batching_options({"SOCKETIO_BATCH_WINDOW_MS": 3})
+    assert options["window_ms"] == 3
+    assert options["max_latency_ms"] == 50
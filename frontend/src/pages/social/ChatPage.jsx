@@ -24,6 +24,18 @@ import Modal from '../../components/Modal';
 import toast from 'react-hot-toast';
 import styles from './ChatPage.module.css';
 
+// 每个标签页一个会话标识：服务端按它在断线重连后恢复本标签页加入过的会话房间
+const SOCKET_CLIENT_SESSION_KEY = 'socketClientSession';
+
+const getSocketClientSession = () => {
+    let clientSession = sessionStorage.getItem(SOCKET_CLIENT_SESSION_KEY);
+    if (!clientSession) {
+        clientSession = crypto.randomUUID();
+        sessionStorage.setItem(SOCKET_CLIENT_SESSION_KEY, clientSession);
+    }
+    return clientSession;
+};
+
 const ChatPage = () => {
     const { user } = useAuth();
     const [conversations, setConversations] = useState([]);
@@ -44,6 +56,10 @@ const ChatPage = () => {
     const [inviteUserId, setInviteUserId] = useState('');
     const [inviteSubmitting, setInviteSubmitting] = useState(false);
     const [removingUserId, setRemovingUserId] = useState(null);
+    // conversation_id -> 正在输入的用户ID列表
+    const [typingUsers, setTypingUsers] = useState({});
+    // conversation_id -> { user_id: 已读到的消息ID }
+    const [readPositions, setReadPositions] = useState({});
     
     const messagesEndRef = useRef(null);
     const dropdownRef = useRef(null);
@@ -152,7 +168,8 @@ const ChatPage = () => {
     useEffect(() => {
         const socket = io('http://localhost:5001', {
             withCredentials: true,
-            transports: ['websocket']
+            transports: ['websocket'],
+            auth: { client_session: getSocketClientSession() }
         });
         socketRef.current = socket;
 
@@ -160,9 +177,23 @@ const ChatPage = () => {
             console.log('Socket connected');
         });
 
-        socket.on('new_message', (msg) => {
+        // Keep server-side presence alive while the page is open
+        const heartbeatTimer = setInterval(() => {
+            if (socket.connected) {
+                socket.emit('heartbeat');
+            }
+        }, 30000);
+
+        const handleIncomingMessage = (msg) => {
             console.log('New message:', msg);
             
+            // A delivered message ends the sender's typing indicator
+            setTypingUsers(prev => {
+                const current = prev[msg.conversation_id];
+                if (!current || !current.includes(msg.sender_id)) return prev;
+                return { ...prev, [msg.conversation_id]: current.filter(id => id !== msg.sender_id) };
+            });
+
             // 1. Update messages if looking at this conversation
             if (activeConvIdRef.current === msg.conversation_id) {
                 const conv = conversationsRef.current.find(c => c.id === msg.conversation_id);
@@ -188,12 +219,42 @@ const ChatPage = () => {
                 }
                 return c;
             }));
+        };
+
+        const handleTyping = ({ conversation_id, user_id, is_typing }) => {
+            if (user_id === user?.id) return;
+            setTypingUsers(prev => {
+                const current = prev[conversation_id] || [];
+                const others = current.filter(id => id !== user_id);
+                return { ...prev, [conversation_id]: is_typing ? [...others, user_id] : others };
+            });
+        };
+
+        const handleMessagesRead = ({ conversation_id, user_id, up_to_message_id }) => {
+            if (user_id === user?.id) return;
+            setReadPositions(prev => ({
+                ...prev,
+                [conversation_id]: { ...(prev[conversation_id] || {}), [user_id]: up_to_message_id }
+            }));
+        };
+
+        socket.on('new_message', handleIncomingMessage);
+        socket.on('typing', handleTyping);
+        socket.on('messages_read', handleMessagesRead);
+
+        // Busy rooms coalesce messages, typing indicators and read receipts into one frame;
+        // unpack it into the same handlers as the individual events
+        socket.on('room_batch', (batch) => {
+            (batch.messages || []).forEach(handleIncomingMessage);
+            (batch.typing || []).forEach(entry => handleTyping({ conversation_id: batch.room, ...entry }));
+            (batch.reads || []).forEach(entry => handleMessagesRead({ conversation_id: batch.room, ...entry }));
         });
 
         return () => {
+            clearInterval(heartbeatTimer);
             socket.disconnect();
         };
-    }, [ensureUserProfileLoaded]);
+    }, [ensureUserProfileLoaded, user?.id]);
 
     // Join/Leave conversation room
     useEffect(() => {
@@ -382,6 +443,17 @@ const ChatPage = () => {
     const isGroupConv = activeConv?.type === 'group';
     const isGroupOwner = isGroupConv && user?.id && activeConv?.participants?.[0] === user.id;
     const otherUserId = activeConv ? getOtherUserId(activeConv) : null;
+    const activeTypingCount = (typingUsers[activeConvId] || []).length;
+    // 对方已读到的最远位置，自己在此之前（含）的最后一条消息显示“已读”
+    const readUpToIndex = Math.max(-1, ...Object.values(readPositions[activeConvId] || {})
+        .map(messageId => messages.findIndex(m => m.id === messageId)));
+    let lastReadOwnIndex = -1;
+    for (let i = readUpToIndex; i >= 0; i -= 1) {
+        if (messages[i].sender_id === user?.id) {
+            lastReadOwnIndex = i;
+            break;
+        }
+    }
 
     const loadMemberProfiles = useCallback(async (participantIds) => {
         if (!participantIds || participantIds.length === 0) return;
@@ -609,7 +681,9 @@ const ChatPage = () => {
                                 <span className={styles.headerName}>
                                     {activeConv ? getConvName(activeConv) : '聊天'}
                                 </span>
-                                <span className={styles.headerStatus}>在线</span>
+                                <span className={styles.headerStatus}>
+                                    {activeTypingCount > 0 ? '正在输入...' : '在线'}
+                                </span>
                             </Link>
                             {isGroupConv && (
                                 <div style={{ marginLeft: 'auto' }}>
@@ -680,6 +754,9 @@ const ChatPage = () => {
                                             ) : (
                                                 msg.content
                                             )}
+                                            {index === lastReadOwnIndex && (
+                                                <span className={styles.readReceipt}>已读</span>
+                                            )}
                                         </div>
                                         {isMe && isGroupConv && (
                                             <div className={styles.msgAvatar} title={senderName}>
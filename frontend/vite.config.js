@@ -27,6 +27,8 @@ export default defineConfig({
       '/api': {
         target: 'http://localhost:5001',
         changeOrigin: true,
+        // Forward the client address so per-IP login limits see real clients
+        xfwd: true,
       },
       '/static': {
         target: 'http://localhost:5001',